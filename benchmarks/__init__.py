@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for St Mary's Fitness Management System.
+"""
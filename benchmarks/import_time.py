@@ -0,0 +1,90 @@
+"""
+Import-time benchmark.
+
+Measures, in a fresh interpreter per run, how long importing each entry
+module takes and how many project modules it pulls in.
+
+Usage:
+    python -m benchmarks.import_time --repeat 10 --output import_times.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+TARGETS = [
+    "src",
+    "src.models",
+    "src.models.attendance",
+    "src.repositories.attendance_repository",
+    "src.services.attendance_service",
+]
+
+_PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(elapsed, len([name for name in sys.modules if name == "src" or name.startswith("src.")]))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """
+    Time importing a module in fresh interpreters.
+
+    :param module: Dotted module name to import.
+    :param repeat: Number of interpreter runs.
+    :return: Timing summary and the number of project modules loaded.
+    """
+    timings = []
+    loaded = 0
+    root = Path(__file__).resolve().parent.parent
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True, text=True, check=True, cwd=root,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        loaded = int(output[1])
+    return {
+        "name": f"import.{module}",
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "project_modules": loaded,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time of the project's packages.")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreter runs per module")
+    parser.add_argument("--module", action="append", help="Module to measure (repeatable)")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in args.module or TARGETS:
+        try:
+            result = measure(module, args.repeat)
+            print(f"{module:<45} median {result['median'] * 1000:8.2f} ms  "
+                  f"{result['project_modules']:3d} project modules", file=sys.stderr)
+        except subprocess.CalledProcessError as e:
+            result = {"name": f"import.{module}", "error": e.stderr.strip().splitlines()[-1]}
+            print(f"{module:<45} ERROR {result['error']}", file=sys.stderr)
+        results.append(result)
+
+    text = json.dumps({"results": results}, indent=4)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
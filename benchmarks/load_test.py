@@ -0,0 +1,158 @@
+"""
+Load test for the HTTP/JSON API.
+
+Opens concurrent keep-alive connections against a running server (or one
+started for the test on a temporary data directory) and reports requests
+per second and latency percentiles.
+
+Usage:
+    python -m benchmarks.load_test --spawn --connections 32 --requests 200
+    python -m benchmarks.load_test --port 8080 --scenario batch --batch-size 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+SCENARIOS = ("check-in", "batch", "health")
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                   method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, bytes]:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = next(int(line.split(":", 1)[1]) for line in lines[1:] if line.lower().startswith("content-length:"))
+    return status, await reader.readexactly(length)
+
+
+async def _client(host: str, port: int, connection: int, requests: int, scenario: str,
+                  batch_size: int, latencies: List[float], errors: List[str]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for index in range(requests):
+            member_id = f"load-{connection}-{index // 2}"
+            if scenario == "health":
+                call = ("GET", "/health", None)
+            elif scenario == "batch":
+                call = ("POST", "/attendance/check-in/batch", {"check_ins": [
+                    {"member_id": f"load-{connection}-{index}-{n}", "location_id": "load"} for n in range(batch_size)
+                ]})
+            elif index % 2 == 0:
+                call = ("POST", "/attendance/check-in", {"member_id": member_id, "location_id": "load"})
+            else:
+                call = ("POST", "/attendance/check-out", {"member_id": member_id})
+            started = time.perf_counter()
+            status, body = await _request(reader, writer, *call)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(f"{status} {body[:200].decode(errors='replace')}")
+    finally:
+        writer.close()
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+async def run_load(host: str, port: int, connections: int, requests: int,
+                   scenario: str = "check-in", batch_size: int = 50) -> dict:
+    """
+    Drive the API with concurrent keep-alive connections.
+
+    :param host: Server host.
+    :param port: Server port.
+    :param connections: Concurrent connections.
+    :param requests: Requests sent sequentially on each connection.
+    :param scenario: One of SCENARIOS.
+    :param batch_size: Check-ins per request for the "batch" scenario.
+    :return: Throughput and latency summary.
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, connection, requests, scenario, batch_size, latencies, errors)
+        for connection in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": scenario,
+        "connections": connections,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "check_ins_per_second": len(latencies) * batch_size / elapsed if scenario == "batch" else None,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def _spawn_server(data_dir: str) -> Tuple[subprocess.Popen, int]:
+    root = Path(__file__).resolve().parent.parent
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.cli", "--data-dir", data_dir, "serve", "--port", "0"],
+        cwd=root, stdout=subprocess.PIPE, text=True,
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Serving on"):
+        process.kill()
+        raise RuntimeError("API server did not start")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--spawn", action="store_true", help="Start a server on a temporary data directory")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per connection")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="check-in")
+    parser.add_argument("--batch-size", type=int, default=50, help="Check-ins per request for --scenario batch")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="api-load-") as data_dir:
+        process = None
+        port = args.port
+        if args.spawn:
+            process, port = _spawn_server(data_dir)
+        try:
+            result = asyncio.run(run_load(args.host, port, args.connections, args.requests,
+                                          args.scenario, args.batch_size))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print(f"{result['scenario']}: {result['requests']} requests over {result['connections']} connections, "
+          f"{result['requests_per_second']:.0f} req/s, p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, {result['errors']} errors", file=sys.stderr)
+    text = json.dumps(result, indent=4)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Memory footprint benchmark.
+
+Writes a synthetic dataset once, then loads the attendance and appointment
+repositories in fresh interpreters with symbol interning on and off
+(INTERN_SYMBOLS) and reports the memory held by the loaded records.
+
+Usage:
+    python -m benchmarks.memory_footprint --scale 1000000 --output memory.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.synthetic_data import generate_dataset, write_dataset
+
+REPOSITORIES = {
+    "attendance": ("src.repositories.attendance_repository", "AttendanceRepository", "attendance.json"),
+    "appointments": ("src.repositories.appointment_repository", "AppointmentRepository", "appointments.json"),
+}
+
+_PROBE = """
+import gc, tracemalloc
+from {module} import {cls}
+gc.collect()
+tracemalloc.start()
+repository = {cls}({path!r})
+gc.collect()
+print(tracemalloc.get_traced_memory()[0], len(repository.data))
+"""
+
+
+def measure(entity: str, data_dir: str, intern: bool) -> dict:
+    """
+    Load one repository in a fresh interpreter and measure the memory it holds.
+
+    :param entity: Key of REPOSITORIES.
+    :param data_dir: Directory holding the dataset files.
+    :param intern: Whether symbol fields are interned while decoding.
+    :return: Bytes held after loading and the number of rows.
+    """
+    module, cls, file_name = REPOSITORIES[entity]
+    root = Path(__file__).resolve().parent.parent
+    environment = dict(os.environ, INTERN_SYMBOLS=str(intern))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, cls=cls, path=str(Path(data_dir) / file_name))],
+        capture_output=True, text=True, check=True, cwd=root, env=environment,
+    ).stdout.split()
+    return {"bytes": int(output[0]), "rows": int(output[1])}
+
+
+def run(scale: int, seed: int) -> List[dict]:
+    """
+    Measure every repository with and without interning.
+
+    :param scale: Number of attendance rows; appointments get half as many.
+    :param seed: Random seed of the synthetic dataset.
+    :return: One result per repository.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="memory-footprint-") as data_dir:
+        write_dataset(generate_dataset(scale, seed=seed), data_dir)
+        for entity in REPOSITORIES:
+            plain = measure(entity, data_dir, intern=False)
+            interned = measure(entity, data_dir, intern=True)
+            results.append({
+                "name": f"memory.{entity}",
+                "scale": scale,
+                "rows": interned["rows"],
+                "plain_bytes": plain["bytes"],
+                "interned_bytes": interned["bytes"],
+                "saved_bytes": plain["bytes"] - interned["bytes"],
+                "saved_ratio": 1 - interned["bytes"] / plain["bytes"],
+            })
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure repository memory with and without symbol interning.")
+    parser.add_argument("--scale", type=int, default=1_000_000, help="Attendance rows, default 1,000,000")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the dataset")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.seed)
+    for result in results:
+        print(
+            f"{result['name']:<22} {result['rows']:>9} rows  "
+            f"plain {result['plain_bytes'] / 2**20:8.1f} MiB  interned {result['interned_bytes'] / 2**20:8.1f} MiB  "
+            f"saved {result['saved_ratio']:6.1%}",
+            file=sys.stderr,
+        )
+    text = json.dumps({"results": results}, indent=4)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,441 @@
+"""
+Benchmark suite for repositories and services.
+
+Generates a synthetic dataset for each requested scale, times load, save,
+lookup, filter and service-level workflows, and writes machine-readable
+results that can be compared against a previous run.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scale 10000 --scale 100000 --output results.json
+    python -m benchmarks.run_benchmarks --scale 10000 --baseline results.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic_data import DAYS, SyntheticDataset, generate_dataset, write_dataset
+from src.models.attendance import AttendanceRecord
+from src.repositories.appointment_repository import AppointmentRepository
+from src.repositories.attendance_repository import AttendanceRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.member_repository import MemberRepository
+from src.utils.codec import codec_for
+
+
+@dataclass
+class BenchmarkContext:
+    """Dataset and storage shared by the benchmarks of one scale"""
+    scale: int
+    data_dir: Path
+    dataset: SyntheticDataset
+    ops: int
+    rng: random.Random = field(default_factory=lambda: random.Random(1))
+    # Data files write_dataset could not write, with their errors
+    unwritten: Dict[str, str] = field(default_factory=dict)
+
+    def path(self, name: str) -> str:
+        """Path of a data file in the benchmark's data directory, failing for a file that could not be written"""
+        if name in self.unwritten:
+            raise RuntimeError(f"{name} could not be written: {self.unwritten[name]}")
+        return str(self.data_dir / name)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark at one scale"""
+    name: str
+    scale: int
+    timings: List[float] = field(default_factory=list)
+    ops: int = 1
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert the result into a JSON-compatible dictionary"""
+        if self.error:
+            return {"name": self.name, "scale": self.scale, "error": self.error}
+        return {
+            "name": self.name,
+            "scale": self.scale,
+            "ops": self.ops,
+            "repeat": len(self.timings),
+            "min": min(self.timings),
+            "median": statistics.median(self.timings),
+            "mean": statistics.fmean(self.timings),
+            "per_op": statistics.median(self.timings) / self.ops,
+        }
+
+
+# A benchmark prepares its state from the context and returns the timed callable plus its op count
+Benchmark = Callable[[BenchmarkContext], tuple]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark under a dotted name such as "load.members"."""
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+@benchmark("load.members")
+def load_members(ctx: BenchmarkContext):
+    return (lambda: MemberRepository(ctx.path("members.json"))), 1
+
+
+@benchmark("load.locations")
+def load_locations(ctx: BenchmarkContext):
+    return (lambda: LocationRepository(ctx.path("locations.json"))), 1
+
+
+@benchmark("load.attendance")
+def load_attendance(ctx: BenchmarkContext):
+    return (lambda: AttendanceRepository(ctx.path("attendance.json"))), 1
+
+
+@benchmark("load.appointments")
+def load_appointments(ctx: BenchmarkContext):
+    return (lambda: AppointmentRepository(ctx.path("appointments.json"))), 1
+
+
+@benchmark("save.members")
+def save_members(ctx: BenchmarkContext):
+    return MemberRepository(ctx.path("members.json")).compact, 1
+
+
+@benchmark("save.attendance")
+def save_attendance(ctx: BenchmarkContext):
+    return AttendanceRepository(ctx.path("attendance.json")).compact, 1
+
+
+@benchmark("save.appointments")
+def save_appointments(ctx: BenchmarkContext):
+    return AppointmentRepository(ctx.path("appointments.json")).compact, 1
+
+
+@benchmark("save.attendance_single_update")
+def save_attendance_single_update(ctx: BenchmarkContext):
+    repository = AttendanceRepository(ctx.path("attendance.json"))
+    records = [ctx.rng.choice(ctx.dataset.attendance) for _ in range(ctx.ops)]
+    records = [repository.get_by_id(record.id) for record in records]
+
+    def run():
+        for record in records:
+            record.update()
+            repository.flush()
+    return run, len(records)
+
+
+@benchmark("codec.encode_attendance")
+def codec_encode_attendance(ctx: BenchmarkContext):
+    encode = codec_for(AttendanceRecord).encode
+    records = ctx.dataset.attendance
+    return (lambda: [encode(record) for record in records]), len(records)
+
+
+@benchmark("codec.decode_attendance")
+def codec_decode_attendance(ctx: BenchmarkContext):
+    codec = codec_for(AttendanceRecord)
+    raw_data = [codec.encode(record) for record in ctx.dataset.attendance]
+    return (lambda: [codec.decode(item) for item in raw_data]), len(raw_data)
+
+
+@benchmark("lookup.member_by_id")
+def lookup_member(ctx: BenchmarkContext):
+    repository = MemberRepository(ctx.path("members.json"))
+    ids = [ctx.rng.choice(ctx.dataset.members).id for _ in range(ctx.ops)]
+    return (lambda: [repository.get_by_id(member_id) for member_id in ids]), ctx.ops
+
+
+@benchmark("lookup.member_read_cache")
+def lookup_member_read_cache(ctx: BenchmarkContext):
+    from src.utils.read_cache import ReadCache, ReadCachePublisher
+    publisher = ReadCachePublisher(
+        MemberRepository(ctx.path("members.json")), LocationRepository(ctx.path("locations.json")),
+        ctx.path("read_cache")
+    )
+    publisher.close()
+    cache = ReadCache(publisher.directory)
+    ids = [ctx.rng.choice(ctx.dataset.members).id for _ in range(ctx.ops)]
+    return (lambda: [cache.get_member(member_id) for member_id in ids]), ctx.ops
+
+
+@benchmark("lookup.attendance_by_id")
+def lookup_attendance(ctx: BenchmarkContext):
+    repository = AttendanceRepository(ctx.path("attendance.json"))
+    ids = [ctx.rng.choice(ctx.dataset.attendance).id for _ in range(ctx.ops)]
+    return (lambda: [repository.get_by_id(record_id) for record_id in ids]), ctx.ops
+
+
+@benchmark("filter.attendance_by_date")
+def filter_attendance_by_date(ctx: BenchmarkContext):
+    repository = AttendanceRepository(ctx.path("attendance.json"))
+    day = ctx.dataset.attendance[len(ctx.dataset.attendance) // 2].check_in_time
+    location_id = ctx.dataset.locations[0].id
+    return (lambda: repository.get_attendance_by_date(day, location_id)), 1
+
+
+@benchmark("filter.active_attendance")
+def filter_active_attendance(ctx: BenchmarkContext):
+    repository = AttendanceRepository(ctx.path("attendance.json"))
+    member_ids = [ctx.rng.choice(ctx.dataset.members).id for _ in range(ctx.ops)]
+    return (lambda: [repository.get_active_attendance(member_id) for member_id in member_ids]), ctx.ops
+
+
+@benchmark("filter.appointments_by_date")
+def filter_appointments_by_date(ctx: BenchmarkContext):
+    repository = AppointmentRepository(ctx.path("appointments.json"))
+    day = ctx.dataset.appointments[0].start_time
+    location_id = ctx.dataset.locations[0].id
+    return (lambda: repository.get_appointments_by_date(day, location_id)), 1
+
+
+@benchmark("filter.trainer_schedule")
+def filter_trainer_schedule(ctx: BenchmarkContext):
+    repository = AppointmentRepository(ctx.path("appointments.json"))
+    appointment = ctx.dataset.appointments[0]
+    return (lambda: repository.get_trainer_schedule(appointment.trainer_id, appointment.start_time)), 1
+
+
+@benchmark("filter.member_appointment_history")
+def filter_member_history(ctx: BenchmarkContext):
+    repository = AppointmentRepository(ctx.path("appointments.json"))
+    member_ids = [ctx.rng.choice(ctx.dataset.members).id for _ in range(ctx.ops)]
+    return (lambda: [repository.get_member_appointment_history(member_id) for member_id in member_ids]), ctx.ops
+
+
+@benchmark("filter.available_zones")
+def filter_available_zones(ctx: BenchmarkContext):
+    from src.utils.schedule import AvailabilityIndex
+    index = AvailabilityIndex(LocationRepository(ctx.path("locations.json")).locations)
+    slots = [(ctx.rng.choice(DAYS), f"{ctx.rng.randint(6, 21):02d}:00") for _ in range(ctx.ops)]
+    return (lambda: [index.available_zones(day, time) for day, time in slots]), ctx.ops
+
+
+@benchmark("service.check_in_out")
+def service_check_in_out(ctx: BenchmarkContext):
+    from src.services.attendance_service import AttendanceService
+    service = AttendanceService(AttendanceRepository(ctx.path("attendance.json")))
+    location = ctx.dataset.locations[0]
+    members = ctx.rng.sample(ctx.dataset.members, min(ctx.ops, len(ctx.dataset.members)))
+
+    def run():
+        for member in members:
+            record = service.check_in(member.id, location.id)
+            service.check_out(record.id)
+    return run, len(members)
+
+
+@benchmark("sharded.check_in_out")
+def sharded_check_in_out(ctx: BenchmarkContext):
+    from src.repositories.sharded_repository import ShardedRepository
+    from src.services.attendance_service import AttendanceService
+    repository = ShardedRepository(AttendanceRepository, str(ctx.data_dir / "sharded"), "attendance.json")
+    if not repository.shard_keys:
+        repository.add_many(AttendanceRepository(ctx.path("attendance.json")).get_all())
+    service = AttendanceService(repository)
+    location = ctx.dataset.locations[0]
+    members = ctx.rng.sample(ctx.dataset.members, min(ctx.ops, len(ctx.dataset.members)))
+
+    def run():
+        for member in members:
+            record = service.check_in(member.id, location.id)
+            service.check_out(record.id)
+    return run, len(members)
+
+
+@benchmark("service.create_appointment")
+def service_create_appointment(ctx: BenchmarkContext):
+    from src.models.appointment import AppointmentType
+    from src.services.appointment_service import AppointmentService
+    service = AppointmentService(AppointmentRepository(ctx.path("appointments.json")))
+    location = ctx.dataset.locations[0]
+    # Each repetition books its own hours after the synthetic appointments, so no booking is rejected as a clash
+    hours = itertools.count()
+    start = datetime(2030, 1, 1)
+
+    def run():
+        for _ in range(ctx.ops):
+            member = ctx.rng.choice(ctx.dataset.members)
+            service.create_appointment(
+                member_id=member.id,
+                trainer_id=ctx.rng.choice(ctx.dataset.trainer_ids),
+                location_id=location.id,
+                appointment_type=AppointmentType.PERSONAL_TRAINING,
+                start_time=start + timedelta(hours=next(hours)),
+                duration=60,
+            )
+    return run, ctx.ops
+
+
+@benchmark("service.trainer_schedule_recurring")
+def service_trainer_schedule_recurring(ctx: BenchmarkContext):
+    from src.models.appointment import AppointmentType, RecurringAppointment
+    from src.repositories.recurring_appointment_repository import RecurringAppointmentRepository
+    from src.services.appointment_service import AppointmentService
+    recurring_repository = RecurringAppointmentRepository(ctx.path("recurring_appointments.json"))
+    # One open-ended weekly series per member of a sample, spread over the trainers and the week
+    start = datetime(2024, 1, 1, 6)
+    recurring_repository.add_many([
+        RecurringAppointment(
+            member_id=member.id,
+            trainer_id=ctx.rng.choice(ctx.dataset.trainer_ids),
+            location_id=member.home_location_id or ctx.dataset.locations[0].id,
+            appointment_type=AppointmentType.PERSONAL_TRAINING,
+            start_time=start + timedelta(days=ctx.rng.randrange(7), hours=ctx.rng.randrange(14)),
+            duration=60,
+        )
+        for member in ctx.rng.sample(ctx.dataset.members, min(len(ctx.dataset.members), max(ctx.scale // 10, 1)))
+    ])
+    service = AppointmentService(AppointmentRepository(ctx.path("appointments.json")), recurring_repository)
+    days = [datetime(2025, 1, 1) + timedelta(days=ctx.rng.randrange(365)) for _ in range(ctx.ops)]
+    trainers = [ctx.rng.choice(ctx.dataset.trainer_ids) for _ in range(ctx.ops)]
+    return (lambda: [service.get_trainer_schedule(trainer, day) for trainer, day in zip(trainers, days)]), ctx.ops
+
+
+@benchmark("report.trainer_utilization")
+def report_trainer_utilization(ctx: BenchmarkContext):
+    from src.services.report_service import ReportService
+    service = ReportService(AppointmentRepository(ctx.path("appointments.json")))
+    starts = [appointment.start_time for appointment in ctx.dataset.appointments]
+    start, end = min(starts), max(starts) + timedelta(days=1)
+    # Columns are built on the first call and reused by the timed ones
+    service.trainer_utilization(start, end)
+    return (lambda: service.trainer_utilization(start, end)), 1
+
+
+def run_suite(scales: List[int], repeat: int, ops: int, selected: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """
+    Run the selected benchmarks at every scale.
+
+    :param scales: Dataset sizes to run at.
+    :param repeat: Timed repetitions per benchmark.
+    :param ops: Operations per repetition for per-operation benchmarks.
+    :param selected: Name prefixes to run, or None for all benchmarks.
+    :return: One result per benchmark and scale.
+    """
+    results = []
+    for scale in scales:
+        dataset = generate_dataset(scale)
+        with tempfile.TemporaryDirectory(prefix=f"bench-{scale}-") as data_dir:
+            unwritten = write_dataset(dataset, data_dir)
+            for file_name, error in unwritten.items():
+                print(f"{file_name} could not be written at scale {scale}: {error}", file=sys.stderr)
+            for name, setup in BENCHMARKS.items():
+                if selected and not any(name.startswith(prefix) for prefix in selected):
+                    continue
+                ctx = BenchmarkContext(scale, Path(data_dir), dataset, ops, unwritten=unwritten)
+                result = BenchmarkResult(name, scale)
+                try:
+                    function, result.ops = setup(ctx)
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        function()
+                        result.timings.append(time.perf_counter() - started)
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+                    traceback.print_exc(file=sys.stderr)
+                results.append(result)
+                print(_format_result(result), file=sys.stderr)
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[dict]:
+    """
+    Compare results against a baseline run.
+
+    :param results: Current result dictionaries.
+    :param baseline: Baseline result dictionaries.
+    :param threshold: Relative slowdown of the median that counts as a regression, e.g. 0.1 for 10%.
+    :return: Comparison rows for every benchmark present in both runs.
+    """
+    previous = {(row["name"], row["scale"]): row for row in baseline if "median" in row}
+    rows = []
+    for row in results:
+        before = previous.get((row["name"], row["scale"]))
+        if before is None or "median" not in row:
+            continue
+        ratio = row["median"] / before["median"] if before["median"] else float("inf")
+        rows.append({
+            "name": row["name"],
+            "scale": row["scale"],
+            "baseline": before["median"],
+            "current": row["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _format_result(result: BenchmarkResult) -> str:
+    if result.error:
+        return f"{result.name:<36} {result.scale:>9}  ERROR {result.error}"
+    data = result.to_dict()
+    return f"{result.name:<36} {result.scale:>9}  median {data['median'] * 1000:10.3f} ms  per op {data['per_op'] * 1e6:12.1f} us"
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the St Mary's Fitness benchmark suite.")
+    parser.add_argument("--scale", type=int, action="append", help="Dataset size (repeatable), default 10000")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--ops", type=int, default=100, help="Operations per repetition for per-op benchmarks")
+    parser.add_argument("--only", action="append", help="Only run benchmarks whose name starts with this prefix")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="Compare against a previous JSON results file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Regression threshold for --baseline")
+    args = parser.parse_args(argv)
+
+    results = [result.to_dict() for result in run_suite(args.scale or [10000], args.repeat, args.ops, args.only)]
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "revision": _git_revision(),
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        report["comparison"] = compare(results, baseline, args.threshold)
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<36} {row['scale']:>9}  x{row['ratio']:6.2f}  {flag}", file=sys.stderr)
+        if any(row["regression"] for row in report["comparison"]):
+            exit_code = 1
+
+    text = json.dumps(report, indent=4)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Synthetic data generator for benchmarks.
+Produces reproducible members, locations with zones, appointments, attendance
+and subscriptions at any scale.
+"""
+
+import json
+import random
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List
+
+from src.models.appointment import Appointment, AppointmentStatus, AppointmentType
+from src.models.attendance import AttendanceRecord
+from src.models.common import Address
+from src.models.location import GymLocation, WorkoutZone
+from src.models.member import HealthInformation, Member, MembershipType
+from src.models.subscription import PaymentFrequency, Subscription, SubscriptionStatus
+from src.repositories.appointment_repository import AppointmentRepository
+from src.repositories.attendance_repository import AttendanceRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.member_repository import MemberRepository
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ZONE_TYPES = ["cardio", "weights", "studio", "pool", "functional", "spin", "yoga", "boxing"]
+FIRST_NAMES = ["Ava", "Ben", "Chloe", "Dan", "Ella", "Finn", "Grace", "Harry", "Isla", "Jack", "Kate", "Leo"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Patel", "Evans"]
+
+
+@dataclass
+class SyntheticDataset:
+    """A generated set of related entities"""
+    members: List[Member] = field(default_factory=list)
+    locations: List[GymLocation] = field(default_factory=list)
+    appointments: List[Appointment] = field(default_factory=list)
+    attendance: List[AttendanceRecord] = field(default_factory=list)
+    subscriptions: List[Subscription] = field(default_factory=list)
+    trainer_ids: List[str] = field(default_factory=list)
+    _locations_by_id: Dict[str, GymLocation] = field(default_factory=dict, repr=False)
+
+    def location_by_id(self, location_id: str) -> GymLocation:
+        """Look up a generated location by ID"""
+        if len(self._locations_by_id) != len(self.locations):
+            self._locations_by_id = {location.id: location for location in self.locations}
+        return self._locations_by_id[location_id]
+
+
+def generate_dataset(scale: int, seed: int = 0, now: datetime = None) -> SyntheticDataset:
+    """
+    Generate a dataset whose largest table has `scale` rows.
+
+    Attendance has `scale` rows, appointments half as many, and members and
+    subscriptions a tenth. There is one location per 2,000 members (at least
+    three), each with four to eight workout zones.
+
+    :param scale: Number of attendance records to generate.
+    :param seed: Random seed, the same seed always yields the same dataset.
+    :param now: Reference time; history is generated over the preceding year.
+    """
+    rng = random.Random(seed)
+    now = (now or datetime(2025, 1, 1)).replace(microsecond=0)
+    dataset = SyntheticDataset()
+
+    def new_id() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    member_count = max(1, scale // 10)
+    location_count = max(3, member_count // 2000)
+    dataset.trainer_ids = [new_id() for _ in range(max(5, member_count // 200))]
+
+    for index in range(location_count):
+        zones = [
+            WorkoutZone(
+                id=new_id(),
+                name=f"Zone {zone_index + 1}",
+                type=rng.choice(ZONE_TYPES),
+                capacity=rng.randint(10, 60),
+                equipment=[],
+                attendant_id=None,
+                schedule={day: [f"{hour:02d}:00" for hour in range(6, 22) if rng.random() < 0.5] for day in DAYS},
+            )
+            for zone_index in range(rng.randint(4, 8))
+        ]
+        dataset.locations.append(GymLocation(
+            id=new_id(),
+            name=f"St Mary's Fitness {index + 1}",
+            address=_address(rng, index),
+            manager_id=new_id(),
+            workout_zones=zones,
+            amenities=["showers", "lockers"],
+            total_capacity=sum(zone.capacity for zone in zones),
+            contact_phone="0100 000 000",
+            contact_email=f"site{index + 1}@stmarysfitness.example",
+            opening_hours={day: "06:00-22:00" for day in DAYS},
+        ))
+
+    for index in range(member_count):
+        home = rng.choice(dataset.locations)
+        member = Member(
+            id=new_id(),
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            email=f"member{index}@example.com",
+            phone=f"07{rng.randint(0, 999999999):09d}",
+            address=_address(rng, index),
+            membership_type=rng.choice(list(MembershipType)),
+            health_info=HealthInformation(
+                height=round(rng.uniform(150, 200), 1),
+                weight=round(rng.uniform(50, 110), 1),
+                medical_conditions=[],
+                emergency_contact_name=rng.choice(FIRST_NAMES),
+                emergency_contact_phone="0100 000 001",
+            ),
+            home_location_id=home.id,
+        )
+        dataset.members.append(member)
+        start = now - timedelta(days=rng.randint(0, 365))
+        dataset.subscriptions.append(Subscription(
+            id=new_id(),
+            member_id=member.id,
+            plan_type=member.membership_type,
+            payment_frequency=rng.choice(list(PaymentFrequency)),
+            start_date=start,
+            end_date=start + timedelta(days=365),
+            amount=round(rng.uniform(20, 80), 2),
+            status=SubscriptionStatus.ACTIVE,
+            payment_method="card",
+        ))
+
+    for _ in range(scale):
+        member = rng.choice(dataset.members)
+        location = _visited_location(rng, dataset, member)
+        check_in = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        dataset.attendance.append(AttendanceRecord(
+            id=new_id(),
+            member_id=member.id,
+            location_id=location.id,
+            check_in_time=check_in,
+            check_out_time=check_in + timedelta(minutes=rng.randint(20, 150)),
+            zone_id=rng.choice(location.workout_zones).id,
+        ))
+    dataset.attendance.sort(key=lambda record: record.check_in_time)
+
+    for _ in range(scale // 2):
+        member = rng.choice(dataset.members)
+        location = _visited_location(rng, dataset, member)
+        start_time = now + timedelta(minutes=30 * rng.randint(-365 * 48, 60 * 48))
+        if start_time > now:
+            status = AppointmentStatus.SCHEDULED
+        else:
+            status = rng.choices(
+                [AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED, AppointmentStatus.NO_SHOW],
+                weights=[85, 10, 5],
+            )[0]
+        dataset.appointments.append(Appointment(
+            id=new_id(),
+            member_id=member.id,
+            trainer_id=rng.choice(dataset.trainer_ids),
+            location_id=location.id,
+            appointment_type=rng.choice(list(AppointmentType)),
+            start_time=start_time,
+            duration=rng.choice([30, 45, 60]),
+            status=status,
+            zone_id=rng.choice(location.workout_zones).id,
+        ))
+
+    return dataset
+
+
+def write_dataset(dataset: SyntheticDataset, data_dir: str) -> Dict[str, str]:
+    """
+    Persist a dataset into a data directory using the repositories' own file formats.
+
+    Every file is written independently, so one repository failing to save
+    leaves the others usable.
+
+    :param dataset: Dataset to write.
+    :param data_dir: Directory that receives members.json, locations.json, etc.
+    :return: Error per data file that could not be written.
+    """
+    directory = Path(data_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    errors = {}
+    for file_name, write in _WRITERS.items():
+        path = directory / file_name
+        try:
+            write(dataset, str(path))
+        except Exception as e:
+            errors[file_name] = f"{type(e).__name__}: {e}"
+            path.unlink(missing_ok=True)
+    return errors
+
+
+def _write_members(dataset: SyntheticDataset, path: str):
+    members = MemberRepository(path)
+    members.members = dataset.members
+    members.save_data()
+
+
+def _write_locations(dataset: SyntheticDataset, path: str):
+    locations = LocationRepository(path)
+    locations.locations = dataset.locations
+    locations.save_data()
+
+
+def _write_attendance(dataset: SyntheticDataset, path: str):
+    attendance = AttendanceRepository(path)
+    attendance.data = dataset.attendance
+    attendance._save()
+
+
+def _write_appointments(dataset: SyntheticDataset, path: str):
+    appointments = AppointmentRepository(path)
+    appointments.data = dataset.appointments
+    appointments._save()
+
+
+def _write_subscriptions(dataset: SyntheticDataset, path: str):
+    # There is no subscription repository yet, so subscriptions are written as plain dataclass dumps
+    with open(path, "w") as file:
+        json.dump([asdict(subscription) for subscription in dataset.subscriptions], file, default=_json_default)
+
+
+_WRITERS = {
+    "members.json": _write_members,
+    "locations.json": _write_locations,
+    "attendance.json": _write_attendance,
+    "appointments.json": _write_appointments,
+    "subscriptions.json": _write_subscriptions,
+}
+
+
+def _address(rng: random.Random, index: int) -> Address:
+    return Address(
+        street=f"{rng.randint(1, 300)} High Street",
+        city=rng.choice(["London", "Leeds", "Bristol", "York"]),
+        state="England",
+        postal_code=f"AB{index % 100} {rng.randint(1, 9)}CD",
+        country="UK",
+    )
+
+
+def _visited_location(rng: random.Random, dataset: SyntheticDataset, member: Member) -> GymLocation:
+    # Members mostly visit their home location
+    if rng.random() < 0.9:
+        return dataset.location_by_id(member.home_location_id)
+    return rng.choice(dataset.locations)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
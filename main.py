@@ -4,12 +4,15 @@ This script initializes and launches the application.
 """
 
 import sys
-from PyQt5.QtWidgets import QApplication
-from src.ui.main_window import MainWindow
 from src.utils import Config
 
 def main():
     """Main function to initialize and start the application."""
+    # Qt and the UI are imported here so that importing this module stays cheap
+    from PyQt5.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+    from src.utils.metrics import exporting
+
     # Load application configuration
     config = Config.load()
 
@@ -20,8 +23,10 @@ def main():
     # Display the main window
     main_window.show()
 
-    # Start the application's event loop
-    sys.exit(app.exec_())
+    # Start the application's event loop, exporting metrics while it runs when enabled
+    with exporting():
+        status = app.exec_()
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
@@ -1,29 +1,43 @@
 """
 St Mary's Fitness Management System Core Module.
-This package initializes and provides access to all core components of the application.
+This package provides access to all core components of the application.
+Components are imported on first use, so headless tools that only need the
+models or repositories never load the services or the UI.
 """
 
-from .models import (
-    Member, MembershipType, HealthInformation,
-    GymLocation, WorkoutZone,
-    Appointment, AppointmentType,
-    Subscription, PaymentFrequency,
-    AttendanceRecord,
-    Address, BaseModel,
-)
-from .repositories import (
-    MemberRepository, LocationRepository,
-    AppointmentRepository, AttendanceRepository,
-)
-from .services import (
-    AppointmentService, AttendanceService,
-    LocationService, MemberService,
-)
-from .ui import (
-    AppointmentView, AttendanceView,
-    MainWindow, MemberView,
-)
-from .utils import Config
+from .utils.lazy import lazy_exports
+
+_EXPORTS = {
+    # Subpackages
+    "models": ".models", "repositories": ".repositories",
+    "services": ".services", "ui": ".ui", "utils": ".utils",
+
+    # Models
+    "Member": ".models", "MembershipType": ".models", "HealthInformation": ".models",
+    "GymLocation": ".models", "WorkoutZone": ".models",
+    "Appointment": ".models", "AppointmentType": ".models",
+    "Subscription": ".models", "PaymentFrequency": ".models",
+    "AttendanceRecord": ".models", "MemberActivityStats": ".models",
+    "Address": ".models", "BaseModel": ".models",
+
+    # Repositories
+    "MemberRepository": ".repositories", "LocationRepository": ".repositories",
+    "AppointmentRepository": ".repositories", "AttendanceRepository": ".repositories",
+    "MemberStatsRepository": ".repositories",
+
+    # Services
+    "AppointmentService": ".services", "AttendanceService": ".services",
+    "LocationService": ".services", "MemberService": ".services",
+
+    # UI
+    "AppointmentView": ".ui", "AttendanceView": ".ui",
+    "MainWindow": ".ui", "MemberView": ".ui",
+
+    # Utils
+    "Config": ".utils",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     # Models
@@ -31,11 +45,12 @@ __all__ = [
     "GymLocation", "WorkoutZone",
     "Appointment", "AppointmentType",
     "Subscription", "PaymentFrequency",
-    "AttendanceRecord", "Address", "BaseModel",
+    "AttendanceRecord", "MemberActivityStats", "Address", "BaseModel",
 
     # Repositories
     "MemberRepository", "LocationRepository",
     "AppointmentRepository", "AttendanceRepository",
+    "MemberStatsRepository",
 
     # Services
     "AppointmentService", "AttendanceService",
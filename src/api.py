@@ -0,0 +1,482 @@
+"""
+Local HTTP/JSON API for turnstiles and booking kiosks.
+
+A small asyncio HTTP/1.1 server in front of the attendance and appointment
+services. Connections are kept alive between requests, and every service
+call is handed to a single writer thread that owns the AppContext. Calls
+queued while the writer is busy run as one group inside AppContext.batch(),
+so a burst of check-ins costs one save per repository instead of one each.
+
+    python -m src.cli serve --port 8080
+
+Endpoints:
+
+    GET  /health
+    POST /attendance/check-in           {"member_id", "location_id", "zone_id"?, "request_id"?}
+    POST /attendance/check-in/batch     {"check_ins": [{...}, ...]}
+    POST /attendance/check-out          {"attendance_id"} or {"member_id"}, "request_id"?
+    GET  /attendance/{attendance_id}
+    GET  /members/{member_id}/attendance/active
+    GET  /members/{member_id}/appointments
+    POST /appointments                  same fields as the "create_appointment" command
+    POST /appointments/recurring        same fields as the "create_recurring_appointment" command
+    GET  /appointments/{appointment_id}
+    POST /appointments/{appointment_id}/cancel     {"note"?}
+    POST /appointments/{appointment_id}/complete   {"note"?}
+    GET  /classes/{session_id}
+    POST /classes/{session_id}/book                {"member_id"}
+    POST /classes/{session_id}/cancel-booking      {"member_id"}
+    POST /commands                      {"commands": [{"op": ...}, ...]}
+
+A follower started with `python -m src.cli follow` serves the GET endpoints
+from its replica and answers writes with 403; before each read it syncs
+with the leader if it lags by more than Config.REPLICA_MAX_LAG.
+
+Turnstiles should send a "request_id" unique to each check-in or check-out
+and keep it when retrying; a retry within Config.REQUEST_DEDUPE_TTL gets the
+original response instead of a second check-in or an "already checked in" error.
+A retry that arrives while the first attempt is still running is answered 409
+once Config.REQUEST_DEDUPE_WAIT passes, and should be sent again later.
+"""
+
+import asyncio
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from .app import AppContext
+from .cli import OPERATIONS, execute, json_default, to_plain
+from .utils.config import Config
+from .utils.dedupe import RequestInProgressError
+from .utils.metrics import metrics
+from .utils.replication import Follower
+
+metrics.describe("api_requests_total", "HTTP API requests by route and status.")
+metrics.describe("api_request_duration_seconds", "HTTP API request latency.")
+metrics.describe("api_writer_batch_size", "Service calls grouped into one writer batch.")
+
+
+class ApiError(Exception):
+    """Error answered with an HTTP status and a JSON error body"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """A parsed HTTP request"""
+
+    def __init__(self, method: str, path: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """Whether the client wants the connection kept open after this request"""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> dict:
+        """Decode the body as a JSON object; an empty body is an empty object."""
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return payload
+
+
+class Writer:
+    """
+    Runs service calls one group at a time on a single thread.
+
+    Every call is queued; the writer takes everything queued so far (up to
+    max_batch calls), runs it inside one AppContext.batch() and then answers
+    each caller, so responses are sent only after their writes are on disk.
+    """
+
+    def __init__(self, ctx: AppContext, max_batch: int = 256):
+        self.ctx = ctx
+        self.max_batch = max_batch
+        self._queue: "asyncio.Queue[Tuple[Callable[[AppContext], Any], asyncio.Future]]" = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-writer")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start draining the queue on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer once the calls already queued have run."""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            self._task = None
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, call: Callable[[AppContext], Any]) -> Any:
+        """
+        Queue a service call and wait for its result.
+
+        :param call: Function receiving the AppContext.
+        :return: The call's return value; its exception is re-raised here.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((call, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < self.max_batch and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            metrics.observe("api_writer_batch_size", len(jobs))
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._run_group, [call for call, _ in jobs])
+            except Exception as e:
+                outcomes = [(False, e)] * len(jobs)
+            for (_, future), (ok, value) in zip(jobs, outcomes):
+                if future.cancelled():
+                    pass
+                elif ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+                self._queue.task_done()
+
+    def _run_group(self, calls: List[Callable[[AppContext], Any]]) -> List[Tuple[bool, Any]]:
+        outcomes = []
+        with self.ctx.batch():
+            for call in calls:
+                try:
+                    outcomes.append((True, call(self.ctx)))
+                except Exception as e:
+                    outcomes.append((False, e))
+        return outcomes
+
+
+Handler = Callable[[Request, Dict[str, str]], Callable[[AppContext], Any]]
+
+
+def _require(payload: dict, *fields: str) -> dict:
+    missing = [name for name in fields if payload.get(name) in (None, "")]
+    if missing:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing field(s): {', '.join(missing)}")
+    return payload
+
+
+def _found(value: Any, what: str) -> Any:
+    if value is None or value is False:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"{what} not found")
+    return value
+
+
+def _health(request: Request, params: Dict[str, str]):
+    return lambda ctx: {"status": "ok"}
+
+
+def _check_in(request: Request, params: Dict[str, str]):
+    command = _require(request.json(), "member_id", "location_id")
+    return lambda ctx: OPERATIONS["check_in"](ctx, command)
+
+
+def _check_in_batch(request: Request, params: Dict[str, str]):
+    check_ins = request.json().get("check_ins")
+    if not isinstance(check_ins, list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Field 'check_ins' must be a list")
+    commands = [dict(item, op="check_in") if isinstance(item, dict) else {"op": None} for item in check_ins]
+    return lambda ctx: {"results": [execute(ctx, command) for command in commands]}
+
+
+def _check_out(request: Request, params: Dict[str, str]):
+    command = request.json()
+    if not command.get("attendance_id") and not command.get("member_id"):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Missing field(s): attendance_id or member_id")
+    return lambda ctx: {"checked_out": _found(OPERATIONS["check_out"](ctx, command), "Active attendance")}
+
+
+def _get_attendance(request: Request, params: Dict[str, str]):
+    return lambda ctx: _found(ctx.attendance_service.get_attendance_by_id(params["id"]), "Attendance record")
+
+
+def _active_attendance(request: Request, params: Dict[str, str]):
+    return lambda ctx: _found(ctx.attendance_service.get_active_attendance(params["id"]), "Active attendance")
+
+
+def _upcoming_appointments(request: Request, params: Dict[str, str]):
+    return lambda ctx: {"appointments": ctx.appointment_service.list_upcoming_appointments(params["id"])}
+
+
+def _create_appointment(request: Request, params: Dict[str, str]):
+    command = _require(request.json(), "member_id", "trainer_id", "location_id",
+                       "appointment_type", "start_time", "duration")
+    return lambda ctx: OPERATIONS["create_appointment"](ctx, command)
+
+
+def _create_recurring_appointment(request: Request, params: Dict[str, str]):
+    command = _require(request.json(), "member_id", "trainer_id", "location_id",
+                       "appointment_type", "start_time", "duration")
+    return lambda ctx: OPERATIONS["create_recurring_appointment"](ctx, command)
+
+
+def _get_appointment(request: Request, params: Dict[str, str]):
+    return lambda ctx: _found(ctx.appointment_service.get_appointment_by_id(params["id"]), "Appointment")
+
+
+def _cancel_appointment(request: Request, params: Dict[str, str]):
+    note = request.json().get("note")
+    return lambda ctx: {"cancelled": _found(ctx.appointment_service.cancel_appointment(params["id"], note), "Appointment")}
+
+
+def _complete_appointment(request: Request, params: Dict[str, str]):
+    note = request.json().get("note")
+    return lambda ctx: {"completed": _found(ctx.appointment_service.complete_appointment(params["id"], note), "Appointment")}
+
+
+def _get_class(request: Request, params: Dict[str, str]):
+    return lambda ctx: _found(ctx.class_booking_service.get_class_by_id(params["id"]), "Class")
+
+
+def _book_class(request: Request, params: Dict[str, str]):
+    member_id = _require(request.json(), "member_id")["member_id"]
+    return lambda ctx: {"status": _found(ctx.class_booking_service.book_class(params["id"], member_id), "Class")}
+
+
+def _cancel_class_booking(request: Request, params: Dict[str, str]):
+    member_id = _require(request.json(), "member_id")["member_id"]
+    return lambda ctx: {"cancelled": _found(ctx.class_booking_service.cancel_booking(params["id"], member_id), "Booking")}
+
+
+def _commands(request: Request, params: Dict[str, str]):
+    commands = request.json().get("commands")
+    if not isinstance(commands, list) or not all(isinstance(command, dict) for command in commands):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Field 'commands' must be a list of objects")
+    return lambda ctx: {"results": [execute(ctx, command) for command in commands]}
+
+
+def _route(pattern: str) -> Pattern:
+    return re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+
+
+ROUTES: List[Tuple[str, str, Pattern, Handler]] = [
+    (method, pattern, _route(pattern), handler) for method, pattern, handler in [
+        ("GET", "/health", _health),
+        ("POST", "/attendance/check-in", _check_in),
+        ("POST", "/attendance/check-in/batch", _check_in_batch),
+        ("POST", "/attendance/check-out", _check_out),
+        ("GET", "/attendance/{id}", _get_attendance),
+        ("GET", "/members/{id}/attendance/active", _active_attendance),
+        ("GET", "/members/{id}/appointments", _upcoming_appointments),
+        ("POST", "/appointments", _create_appointment),
+        ("POST", "/appointments/recurring", _create_recurring_appointment),
+        ("GET", "/appointments/{id}", _get_appointment),
+        ("POST", "/appointments/{id}/cancel", _cancel_appointment),
+        ("POST", "/appointments/{id}/complete", _complete_appointment),
+        ("GET", "/classes/{id}", _get_class),
+        ("POST", "/classes/{id}/book", _book_class),
+        ("POST", "/classes/{id}/cancel-booking", _cancel_class_booking),
+        ("POST", "/commands", _commands),
+    ]
+]
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server exposing the services as JSON endpoints"""
+
+    def __init__(
+        self,
+        ctx: AppContext,
+        host: str = Config.API_HOST,
+        port: int = Config.API_PORT,
+        max_body: int = Config.API_MAX_BODY,
+        idle_timeout: float = Config.API_IDLE_TIMEOUT,
+        follower: Optional[Follower] = None
+    ):
+        """
+        Initialize the server.
+
+        :param ctx: Application context owned by the writer thread.
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 picks a free port.
+        :param max_body: Largest accepted request body in bytes.
+        :param idle_timeout: Seconds a kept-alive connection may sit idle.
+        :param follower: Replication follower keeping ctx's data directory current; makes the server read-only.
+        """
+        self.ctx = ctx
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.follower = follower
+        self.writer: Optional[Writer] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start listening; the bound port is stored in self.port."""
+        self.writer = Writer(self.ctx)
+        self.writer.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start the server if needed and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop accepting connections and let queued service calls finish."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.writer is not None:
+            await self.writer.stop()
+            self.writer = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, stream: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except ApiError as e:
+                    self._write_response(stream, e.status, {"error": str(e)}, keep_alive=False)
+                    await stream.drain()
+                    break
+                if request is None:
+                    break
+                started = time.perf_counter()
+                status, payload, route = await self._dispatch(request)
+                self._write_response(stream, status, payload, request.keep_alive)
+                await stream.drain()
+                metrics.inc("api_requests_total", route=route, status=str(status.value))
+                metrics.observe("api_request_duration_seconds", time.perf_counter() - started, route=route)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            stream.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Incomplete request")
+            return None  # Client closed a kept-alive connection
+        except asyncio.LimitOverrunError:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > self.max_body:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target.split("?", 1)[0], version, headers, body)
+
+    async def _dispatch(self, request: Request) -> Tuple[HTTPStatus, Any, str]:
+        allowed = []
+        for method, pattern, regex, handler in ROUTES:
+            match = regex.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            if self.follower is not None and method != "GET":
+                return HTTPStatus.FORBIDDEN, {"error": "This server is a read-only replica; send writes to the leader"}, pattern
+            try:
+                call = handler(request, match.groupdict())
+                result = await self.writer.submit(self._current(call) if self.follower is not None else call)
+                status = HTTPStatus.CREATED if method == "POST" and pattern in ("/attendance/check-in", "/appointments", "/appointments/recurring") \
+                    else HTTPStatus.OK
+                return status, to_plain(result), pattern
+            except ApiError as e:
+                return e.status, {"error": str(e)}, pattern
+            except RequestInProgressError as e:
+                return HTTPStatus.CONFLICT, {"error": str(e)}, pattern
+            except (KeyError, ValueError) as e:
+                return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": f"{type(e).__name__}: {e}"}, pattern
+            except Exception as e:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}, pattern
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Allowed: {', '.join(allowed)}"}, "unmatched"
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {request.path}"}, "unmatched"
+
+    def _current(self, call: Callable[[AppContext], Any]) -> Callable[[AppContext], Any]:
+        """Wrap a read so that it runs on a replica no more than the follower's max_lag behind."""
+        follower = self.follower
+
+        def run(ctx: AppContext) -> Any:
+            follower.ensure_current()
+            return call(ctx)
+        return run
+
+    @staticmethod
+    def _write_response(stream: asyncio.StreamWriter, status: HTTPStatus, payload: Any, keep_alive: bool):
+        body = json.dumps(payload, default=json_default).encode()
+        stream.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n".encode() + body
+        )
+
+
+def serve(
+    ctx: AppContext,
+    host: str = Config.API_HOST,
+    port: int = Config.API_PORT,
+    follower: Optional[Follower] = None
+):
+    """
+    Run the API server until interrupted.
+
+    :param ctx: Application context.
+    :param host: Interface to listen on.
+    :param port: Port to listen on.
+    :param follower: Follower keeping ctx's data directory current, for a read-only replica.
+    """
+    server = ApiServer(ctx, host, port, follower=follower)
+
+    async def run():
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,158 @@
+"""
+Application wiring for St Mary's Fitness Management System.
+Builds the repositories and services once so that every entry point
+(desktop UI, command line, API server) shares the same setup.
+"""
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Type
+from .repositories.appointment_repository import AppointmentRepository
+from .repositories.attendance_archive_repository import AttendanceArchiveRepository
+from .repositories.attendance_repository import AttendanceRepository
+from .repositories.class_session_repository import ClassSessionRepository
+from .repositories.location_repository import LocationRepository
+from .repositories.member_repository import MemberRepository
+from .repositories.member_stats_repository import MemberStatsRepository
+from .repositories.recurring_appointment_repository import RecurringAppointmentRepository
+from .repositories.sharded_repository import ShardedRepository
+from .services.appointment_service import AppointmentService
+from .services.attendance_archive_service import AttendanceArchiveService
+from .services.attendance_service import AttendanceService
+from .services.class_booking_service import ClassBookingService
+from .services.location_service import LocationService
+from .services.member_service import MemberService
+from .services.report_service import ReportService
+from .utils.config import Config
+from .utils.events import EventBus, change_bus
+from .utils.read_cache import ReadCache, ReadCachePublisher
+
+# Repositories partitioned by location in sharded storage: class, file name and location field
+SHARDED_REPOSITORIES: Dict[str, Tuple[Type, str, str]] = {
+    "members": (MemberRepository, "members.json", "home_location_id"),
+    "attendance": (AttendanceRepository, "attendance.json", "location_id"),
+    "appointments": (AppointmentRepository, "appointments.json", "location_id"),
+}
+
+
+@dataclass
+class AppContext:
+    """Repositories and services for one data directory"""
+    data_dir: str
+    member_repository: MemberRepository
+    location_repository: LocationRepository
+    attendance_repository: AttendanceRepository
+    appointment_repository: AppointmentRepository
+    recurring_appointment_repository: RecurringAppointmentRepository
+    class_session_repository: ClassSessionRepository
+    member_stats_repository: MemberStatsRepository
+    archive_repository: AttendanceArchiveRepository
+    member_service: MemberService
+    location_service: LocationService
+    attendance_service: AttendanceService
+    appointment_service: AppointmentService
+    class_booking_service: ClassBookingService
+    archive_service: AttendanceArchiveService
+    report_service: ReportService
+    # Shared images of members and locations, and this process's writer of them, when enabled
+    read_cache: Optional[ReadCache] = None
+    read_cache_publisher: Optional[ReadCachePublisher] = field(default=None, repr=False)
+
+    @classmethod
+    def create(
+        cls,
+        data_dir: Optional[str] = None,
+        event_bus: Optional[EventBus] = None,
+        sharded: Optional[bool] = None,
+        shard_workers: Optional[bool] = None,
+        read_cache: Optional[bool] = None
+    ) -> "AppContext":
+        """
+        Load the repositories for a data directory and wire the services to them.
+
+        :param data_dir: Directory holding the JSON data files, defaults to Config.DATA_DIR.
+        :param event_bus: Bus the repositories publish changes to, defaults to the shared change_bus.
+        :param sharded: Partition members, attendance and appointments by location, defaults to Config.STORAGE_SHARDED.
+        :param shard_workers: Serve each shard from its own process, defaults to Config.SHARD_WORKERS.
+        :param read_cache: Publish and map the shared read cache, defaults to Config.READ_CACHE_ENABLED.
+        :return: The assembled context.
+        """
+        data_dir = data_dir or Config.DATA_DIR
+        os.makedirs(data_dir, exist_ok=True)
+        bus = event_bus or change_bus
+        sharded = Config.STORAGE_SHARDED if sharded is None else sharded
+        shard_workers = Config.SHARD_WORKERS if shard_workers is None else shard_workers
+        read_cache = Config.READ_CACHE_ENABLED if read_cache is None else read_cache
+
+        def path(name: str) -> str:
+            return os.path.join(data_dir, name)
+
+        def partitioned(entity: str):
+            repository_class, file_name, location_field = SHARDED_REPOSITORIES[entity]
+            if sharded:
+                return ShardedRepository(
+                    repository_class, data_dir, file_name, location_field, event_bus=bus, workers=shard_workers
+                )
+            return repository_class(path(file_name), event_bus=bus)
+
+        member_repository = partitioned("members")
+        location_repository = LocationRepository(path("locations.json"), event_bus=bus)
+        attendance_repository = partitioned("attendance")
+        appointment_repository = partitioned("appointments")
+        recurring_appointment_repository = RecurringAppointmentRepository(
+            path("recurring_appointments.json"), event_bus=bus
+        )
+        class_session_repository = ClassSessionRepository(path("class_sessions.json"), event_bus=bus)
+        member_stats_repository = MemberStatsRepository(
+            path("member_stats.json"), event_bus=bus,
+            source=lambda: (attendance_repository.get_all(), appointment_repository.get_all())
+        )
+        archive_dir = Config.ARCHIVE_DIR if data_dir == Config.DATA_DIR else path("archive")
+        archive_repository = AttendanceArchiveRepository(archive_dir)
+        archive_service = AttendanceArchiveService(attendance_repository, archive_repository)
+        publisher = None
+        if read_cache:
+            publisher = ReadCachePublisher(
+                member_repository, location_repository, Config.READ_CACHE_DIR or data_dir, Config.READ_CACHE_DELAY
+            )
+
+        return cls(
+            data_dir=data_dir,
+            member_repository=member_repository,
+            location_repository=location_repository,
+            attendance_repository=attendance_repository,
+            appointment_repository=appointment_repository,
+            recurring_appointment_repository=recurring_appointment_repository,
+            class_session_repository=class_session_repository,
+            member_stats_repository=member_stats_repository,
+            archive_repository=archive_repository,
+            member_service=MemberService(member_repository, member_stats_repository),
+            location_service=LocationService(location_repository),
+            attendance_service=AttendanceService(attendance_repository, archive_service),
+            appointment_service=AppointmentService(appointment_repository, recurring_appointment_repository),
+            class_booking_service=ClassBookingService(class_session_repository, location_repository),
+            archive_service=archive_service,
+            report_service=ReportService(appointment_repository, recurring_appointment_repository),
+            read_cache=ReadCache(publisher.directory) if publisher else None,
+            read_cache_publisher=publisher,
+        )
+
+    @contextmanager
+    def batch(self):
+        """Group writes to attendance, appointments, classes and the statistics table into one save each."""
+        with self.attendance_repository.batch(), self.appointment_repository.batch(), \
+                self.recurring_appointment_repository.batch(), self.class_session_repository.batch(), \
+                self.member_stats_repository.batch():
+            yield self
+
+    def close(self):
+        """Detach the derived tables from the event bus and stop any shard worker processes."""
+        self.member_stats_repository.close()
+        self.report_service.close()
+        if self.read_cache_publisher is not None:
+            self.read_cache_publisher.close()
+            self.read_cache.close()
+        for repository in (self.member_repository, self.attendance_repository, self.appointment_repository):
+            if isinstance(repository, ShardedRepository):
+                repository.close()
@@ -0,0 +1,490 @@
+"""
+Headless command-line entry point for St Mary's Fitness Management System.
+
+Wires up the repositories and services once and processes bulk work
+without the desktop UI:
+
+    python -m src.cli run commands.ndjson       # newline-delimited JSON commands
+    python -m src.cli import members members.json
+    python -m src.cli export attendance --output attendance.json
+    python -m src.cli report attendance --date 2025-01-31
+    python -m src.cli report member-stats --rebuild
+    python -m src.cli report trainer-utilization --start 2025-01-06 --end 2025-04-07
+    python -m src.cli compact --retention-days 90
+    python -m src.cli shard                     # then run with STORAGE_SHARDED=true
+    python -m src.cli replicate --listen 127.0.0.1:8090
+    python -m src.cli --data-dir replica follow --leader 127.0.0.1:8090 --port 8081
+    python -m src.cli --data-dir replica follow --leader-dir data --once
+    python -m src.cli serve --port 8080
+    python -m src.cli benchmark --scale 10000
+
+Each line of a command stream is a JSON object with an "op" field, e.g.
+{"op": "check_in", "member_id": "...", "location_id": "..."}. One JSON
+result line is written per command, echoing its optional "id".
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+from .app import SHARDED_REPOSITORIES, AppContext
+from .models.appointment import AppointmentType, RecurrenceFrequency
+from .repositories.sharded_repository import ShardedRepository
+from .utils.config import Config
+from .utils.events import EventBus
+from .utils.metrics import exporting
+from .utils.replication import Follower, RemoteSource, ReplicationServer, ReplicationSource
+from .utils.timestamps import day_range
+
+ENTITIES = ("members", "locations", "attendance", "appointments", "classes")
+
+
+def _check_in(ctx: AppContext, command: dict):
+    return ctx.attendance_service.check_in(
+        member_id=command["member_id"],
+        location_id=command["location_id"],
+        zone_id=command.get("zone_id"),
+        request_id=command.get("request_id"),
+    )
+
+
+def _check_out(ctx: AppContext, command: dict):
+    attendance_id = command.get("attendance_id")
+    if attendance_id is None:
+        return ctx.attendance_service.check_out_member(command["member_id"], command.get("request_id"))
+    return ctx.attendance_service.check_out(attendance_id, command.get("request_id"))
+
+
+def _create_appointment(ctx: AppContext, command: dict):
+    return ctx.appointment_service.create_appointment(
+        member_id=command["member_id"],
+        trainer_id=command["trainer_id"],
+        location_id=command["location_id"],
+        appointment_type=AppointmentType(command["appointment_type"]),
+        start_time=datetime.fromisoformat(command["start_time"]),
+        duration=int(command["duration"]),
+        zone_id=command.get("zone_id"),
+        notes=command.get("notes"),
+    )
+
+
+def _create_recurring_appointment(ctx: AppContext, command: dict):
+    until = command.get("until")
+    return ctx.appointment_service.create_recurring_appointment(
+        member_id=command["member_id"],
+        trainer_id=command["trainer_id"],
+        location_id=command["location_id"],
+        appointment_type=AppointmentType(command["appointment_type"]),
+        start_time=datetime.fromisoformat(command["start_time"]),
+        duration=int(command["duration"]),
+        frequency=RecurrenceFrequency(command.get("frequency", RecurrenceFrequency.WEEKLY.value)),
+        until=datetime.fromisoformat(until) if until else None,
+        count=command.get("count"),
+        exceptions=[date.fromisoformat(day) for day in command.get("exceptions", [])],
+        zone_id=command.get("zone_id"),
+        notes=command.get("notes"),
+    )
+
+
+def _cancel_appointment(ctx: AppContext, command: dict):
+    return ctx.appointment_service.cancel_appointment(command["appointment_id"], command.get("note"))
+
+
+def _complete_appointment(ctx: AppContext, command: dict):
+    return ctx.appointment_service.complete_appointment(command["appointment_id"], command.get("note"))
+
+
+def _book_class(ctx: AppContext, command: dict):
+    return {"status": ctx.class_booking_service.book_class(command["session_id"], command["member_id"])}
+
+
+def _cancel_class_booking(ctx: AppContext, command: dict):
+    return ctx.class_booking_service.cancel_booking(command["session_id"], command["member_id"])
+
+
+def _compact(ctx: AppContext, command: dict):
+    return {"archived": ctx.archive_service.compact(command.get("retention_days"))}
+
+
+OPERATIONS: Dict[str, Callable[[AppContext, dict], Any]] = {
+    "check_in": _check_in,
+    "check_out": _check_out,
+    "create_appointment": _create_appointment,
+    "create_recurring_appointment": _create_recurring_appointment,
+    "cancel_appointment": _cancel_appointment,
+    "complete_appointment": _complete_appointment,
+    "book_class": _book_class,
+    "cancel_class_booking": _cancel_class_booking,
+    "compact": _compact,
+}
+
+
+def execute(ctx: AppContext, command: dict) -> dict:
+    """
+    Execute a single command.
+
+    :param ctx: Application context.
+    :param command: Command object with an "op" field and its arguments.
+    :return: Result object with "ok" and either "result" or "error".
+    """
+    response = {"id": command.get("id")} if "id" in command else {}
+    try:
+        operation = OPERATIONS[command["op"]]
+    except KeyError:
+        response.update(ok=False, error=f"Unknown operation: {command.get('op')!r}")
+        return response
+    try:
+        response.update(ok=True, result=to_plain(operation(ctx, command)))
+    except Exception as e:
+        response.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return response
+
+
+def run_stream(ctx: AppContext, lines: Iterable[str], output: TextIO, batch_size: int = 500) -> int:
+    """
+    Execute a newline-delimited JSON command stream.
+
+    Writes are batched so that each group of `batch_size` commands is
+    persisted with one save per repository instead of one per command.
+
+    :param ctx: Application context.
+    :param lines: Input lines, one JSON command each; blank lines are skipped.
+    :param output: Stream receiving one JSON result per command.
+    :param batch_size: Commands per persistence batch.
+    :return: Number of commands that failed.
+    """
+    failures = 0
+    for chunk in _chunks((line for line in lines if line.strip()), batch_size):
+        with ctx.batch():
+            results = []
+            for line in chunk:
+                try:
+                    command = json.loads(line)
+                except json.JSONDecodeError as e:
+                    results.append({"ok": False, "error": f"Invalid JSON: {e}"})
+                    continue
+                results.append(execute(ctx, command))
+        for result in results:
+            failures += not result["ok"]
+            output.write(json.dumps(result, default=json_default) + "\n")
+        output.flush()
+    return failures
+
+
+def import_entities(ctx: AppContext, entity: str, source: TextIO) -> int:
+    """
+    Bulk-import a JSON array in the repository's file format.
+
+    :return: Number of imported records.
+    """
+    repository = _repository(ctx, entity)
+    items = [repository._deserialize(raw) for raw in json.load(source)]
+    repository.add_many(items)
+    return len(items)
+
+
+def export_entities(ctx: AppContext, entity: str, destination: TextIO):
+    """
+    Write all records of an entity as a JSON array in the repository's file format.
+    """
+    repository = _repository(ctx, entity)
+    if entity in ("members", "locations"):
+        rows = [repository._serialize(item) for item in repository.find_all()]
+    else:
+        rows = [item.to_dict() for item in repository.find_all()]
+    json.dump(rows, destination, indent=4, default=json_default)
+    destination.write("\n")
+
+
+def attendance_report(ctx: AppContext, day: date) -> List[dict]:
+    """
+    Count visits and distinct members per location for one day.
+    """
+    per_location: Dict[str, dict] = {}
+    start, end = day_range(day)
+    with ctx.attendance_repository.snapshot() as snapshot:
+        for record in snapshot:
+            if not start <= record.check_in_time_epoch < end:
+                continue
+            row = per_location.setdefault(record.location_id, {"location_id": record.location_id, "visits": 0, "members": set()})
+            row["visits"] += 1
+            row["members"].add(record.member_id)
+    return [
+        {"location_id": row["location_id"], "visits": row["visits"], "members": len(row["members"])}
+        for row in per_location.values()
+    ]
+
+
+def member_stats_report(ctx: AppContext, rebuild: bool = False) -> List[dict]:
+    """
+    List every member's activity statistics, optionally rebuilding the table first.
+    """
+    if rebuild:
+        with ctx.attendance_repository.snapshot() as attendance, ctx.appointment_repository.snapshot() as appointments:
+            ctx.member_stats_repository.rebuild(attendance, appointments)
+    return [
+        dict(asdict(stats),
+             open_visits=len(stats.open_visits),
+             pending_appointments=len(stats.pending_appointments),
+             average_visit_duration=stats.average_visit_duration,
+             completion_rate=stats.completion_rate,
+             no_show_rate=stats.no_show_rate)
+        for stats in ctx.member_stats_repository.get_all()
+    ]
+
+
+def trainer_utilization_report(ctx: AppContext, start: date, end: date, location_id: Optional[str] = None) -> List[dict]:
+    """
+    List booked hours, completion and no-show rates per trainer and week.
+    """
+    return [
+        dict(asdict(row),
+             booked_hours=row.booked_hours,
+             completion_rate=row.completion_rate,
+             no_show_rate=row.no_show_rate)
+        for row in ctx.report_service.trainer_utilization(
+            datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time()), location_id
+        )
+    ]
+
+
+def shard_data(data_dir: str) -> Dict[str, int]:
+    """
+    Copy single-file members, attendance and appointments into per-location shard files.
+    The single files are left in place; sharded storage no longer reads them.
+    """
+    # Nothing listens on this bus: the statistics table already counts the copied records
+    bus = EventBus()
+    targets = {}
+    for entity, (repository_class, file_name, location_field) in SHARDED_REPOSITORIES.items():
+        targets[entity] = ShardedRepository(repository_class, data_dir, file_name, location_field, event_bus=bus)
+        if targets[entity].shard_keys:
+            raise ValueError(f"The {entity} are already sharded.")
+    copied = {}
+    for entity, (repository_class, file_name, _) in SHARDED_REPOSITORIES.items():
+        source = repository_class(os.path.join(data_dir, file_name), event_bus=bus)
+        copied[entity] = len(targets[entity].add_many(source.get_all()))
+    return copied
+
+
+def replicate(data_dir: str, address: Any):
+    """
+    Serve a leader's data directory to followers until interrupted.
+    """
+    server = ReplicationServer(ReplicationSource(data_dir), address, _authkey())
+    print(f"Replicating {data_dir} on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def follow(replica_dir: str, source: Any, once: bool = False, host: str = Config.API_HOST, port: int = Config.API_PORT) -> dict:
+    """
+    Catch a replica up with its leader, then keep it current while serving the read-only API.
+    With once, return after catching up, e.g. before running reports or exports on the replica.
+    """
+    follower = Follower(source, replica_dir)
+    files = follower.sync()
+    if once:
+        return {"files_updated": files, "lag_seconds": follower.lag}
+    follower.start()
+    ctx = AppContext.create(replica_dir)
+    try:
+        from .api import serve
+        serve(ctx, host, port, follower)
+    finally:
+        follower.stop()
+        ctx.close()
+    return {"files_updated": files}
+
+
+def _authkey() -> bytes:
+    if not Config.REPLICATION_AUTHKEY:
+        raise ValueError("Set REPLICATION_AUTHKEY to the secret shared by the leader and its followers.")
+    return Config.REPLICATION_AUTHKEY.encode()
+
+
+def _address(text: str) -> Any:
+    """Parse "host:port" into a TCP address; anything else is a Unix socket path."""
+    host, _, port = text.rpartition(":")
+    return (host, int(port)) if host and port.isdigit() else text
+
+
+def _repository(ctx: AppContext, entity: str):
+    return {
+        "members": ctx.member_repository,
+        "locations": ctx.location_repository,
+        "attendance": ctx.attendance_repository,
+        "appointments": ctx.appointment_repository,
+        "classes": ctx.class_session_repository,
+    }[entity]
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def to_plain(value: Any) -> Any:
+    """Convert a dataclass result into a dictionary, leaving other values unchanged."""
+    return asdict(value) if is_dataclass(value) else value
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for dates, enums and sets."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _open_inputs(paths: List[str]) -> Iterator[str]:
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            with open(path, "r") as file:
+                yield from file
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="St Mary's Fitness headless tools.")
+    parser.add_argument("--data-dir", help="Data directory, defaults to Config.DATA_DIR")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Execute newline-delimited JSON commands")
+    run.add_argument("files", nargs="*", help="Command files, '-' or nothing for stdin")
+    run.add_argument("--batch-size", type=int, default=500, help="Commands persisted per save")
+
+    import_parser = commands.add_parser("import", help="Bulk-import a JSON array")
+    import_parser.add_argument("entity", choices=ENTITIES)
+    import_parser.add_argument("file")
+
+    export = commands.add_parser("export", help="Export records as a JSON array")
+    export.add_argument("entity", choices=ENTITIES)
+    export.add_argument("--output", help="Output file, defaults to stdout")
+
+    report = commands.add_parser("report", help="Print a report as JSON")
+    report_kinds = report.add_subparsers(dest="report", required=True)
+    attendance = report_kinds.add_parser("attendance", help="Visits per location for a day")
+    attendance.add_argument("--date", type=date.fromisoformat, default=date.today())
+    stats = report_kinds.add_parser("member-stats", help="Per-member activity statistics")
+    stats.add_argument("--rebuild", action="store_true", help="Recompute the table from all records first")
+    utilization = report_kinds.add_parser("trainer-utilization", help="Per-trainer weekly hours and no-show rates")
+    utilization.add_argument("--start", type=date.fromisoformat, required=True, help="First day (inclusive)")
+    utilization.add_argument("--end", type=date.fromisoformat, required=True, help="Last day (exclusive)")
+    utilization.add_argument("--location", help="Only appointments at this location")
+
+    compact = commands.add_parser("compact", help="Archive attendance older than the retention horizon")
+    compact.add_argument("--retention-days", type=int)
+
+    commands.add_parser("shard", help="Split members, attendance and appointments into per-location files")
+
+    replicate_parser = commands.add_parser("replicate", help="Ship this data directory's changes to followers")
+    replicate_parser.add_argument("--listen", default=Config.REPLICATION_ADDRESS, help="host:port or Unix socket path")
+
+    follow_parser = commands.add_parser("follow", help="Keep the data directory as a read-only replica of a leader")
+    leader = follow_parser.add_mutually_exclusive_group(required=True)
+    leader.add_argument("--leader", help="Leader's replication address, host:port or Unix socket path")
+    leader.add_argument("--leader-dir", help="Leader's data directory, when shared with this host")
+    follow_parser.add_argument("--once", action="store_true", help="Catch up once and exit instead of serving")
+    follow_parser.add_argument("--host", default=Config.API_HOST)
+    follow_parser.add_argument("--port", type=int, default=Config.API_PORT)
+
+    serve = commands.add_parser("serve", help="Run the HTTP/JSON API for kiosks")
+    serve.add_argument("--host", default=Config.API_HOST)
+    serve.add_argument("--port", type=int, default=Config.API_PORT)
+
+    commands.add_parser("benchmark", help="Run the benchmark suite; remaining arguments are passed through",
+                        add_help=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    # With METRICS_ENABLED, /metrics is served on METRICS_PORT while the command runs and written to METRICS_FILE after
+    with exporting():
+        return _run_command(parser, args, extra)
+
+
+def _run_command(parser: argparse.ArgumentParser, args: argparse.Namespace, extra: List[str]) -> int:
+    if args.command == "benchmark":
+        from benchmarks.run_benchmarks import main as run_benchmarks
+        return run_benchmarks(extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command in ("replicate", "follow"):
+        data_dir = args.data_dir or Config.DATA_DIR
+        try:
+            if args.command == "replicate":
+                replicate(data_dir, _address(args.listen))
+                return 0
+            if args.leader_dir is not None:
+                if os.path.abspath(args.leader_dir) == os.path.abspath(data_dir):
+                    parser.error("the replica needs its own --data-dir")
+                source = ReplicationSource(args.leader_dir)
+            else:
+                source = RemoteSource(_address(args.leader), _authkey())
+            print(json.dumps(follow(data_dir, source, args.once, args.host, args.port)))
+        except ValueError as e:
+            parser.error(str(e))
+        return 0
+    if args.command == "shard":
+        try:
+            print(json.dumps({"sharded": shard_data(args.data_dir or Config.DATA_DIR)}))
+        except ValueError as e:
+            parser.error(str(e))
+        return 0
+
+    ctx = AppContext.create(args.data_dir)
+    try:
+        if args.command == "serve":
+            from .api import serve
+            serve(ctx, args.host, args.port)
+            return 0
+        if args.command == "run":
+            return 1 if run_stream(ctx, _open_inputs(args.files), sys.stdout, args.batch_size) else 0
+        if args.command == "import":
+            with open(args.file, "r") as file:
+                print(json.dumps({"imported": import_entities(ctx, args.entity, file)}))
+        elif args.command == "export":
+            if args.output:
+                with open(args.output, "w") as file:
+                    export_entities(ctx, args.entity, file)
+            else:
+                export_entities(ctx, args.entity, sys.stdout)
+        elif args.command == "report":
+            if args.report == "attendance":
+                rows = attendance_report(ctx, args.date)
+            elif args.report == "trainer-utilization":
+                rows = trainer_utilization_report(ctx, args.start, args.end, args.location)
+            else:
+                rows = member_stats_report(ctx, args.rebuild)
+            print(json.dumps(rows, indent=4, default=json_default))
+        elif args.command == "compact":
+            print(json.dumps({"archived": ctx.archive_service.compact(args.retention_days)}))
+        return 0
+    finally:
+        ctx.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
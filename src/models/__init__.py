@@ -3,18 +3,32 @@ Core domain models for St Mary's Fitness Management System.
 This module exports all model classes for easy access.
 """
 
-from .member import Member, MembershipType, HealthInformation
-from .location import GymLocation, WorkoutZone
-from .appointment import Appointment, AppointmentType
-from .subscription import Subscription, PaymentFrequency
-from .attendance import AttendanceRecord
-from .common import Address, BaseModel
+from ..utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "Member": ".member", "MembershipType": ".member", "HealthInformation": ".member",
+    "GymLocation": ".location", "WorkoutZone": ".location",
+    "Appointment": ".appointment", "AppointmentType": ".appointment",
+    "RecurringAppointment": ".appointment", "RecurrenceFrequency": ".appointment",
+    "ClassSession": ".class_session", "BookingStatus": ".class_session",
+    "Subscription": ".subscription", "PaymentFrequency": ".subscription",
+    "AttendanceRecord": ".attendance", "AttendanceDailySummary": ".attendance",
+    "MemberActivityStats": ".member_stats",
+    "TrainerWeekUtilization": ".trainer_utilization",
+    "Address": ".common", "BaseModel": ".common",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     'Member', 'MembershipType', 'HealthInformation',
     'GymLocation', 'WorkoutZone',
     'Appointment', 'AppointmentType',
+    'RecurringAppointment', 'RecurrenceFrequency',
+    'ClassSession', 'BookingStatus',
     'Subscription', 'PaymentFrequency',
-    'AttendanceRecord',
+    'AttendanceRecord', 'AttendanceDailySummary',
+    'MemberActivityStats',
+    'TrainerWeekUtilization',
     'Address', 'BaseModel'
-]
\ No newline at end of file
+]
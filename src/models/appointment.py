@@ -1,12 +1,15 @@
 """
-Appointment-related models including Appointment and AppointmentType.
+Appointment-related models including Appointment, AppointmentType and RecurringAppointment.
 """
 
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Iterator, List, Optional, Union
 from .common import BaseModel
+from ..utils.recurrence import SECONDS_PER_WEEK, is_occurrence, occurrence_starts
+from ..utils.symbols import symbol
+from ..utils.timestamps import Timestamp, TimestampValue, from_epoch, to_epoch
 
 class AppointmentType(Enum):
     """Types of appointments available"""
@@ -26,15 +29,16 @@ class AppointmentStatus(Enum):
 @dataclass
 class Appointment(BaseModel):
     """Represents a scheduled appointment"""
-    member_id: str
-    trainer_id: str
-    location_id: str
+    member_id: str = symbol()
+    trainer_id: str = symbol()
+    location_id: str = symbol()
     appointment_type: AppointmentType
-    start_time: datetime
+    start_time: datetime = Timestamp()
     duration: int  # in minutes
     status: AppointmentStatus = AppointmentStatus.SCHEDULED
-    zone_id: Optional[str] = None
+    zone_id: Optional[str] = symbol(default=None)
     notes: Optional[str] = None
+    series_id: Optional[str] = symbol(default=None)  # Recurring appointment this occurrence belongs to
 
     @property
     def end_time(self) -> datetime:
@@ -57,4 +61,109 @@ class Appointment(BaseModel):
 
     def is_upcoming(self) -> bool:
         """Check if appointment is in the future"""
-        return self.start_time > datetime.now()
\ No newline at end of file
+        return self.start_time > datetime.now()
+
+class RecurrenceFrequency(Enum):
+    """How often a recurring appointment repeats"""
+    WEEKLY = "weekly"
+    BIWEEKLY = "biweekly"
+
+    @property
+    def period(self) -> int:
+        """Seconds between occurrences"""
+        return SECONDS_PER_WEEK if self is RecurrenceFrequency.WEEKLY else 2 * SECONDS_PER_WEEK
+
+@dataclass
+class RecurringAppointment(BaseModel):
+    """
+    Represents an appointment repeating at the same time every week or every other week.
+
+    Occurrences are not stored: occurrences() yields them as Appointment
+    objects for a time window. An occurrence that is cancelled, completed or
+    rescheduled is stored as its own Appointment and its date added to the
+    exceptions, so the series skips it from then on.
+    """
+    member_id: str = symbol()
+    trainer_id: str = symbol()
+    location_id: str = symbol()
+    appointment_type: AppointmentType
+    start_time: datetime = Timestamp()  # Start of the first occurrence
+    duration: int  # in minutes
+    frequency: RecurrenceFrequency = RecurrenceFrequency.WEEKLY
+    until: Optional[datetime] = Timestamp(default=None)  # No occurrence starts after this time
+    count: Optional[int] = None  # Number of occurrences, None for no limit
+    exceptions: List[date] = field(default_factory=list)  # Dates without an occurrence
+    zone_id: Optional[str] = symbol(default=None)
+    notes: Optional[str] = None
+
+    def _skipped_days(self) -> frozenset:
+        """Exception dates as epoch days, cached until the exceptions change"""
+        cached = self.__dict__.get("_skipped")
+        if cached is None or cached[0] != len(self.exceptions) or cached[1] is not self.exceptions:
+            days = frozenset(to_epoch(day) for day in self.exceptions)
+            cached = self.__dict__["_skipped"] = (len(self.exceptions), self.exceptions, days)
+        return cached[2]
+
+    def occurrence_starts(
+        self, start: Optional[TimestampValue] = None, end: Optional[TimestampValue] = None
+    ) -> Iterator[int]:
+        """Yield the epoch seconds of occurrences starting in [start, end), in order"""
+        return occurrence_starts(
+            self.start_time_epoch,
+            self.frequency.period,
+            None if start is None else to_epoch(start, round_up=True),
+            None if end is None else to_epoch(end, round_up=True),
+            self.until_epoch,
+            self.count,
+            self._skipped_days(),
+        )
+
+    def occurrences(
+        self, start: Optional[TimestampValue] = None, end: Optional[TimestampValue] = None
+    ) -> Iterator[Appointment]:
+        """Yield the occurrences starting in [start, end) as appointments, in order"""
+        for seconds in self.occurrence_starts(start, end):
+            yield self._occurrence(seconds)
+
+    def occurrence_at(self, when: TimestampValue) -> Optional[Appointment]:
+        """Get the occurrence starting at a time, or None if the series has none then"""
+        seconds = to_epoch(when)
+        if not is_occurrence(
+            seconds, self.start_time_epoch, self.frequency.period, self.until_epoch, self.count, self._skipped_days()
+        ):
+            return None
+        return self._occurrence(seconds)
+
+    def occurrence_id(self, when: TimestampValue) -> str:
+        """ID of the occurrence starting at a time"""
+        return f"{self.id}:{to_epoch(when)}"
+
+    def _occurrence(self, seconds: int) -> Appointment:
+        return Appointment(
+            id=self.occurrence_id(seconds),
+            created_at=self.created_at_epoch,
+            member_id=self.member_id,
+            trainer_id=self.trainer_id,
+            location_id=self.location_id,
+            appointment_type=self.appointment_type,
+            start_time=seconds,
+            duration=self.duration,
+            zone_id=self.zone_id,
+            notes=self.notes,
+            series_id=self.id,
+        )
+
+    def skip(self, day: Union[date, datetime, int]):
+        """Drop the occurrence on a day, e.g. one stored separately after a change"""
+        if isinstance(day, (datetime, int)):
+            day = from_epoch(to_epoch(day)).date()
+        if day not in self.exceptions:
+            self.exceptions.append(day)
+            self.update()
+
+    def end_before(self, when: TimestampValue):
+        """End the series so that no occurrence starts at or after a time"""
+        until = to_epoch(when, round_up=True) - 1
+        if self.until_epoch is None or until < self.until_epoch:
+            self.until = until
+            self.update()
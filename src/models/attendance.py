@@ -3,18 +3,20 @@ Attendance-related models for tracking member visits.
 """
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from .common import BaseModel
+from ..utils.symbols import symbol
+from ..utils.timestamps import Timestamp
 
 @dataclass
 class AttendanceRecord(BaseModel):
     """Records a member's attendance at the gym"""
-    member_id: str
-    location_id: str
-    check_in_time: datetime
-    check_out_time: Optional[datetime] = None
-    zone_id: Optional[str] = None
+    member_id: str = symbol()
+    location_id: str = symbol()
+    check_in_time: datetime = Timestamp()
+    check_out_time: Optional[datetime] = Timestamp(default=None)
+    zone_id: Optional[str] = symbol(default=None)
 
     def check_out(self):
         """Record check-out time"""
@@ -24,11 +26,24 @@ class AttendanceRecord(BaseModel):
     @property
     def duration(self) -> Optional[int]:
         """Calculate duration of visit in minutes"""
-        if not self.check_out_time:
+        if self.check_out_time_epoch is None:
             return None
-        duration = self.check_out_time - self.check_in_time
-        return int(duration.total_seconds() / 60)
+        return (self.check_out_time_epoch - self.check_in_time_epoch) // 60
 
     def is_active(self) -> bool:
         """Check if this is an active visit (no checkout)"""
-        return self.check_out_time is None
\ No newline at end of file
+        return self.check_out_time_epoch is None
+
+@dataclass
+class AttendanceDailySummary:
+    """Visits of one member at one location on one day"""
+    day: date
+    location_id: str = symbol()
+    member_id: str = symbol()
+    visits: int = 0
+    total_minutes: int = 0
+
+    def add_visit(self, duration: Optional[int]):
+        """Count a visit and its duration"""
+        self.visits += 1
+        self.total_minutes += duration or 0
@@ -0,0 +1,89 @@
+"""
+Group class models including ClassSession and BookingStatus.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import List, Optional
+from .common import BaseModel
+from ..utils.symbols import symbol
+from ..utils.timestamps import Timestamp
+
+class BookingStatus(Enum):
+    """Outcome of booking a place on a class"""
+    BOOKED = "booked"
+    WAITLISTED = "waitlisted"
+
+@dataclass
+class ClassSession(BaseModel):
+    """A scheduled group class held in a workout zone, with a limited number of places"""
+    location_id: str = symbol()
+    zone_id: str = symbol()
+    trainer_id: str = symbol()
+    name: str
+    start_time: datetime = Timestamp()
+    duration: int  # in minutes
+    capacity: int
+    attendee_ids: List[str] = field(default_factory=list)
+    waitlist: List[str] = field(default_factory=list)  # Member IDs, first come first served
+    is_cancelled: bool = False
+
+    @property
+    def end_time(self) -> datetime:
+        """Calculate class end time"""
+        return self.start_time + timedelta(minutes=self.duration)
+
+    @property
+    def available_places(self) -> int:
+        """Places left before new bookings go to the waitlist"""
+        return max(self.capacity - len(self.attendee_ids), 0)
+
+    def booking_status(self, member_id: str) -> Optional[BookingStatus]:
+        """Check whether a member holds a place or is waiting for one"""
+        if member_id in self.attendee_ids:
+            return BookingStatus.BOOKED
+        if member_id in self.waitlist:
+            return BookingStatus.WAITLISTED
+        return None
+
+    def reserve(self, member_id: str) -> BookingStatus:
+        """Take a place if one is free, otherwise join the end of the waitlist"""
+        status = self.booking_status(member_id)
+        if status is not None:
+            return status
+        if len(self.attendee_ids) < self.capacity:
+            self.attendee_ids.append(member_id)
+            status = BookingStatus.BOOKED
+        else:
+            self.waitlist.append(member_id)
+            status = BookingStatus.WAITLISTED
+        self.update()
+        return status
+
+    def release(self, member_id: str) -> List[str]:
+        """Give up a place or leave the waitlist, promoting waiting members into freed places"""
+        if member_id in self.attendee_ids:
+            self.attendee_ids.remove(member_id)
+        elif member_id in self.waitlist:
+            self.waitlist.remove(member_id)
+        else:
+            return []
+        promoted = self.promote()
+        self.update()
+        return promoted
+
+    def promote(self) -> List[str]:
+        """Move members from the head of the waitlist into free places"""
+        free = self.capacity - len(self.attendee_ids)
+        if free <= 0 or not self.waitlist:
+            return []
+        promoted = self.waitlist[:free]
+        del self.waitlist[:free]
+        self.attendee_ids.extend(promoted)
+        return promoted
+
+    def cancel(self):
+        """Cancel the class"""
+        self.is_cancelled = True
+        self.update()
@@ -6,22 +6,38 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 import uuid
+from ..utils.codec import codec_for
+from ..utils.timestamps import Timestamp
 
-@dataclass
+@dataclass(kw_only=True)
 class BaseModel:
     """Base model class with common attributes and methods"""
-    id: str
-    created_at: datetime = datetime.now()
-    updated_at: Optional[datetime] = None
+    id: str = ""
+    created_at: datetime = Timestamp(default=None)
+    updated_at: Optional[datetime] = Timestamp(default=None)
 
     def __post_init__(self):
-        """Initialize ID if not provided"""
+        """Initialize ID and creation time if not provided"""
         if not self.id:
             self.id = str(uuid.uuid4())
+        if self.created_at_epoch is None:
+            self.created_at = datetime.now()
 
     def update(self):
-        """Update the updated_at timestamp"""
+        """Update the updated_at timestamp and mark the model dirty in the repository holding it"""
         self.updated_at = datetime.now()
+        dirty_set = self.__dict__.get("_dirty_set")
+        if dirty_set is not None:
+            dirty_set.mark_changed(self, in_place=True)
+
+    def to_dict(self) -> dict:
+        """Convert the model into a JSON-compatible dictionary"""
+        return codec_for(type(self)).encode(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create a model from a dictionary produced by to_dict"""
+        return codec_for(cls).decode(data)
 
 @dataclass
 class Address:
@@ -30,8 +46,10 @@ class Address:
     city: str
     state: str
     postal_code: str
-    country: str
+    # Absent from addresses saved before it was added
+    country: str = ""
 
     def __str__(self) -> str:
         """Return formatted address string"""
-        return f"{self.street}, {self.city}, {self.state} {self.postal_code}, {self.country}"
\ No newline at end of file
+        address = f"{self.street}, {self.city}, {self.state} {self.postal_code}"
+        return f"{address}, {self.country}" if self.country else address
\ No newline at end of file
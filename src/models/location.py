@@ -3,8 +3,10 @@ Location-related models including GymLocation and WorkoutZone.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Dict, Optional, Union
 from .common import BaseModel, Address
+from ..utils.schedule import Interval, compile_opening_hours, compile_schedule, parse_time, within_intervals
 
 @dataclass
 class WorkoutZone(BaseModel):
@@ -29,9 +31,25 @@ class WorkoutZone(BaseModel):
         self.schedule[day] = times
         self.update()
 
+    def update(self):
+        """Drop the compiled schedule and record the update"""
+        self.__dict__.pop("_slot_bitmaps", None)
+        super().update()
+
+    def slot_bitmaps(self) -> Dict[str, int]:
+        """Schedule compiled into per-day slot bitmaps, cached until the next update() or a new schedule"""
+        cached = self.__dict__.get("_slot_bitmaps")
+        if cached is None or cached[0] is not self.schedule:
+            cached = self.__dict__["_slot_bitmaps"] = (self.schedule, compile_schedule(self.schedule))
+        return cached[1]
+
     def is_available(self, day: str, time: str) -> bool:
         """Check if zone is available at specific time"""
-        return day in self.schedule and time in self.schedule[day]
+        try:
+            minute = parse_time(time)
+        except ValueError:
+            return False
+        return bool(self.slot_bitmaps().get(day, 0) >> minute & 1)
 
 @dataclass
 class GymLocation(BaseModel):
@@ -66,4 +84,29 @@ class GymLocation(BaseModel):
         for zone in self.workout_zones:
             if zone.id == zone_id:
                 return zone
-        return None
\ No newline at end of file
+        return None
+
+    def update(self):
+        """Drop the compiled opening hours and record the update"""
+        self.__dict__.pop("_opening_intervals", None)
+        super().update()
+
+    def set_opening_hours(self, day: str, hours: str):
+        """Set the opening hours of one day, e.g. 06:00-22:00"""
+        self.opening_hours[day] = hours
+        self.update()
+
+    def opening_intervals(self) -> List[Interval]:
+        """Opening hours compiled into minute-of-week intervals, cached until the next update() or new hours"""
+        cached = self.__dict__.get("_opening_intervals")
+        if cached is None or cached[0] is not self.opening_hours:
+            cached = self.__dict__["_opening_intervals"] = (self.opening_hours, compile_opening_hours(self.opening_hours))
+        return cached[1]
+
+    def is_open_at(self, when: Union[datetime, int]) -> bool:
+        """Check if the location is open at a time (datetime or epoch seconds)"""
+        return self.is_active and within_intervals(self.opening_intervals(), when)
+
+    def is_within_opening_hours(self, start: Union[datetime, int], duration: int) -> bool:
+        """Check if a booking of `duration` minutes starting at `start` fits inside the opening hours"""
+        return self.is_active and within_intervals(self.opening_intervals(), start, duration)
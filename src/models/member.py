@@ -7,6 +7,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 from .common import BaseModel, Address
+from ..utils.symbols import symbol
 
 class MembershipType(Enum):
     """Types of membership available"""
@@ -35,7 +36,7 @@ class Member(BaseModel):
     address: Address
     membership_type: MembershipType
     health_info: HealthInformation
-    home_location_id: Optional[str] = None
+    home_location_id: Optional[str] = symbol(default=None)
     is_active: bool = True
 
     @property
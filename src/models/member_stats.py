@@ -0,0 +1,66 @@
+"""
+Materialized per-member activity statistics.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+@dataclass
+class MemberActivityStats:
+    """Aggregated visit and appointment activity for a member"""
+    member_id: str
+    visit_count: int = 0
+    last_visit: Optional[datetime] = None
+    completed_visits: int = 0  # visits with a check-out
+    total_visit_minutes: int = 0
+    appointments_booked: int = 0
+    appointments_completed: int = 0
+    appointments_cancelled: int = 0
+    appointments_no_show: int = 0
+    # Visits not yet checked out and the status of appointments not yet resolved, so that
+    # each check-out and each resolution is counted once; both stay small
+    open_visits: List[str] = field(default_factory=list)
+    pending_appointments: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        """The member ID, under which the statistics are stored"""
+        return self.member_id
+
+    @property
+    def average_visit_duration(self) -> Optional[float]:
+        """Average visit duration in minutes over completed visits"""
+        if not self.completed_visits:
+            return None
+        return self.total_visit_minutes / self.completed_visits
+
+    @property
+    def resolved_appointments(self) -> int:
+        """Number of appointments that were completed, cancelled or missed"""
+        return self.appointments_completed + self.appointments_cancelled + self.appointments_no_show
+
+    @property
+    def completion_rate(self) -> Optional[float]:
+        """Share of resolved appointments that were completed"""
+        if not self.resolved_appointments:
+            return None
+        return self.appointments_completed / self.resolved_appointments
+
+    @property
+    def no_show_rate(self) -> Optional[float]:
+        """Share of resolved appointments the member did not show up for"""
+        if not self.resolved_appointments:
+            return None
+        return self.appointments_no_show / self.resolved_appointments
+
+    def record_visit(self, check_in_time: datetime):
+        """Count a new visit"""
+        self.visit_count += 1
+        if self.last_visit is None or check_in_time > self.last_visit:
+            self.last_visit = check_in_time
+
+    def record_check_out(self, duration: int):
+        """Add the duration of a finished visit"""
+        self.completed_visits += 1
+        self.total_visit_minutes += duration
@@ -7,6 +7,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 from .common import BaseModel
+from .member import MembershipType
 
 class PaymentFrequency(Enum):
     """Available payment frequencies"""
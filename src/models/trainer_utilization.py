@@ -0,0 +1,42 @@
+"""
+Per-trainer weekly utilization figures.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+@dataclass
+class TrainerWeekUtilization:
+    """Appointments of one trainer in one week (Monday to Sunday)"""
+    trainer_id: str
+    week_start: date
+    appointments_booked: int = 0  # not cancelled
+    booked_minutes: int = 0
+    appointments_completed: int = 0
+    appointments_cancelled: int = 0
+    appointments_no_show: int = 0
+
+    @property
+    def booked_hours(self) -> float:
+        """Hours of appointments that were not cancelled"""
+        return self.booked_minutes / 60
+
+    @property
+    def resolved_appointments(self) -> int:
+        """Number of appointments that were completed, cancelled or missed"""
+        return self.appointments_completed + self.appointments_cancelled + self.appointments_no_show
+
+    @property
+    def completion_rate(self) -> Optional[float]:
+        """Share of resolved appointments that were completed"""
+        if not self.resolved_appointments:
+            return None
+        return self.appointments_completed / self.resolved_appointments
+
+    @property
+    def no_show_rate(self) -> Optional[float]:
+        """Share of resolved appointments the member did not show up for"""
+        if not self.resolved_appointments:
+            return None
+        return self.appointments_no_show / self.resolved_appointments
@@ -3,18 +3,34 @@ Repositories for St Mary's Fitness Management System.
 This module exports all repository classes for easy access.
 """
 
-from .member_repository import MemberRepository
-from .location_repository import LocationRepository
-from .appointment_repository import AppointmentRepository
-from .subscription_repository import SubscriptionRepository
-from .attendance_repository import AttendanceRepository
-from .base_repository import BaseRepository
+from ..utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "MemberRepository": ".member_repository",
+    "LocationRepository": ".location_repository",
+    "AppointmentRepository": ".appointment_repository",
+    "RecurringAppointmentRepository": ".recurring_appointment_repository",
+    "ClassSessionRepository": ".class_session_repository",
+    "AttendanceRepository": ".attendance_repository",
+    "AttendanceArchiveRepository": ".attendance_archive_repository",
+    "MemberStatsRepository": ".member_stats_repository",
+    "ShardedRepository": ".sharded_repository",
+    "ShardWorker": ".shard_worker",
+    "BaseRepository": ".base_repository",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     'MemberRepository',
     'LocationRepository',
     'AppointmentRepository',
-    'SubscriptionRepository',
+    'RecurringAppointmentRepository',
+    'ClassSessionRepository',
     'AttendanceRepository',
+    'AttendanceArchiveRepository',
+    'MemberStatsRepository',
+    'ShardedRepository',
+    'ShardWorker',
     'BaseRepository'
 ]
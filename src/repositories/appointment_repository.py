@@ -2,14 +2,20 @@
 Repository for managing appointments.
 """
 
+from dataclasses import replace
 from datetime import datetime, timedelta
 from typing import List, Optional
 from src.models.appointment import Appointment, AppointmentStatus, AppointmentType
 from src.repositories.base_repository import BaseRepository
+from src.utils.timestamps import day_range, to_epoch
+from src.utils.tracing import traced
 
 class AppointmentRepository(BaseRepository[Appointment]):
     """Repository for managing appointments"""
 
+    entity_name = "appointment"
+
+    @traced("repository.get_upcoming_appointments")
     def get_upcoming_appointments(self, member_id: Optional[str] = None) -> List[Appointment]:
         """
         Get all upcoming appointments, optionally filtered by member ID.
@@ -17,13 +23,14 @@ class AppointmentRepository(BaseRepository[Appointment]):
         :param member_id: Optional ID of the member to filter.
         :return: List of upcoming appointments.
         """
-        now = datetime.now()
+        now = to_epoch(datetime.now())
         return [
             appointment for appointment in self.data
-            if appointment.start_time > now
+            if appointment.start_time_epoch > now
             and (member_id is None or appointment.member_id == member_id)
         ]
 
+    @traced("repository.get_appointments_by_date")
     def get_appointments_by_date(self, date: datetime, location_id: Optional[str] = None) -> List[Appointment]:
         """
         Get appointments for a specific date, optionally filtered by location.
@@ -32,10 +39,10 @@ class AppointmentRepository(BaseRepository[Appointment]):
         :param location_id: Optional location ID to filter appointments.
         :return: List of appointments for the date.
         """
-        date_str = date.strftime("%Y-%m-%d")
+        start, end = day_range(date)
         return [
             appointment for appointment in self.data
-            if appointment.start_time.strftime("%Y-%m-%d") == date_str
+            if start <= appointment.start_time_epoch < end
             and (location_id is None or appointment.location_id == location_id)
         ]
 
@@ -57,11 +64,13 @@ class AppointmentRepository(BaseRepository[Appointment]):
         :param note: Optional cancellation note.
         :return: True if cancellation was successful, False otherwise.
         """
-        appointment = self.get_by_id(appointment_id)
-        if appointment and appointment.status not in [AppointmentStatus.CANCELLED, AppointmentStatus.COMPLETED]:
-            appointment.cancel(note)
-            self.update(appointment)
-            return True
+        with self._lock:
+            appointment = self.get_by_id(appointment_id)
+            if appointment and appointment.status not in [AppointmentStatus.CANCELLED, AppointmentStatus.COMPLETED]:
+                appointment = replace(appointment)  # Snapshots and change events keep the stored version
+                appointment.cancel(note)
+                self.update(appointment)
+                return True
         return False
 
     def complete_appointment(self, appointment_id: str, note: Optional[str] = None) -> bool:
@@ -72,13 +81,16 @@ class AppointmentRepository(BaseRepository[Appointment]):
         :param note: Optional completion note.
         :return: True if completion was successful, False otherwise.
         """
-        appointment = self.get_by_id(appointment_id)
-        if appointment and appointment.status == AppointmentStatus.IN_PROGRESS:
-            appointment.complete(note)
-            self.update(appointment)
-            return True
+        with self._lock:
+            appointment = self.get_by_id(appointment_id)
+            if appointment and appointment.status == AppointmentStatus.IN_PROGRESS:
+                appointment = replace(appointment)  # Snapshots and change events keep the stored version
+                appointment.complete(note)
+                self.update(appointment)
+                return True
         return False
 
+    @traced("repository.get_member_appointment_history")
     def get_member_appointment_history(self, member_id: str) -> List[Appointment]:
         """
         Get the full appointment history for a member.
@@ -88,6 +100,7 @@ class AppointmentRepository(BaseRepository[Appointment]):
         """
         return [appointment for appointment in self.data if appointment.member_id == member_id]
 
+    @traced("repository.get_trainer_schedule")
     def get_trainer_schedule(self, trainer_id: str, date: datetime) -> List[Appointment]:
         """
         Get a trainer's schedule for a specific date.
@@ -96,9 +109,9 @@ class AppointmentRepository(BaseRepository[Appointment]):
         :param date: Date to filter appointments.
         :return: List of appointments for the trainer on the date.
         """
-        date_str = date.strftime("%Y-%m-%d")
+        start, end = day_range(date)
         return [
             appointment for appointment in self.data
             if appointment.trainer_id == trainer_id
-            and appointment.start_time.strftime("%Y-%m-%d") == date_str
+            and start <= appointment.start_time_epoch < end
         ]
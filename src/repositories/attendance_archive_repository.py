@@ -0,0 +1,300 @@
+"""
+Repository for archived attendance: compressed monthly segments of raw records
+plus daily per-location/per-member summary rows.
+"""
+
+import gzip
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..models.attendance import AttendanceDailySummary, AttendanceRecord
+from ..utils.codec import codec_for
+from ..utils.config import Config
+from ..utils.file_lock import FileLock, FileStamp, atomic_write_text
+from ..utils.timestamps import to_epoch
+
+SummaryKey = Tuple[date, str, str]  # (day, location_id, member_id)
+
+RECORD_CODEC = codec_for(AttendanceRecord)
+SUMMARY_CODEC = codec_for(AttendanceDailySummary)
+
+
+class AttendanceArchiveRepository:
+    """
+    Repository class for archived attendance records.
+
+    Raw records are kept in gzip-compressed ``attendance-YYYY-MM.json.gz``
+    segments that are only read back on demand; everyday queries use the
+    summary rows in ``attendance_summary.json``. The summaries also tell which
+    months hold a member's visits, so record queries open only those segments,
+    and the most recently read segments are kept decoded in memory.
+    """
+
+    def __init__(self, archive_dir: str = "data/archive"):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.summary_file = self.archive_dir / "attendance_summary.json"
+        self._summaries: Dict[SummaryKey, AttendanceDailySummary] = {}
+        self._by_member: Dict[str, List[AttendanceDailySummary]] = {}
+        # Distinct days with archived visits, in order
+        self._days: List[date] = []
+        self._stamp: Optional[FileStamp] = None
+        self._lock = FileLock(self.summary_file, timeout=Config.STORAGE_LOCK_TIMEOUT)
+        # Decoded segments by month, with the stamp of the file they were read from, least recently used first
+        self._segments: "OrderedDict[str, Tuple[FileStamp, List[AttendanceRecord]]]" = OrderedDict()
+        self._segments_lock = threading.Lock()
+        self.load_data()
+
+    def refresh(self) -> bool:
+        """
+        Reload the summaries if another process wrote them since they were last read.
+        """
+        if FileStamp.of(self.summary_file) == self._stamp:
+            return False
+        self.load_data()
+        return True
+
+    def load_data(self):
+        """
+        Load the summary rows from the JSON file into memory.
+        """
+        stamp = FileStamp.of(self.summary_file)
+        rows = []
+        if stamp is not None:
+            with self.summary_file.open("r") as file:
+                rows = SUMMARY_CODEC.decode_many(json.load(file), str(self.summary_file))
+        self._set_summaries(rows)
+        self._stamp = stamp
+
+    def save_data(self):
+        """
+        Save the summary rows to the JSON file.
+        """
+        with self._lock:
+            rows = [self._serialize_summary(summary) for summary in self._summaries.values()]
+            atomic_write_text(self.summary_file, json.dumps(rows, indent=4))
+            self._stamp = FileStamp.of(self.summary_file)
+
+    def archive(self, records: Iterable[AttendanceRecord]) -> int:
+        """
+        Move records into their monthly segments and refresh the affected summary rows.
+
+        Archiving is idempotent: records already present in a segment are
+        replaced rather than duplicated, and the summaries of every touched
+        month are recomputed from the segment.
+
+        :param records: Checked-out attendance records to archive.
+        :return: Number of records archived.
+        """
+        by_month: Dict[str, List[AttendanceRecord]] = {}
+        for record in records:
+            by_month.setdefault(record.check_in_time.strftime("%Y-%m"), []).append(record)
+        if not by_month:
+            return 0
+
+        with self._lock:
+            self.refresh()
+            for month, month_records in by_month.items():
+                merged = {record.id: record for record in self.read_segment(month)}
+                merged.update((record.id, record) for record in month_records)
+                self._write_segment(month, merged.values())
+                self._replace_month_summaries(month, merged.values())
+            self.save_data()
+        return sum(len(month_records) for month_records in by_month.values())
+
+    def list_segments(self) -> List[str]:
+        """
+        List the archived months as "YYYY-MM" strings.
+        """
+        return sorted(path.name[len("attendance-"):-len(".json.gz")]
+                      for path in self.archive_dir.glob("attendance-*.json.gz"))
+
+    def read_segment(self, month: str) -> List[AttendanceRecord]:
+        """
+        Read the raw records archived for a month.
+
+        Up to Config.ARCHIVE_SEGMENT_CACHE_SIZE decoded segments are kept, and
+        one is read again once another process rewrites its file.
+
+        :param month: Month as "YYYY-MM".
+        :return: Archived records, empty if the month has no segment. The list is shared; do not modify it.
+        """
+        path = self._segment_path(month)
+        stamp = FileStamp.of(path)
+        if stamp is None:
+            return []
+        with self._segments_lock:
+            cached = self._segments.get(month)
+            if cached is not None and cached[0] == stamp:
+                self._segments.move_to_end(month)
+                return cached[1]
+        with gzip.open(path, "rt") as file:
+            records = RECORD_CODEC.decode_many(json.load(file), str(path))
+        self._cache_segment(month, stamp, records)
+        return records
+
+    def _cache_segment(self, month: str, stamp: Optional[FileStamp], records: List[AttendanceRecord]):
+        with self._segments_lock:
+            self._segments[month] = (stamp, records)
+            self._segments.move_to_end(month)
+            while len(self._segments) > Config.ARCHIVE_SEGMENT_CACHE_SIZE:
+                self._segments.popitem(last=False)
+
+    def archived_months(
+        self,
+        member_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[str]:
+        """
+        List the months with archived visits from start_date through end_date, taken from the summaries.
+
+        :param member_id: Only months with this member's visits.
+        :return: Months as "YYYY-MM" strings, in order.
+        """
+        if member_id is None:
+            self.refresh()
+            low = bisect_left(self._days, start_date) if start_date else 0
+            high = bisect_right(self._days, end_date) if end_date else len(self._days)
+            days: Iterable[date] = self._days[low:high]
+        else:
+            days = (summary.day for summary in self.get_member_summaries(member_id, start_date, end_date))
+        months: Set[str] = {day.strftime("%Y-%m") for day in days}
+        return sorted(months)
+
+    def find_records(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        member_id: Optional[str] = None
+    ) -> List[AttendanceRecord]:
+        """
+        Get archived raw records checked in from start through end, both included.
+
+        Only the segments of months whose summaries show matching visits are read.
+
+        :param start: Earliest check-in time to include.
+        :param end: Latest check-in time to include.
+        :param member_id: Only include this member's records.
+        :return: Matching records in check-in order.
+        """
+        start_epoch = to_epoch(start, round_up=True) if start is not None else None
+        end_epoch = to_epoch(end) if end is not None else None
+        records = []
+        for month in self.archived_months(member_id, start.date() if start else None, end.date() if end else None):
+            records.extend(
+                record for record in self.read_segment(month)
+                if (member_id is None or record.member_id == member_id)
+                and (start_epoch is None or record.check_in_time_epoch >= start_epoch)
+                and (end_epoch is None or record.check_in_time_epoch <= end_epoch)
+            )
+        records.sort(key=lambda record: record.check_in_time_epoch)
+        return records
+
+    def get_member_summaries(
+        self,
+        member_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[AttendanceDailySummary]:
+        """
+        Get a member's archived daily summaries from start_date through end_date, both included.
+        """
+        self.refresh()
+        return [
+            summary for summary in self._by_member.get(member_id, [])
+            if (start_date is None or summary.day >= start_date)
+            and (end_date is None or summary.day <= end_date)
+        ]
+
+    def get_location_summaries(
+        self,
+        location_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[AttendanceDailySummary]:
+        """
+        Get a location's archived daily summaries within an optional date range.
+        """
+        self.refresh()
+        return [
+            summary for summary in self._summaries.values()
+            if summary.location_id == location_id
+            and (start_date is None or summary.day >= start_date)
+            and (end_date is None or summary.day <= end_date)
+        ]
+
+    def _replace_month_summaries(self, month: str, records: Iterable[AttendanceRecord]):
+        summaries = {
+            key: summary for key, summary in self._summaries.items()
+            if key[0].strftime("%Y-%m") != month
+        }
+        for key, summary in summarize_by_day(records).items():
+            summaries[key] = summary
+        self._set_summaries(summaries.values())
+
+    def _set_summaries(self, summaries: Iterable[AttendanceDailySummary]):
+        self._summaries = {}
+        self._by_member = {}
+        for summary in sorted(summaries, key=lambda s: s.day):
+            self._summaries[(summary.day, summary.location_id, summary.member_id)] = summary
+            self._by_member.setdefault(summary.member_id, []).append(summary)
+        self._days = sorted({summary.day for summary in self._summaries.values()})
+
+    def _segment_path(self, month: str) -> Path:
+        return self.archive_dir / f"attendance-{month}.json.gz"
+
+    def _write_segment(self, month: str, records: Iterable[AttendanceRecord]):
+        records = list(records)
+        path = self._segment_path(month)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt") as file:
+            json.dump([self._serialize(record) for record in records], file)
+        tmp_path.replace(path)
+        self._cache_segment(month, FileStamp.of(path), records)
+
+    def _serialize(self, record: AttendanceRecord) -> dict:
+        """
+        Serialize an AttendanceRecord object into a dictionary.
+        """
+        return RECORD_CODEC.encode(record)
+
+    def _deserialize(self, data: dict) -> AttendanceRecord:
+        """
+        Deserialize a dictionary into an AttendanceRecord object.
+        """
+        return RECORD_CODEC.decode(data)
+
+    def _serialize_summary(self, summary: AttendanceDailySummary) -> dict:
+        """
+        Serialize an AttendanceDailySummary object into a dictionary.
+        """
+        return SUMMARY_CODEC.encode(summary)
+
+    def _deserialize_summary(self, data: dict) -> AttendanceDailySummary:
+        """
+        Deserialize a dictionary into an AttendanceDailySummary object.
+        """
+        return SUMMARY_CODEC.decode(data)
+
+
+def summarize_by_day(records: Iterable[AttendanceRecord]) -> Dict[SummaryKey, AttendanceDailySummary]:
+    """
+    Roll attendance records up into daily per-location/per-member summary rows.
+
+    :param records: Attendance records to summarize.
+    :return: Summary rows keyed by (day, location_id, member_id).
+    """
+    summaries: Dict[SummaryKey, AttendanceDailySummary] = {}
+    for record in records:
+        day = record.check_in_time.date()
+        key = (day, record.location_id, record.member_id)
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = AttendanceDailySummary(day, record.location_id, record.member_id)
+        summary.add_visit(record.duration)
+    return summaries
@@ -2,14 +2,21 @@
 Repository for managing attendance records.
 """
 
+from dataclasses import replace
 from datetime import datetime
 from typing import List, Optional
 from src.models.attendance import AttendanceRecord
 from src.repositories.base_repository import BaseRepository
+from src.utils.timestamps import day_range
+from src.utils.tracing import traced
 
 class AttendanceRepository(BaseRepository[AttendanceRecord]):
     """Repository for attendance records"""
 
+    entity_name = "attendance"
+    page_orders = ("check_in_time",)
+
+    @traced("repository.get_active_attendance")
     def get_active_attendance(self, member_id: str) -> Optional[AttendanceRecord]:
         """
         Get the active attendance record for a member.
@@ -22,6 +29,7 @@ class AttendanceRepository(BaseRepository[AttendanceRecord]):
                 return record
         return None
 
+    @traced("repository.get_attendance_by_date")
     def get_attendance_by_date(self, date: datetime, location_id: Optional[str] = None) -> List[AttendanceRecord]:
         """
         Get attendance records for a specific date, optionally filtered by location.
@@ -30,10 +38,10 @@ class AttendanceRepository(BaseRepository[AttendanceRecord]):
         :param location_id: Optional location ID to further filter records.
         :return: List of attendance records.
         """
-        date_str = date.strftime("%Y-%m-%d")
+        start, end = day_range(date)
         return [
             record for record in self.data
-            if record.check_in_time.strftime("%Y-%m-%d") == date_str
+            if start <= record.check_in_time_epoch < end
             and (location_id is None or record.location_id == location_id)
         ]
 
@@ -56,11 +64,13 @@ class AttendanceRepository(BaseRepository[AttendanceRecord]):
         """
         active_record = self.get_active_attendance(member_id)
         if active_record:
-            active_record.check_out()
-            self.update(active_record)
+            checked_out = replace(active_record)
+            checked_out.check_out()
+            self.update(checked_out)
             return True
         return False
 
+    @traced("repository.get_attendance_history")
     def get_attendance_history(self, member_id: str) -> List[AttendanceRecord]:
         """
         Get the full attendance history for a member.
@@ -3,44 +3,277 @@ Base repository providing common CRUD operations for other repositories.
 """
 
 import json
-import os
-from typing import Generic, TypeVar, List, Optional
+import operator
+from contextlib import contextmanager
+from typing import Any, Dict, Generic, Iterable, Tuple, Type, TypeVar, List, Optional, get_args, get_origin
 from src.models.common import BaseModel
+from src.utils.codec import Codec, codec_for
+from src.utils.config import Config
+from src.utils.events import ChangeType, EventBus, change_bus
+from src.utils.file_lock import FileLock, FileStamp, atomic_write_text
+from src.utils.filters import compile_filters
+from src.utils.journal import DirtySet, Journal, replay
+from src.utils.metrics import metrics
+from src.utils.mvcc import Snapshot, VersionedList
+from src.utils.pagination import Page, SortedIndex
+from src.utils.tracing import traced, tracer
 
 T = TypeVar("T", bound=BaseModel)
 
+ITEM_ID = operator.attrgetter("id")
+
 class BaseRepository(Generic[T]):
     """A base repository for common CRUD operations"""
 
-    def __init__(self, file_path: str):
+    # Name under which change events for this repository are published
+    entity_name: str = "item"
+    # Model class stored by the repository, taken from the BaseRepository[Model] base
+    model: Optional[Type[T]] = None
+    # Orderings served by find_page whose sort indexes are built as the data loads
+    page_orders: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for base in getattr(cls, "__orig_bases__", ()):
+            if get_origin(base) is BaseRepository and isinstance(get_args(base)[0], type):
+                cls.model = get_args(base)[0]
+
+    def __init__(self, file_path: str, event_bus: Optional[EventBus] = None):
         """
         Initialize the repository with a file path for data persistence.
 
         :param file_path: Path to the JSON file for storage.
+        :param event_bus: Bus that receives change events, defaults to the shared change_bus.
         """
         self.file_path = file_path
-        self.data: List[T] = []
+        self.event_bus = event_bus or change_bus
+        self._codec: Codec = codec_for(self.model)
+        # Records in copy-on-write versions, so snapshots stay consistent while writes continue
+        self._versions: VersionedList[T] = VersionedList()
+        self._stamp: Optional[FileStamp] = None
+        self._lock = FileLock(file_path, timeout=Config.STORAGE_LOCK_TIMEOUT)
+        self._batch_depth = 0
+        self._save_pending = False
+        # Sort indexes of page_orders and of other orderings requested through find_page
+        self._indexes: Dict[str, SortedIndex[T]] = {}
+        # Records changed since the last save, persisted as journal entries
+        self._dirty = DirtySet()
+        self._journal = Journal(file_path)
+        self._snapshot_pending = False
         self._load()
 
+    @property
+    def data(self) -> List[T]:
+        """
+        Items held in memory, reloaded first if another process changed the file.
+
+        This is the live list; long-running reads should iterate a snapshot() instead.
+        """
+        self.refresh()
+        return self._data
+
+    @data.setter
+    def data(self, items: List[T]):
+        self._data = items
+        self._build_indexes()
+        self._snapshot_pending = True
+        for item in items:
+            self._dirty.track(item)
+
+    @property
+    def _data(self) -> List[T]:
+        """Records of the current version."""
+        return self._versions.items
+
+    @_data.setter
+    def _data(self, items: List[T]):
+        self._versions.replace(items)
+
+    def snapshot(self) -> Snapshot[T]:
+        """
+        Pin a consistent point-in-time view of the items.
+
+        Taking a snapshot only waits out an in-memory change in progress, and
+        reading it takes no lock and is unaffected by later writes; the
+        first write after it is taken copies the item list instead. Release the
+        snapshot (or use it as a context manager) so that copy can be reclaimed.
+
+        :return: The snapshot of the current version.
+        """
+        self.refresh()
+        return self._versions.snapshot()
+
+    def refresh(self) -> bool:
+        """
+        Catch up with writes made by other processes since the data was last read.
+
+        Appended journal entries are replayed on their own; the whole file is
+        reloaded only after it was rewritten.
+
+        :return: True if the data changed, False if it was already current.
+        """
+        if FileStamp.of(self.file_path) != self._stamp or self._journal.was_replaced():
+            self._load()
+        elif self._journal.has_new_entries():
+            self._apply_journal()
+        else:
+            return False
+        self.event_bus.publish(self.entity_name, ChangeType.RELOADED, None)
+        return True
+
     def _load(self):
-        """Load data from the JSON file if it exists."""
-        if os.path.exists(self.file_path):
+        """Load data from the JSON file if it exists, then replay its journal."""
+        stamp = FileStamp.of(self.file_path)
+        self._journal.open()
+        if stamp is not None:
             try:
-                with open(self.file_path, 'r') as file:
+                with tracer.span("repository.load", repository=self.entity_name), \
+                        metrics.time("repository_load_duration_seconds", repository=self.entity_name), \
+                        open(self.file_path, 'r') as file:
                     raw_data = json.load(file)
-                    self.data = [self._deserialize(item) for item in raw_data]
+                    self._data = self._codec.decode_many(raw_data, self.file_path)
+                    for item in self._data:
+                        self._dirty.track(item)
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Error loading data from {self.file_path}: {e}")
+        self._stamp = stamp
+        orders = tuple(self._indexes)
+        self._indexes = {}
+        self._apply_journal()
+        self._build_indexes(orders)
+
+    def _build_indexes(self, orders: Iterable[str] = ()):
+        """Sort the items for page_orders and the given orderings."""
+        orders = dict.fromkeys((*self.page_orders, *orders, *self._indexes))
+        self._indexes = {order: SortedIndex(order, self._data) for order in orders}
+
+    def _apply_journal(self):
+        """Replay journal entries appended since they were last read."""
+        entries = self._journal.read_new()
+        if entries:
+            with self._versions.writing() as items:
+                removed, put = replay(items, entries, self._decode_entry)
+            for item in put:
+                self._dirty.track(item)
+            self._reindex(removed, put)
 
     def _save(self):
-        """Save data to the JSON file."""
+        """
+        Persist the changed records, holding the cross-process write lock.
+
+        Changes are appended to the journal; the whole file is rewritten only
+        when the journal has grown large enough to be compacted.
+        """
+        touched = self._dirty.take_touched()
+        if touched:
+            # Records changed in place by BaseModel.update() move to their new place in the sort indexes
+            self._reindex([item.id for item in touched], touched)
+        if self._batch_depth:
+            self._save_pending = True
+            return
         try:
-            with open(self.file_path, 'w') as file:
-                raw_data = [item.to_dict() for item in self.data]
-                json.dump(raw_data, file, indent=4)
+            with self._lock:
+                if self._stamp is None or self._snapshot_pending or self._journal.needs_compaction(len(self._data)):
+                    self._write_snapshot()
+                elif self._dirty:
+                    self._write_journal()
+                self._dirty.clear()
         except IOError as e:
             print(f"Error saving data to {self.file_path}: {e}")
 
+    def _write_journal(self):
+        with tracer.span("repository.save", repository=self.entity_name, mode="journal"), \
+                metrics.time("repository_save_duration_seconds", repository=self.entity_name):
+            with tracer.span("repository.serialize", rows=len(self._dirty)):
+                entries = self._dirty.entries(self._serialize)
+            offset = self._journal.offset
+            with tracer.span("repository.write", entries=len(entries)):
+                self._journal.append(entries)
+            metrics.inc("repository_bytes_written_total", self._journal.offset - offset, repository=self.entity_name)
+
+    def _write_snapshot(self):
+        with tracer.span("repository.save", repository=self.entity_name, mode="snapshot"), \
+                metrics.time("repository_save_duration_seconds", repository=self.entity_name):
+            with tracer.span("repository.serialize", rows=len(self._data)):
+                encode = self._codec.encode
+                raw_data = [encode(item) for item in self._data]
+                text = json.dumps(raw_data, indent=4)
+            with tracer.span("repository.write", bytes=len(text)):
+                atomic_write_text(self.file_path, text)
+                self._journal.reset()
+            self._stamp = FileStamp.of(self.file_path)
+            self._snapshot_pending = False
+            metrics.inc("repository_bytes_written_total", len(text), repository=self.entity_name)
+
+    def flush(self):
+        """
+        Persist records marked dirty by BaseModel.update() since the last save.
+
+        Such records were changed in place rather than copied, so open snapshots
+        already see the change; sort indexes are brought up to date here. Write
+        a replace() copy through update() where snapshot readers must not see it.
+        """
+        with self._lock:
+            self._save()
+
+    def compact(self):
+        """
+        Rewrite the whole file and start an empty journal.
+        """
+        with self._lock:
+            self.refresh()
+            self._snapshot_pending = True
+            self._save()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several writes into a single save.
+
+        The write lock is held for the whole batch and the file is written
+        once when the outermost batch exits.
+        """
+        with self._lock:
+            self.refresh()
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._save_pending:
+                    self._save_pending = False
+                    self._save()
+
+    def _reindex(self, removed: Iterable[str] = (), added: Iterable[T] = ()):
+        """Apply a change to the sort indexes that have been built."""
+        for index in self._indexes.values():
+            for item_id in removed:
+                index.remove(item_id)
+            for item in added:
+                index.add(item)
+
+    def _record_change(self, removed: Iterable[str] = (), added: Iterable[T] = ()):
+        """Mark added, updated and removed items dirty and keep the sort indexes current."""
+        for item_id in removed:
+            self._dirty.mark_deleted(item_id)
+        for item in added:
+            self._dirty.track(item)
+            self._dirty.mark_changed(item)
+        self._reindex(removed, added)
+
+    def _serialize(self, item: T) -> dict:
+        """
+        Convert a model into a dictionary for storage.
+
+        :param item: Model instance.
+        :return: JSON-compatible dictionary.
+        """
+        return self._codec.encode(item)
+
+    def _decode_entry(self, raw_data: dict) -> Optional[T]:
+        """Deserialize a journal entry's record, or None if it cannot be decoded."""
+        return self._codec.try_decode(raw_data, f"{self.file_path} journal")
+
     def _deserialize(self, raw_data: dict) -> T:
         """
         Convert a dictionary back into the model.
@@ -48,7 +281,7 @@ class BaseRepository(Generic[T]):
         :param raw_data: Raw dictionary data from the file.
         :return: Deserialized model instance.
         """
-        return T.from_dict(raw_data)
+        return self._codec.decode(raw_data)
 
     def add(self, item: T) -> T:
         """
@@ -57,10 +290,100 @@ class BaseRepository(Generic[T]):
         :param item: The item to add.
         :return: The added item.
         """
-        self.data.append(item)
-        self._save()
+        with self._lock:
+            self.refresh()
+            with self._versions.writing() as items:
+                items.append(item)
+            self._record_change(added=[item])
+            self._save()
+            self.event_bus.publish(self.entity_name, ChangeType.CREATED, item.id, after=item)
+        return item
+
+    def add_many(self, items: Iterable[T]) -> List[T]:
+        """
+        Add several items with a single save.
+
+        :param items: The items to add.
+        :return: The added items.
+        """
+        items = list(items)
+        with self._lock:
+            self.refresh()
+            with self._versions.writing() as data:
+                data.extend(items)
+            self._record_change(added=items)
+            self._save()
+            for item in items:
+                self.event_bus.publish(self.entity_name, ChangeType.CREATED, item.id, after=item)
+        return items
+
+    def save(self, item: T) -> T:
+        """
+        Update an item if it is already stored, otherwise add it.
+
+        :param item: The item to save.
+        :return: The saved item.
+        """
+        with self._lock:
+            if not self.update(item):
+                self.add(item)
         return item
 
+    def find_by_id(self, item_id: str) -> Optional[T]:
+        """
+        Retrieve an item by its unique ID.
+
+        :param item_id: The ID of the item.
+        :return: The item if found, None otherwise.
+        """
+        return self.get_by_id(item_id)
+
+    def find_all(self, filters: Optional[Dict[str, Any]] = None) -> List[T]:
+        """
+        Get all items matching the given filters.
+
+        :param filters: Field lookups such as {"member_id": ..., "check_in_time__gte": ...}.
+        :return: A list of matching items.
+        """
+        if not filters:
+            return list(self.data)
+        predicate = compile_filters(filters)
+        return [item for item in self.data if predicate(item)]
+
+    def find_page(
+        self,
+        order_by: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+        descending: bool = False,
+        start: Any = None,
+        end: Any = None
+    ) -> Page[T]:
+        """
+        Get one page of items in keyset order.
+
+        Orderings in page_orders are sorted as the data loads; another ordering
+        is sorted on its first call and kept, and rebuilt on later reloads.
+        Writes keep the indexes current, so each page costs a bisection plus
+        the items it reads.
+
+        :param order_by: Field to order by; ties are broken by id.
+        :param cursor: next_cursor of the previous page, None for the first page.
+        :param limit: Maximum number of items on the page.
+        :param filters: Field lookups applied to the items in order.
+        :param descending: Return the largest values first.
+        :param start: Smallest order_by value to include.
+        :param end: Largest order_by value to include.
+        :return: The page and the cursor of the next one.
+        """
+        self.refresh()
+        index = self._indexes.get(order_by)
+        if index is None:
+            index = self._indexes[order_by] = SortedIndex(order_by, self._data)
+        predicate = compile_filters(filters) if filters else None
+        return index.page(cursor, limit, predicate, descending, start, end)
+
     def get_all(self) -> List[T]:
         """
         Get all items in the repository.
@@ -69,6 +392,7 @@ class BaseRepository(Generic[T]):
         """
         return self.data
 
+    @traced("repository.get_by_id")
     def get_by_id(self, item_id: str) -> Optional[T]:
         """
         Retrieve an item by its unique ID.
@@ -85,12 +409,29 @@ class BaseRepository(Generic[T]):
         :param item: The item to update.
         :return: True if updated successfully, False otherwise.
         """
-        for index, existing_item in enumerate(self.data):
-            if existing_item.id == item.id:
-                self.data[index] = item
-                self._save()
-                return True
-        return False
+        with self._lock:
+            self.refresh()
+            index = self._position(item.id)
+            if index is None:
+                return False
+            existing_item = self._data[index]
+            # A record changed in place is no pre-image of itself
+            before = existing_item if existing_item is not item else None
+            if before is not None:
+                self._dirty.untrack(before)
+            with self._versions.writing() as items:
+                items[index] = item
+            self._record_change(added=[item])
+            self._save()
+            self.event_bus.publish(self.entity_name, ChangeType.UPDATED, item.id, before=before, after=item)
+        return True
+
+    def _position(self, item_id: str) -> Optional[int]:
+        """Position of an item in the current version, scanning the ids in C rather than in a Python loop."""
+        try:
+            return operator.indexOf(map(ITEM_ID, self._data), item_id)
+        except ValueError:
+            return None
 
     def delete(self, item_id: str) -> bool:
         """
@@ -99,9 +440,36 @@ class BaseRepository(Generic[T]):
         :param item_id: The ID of the item to delete.
         :return: True if deleted successfully, False otherwise.
         """
-        initial_length = len(self.data)
-        self.data = [item for item in self.data if item.id != item_id]
-        if len(self.data) < initial_length:
-            self._save()
-            return True
+        with self._lock:
+            self.refresh()
+            removed = next((item for item in self._data if item.id == item_id), None)
+            if removed is not None:
+                self._data = [item for item in self._data if item.id != item_id]
+                self._dirty.untrack(removed)
+                self._record_change(removed=[item_id])
+                self._save()
+                self.event_bus.publish(self.entity_name, ChangeType.DELETED, item_id, before=removed)
+                return True
         return False
+
+    def delete_many(self, item_ids: Iterable[str]) -> int:
+        """
+        Delete several items by ID with a single save.
+
+        :param item_ids: IDs of the items to delete.
+        :return: Number of items deleted.
+        """
+        ids = set(item_ids)
+        with self._lock:
+            self.refresh()
+            removed = [item for item in self._data if item.id in ids]
+            if not removed:
+                return 0
+            self._data = [item for item in self._data if item.id not in ids]
+            for item in removed:
+                self._dirty.untrack(item)
+            self._record_change(removed=[item.id for item in removed])
+            self._save()
+            for item in removed:
+                self.event_bus.publish(self.entity_name, ChangeType.DELETED, item.id, before=item)
+        return len(removed)
@@ -0,0 +1,155 @@
+"""
+Repository for managing group class sessions.
+"""
+
+from dataclasses import replace
+from datetime import datetime
+from typing import List, Optional, Tuple
+from src.models.class_session import BookingStatus, ClassSession
+from src.repositories.base_repository import BaseRepository
+from src.utils.timestamps import day_range, to_epoch
+from src.utils.tracing import traced
+
+class ClassSessionRepository(BaseRepository[ClassSession]):
+    """
+    Repository for managing group class sessions.
+
+    Places are reserved and released as read-modify-write steps under the
+    repository's cross-process write lock, so concurrent bookers (threads or
+    other processes sharing the file) never take more places than the class has.
+    """
+
+    entity_name = "class_session"
+
+    @traced("repository.get_upcoming_sessions")
+    def get_upcoming_sessions(self, location_id: Optional[str] = None) -> List[ClassSession]:
+        """
+        Get all upcoming classes that have not been cancelled.
+
+        :param location_id: Optional location ID to filter classes.
+        :return: List of upcoming classes.
+        """
+        now = to_epoch(datetime.now())
+        return [
+            session for session in self.data
+            if session.start_time_epoch > now and not session.is_cancelled
+            and (location_id is None or session.location_id == location_id)
+        ]
+
+    @traced("repository.get_sessions_by_date")
+    def get_sessions_by_date(self, date: datetime, location_id: Optional[str] = None) -> List[ClassSession]:
+        """
+        Get classes held on a specific date, optionally filtered by location.
+
+        :param date: Date to filter classes.
+        :param location_id: Optional location ID to filter classes.
+        :return: List of classes on the date.
+        """
+        start, end = day_range(date)
+        return [
+            session for session in self.data
+            if start <= session.start_time_epoch < end
+            and (location_id is None or session.location_id == location_id)
+        ]
+
+    @traced("repository.get_member_sessions")
+    def get_member_sessions(self, member_id: str) -> List[ClassSession]:
+        """
+        Get the classes a member holds a place on or is waiting for.
+
+        :param member_id: ID of the member.
+        :return: List of classes.
+        """
+        return [
+            session for session in self.data
+            if member_id in session.attendee_ids or member_id in session.waitlist
+        ]
+
+    def reserve(self, session_id: str, member_id: str) -> Optional[BookingStatus]:
+        """
+        Atomically take a place on a class, or join its waitlist when it is full.
+
+        Booking again returns the member's current status without a write.
+
+        :param session_id: ID of the class.
+        :param member_id: ID of the member booking.
+        :return: The member's booking status, None if the class does not exist.
+        :raises ValueError: If the class has been cancelled.
+        """
+        with self._lock:
+            session = self.get_by_id(session_id)
+            if session is None:
+                return None
+            status = session.booking_status(member_id)
+            if status is not None:
+                return status
+            if session.is_cancelled:
+                raise ValueError("Class has been cancelled.")
+            session = self._writable_copy(session)
+            status = session.reserve(member_id)
+            self.update(session)
+            return status
+
+    def release(self, session_id: str, member_id: str) -> Tuple[bool, List[str]]:
+        """
+        Atomically give up a place or leave the waitlist.
+
+        A freed place goes to the member at the head of the waitlist in the same write.
+
+        :param session_id: ID of the class.
+        :param member_id: ID of the member cancelling.
+        :return: Whether the member was booked or waiting, and the IDs of promoted members.
+        """
+        with self._lock:
+            session = self.get_by_id(session_id)
+            if session is None or session.booking_status(member_id) is None:
+                return False, []
+            session = self._writable_copy(session)
+            promoted = session.release(member_id)
+            self.update(session)
+            return True, promoted
+
+    def resize(self, session_id: str, capacity: int) -> Optional[List[str]]:
+        """
+        Atomically change the number of places on a class.
+
+        Members already booked keep their places when capacity shrinks;
+        places added by growing it are filled from the waitlist.
+
+        :param session_id: ID of the class.
+        :param capacity: New number of places.
+        :return: IDs of promoted members, None if the class does not exist.
+        """
+        if capacity < 0:
+            raise ValueError("Capacity cannot be negative.")
+        with self._lock:
+            session = self.get_by_id(session_id)
+            if session is None:
+                return None
+            session = self._writable_copy(session)
+            session.capacity = capacity
+            promoted = [] if session.is_cancelled else session.promote()
+            session.update()
+            self.update(session)
+            return promoted
+
+    def cancel_session(self, session_id: str) -> bool:
+        """
+        Cancel a class.
+
+        :param session_id: ID of the class to cancel.
+        :return: True if cancellation was successful, False otherwise.
+        """
+        with self._lock:
+            session = self.get_by_id(session_id)
+            if session is None or session.is_cancelled:
+                return False
+            session = self._writable_copy(session)
+            session.cancel()
+            self.update(session)
+            return True
+
+    @staticmethod
+    def _writable_copy(session: ClassSession) -> ClassSession:
+        """Copy a stored class, including its member lists, so snapshots keep reading the stored one"""
+        return replace(session, attendee_ids=list(session.attendee_ids), waitlist=list(session.waitlist))
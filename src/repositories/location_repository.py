@@ -2,89 +2,93 @@
 Repository for managing gym location and workout zone data.
 """
 
-import json
+from dataclasses import replace
+from pathlib import Path
 from typing import List, Optional
 from ..models.location import GymLocation, WorkoutZone
-from ..models.common import Address
-from pathlib import Path
+from ..utils.events import EventBus
+from .base_repository import BaseRepository
 
 
-class LocationRepository:
+class LocationRepository(BaseRepository[GymLocation]):
     """
     Repository class for managing GymLocation and WorkoutZone data.
+
+    Storage, the change journal, sort indexes and change events are those of
+    BaseRepository; this class adds the location-facing names and workout zones.
     """
 
-    def __init__(self, data_file: str = "data/locations.json"):
+    entity_name = "location"
+
+    def __init__(self, data_file: str = "data/locations.json", event_bus: Optional[EventBus] = None):
         self.data_file = Path(data_file)
-        self.locations: List[GymLocation] = []
-        self.load_data()
+        if not self.data_file.exists():
+            self.data_file.write_text("[]")  # Create an empty JSON file if it doesn't exist
+        super().__init__(str(self.data_file), event_bus)
 
-    def load_data(self):
+    @property
+    def locations(self) -> List[GymLocation]:
         """
-        Load gym locations' data from the JSON file into memory.
+        Gym locations held in memory, reloaded first if another process changed the file.
         """
-        if not self.data_file.exists():
-            self.data_file.write_text("[]")  # Create an empty JSON file if it doesn't exist
+        return self.data
 
-        with self.data_file.open("r") as file:
-            data = json.load(file)
-            self.locations = [self._deserialize(location) for location in data]
+    @locations.setter
+    def locations(self, value: List[GymLocation]):
+        self.data = value
+
+    def load_data(self):
+        """
+        Load gym locations' data from the JSON file and its journal into memory.
+        """
+        with self._lock:
+            self._load()
 
     def save_data(self):
         """
-        Save gym locations' data to the JSON file.
+        Save changed gym locations, as a full rewrite when the list was replaced or the journal is due for compaction.
         """
-        with self.data_file.open("w") as file:
-            json.dump([self._serialize(location) for location in self.locations], file, indent=4)
+        with self._lock:
+            self._save()
 
     def add_location(self, location: GymLocation) -> None:
         """
         Add a new gym location to the repository.
         """
-        self.locations.append(location)
-        self.save_data()
+        self.add(location)
 
     def get_all_locations(self) -> List[GymLocation]:
         """
         Retrieve all gym locations.
         """
-        return self.locations
+        return self.get_all()
 
     def get_location_by_id(self, location_id: str) -> Optional[GymLocation]:
         """
         Retrieve a gym location by its unique ID.
         """
-        return next((location for location in self.locations if location.id == location_id), None)
+        return self.get_by_id(location_id)
 
     def update_location(self, updated_location: GymLocation) -> bool:
         """
         Update an existing gym location's details.
         """
-        for i, location in enumerate(self.locations):
-            if location.id == updated_location.id:
-                self.locations[i] = updated_location
-                self.save_data()
-                return True
-        return False
+        return self.update(updated_location)
 
     def delete_location(self, location_id: str) -> bool:
         """
         Delete a gym location by its unique ID.
         """
-        for i, location in enumerate(self.locations):
-            if location.id == location_id:
-                del self.locations[i]
-                self.save_data()
-                return True
-        return False
+        return self.delete(location_id)
 
     def add_workout_zone(self, location_id: str, zone: WorkoutZone) -> bool:
         """
         Add a workout zone to a specific gym location.
         """
-        location = self.get_location_by_id(location_id)
-        if location:
-            location.workout_zones.append(zone)
+        stored = self.get_location_by_id(location_id)
+        if stored:
+            location = replace(stored, workout_zones=list(stored.workout_zones))
+            location.add_workout_zone(zone)
             self.update_location(location)
             return True
         return False
@@ -93,87 +97,10 @@ class LocationRepository:
         """
         Remove a workout zone from a specific gym location by ID.
         """
-        location = self.get_location_by_id(location_id)
-        if location:
+        stored = self.get_location_by_id(location_id)
+        if stored:
+            location = replace(stored)
             if location.remove_workout_zone(zone_id):
                 self.update_location(location)
                 return True
         return False
-
-    def _serialize(self, location: GymLocation) -> dict:
-        """
-        Serialize a GymLocation object into a dictionary.
-        """
-        return {
-            "id": location.id,
-            "name": location.name,
-            "address": {
-                "street": location.address.street,
-                "city": location.address.city,
-                "state": location.address.state,
-                "postal_code": location.address.postal_code
-            },
-            "manager_id": location.manager_id,
-            "workout_zones": [self._serialize_zone(zone) for zone in location.workout_zones],
-            "amenities": location.amenities,
-            "total_capacity": location.total_capacity,
-            "contact_phone": location.contact_phone,
-            "contact_email": location.contact_email,
-            "opening_hours": location.opening_hours,
-            "is_active": location.is_active
-        }
-
-    def _serialize_zone(self, zone: WorkoutZone) -> dict:
-        """
-        Serialize a WorkoutZone object into a dictionary.
-        """
-        return {
-            "id": zone.id,
-            "name": zone.name,
-            "type": zone.type,
-            "capacity": zone.capacity,
-            "equipment": zone.equipment,
-            "attendant_id": zone.attendant_id,
-            "description": zone.description,
-            "is_active": zone.is_active,
-            "schedule": zone.schedule
-        }
-
-    def _deserialize(self, data: dict) -> GymLocation:
-        """
-        Deserialize a dictionary into a GymLocation object.
-        """
-        return GymLocation(
-            id=data["id"],
-            name=data["name"],
-            address=Address(
-                street=data["address"]["street"],
-                city=data["address"]["city"],
-                state=data["address"]["state"],
-                postal_code=data["address"]["postal_code"]
-            ),
-            manager_id=data["manager_id"],
-            workout_zones=[self._deserialize_zone(zone) for zone in data["workout_zones"]],
-            amenities=data["amenities"],
-            total_capacity=data["total_capacity"],
-            contact_phone=data["contact_phone"],
-            contact_email=data["contact_email"],
-            opening_hours=data["opening_hours"],
-            is_active=data["is_active"]
-        )
-
-    def _deserialize_zone(self, data: dict) -> WorkoutZone:
-        """
-        Deserialize a dictionary into a WorkoutZone object.
-        """
-        return WorkoutZone(
-            id=data["id"],
-            name=data["name"],
-            type=data["type"],
-            capacity=data["capacity"],
-            equipment=data["equipment"],
-            attendant_id=data.get("attendant_id"),
-            description=data.get("description"),
-            is_active=data["is_active"],
-            schedule=data.get("schedule", {})
-        )
@@ -0,0 +1,206 @@
+"""
+Repository for the materialized per-member activity statistics table.
+"""
+
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from ..models.appointment import Appointment, AppointmentStatus
+from ..models.attendance import AttendanceRecord
+from ..models.member_stats import MemberActivityStats
+from ..utils.events import ChangeEvent, ChangeType, EventBus
+from ..utils.file_lock import FileStamp
+from .base_repository import BaseRepository
+
+
+# Appointment statuses after which an appointment no longer changes
+TERMINAL_STATUSES = {
+    AppointmentStatus.COMPLETED: "appointments_completed",
+    AppointmentStatus.CANCELLED: "appointments_cancelled",
+    AppointmentStatus.NO_SHOW: "appointments_no_show",
+}
+
+# Returns every attendance record and appointment, to rebuild the table from
+StatsSource = Callable[[], Tuple[Iterable[AttendanceRecord], Iterable[Appointment]]]
+
+
+class MemberStatsRepository(BaseRepository[MemberActivityStats]):
+    """
+    Repository class for per-member activity statistics.
+
+    The table is kept current from attendance and appointment change events,
+    so reading a member's statistics never scans the underlying records.
+    Deleting attendance or appointments (e.g. archiving) leaves the totals untouched.
+
+    Storage, the change journal, locking and refresh are those of
+    BaseRepository; each event rewrites the affected member's row, which also
+    holds that member's open visits and pending appointments.
+    """
+
+    entity_name = "member_stats"
+
+    def __init__(
+        self,
+        data_file: str = "data/member_stats.json",
+        event_bus: Optional[EventBus] = None,
+        source: Optional[StatsSource] = None
+    ):
+        """
+        :param data_file: Path to the JSON file for storage.
+        :param event_bus: Bus the attendance and appointment changes arrive on, defaults to the shared change_bus.
+        :param source: Supplies all attendance and appointments to rebuild the table from when its file is missing.
+        """
+        self.source = source
+        # Rows by member ID, kept current alongside the sort indexes
+        self._by_member: Dict[str, MemberActivityStats] = {}
+        super().__init__(str(data_file), event_bus)
+
+        bus = self.event_bus
+        self._unsubscribers = [
+            bus.subscribe(self._on_attendance_change, "attendance"),
+            bus.subscribe(self._on_appointment_change, "appointment"),
+        ]
+
+    def _load(self):
+        """Load the table, or rebuild it from the source if its file is missing."""
+        if self.source is not None and FileStamp.of(self.file_path) is None:
+            self._journal.open()
+            self._stamp = None
+            attendance, appointments = self.source()
+            self.rebuild(attendance, appointments)
+            return
+        super()._load()
+
+    def _build_indexes(self, orders: Iterable[str] = ()):
+        super()._build_indexes(orders)
+        self._by_member = {stats.member_id: stats for stats in self._data}
+
+    def _reindex(self, removed: Iterable[str] = (), added: Iterable[MemberActivityStats] = ()):
+        super()._reindex(removed, added)
+        for member_id in removed:
+            self._by_member.pop(member_id, None)
+        for stats in added:
+            self._by_member[stats.member_id] = stats
+
+    def load_data(self):
+        """
+        Load the statistics table from the JSON file and its journal into memory.
+        """
+        with self._lock:
+            self._load()
+
+    def save_data(self):
+        """
+        Save the whole statistics table to the JSON file and start an empty journal.
+        """
+        self.compact()
+
+    def close(self):
+        """
+        Stop following change events.
+        """
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+
+    def get_by_member_id(self, member_id: str) -> Optional[MemberActivityStats]:
+        """
+        Retrieve the statistics of a member.
+        """
+        self.refresh()
+        return self._by_member.get(member_id)
+
+    def get_by_id(self, item_id: str) -> Optional[MemberActivityStats]:
+        """
+        Retrieve the statistics of a member by member ID.
+        """
+        return self.get_by_member_id(item_id)
+
+    def rebuild(self, attendance: Iterable[AttendanceRecord], appointments: Iterable[Appointment]):
+        """
+        Recompute the whole table in a single pass over attendance and appointments.
+        """
+        stats: Dict[str, MemberActivityStats] = {}
+        for record in attendance:
+            self._apply_visit(self._member(stats, record.member_id), record)
+        for appointment in appointments:
+            self._apply_booking(self._member(stats, appointment.member_id), appointment)
+
+        with self._lock:
+            self.data = list(stats.values())
+            self._save()
+
+    def _on_attendance_change(self, event: ChangeEvent):
+        record = event.after
+        if event.change_type == ChangeType.CREATED:
+            with self._lock:
+                stats = self._copy(record.member_id)
+                self._apply_visit(stats, record)
+                self.save(stats)
+        elif event.change_type == ChangeType.UPDATED and not record.is_active():
+            with self._lock:
+                stats = self._copy(record.member_id)
+                if record.id not in stats.open_visits:
+                    return
+                stats.open_visits.remove(record.id)
+                stats.record_check_out(record.duration)
+                self.save(stats)
+
+    def _on_appointment_change(self, event: ChangeEvent):
+        appointment = event.after
+        if event.change_type == ChangeType.CREATED:
+            with self._lock:
+                stats = self._copy(appointment.member_id)
+                self._apply_booking(stats, appointment)
+                self.save(stats)
+        elif event.change_type == ChangeType.UPDATED:
+            with self._lock:
+                stats = self._copy(appointment.member_id)
+                previous_status = stats.pending_appointments.get(appointment.id)
+                if previous_status is None or previous_status == appointment.status.value:
+                    return
+                self._apply_status(stats, appointment)
+                self.save(stats)
+        elif event.change_type == ChangeType.DELETED and event.before is not None:
+            with self._lock:
+                stats = self._copy(event.before.member_id)
+                if stats.pending_appointments.pop(event.entity_id, None) is None:
+                    return
+                self.save(stats)
+
+    def _copy(self, member_id: str) -> MemberActivityStats:
+        """A copy of a member's current row to change and save, so snapshots keep the stored one."""
+        self.refresh()
+        stats = self._by_member.get(member_id)
+        if stats is None:
+            return MemberActivityStats(member_id=member_id)
+        return replace(
+            stats, open_visits=list(stats.open_visits), pending_appointments=dict(stats.pending_appointments)
+        )
+
+    @staticmethod
+    def _apply_visit(stats: MemberActivityStats, record: AttendanceRecord):
+        stats.record_visit(record.check_in_time)
+        if record.is_active():
+            stats.open_visits.append(record.id)
+        else:
+            stats.record_check_out(record.duration)
+
+    def _apply_booking(self, stats: MemberActivityStats, appointment: Appointment):
+        stats.appointments_booked += 1
+        self._apply_status(stats, appointment)
+
+    @staticmethod
+    def _apply_status(stats: MemberActivityStats, appointment: Appointment):
+        counter = TERMINAL_STATUSES.get(appointment.status)
+        if counter is None:
+            stats.pending_appointments[appointment.id] = appointment.status.value
+            return
+        stats.pending_appointments.pop(appointment.id, None)
+        setattr(stats, counter, getattr(stats, counter) + 1)
+
+    @staticmethod
+    def _member(stats: Dict[str, MemberActivityStats], member_id: str) -> MemberActivityStats:
+        member_stats = stats.get(member_id)
+        if member_stats is None:
+            member_stats = stats[member_id] = MemberActivityStats(member_id=member_id)
+        return member_stats
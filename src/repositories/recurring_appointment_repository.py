@@ -0,0 +1,123 @@
+"""
+Repository for managing recurring appointments.
+"""
+
+import heapq
+from dataclasses import replace
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+from src.models.appointment import Appointment, RecurringAppointment
+from src.repositories.base_repository import BaseRepository
+from src.utils.timestamps import TimestampValue, to_epoch
+from src.utils.tracing import traced
+
+class RecurringAppointmentRepository(BaseRepository[RecurringAppointment]):
+    """
+    Repository for recurring appointment series.
+
+    Each series is one stored record; its occurrences are expanded lazily
+    by generators for the time window being queried.
+    """
+
+    entity_name = "recurring_appointment"
+
+    @traced("repository.get_trainer_series")
+    def get_trainer_series(self, trainer_id: str) -> List[RecurringAppointment]:
+        """
+        Get all recurring appointments of a trainer.
+
+        :param trainer_id: ID of the trainer.
+        :return: List of series.
+        """
+        return [series for series in self.data if series.trainer_id == trainer_id]
+
+    @traced("repository.get_member_series")
+    def get_member_series(self, member_id: str) -> List[RecurringAppointment]:
+        """
+        Get all recurring appointments of a member.
+
+        :param member_id: ID of the member.
+        :return: List of series.
+        """
+        return [series for series in self.data if series.member_id == member_id]
+
+    def occurrences(
+        self,
+        start: TimestampValue,
+        end: Optional[TimestampValue] = None,
+        trainer_id: Optional[str] = None,
+        member_id: Optional[str] = None,
+        location_id: Optional[str] = None
+    ) -> Iterator[Appointment]:
+        """
+        Yield the occurrences of all matching series starting in [start, end), ordered by start time.
+
+        The series' generators are merged lazily, so reading the first few
+        occurrences of open-ended series costs only those occurrences.
+
+        :param start: Earliest start time (inclusive).
+        :param end: Latest start time (exclusive), None for no limit.
+        :param trainer_id: Optional trainer ID to filter series.
+        :param member_id: Optional member ID to filter series.
+        :param location_id: Optional location ID to filter series.
+        :return: Iterator over occurrences.
+        """
+        start_epoch = to_epoch(start, round_up=True)
+        end_epoch = None if end is None else to_epoch(end, round_up=True)
+        streams = [
+            series.occurrences(start_epoch, end_epoch) for series in self.data
+            if (trainer_id is None or series.trainer_id == trainer_id)
+            and (member_id is None or series.member_id == member_id)
+            and (location_id is None or series.location_id == location_id)
+            and (series.until_epoch is None or series.until_epoch >= start_epoch)
+            and (end_epoch is None or series.start_time_epoch < end_epoch)
+        ]
+        return heapq.merge(*streams, key=lambda appointment: appointment.start_time_epoch)
+
+    def get_occurrence(self, occurrence_id: str) -> Optional[Appointment]:
+        """
+        Get an occurrence by the ID it was generated with.
+
+        :param occurrence_id: "<series id>:<start epoch seconds>".
+        :return: The occurrence, None if the series does not exist or has no occurrence then.
+        """
+        series_id, _, seconds = occurrence_id.rpartition(":")
+        if not series_id or not seconds.isdigit():
+            return None
+        series = self.get_by_id(series_id)
+        return series.occurrence_at(int(seconds)) if series else None
+
+    def skip_occurrence(self, series_id: str, day: date) -> bool:
+        """
+        Drop the occurrence on a day from a series.
+
+        :param series_id: ID of the series.
+        :param day: Date of the occurrence.
+        :return: True if the series exists, False otherwise.
+        """
+        with self._lock:
+            series = self.get_by_id(series_id)
+            if series is None:
+                return False
+            if day not in series.exceptions:
+                series = replace(series, exceptions=list(series.exceptions))
+                series.skip(day)
+                self.update(series)
+            return True
+
+    def end_series(self, series_id: str, when: datetime) -> bool:
+        """
+        Stop a series so that no occurrence starts at or after a time.
+
+        :param series_id: ID of the series.
+        :param when: First time without occurrences.
+        :return: True if the series exists, False otherwise.
+        """
+        with self._lock:
+            series = self.get_by_id(series_id)
+            if series is None:
+                return False
+            series = replace(series, exceptions=list(series.exceptions))
+            series.end_before(when)
+            self.update(series)
+            return True
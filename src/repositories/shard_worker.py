@@ -0,0 +1,170 @@
+"""
+Worker processes that each own one shard's repository.
+
+A ShardWorker starts a child process that opens a repository on one shard
+file and executes the calls sent to it over a pipe. Writes to different
+shards therefore run in separate processes, and a query fanned out to all
+shards is answered by every worker at once. Arguments and results cross the
+pipe pickled. Change events the repository publishes in the child are sent
+back with each result and republished on the parent's event bus, so derived
+tables in the parent (member statistics, report caches) stay current.
+"""
+
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, List, Optional, Type
+from src.utils.events import ChangeEvent, EventBus, change_bus
+from src.utils.mvcc import Snapshot
+
+# Message asking the worker process to exit
+_STOP = None
+
+
+def _serve(connection, repository_class: Type, file_path: str):
+    """Worker process loop: execute (method, args, kwargs) requests until told to stop."""
+    bus = EventBus()
+    events: List[ChangeEvent] = []
+    bus.subscribe(events.append)
+    repository = repository_class(file_path, event_bus=bus)
+    batches = []
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is _STOP:
+            break
+        method, args, kwargs = request
+        try:
+            if method == "_begin_batch":
+                batch = repository.batch()
+                batch.__enter__()
+                batches.append(batch)
+                result = None
+            elif method == "_end_batch":
+                result = batches.pop().__exit__(None, None, None)
+            else:
+                result = getattr(repository, method)(*args, **kwargs)
+            response = (True, result)
+        except Exception as e:
+            response = (False, e)
+        changes = [(event.entity, event.change_type, event.entity_id, event.before, event.after) for event in events]
+        events.clear()
+        try:
+            connection.send(response + (changes,))
+        except Exception as e:
+            connection.send((False, RuntimeError(f"Shard worker could not return the result of {method}: {e}"), changes))
+    for batch in reversed(batches):
+        batch.__exit__(None, None, None)
+    connection.close()
+
+
+class ShardWorker:
+    """
+    Proxy for a repository running in its own process.
+
+    Repository methods called on the proxy run in the worker and return copies
+    of their results; calls from several threads are serialized.
+    """
+
+    def __init__(self, repository_class: Type, file_path: str, event_bus: Optional[EventBus] = None):
+        """
+        Start the worker process.
+
+        :param repository_class: Repository class opened in the worker, constructed as (file_path, event_bus=...).
+        :param file_path: Shard file of the repository.
+        :param event_bus: Bus the worker's change events are republished on, defaults to the shared change_bus.
+        """
+        self.file_path = file_path
+        self.entity_name = repository_class.entity_name
+        self.event_bus = event_bus or change_bus
+        # Held from sending a request until its response is read, and for the whole of a batch
+        self._lock = threading.RLock()
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child, repository_class, file_path),
+            name=f"shard-worker:{file_path}", daemon=True
+        )
+        self._process.start()
+        child.close()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return partial(self.call, name)
+
+    def submit(self, method: str, *args, **kwargs) -> Callable[[], Any]:
+        """
+        Send a call to the worker without waiting for it.
+
+        The worker is reserved for the calling thread until the returned
+        function is called, which must happen exactly once.
+
+        :param method: Name of the repository method.
+        :return: Function that waits for the result and returns it, or raises the worker's exception.
+        """
+        self._lock.acquire()
+        try:
+            self._connection.send((method, args, kwargs))
+        except BaseException:
+            self._lock.release()
+            raise
+
+        def result() -> Any:
+            try:
+                ok, value, changes = self._connection.recv()
+            finally:
+                self._lock.release()
+            for entity, change_type, entity_id, before, after in changes:
+                self.event_bus.publish(entity, change_type, entity_id, before=before, after=after)
+            if not ok:
+                raise value
+            return value
+        return result
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Run a repository method in the worker and wait for its result.
+
+        :param method: Name of the repository method.
+        :return: The method's result.
+        """
+        return self.submit(method, *args, **kwargs)()
+
+    @property
+    def data(self) -> List[Any]:
+        """Copy of the worker's items."""
+        return self.call("get_all")
+
+    def snapshot(self) -> Snapshot:
+        """
+        Copy the worker's items into a snapshot.
+
+        :return: Snapshot of the items at the time of the call.
+        """
+        return Snapshot(0, self.call("get_all"))
+
+    @contextmanager
+    def batch(self):
+        """
+        Group writes into a single save in the worker, holding the worker for this thread meanwhile.
+        """
+        with self._lock:
+            self.call("_begin_batch")
+            try:
+                yield self
+            finally:
+                self.call("_end_batch")
+
+    def close(self):
+        """Stop the worker process after its pending calls."""
+        with self._lock:
+            if self._process.is_alive():
+                try:
+                    self._connection.send(_STOP)
+                except (BrokenPipeError, OSError):
+                    pass
+                self._process.join()
+            self._connection.close()
@@ -0,0 +1,419 @@
+"""
+Repositories partitioned by location into one file per shard.
+
+A ShardedRepository routes every call to the repositories of its shards,
+one per location, each with its own file under
+`<data_dir>/shards/<location id>/` (and optionally its own worker process,
+see shard_worker). It offers the repository methods the services use, so a
+service given a ShardedRepository routes transparently: writes go to the
+shard of the item's location, reads filtered by location read one shard,
+and other reads fan out to every shard and combine the results. Each site
+therefore contends only for its own files, which grow with that site alone.
+
+Items are found by ID through a directory of the shard each item was last
+seen in; unknown IDs are looked up in all shards.
+"""
+
+import heapq
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from itertools import chain, islice
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
+from urllib.parse import quote, unquote
+from src.repositories.shard_worker import ShardWorker
+from src.utils.codec import Codec, codec_for
+from src.utils.events import EventBus, change_bus
+from src.utils.mvcc import Snapshot
+from src.utils.pagination import Page, SortedIndex, encode_cursor
+
+T = TypeVar("T")
+
+SHARDS_DIR = "shards"
+# Directory of the shard holding items without a location, e.g. members without a home location
+UNASSIGNED_SHARD = "_unassigned"
+
+_MISSING = object()
+
+
+def shard_directory(data_dir: str, key: Optional[str]) -> str:
+    """
+    Directory holding the files of one shard.
+
+    :param data_dir: Data directory of the application.
+    :param key: Location ID of the shard, None for items without a location.
+    :return: Path of the shard's directory.
+    """
+    return os.path.join(data_dir, SHARDS_DIR, UNASSIGNED_SHARD if key is None else quote(key, safe=""))
+
+
+class ShardedRepository(Generic[T]):
+    """A repository partitioned into one repository per location"""
+
+    def __init__(
+        self,
+        repository_class: Type,
+        data_dir: str,
+        file_name: str,
+        shard_field: str = "location_id",
+        event_bus: Optional[EventBus] = None,
+        workers: bool = False
+    ):
+        """
+        Open the shards found in the data directory; others are created on first write.
+
+        :param repository_class: Repository class of each shard, constructed as (file_path, event_bus=...).
+        :param data_dir: Data directory of the application.
+        :param file_name: Name of the file in each shard directory, e.g. "appointments.json".
+        :param shard_field: Item attribute holding the location that decides the shard.
+        :param event_bus: Bus the shards publish changes to, defaults to the shared change_bus.
+        :param workers: Run each shard in its own worker process.
+        """
+        self.repository_class = repository_class
+        self.data_dir = data_dir
+        self.file_name = file_name
+        self.shard_field = shard_field
+        self.entity_name = repository_class.entity_name
+        self.model: Type[T] = repository_class.model
+        self.event_bus = event_bus or change_bus
+        self.workers = workers
+        self._codec: Codec = codec_for(self.model)
+        self._shards: Dict[Optional[str], Any] = {}
+        self._lock = threading.RLock()
+        # Shard key each item ID was last seen in
+        self._shard_of: Dict[str, Optional[str]] = {}
+        self._discover()
+
+    def _discover(self):
+        """Open shards created since the last call, possibly by other processes."""
+        root = os.path.join(self.data_dir, SHARDS_DIR)
+        try:
+            names = os.listdir(root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            key = None if name == UNASSIGNED_SHARD else unquote(name)
+            if key not in self._shards and os.path.exists(os.path.join(root, name, self.file_name)):
+                self.shard(key)
+
+    def _open(self, key: Optional[str]) -> Any:
+        directory = shard_directory(self.data_dir, key)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.file_name)
+        if self.workers:
+            return ShardWorker(self.repository_class, path, self.event_bus)
+        return self.repository_class(path, event_bus=self.event_bus)
+
+    def shard(self, key: Optional[str], create: bool = True) -> Any:
+        """
+        Repository of one location's shard.
+
+        :param key: Location ID, None for items without a location.
+        :param create: Open (and create) the shard if it is not open yet.
+        :return: The shard's repository, or None if it does not exist and create is False.
+        """
+        shard = self._shards.get(key)
+        if shard is None and create:
+            with self._lock:
+                shard = self._shards.get(key)
+                if shard is None:
+                    shard = self._shards[key] = self._open(key)
+        return shard
+
+    @property
+    def shard_keys(self) -> List[Optional[str]]:
+        """Location IDs of the open shards, in a fixed order (None first)."""
+        return sorted(self._shards, key=lambda key: (key is not None, key or ""))
+
+    def _key_of(self, item: T) -> Optional[str]:
+        return getattr(item, self.shard_field)
+
+    def _routed_key(self, filters: Optional[Dict[str, Any]]) -> Any:
+        """Shard key selected by an exact filter on the shard field, or _MISSING."""
+        if filters and self.shard_field in filters:
+            return filters[self.shard_field]
+        return _MISSING
+
+    def _fan_out(self, method: str, *args, **kwargs) -> List[Tuple[Optional[str], Any]]:
+        """
+        Call a method on every shard.
+
+        Worker shards receive the call before any result is awaited, so they
+        execute it in parallel. Shards are always visited in shard_keys order.
+
+        :return: (shard key, result) per shard.
+        """
+        self._discover()
+        keys = self.shard_keys
+        shards = [self._shards[key] for key in keys]
+        if not self.workers:
+            return [(key, getattr(shard, method)(*args, **kwargs)) for key, shard in zip(keys, shards)]
+        pending = []
+        error: Optional[Exception] = None
+        try:
+            for shard in shards:
+                pending.append(shard.submit(method, *args, **kwargs))
+        finally:
+            results = []
+            for key, result in zip(keys, pending):
+                try:
+                    results.append((key, result()))
+                except Exception as e:
+                    error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def _locate(self, item_id: str) -> Tuple[Any, Optional[T]]:
+        """Shard key and stored item of an ID, (_MISSING, None) if no shard holds it."""
+        key = self._shard_of.get(item_id, _MISSING)
+        if key is not _MISSING:
+            shard = self.shard(key, create=False)
+            item = shard.get_by_id(item_id) if shard is not None else None
+            if item is not None:
+                return key, item
+        for key, item in self._fan_out("get_by_id", item_id):
+            if item is not None:
+                self._shard_of[item_id] = key
+                return key, item
+        self._shard_of.pop(item_id, None)
+        return _MISSING, None
+
+    @property
+    def data(self) -> List[T]:
+        """
+        Items of all shards, as a new list.
+        """
+        return list(chain.from_iterable(items for _, items in self._fan_out("get_all")))
+
+    def get_all(self) -> List[T]:
+        """
+        Get all items of all shards.
+
+        :return: A list of all items.
+        """
+        return self.data
+
+    def snapshot(self) -> Snapshot[T]:
+        """
+        Copy the items of all shards into a snapshot.
+
+        Each shard is read at one point in time, but not all shards at the same instant.
+
+        :return: The snapshot.
+        """
+        return Snapshot(0, self.data)
+
+    def refresh(self) -> bool:
+        """
+        Open new shards and let every shard catch up with writes by other processes.
+
+        :return: True if any shard's data changed.
+        """
+        return any([changed for _, changed in self._fan_out("refresh")])
+
+    def get_by_id(self, item_id: str) -> Optional[T]:
+        """
+        Retrieve an item by its unique ID from whichever shard holds it.
+
+        :param item_id: The ID of the item.
+        :return: The item if found, None otherwise.
+        """
+        return self._locate(item_id)[1]
+
+    def find_by_id(self, item_id: str) -> Optional[T]:
+        """
+        Retrieve an item by its unique ID.
+
+        :param item_id: The ID of the item.
+        :return: The item if found, None otherwise.
+        """
+        return self.get_by_id(item_id)
+
+    def find_all(self, filters: Optional[Dict[str, Any]] = None) -> List[T]:
+        """
+        Get all items matching the given filters; a filter on the shard field reads one shard only.
+
+        :param filters: Field lookups such as {"location_id": ..., "start_time__gte": ...}.
+        :return: A list of matching items.
+        """
+        key = self._routed_key(filters)
+        if key is not _MISSING:
+            shard = self.shard(key, create=False)
+            return shard.find_all(filters) if shard is not None else []
+        return list(chain.from_iterable(items for _, items in self._fan_out("find_all", filters)))
+
+    def find_page(
+        self,
+        order_by: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+        descending: bool = False,
+        start: Any = None,
+        end: Any = None
+    ) -> Page[T]:
+        """
+        Get one page of items in keyset order across all shards.
+
+        Every shard returns its own next page after the cursor and the pages are
+        merged, so the cursor format is the same as for a single repository.
+
+        :param order_by: Field to order by; ties are broken by id.
+        :param cursor: next_cursor of the previous page, None for the first page.
+        :param limit: Maximum number of items on the page.
+        :param filters: Field lookups applied to the items in order.
+        :param descending: Return the largest values first.
+        :param start: Smallest order_by value to include.
+        :param end: Largest order_by value to include.
+        :return: The page and the cursor of the next one.
+        """
+        bounds = {name: value for name, value in (("start", start), ("end", end)) if value is not None}
+        key = self._routed_key(filters)
+        if key is not _MISSING:
+            shard = self.shard(key, create=False)
+            return shard.find_page(order_by, cursor, limit, filters, descending, **bounds) if shard is not None else Page()
+        pages = [page for _, page in self._fan_out("find_page", order_by, cursor, limit, filters, descending, **bounds)]
+        index: SortedIndex[T] = SortedIndex(order_by)
+        merged = heapq.merge(*(page.items for page in pages), key=index.key_of, reverse=descending)
+        items = list(islice(merged, limit))
+        more = any(page.has_more for page in pages) or sum(len(page.items) for page in pages) > limit
+        return Page(items, encode_cursor(order_by, index.key_of(items[-1])) if more else None)
+
+    def add(self, item: T) -> T:
+        """
+        Add a new item to the shard of its location.
+
+        :param item: The item to add.
+        :return: The added item.
+        """
+        key = self._key_of(item)
+        self.shard(key).add(item)
+        self._shard_of[item.id] = key
+        return item
+
+    def add_many(self, items: Iterable[T]) -> List[T]:
+        """
+        Add several items with a single save per shard.
+
+        :param items: The items to add.
+        :return: The added items.
+        """
+        items = list(items)
+        groups: Dict[Optional[str], List[T]] = {}
+        for item in items:
+            groups.setdefault(self._key_of(item), []).append(item)
+        for key, group in groups.items():
+            self.shard(key).add_many(group)
+            for item in group:
+                self._shard_of[item.id] = key
+        return items
+
+    def update(self, item: T) -> bool:
+        """
+        Update an existing item, moving it to another shard if its location changed.
+
+        A move is published as a creation in the new shard and a deletion in the old one.
+
+        :param item: The item to update.
+        :return: True if updated successfully, False otherwise.
+        """
+        stored_key, stored = self._locate(item.id)
+        if stored is None:
+            return False
+        key = self._key_of(item)
+        if key == stored_key:
+            return self.shard(key).update(item)
+        self.shard(key).add(item)
+        self.shard(stored_key).delete(item.id)
+        self._shard_of[item.id] = key
+        return True
+
+    def save(self, item: T) -> T:
+        """
+        Update an item if it is already stored, otherwise add it.
+
+        :param item: The item to save.
+        :return: The saved item.
+        """
+        stored_key, _ = self._locate(item.id)
+        if stored_key is _MISSING or stored_key == self._key_of(item):
+            key = self._key_of(item)
+            self.shard(key).save(item)
+            self._shard_of[item.id] = key
+        else:
+            self.update(item)
+        return item
+
+    def delete(self, item_id: str) -> bool:
+        """
+        Delete an item by its ID.
+
+        :param item_id: The ID of the item to delete.
+        :return: True if deleted successfully, False otherwise.
+        """
+        key, stored = self._locate(item_id)
+        if stored is None:
+            return False
+        self._shard_of.pop(item_id, None)
+        return self.shard(key).delete(item_id)
+
+    def delete_many(self, item_ids: Iterable[str]) -> int:
+        """
+        Delete several items by ID with a single save per shard.
+
+        :param item_ids: IDs of the items to delete.
+        :return: Number of items deleted.
+        """
+        ids = list(set(item_ids))
+        for item_id in ids:
+            self._shard_of.pop(item_id, None)
+        return sum(deleted for _, deleted in self._fan_out("delete_many", ids))
+
+    @contextmanager
+    def batch(self):
+        """
+        Group writes into a single save per shard.
+
+        Shards are entered in shard_keys order; shards created during the batch save on every write.
+        """
+        with ExitStack() as stack:
+            for key in self.shard_keys:
+                stack.enter_context(self._shards[key].batch())
+            yield self
+
+    def flush(self):
+        """
+        Persist the dirty records of every shard.
+        """
+        self._fan_out("flush")
+
+    def compact(self):
+        """
+        Rewrite every shard's file and start empty journals.
+        """
+        self._fan_out("compact")
+
+    def close(self):
+        """Stop the shards' worker processes, if any."""
+        if self.workers:
+            for shard in self._shards.values():
+                shard.close()
+
+    def _serialize(self, item: T) -> dict:
+        """
+        Convert a model into a dictionary for storage.
+
+        :param item: Model instance.
+        :return: JSON-compatible dictionary.
+        """
+        return self._codec.encode(item)
+
+    def _deserialize(self, raw_data: dict) -> T:
+        """
+        Convert a dictionary back into the model.
+
+        :param raw_data: Raw dictionary data from the file.
+        :return: Deserialized model instance.
+        """
+        return self._codec.decode(raw_data)
@@ -3,14 +3,26 @@ Service layer for St Mary's Fitness Management System.
 Exports all services for easy access.
 """
 
-from .appointment_service import AppointmentService
-from .attendance_service import AttendanceService
-from .location_service import LocationService
-from .member_service import MemberService
+from ..utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "AppointmentService": ".appointment_service",
+    "AttendanceService": ".attendance_service",
+    "AttendanceArchiveService": ".attendance_archive_service",
+    "ClassBookingService": ".class_booking_service",
+    "LocationService": ".location_service",
+    "MemberService": ".member_service",
+    "ReportService": ".report_service",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "AppointmentService",
     "AttendanceService",
+    "AttendanceArchiveService",
+    "ClassBookingService",
     "LocationService",
     "MemberService",
+    "ReportService",
 ]
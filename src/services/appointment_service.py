@@ -2,17 +2,64 @@
 Service layer for handling Appointment-related operations.
 """
 
-from datetime import datetime, timedelta
-from typing import List, Optional
-from repositories.appointment_repository import AppointmentRepository
-from models.appointment import Appointment, AppointmentType, AppointmentStatus
+import heapq
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+from ..repositories.appointment_repository import AppointmentRepository
+from ..repositories.recurring_appointment_repository import RecurringAppointmentRepository
+from ..models.appointment import (
+    Appointment, AppointmentType, AppointmentStatus, RecurrenceFrequency, RecurringAppointment
+)
+from ..utils.config import Config
+from ..utils.metrics import instrument_service
+from ..utils.recurrence import overlapping
+from ..utils.timestamps import SECONDS_PER_DAY, TimestampValue, day_range, from_epoch, to_epoch
+from ..utils.tracing import trace_service
 
+# Appointments are assumed to last less than a day, so one starting earlier than this cannot overlap a time
+_LOOKBACK_SECONDS = SECONDS_PER_DAY
 
+
+@instrument_service
+@trace_service
 class AppointmentService:
     """Handles operations related to appointments."""
 
-    def __init__(self, appointment_repository: AppointmentRepository):
+    def __init__(
+        self,
+        appointment_repository: AppointmentRepository,
+        recurring_repository: Optional[RecurringAppointmentRepository] = None
+    ):
         self.appointment_repository = appointment_repository
+        self.recurring_repository = recurring_repository
+
+    @contextmanager
+    def _booking(self):
+        """
+        Hold the appointment and series write locks, so a conflict check still holds when the write it guards lands.
+
+        The locks are taken in the order AppContext.batch() takes them.
+        """
+        with self.appointment_repository.batch():
+            if self.recurring_repository is None:
+                yield
+            else:
+                with self.recurring_repository.batch():
+                    yield
+
+    def _save(self, appointment: Appointment):
+        """
+        Store an appointment; an occurrence of a series is first dropped from the series, then stored on its own.
+
+        Dropping the occurrence is idempotent and comes first, so a crash in between
+        loses the change rather than showing the occurrence twice. Call inside _booking().
+        """
+        if appointment.series_id is not None and self.recurring_repository is not None:
+            original_start = int(appointment.id.rpartition(":")[2])
+            self.recurring_repository.skip_occurrence(appointment.series_id, from_epoch(original_start).date())
+        self.appointment_repository.save(appointment)
 
     def create_appointment(
         self,
@@ -27,6 +74,7 @@ class AppointmentService:
     ) -> Appointment:
         """
         Create a new appointment.
+        Raises ValueError if it clashes with the trainer's other appointments.
         """
         new_appointment = Appointment(
             member_id=member_id,
@@ -38,51 +86,209 @@ class AppointmentService:
             zone_id=zone_id,
             notes=notes
         )
-        return self.appointment_repository.save(new_appointment)
+        with self._booking():
+            self._check_trainer_free(trainer_id, start_time, duration)
+            return self.appointment_repository.save(new_appointment)
 
     def get_appointment_by_id(self, appointment_id: str) -> Optional[Appointment]:
         """
-        Retrieve an appointment by its ID.
+        Retrieve an appointment, or an occurrence of a recurring appointment, by its ID.
         """
-        return self.appointment_repository.find_by_id(appointment_id)
+        appointment = self.appointment_repository.find_by_id(appointment_id)
+        if appointment is None and self.recurring_repository is not None:
+            appointment = self.recurring_repository.get_occurrence(appointment_id)
+        return appointment
 
     def list_upcoming_appointments(self, member_id: str) -> List[Appointment]:
         """
-        Get a list of upcoming appointments for a specific member.
+        Get a list of upcoming appointments for a specific member,
+        including recurring occurrences within Config.RECURRENCE_HORIZON_DAYS.
         """
-        return self.appointment_repository.find_all(
+        now = datetime.now()
+        appointments = self.appointment_repository.find_all(
             filters={
                 "member_id": member_id,
-                "start_time__gte": datetime.now(),
+                "start_time__gte": now,
                 "status": AppointmentStatus.SCHEDULED
             }
         )
+        if self.recurring_repository is not None:
+            horizon = now + timedelta(days=Config.RECURRENCE_HORIZON_DAYS)
+            appointments.extend(self.recurring_repository.occurrences(now, horizon, member_id=member_id))
+            appointments.sort(key=lambda appointment: appointment.start_time_epoch)
+        return appointments
+
+    def list_appointments(
+        self,
+        start: TimestampValue,
+        end: Optional[TimestampValue] = None,
+        trainer_id: Optional[str] = None,
+        member_id: Optional[str] = None,
+        location_id: Optional[str] = None
+    ) -> Iterator[Appointment]:
+        """
+        Iterate over appointments and recurring occurrences starting in [start, end), ordered by start time.
+        Occurrences are generated as the iterator advances, so open-ended series are never expanded in full.
+        """
+        filters = {"start_time__gte": start}
+        if end is not None:
+            filters["start_time__lt"] = end
+        for name, value in (("trainer_id", trainer_id), ("member_id", member_id), ("location_id", location_id)):
+            if value is not None:
+                filters[name] = value
+        stored = sorted(self.appointment_repository.find_all(filters), key=lambda appointment: appointment.start_time_epoch)
+        if self.recurring_repository is None:
+            return iter(stored)
+        return heapq.merge(
+            stored,
+            self.recurring_repository.occurrences(start, end, trainer_id, member_id, location_id),
+            key=lambda appointment: appointment.start_time_epoch
+        )
+
+    def get_trainer_schedule(self, trainer_id: str, day: date) -> List[Appointment]:
+        """
+        Get a trainer's appointments on a day, including recurring occurrences, ordered by start time.
+        """
+        start, end = day_range(day)
+        return list(self.list_appointments(start, end, trainer_id=trainer_id))
+
+    def find_conflicts(
+        self,
+        trainer_id: str,
+        start_time: TimestampValue,
+        duration: int,
+        exclude_id: Optional[str] = None
+    ) -> List[Appointment]:
+        """
+        Find the trainer's appointments, including recurring occurrences, overlapping a time slot.
+        """
+        start = to_epoch(start_time)
+        end = start + duration * 60
+        return [
+            appointment for appointment in self.list_appointments(start - _LOOKBACK_SECONDS, end, trainer_id=trainer_id)
+            if appointment.status is not AppointmentStatus.CANCELLED
+            and appointment.id != exclude_id
+            and appointment.start_time_epoch + appointment.duration * 60 > start
+        ]
+
+    def _check_trainer_free(
+        self, trainer_id: str, start_time: TimestampValue, duration: int, exclude_id: Optional[str] = None
+    ):
+        """Raise ValueError if the trainer has another appointment overlapping a time slot."""
+        conflicts = self.find_conflicts(trainer_id, start_time, duration, exclude_id)
+        if conflicts:
+            raise ValueError(f"Trainer is already booked at {conflicts[0].start_time:%Y-%m-%d %H:%M}.")
+
+    def find_series_conflicts(self, series: RecurringAppointment) -> List[Appointment]:
+        """
+        Find the trainer's appointments and occurrences overlapping any occurrence of a series.
+        Open-ended series are checked up to Config.RECURRENCE_HORIZON_DAYS ahead.
+        """
+        end = None
+        if series.until_epoch is None and series.count is None:
+            end = max(to_epoch(datetime.now()), series.start_time_epoch) + Config.RECURRENCE_HORIZON_DAYS * SECONDS_PER_DAY
+        length = series.duration * 60
+        occurrences = ((start, start + length, start) for start in series.occurrence_starts(None, end))
+        booked = (
+            (appointment.start_time_epoch, appointment.start_time_epoch + appointment.duration * 60, appointment)
+            for appointment in self.list_appointments(
+                series.start_time_epoch - _LOOKBACK_SECONDS, None, trainer_id=series.trainer_id
+            )
+            if appointment.status is not AppointmentStatus.CANCELLED and appointment.series_id != series.id
+        )
+        conflicts = {}
+        for _, appointment in overlapping(occurrences, booked):
+            conflicts.setdefault(appointment.id, appointment)
+        return list(conflicts.values())
+
+    def create_recurring_appointment(
+        self,
+        member_id: str,
+        trainer_id: str,
+        location_id: str,
+        appointment_type: AppointmentType,
+        start_time: datetime,
+        duration: int,
+        frequency: RecurrenceFrequency = RecurrenceFrequency.WEEKLY,
+        until: Optional[datetime] = None,
+        count: Optional[int] = None,
+        exceptions: Optional[List[date]] = None,
+        zone_id: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> RecurringAppointment:
+        """
+        Create an appointment repeating every week or every other week, stored as one record.
+        Raises ValueError if an occurrence clashes with the trainer's other appointments.
+        """
+        if self.recurring_repository is None:
+            raise ValueError("Recurring appointments are not configured.")
+        if count is not None and count < 1:
+            raise ValueError("Count must be at least 1.")
+        series = RecurringAppointment(
+            member_id=member_id,
+            trainer_id=trainer_id,
+            location_id=location_id,
+            appointment_type=appointment_type,
+            start_time=start_time,
+            duration=duration,
+            frequency=frequency,
+            until=until,
+            count=count,
+            exceptions=list(exceptions or []),
+            zone_id=zone_id,
+            notes=notes
+        )
+        with self._booking():
+            conflicts = self.find_series_conflicts(series)
+            if conflicts:
+                raise ValueError(f"Trainer is already booked at {conflicts[0].start_time:%Y-%m-%d %H:%M}.")
+            return self.recurring_repository.save(series)
+
+    def get_recurring_appointment(self, series_id: str) -> Optional[RecurringAppointment]:
+        """
+        Retrieve a recurring appointment by its ID.
+        """
+        if self.recurring_repository is None:
+            return None
+        return self.recurring_repository.find_by_id(series_id)
+
+    def end_recurring_appointment(self, series_id: str, from_time: Optional[datetime] = None) -> bool:
+        """
+        Stop a recurring appointment so no occurrence starts at or after from_time (default now).
+        """
+        if self.recurring_repository is None:
+            return False
+        return self.recurring_repository.end_series(series_id, from_time or datetime.now())
 
     def cancel_appointment(self, appointment_id: str, cancellation_note: Optional[str] = None) -> bool:
         """
         Cancel an appointment by ID.
         """
-        appointment = self.get_appointment_by_id(appointment_id)
-        if not appointment:
-            return False
-        if appointment.status not in [AppointmentStatus.SCHEDULED, AppointmentStatus.IN_PROGRESS]:
-            return False
-        appointment.cancel(cancellation_note)
-        self.appointment_repository.save(appointment)
-        return True
+        with self._booking():
+            appointment = self.get_appointment_by_id(appointment_id)
+            if not appointment:
+                return False
+            if appointment.status not in [AppointmentStatus.SCHEDULED, AppointmentStatus.IN_PROGRESS]:
+                return False
+            appointment = replace(appointment)
+            appointment.cancel(cancellation_note)
+            self._save(appointment)
+            return True
 
     def complete_appointment(self, appointment_id: str, completion_note: Optional[str] = None) -> bool:
         """
         Mark an appointment as completed.
         """
-        appointment = self.get_appointment_by_id(appointment_id)
-        if not appointment:
-            return False
-        if appointment.status != AppointmentStatus.IN_PROGRESS:
-            return False
-        appointment.complete(completion_note)
-        self.appointment_repository.save(appointment)
-        return True
+        with self._booking():
+            appointment = self.get_appointment_by_id(appointment_id)
+            if not appointment:
+                return False
+            if appointment.status != AppointmentStatus.IN_PROGRESS:
+                return False
+            appointment = replace(appointment)
+            appointment.complete(completion_note)
+            self._save(appointment)
+            return True
 
     def reschedule_appointment(
         self,
@@ -92,14 +298,18 @@ class AppointmentService:
     ) -> bool:
         """
         Reschedule an existing appointment.
+        Raises ValueError if the new time clashes with the trainer's other appointments.
         """
-        appointment = self.get_appointment_by_id(appointment_id)
-        if not appointment:
-            return False
-        if appointment.status != AppointmentStatus.SCHEDULED:
-            return False
-        appointment.start_time = new_start_time
-        if new_duration:
-            appointment.duration = new_duration
-        self.appointment_repository.save(appointment)
-        return True
+        with self._booking():
+            appointment = self.get_appointment_by_id(appointment_id)
+            if not appointment:
+                return False
+            if appointment.status != AppointmentStatus.SCHEDULED:
+                return False
+            self._check_trainer_free(
+                appointment.trainer_id, new_start_time, new_duration or appointment.duration, exclude_id=appointment.id
+            )
+            appointment = replace(appointment, start_time=new_start_time, duration=new_duration or appointment.duration)
+            appointment.update()
+            self._save(appointment)
+            return True
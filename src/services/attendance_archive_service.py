@@ -0,0 +1,121 @@
+"""
+Service layer for archiving old attendance records.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from ..repositories.attendance_repository import AttendanceRepository
+from ..repositories.attendance_archive_repository import AttendanceArchiveRepository, summarize_by_day
+from ..models.attendance import AttendanceDailySummary, AttendanceRecord
+from ..utils.config import Config
+from ..utils.timestamps import to_epoch
+
+
+def days_touched(start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[date], Optional[date]]:
+    """First and last day with a moment from start through end; None for an open bound."""
+    return start.date() if start else None, end.date() if end else None
+
+
+def day_filters(first_day: Optional[date], last_day: Optional[date]) -> dict:
+    """Attendance filters for check-ins from first_day through last_day."""
+    filters = {}
+    if first_day is not None:
+        filters["check_in_time__gte"] = datetime.combine(first_day, time())
+    if last_day is not None:
+        filters["check_in_time__lt"] = datetime.combine(last_day + timedelta(days=1), time())
+    return filters
+
+
+class AttendanceArchiveService:
+    """
+    Moves attendance older than the retention horizon out of the live repository,
+    and answers history queries over archived and live attendance alike.
+
+    Every history query covers check-ins from start through end, both
+    included as in list_attendance_page, for archived and live records alike.
+    """
+
+    def __init__(
+        self,
+        attendance_repository: AttendanceRepository,
+        archive_repository: AttendanceArchiveRepository
+    ):
+        self.attendance_repository = attendance_repository
+        self.archive_repository = archive_repository
+
+    def compact(self, retention_days: Optional[int] = None, now: Optional[datetime] = None) -> int:
+        """
+        Archive checked-out attendance records older than the retention horizon.
+
+        Records are written to the archive before they are removed from the
+        live repository, so an interrupted run can simply be repeated.
+        """
+        if retention_days is None:
+            retention_days = Config.ATTENDANCE_RETENTION_DAYS
+        cutoff = to_epoch((now or datetime.now()) - timedelta(days=retention_days), round_up=True)
+        expired = [
+            record for record in self.attendance_repository.data
+            if not record.is_active() and record.check_in_time_epoch < cutoff
+        ]
+        if not expired:
+            return 0
+        archived = self.archive_repository.archive(expired)
+        self.attendance_repository.delete_many(record.id for record in expired)
+        return archived
+
+    def find_attendance(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        member_id: Optional[str] = None
+    ) -> List[AttendanceRecord]:
+        """
+        Attendance records checked in from start through end, archived and live, in check-in order.
+        """
+        filters = {}
+        if member_id is not None:
+            filters["member_id"] = member_id
+        if start is not None:
+            filters["check_in_time__gte"] = start
+        if end is not None:
+            filters["check_in_time__lte"] = end
+        live = self.attendance_repository.find_all(filters=filters)
+        archived = self.archive_repository.find_records(start, end, member_id)
+        # Records are archived before they are deleted, so a repeated run may briefly hold both copies
+        live_ids = {record.id for record in live}
+        records = [record for record in archived if record.id not in live_ids] + live
+        records.sort(key=lambda record: record.check_in_time_epoch)
+        return records
+
+    def daily_visit_history(
+        self,
+        member_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AttendanceDailySummary]:
+        """
+        A member's visits per day and location, combining archived summaries with live records.
+
+        Archived visits are only kept as whole days, so the range is widened to
+        the days from start through end, for both sources.
+        """
+        first_day, last_day = days_touched(start, end)
+        summaries: Dict[tuple, AttendanceDailySummary] = {}
+        for summary in self.archive_repository.get_member_summaries(member_id, first_day, last_day):
+            summaries[(summary.day, summary.location_id, summary.member_id)] = summary
+
+        filters = dict(day_filters(first_day, last_day), member_id=member_id)
+        live_records = self.attendance_repository.find_all(filters=filters)
+        for key, live in summarize_by_day(live_records).items():
+            archived = summaries.get(key)
+            if archived is None:
+                summaries[key] = live
+            else:
+                summaries[key] = AttendanceDailySummary(
+                    day=live.day,
+                    location_id=live.location_id,
+                    member_id=live.member_id,
+                    visits=archived.visits + live.visits,
+                    total_minutes=archived.total_minutes + live.total_minutes
+                )
+        return sorted(summaries.values(), key=lambda summary: (summary.day, summary.location_id))
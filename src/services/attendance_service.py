@@ -2,27 +2,57 @@
 Service layer for handling Attendance-related operations.
 """
 
+from dataclasses import replace
 from datetime import datetime
 from typing import List, Optional
-from repositories.attendance_repository import AttendanceRepository
-from models.attendance import AttendanceRecord
+from ..repositories.attendance_repository import AttendanceRepository
+from ..repositories.attendance_archive_repository import summarize_by_day
+from ..models.attendance import AttendanceDailySummary, AttendanceRecord
+from .attendance_archive_service import AttendanceArchiveService, day_filters, days_touched
+from ..utils.config import Config
+from ..utils.dedupe import RequestCache
+from ..utils.metrics import instrument_service
+from ..utils.pagination import Page
+from ..utils.tracing import trace_service
 
 
+@instrument_service
+@trace_service
 class AttendanceService:
     """Handles operations related to gym attendance."""
 
-    def __init__(self, attendance_repository: AttendanceRepository):
+    def __init__(
+        self,
+        attendance_repository: AttendanceRepository,
+        archive_service: Optional[AttendanceArchiveService] = None,
+        request_cache: Optional[RequestCache] = None
+    ):
         self.attendance_repository = attendance_repository
+        # History queries go through the archive service so that archived visits are included
+        self.archive_service = archive_service
+        # Outcomes of recent check-ins and check-outs by client request id, so retries are answered once
+        self.request_cache = request_cache or RequestCache(
+            "attendance", Config.REQUEST_DEDUPE_TTL, Config.REQUEST_DEDUPE_MAX_ENTRIES, Config.REQUEST_DEDUPE_WAIT
+        )
 
     def check_in(
         self,
         member_id: str,
         location_id: str,
-        zone_id: Optional[str] = None
+        zone_id: Optional[str] = None,
+        request_id: Optional[str] = None
     ) -> AttendanceRecord:
         """
         Create a check-in record for a member.
+        A retry with the same request_id returns the original record (or error) without a new check-in.
         """
+        return self.request_cache.run(
+            ("check_in", request_id) if request_id is not None else None,
+            lambda: self._check_in(member_id, location_id, zone_id),
+            fingerprint=(member_id, location_id, zone_id)
+        )
+
+    def _check_in(self, member_id: str, location_id: str, zone_id: Optional[str]) -> AttendanceRecord:
         active_attendance = self.get_active_attendance(member_id)
         if active_attendance:
             raise ValueError("Member already has an active attendance record.")
@@ -35,15 +65,36 @@ class AttendanceService:
         )
         return self.attendance_repository.save(new_attendance)
 
-    def check_out(self, attendance_id: str) -> bool:
+    def check_out(self, attendance_id: str, request_id: Optional[str] = None) -> bool:
         """
         Check out a member by updating their attendance record.
+        A retry with the same request_id returns the original outcome.
         """
+        return self.request_cache.run(
+            ("check_out", request_id) if request_id is not None else None,
+            lambda: self._check_out(attendance_id),
+            fingerprint=attendance_id
+        )
+
+    def check_out_member(self, member_id: str, request_id: Optional[str] = None) -> bool:
+        """
+        Check out a member's active visit.
+        A retry with the same request_id returns the original outcome, even though the visit is no longer active.
+        """
+        def check_out():
+            active = self.get_active_attendance(member_id)
+            return active is not None and self._check_out(active.id)
+        return self.request_cache.run(
+            ("check_out", request_id) if request_id is not None else None, check_out, fingerprint=member_id
+        )
+
+    def _check_out(self, attendance_id: str) -> bool:
         attendance = self.attendance_repository.find_by_id(attendance_id)
         if not attendance:
             return False
         if attendance.check_out_time is not None:
             return False  # Already checked out
+        attendance = replace(attendance)  # Snapshots keep reading the stored record
         attendance.check_out()
         self.attendance_repository.save(attendance)
         return True
@@ -70,14 +121,15 @@ class AttendanceService:
         end_date: Optional[datetime] = None
     ) -> List[AttendanceRecord]:
         """
-        Retrieve all attendance records for a member within an optional date range.
+        Retrieve a member's attendance records checked in from start_date through end_date, including archived ones.
         """
-        filters = {"member_id": member_id}
-        if start_date:
-            filters["check_in_time__gte"] = start_date
-        if end_date:
-            filters["check_in_time__lte"] = end_date
-        return self.attendance_repository.find_all(filters=filters)
+        return self._find_attendance(start_date, end_date, member_id)
+
+    def get_attendance_history(self, member_id: str) -> List[AttendanceRecord]:
+        """
+        Retrieve a member's full attendance history, including archived records.
+        """
+        return self._find_attendance(member_id=member_id)
 
     def list_all_attendance(
         self,
@@ -85,11 +137,53 @@ class AttendanceService:
         end_date: Optional[datetime] = None
     ) -> List[AttendanceRecord]:
         """
-        Retrieve all attendance records, optionally filtered by date range.
+        Retrieve all attendance records checked in from start_date through end_date, including archived ones.
         """
+        return self._find_attendance(start_date, end_date)
+
+    def _find_attendance(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        member_id: Optional[str] = None
+    ) -> List[AttendanceRecord]:
+        if self.archive_service is not None:
+            return self.archive_service.find_attendance(start_date, end_date, member_id)
         filters = {}
+        if member_id is not None:
+            filters["member_id"] = member_id
         if start_date:
             filters["check_in_time__gte"] = start_date
         if end_date:
             filters["check_in_time__lte"] = end_date
         return self.attendance_repository.find_all(filters=filters)
+
+    def list_attendance_page(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = Config.PAGE_SIZE,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Page[AttendanceRecord]:
+        """
+        List one page of attendance records, newest check-in first, continuing after `cursor`.
+        """
+        return self.attendance_repository.find_page(
+            "check_in_time", cursor, page_size, descending=True, start=start_date, end=end_date
+        )
+
+    def get_daily_visit_history(
+        self,
+        member_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[AttendanceDailySummary]:
+        """
+        Retrieve a member's visits per day and location over the days from start_date through end_date,
+        combining archived summaries with live records.
+        """
+        if self.archive_service is not None:
+            return self.archive_service.daily_visit_history(member_id, start_date, end_date)
+        filters = dict(day_filters(*days_touched(start_date, end_date)), member_id=member_id)
+        live_records = self.attendance_repository.find_all(filters=filters)
+        return sorted(summarize_by_day(live_records).values(), key=lambda summary: (summary.day, summary.location_id))
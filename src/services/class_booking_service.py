@@ -0,0 +1,129 @@
+"""
+Service layer for scheduling group classes and booking places on them.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from ..repositories.class_session_repository import ClassSessionRepository
+from ..repositories.location_repository import LocationRepository
+from ..models.class_session import BookingStatus, ClassSession
+from ..models.location import WorkoutZone
+from ..utils.metrics import instrument_service
+from ..utils.tracing import trace_service
+
+
+@instrument_service
+@trace_service
+class ClassBookingService:
+    """Handles group classes, their places and waitlists."""
+
+    def __init__(self, session_repository: ClassSessionRepository, location_repository: LocationRepository):
+        self.session_repository = session_repository
+        self.location_repository = location_repository
+
+    def _zone(self, location_id: str, zone_id: str) -> WorkoutZone:
+        location = self.location_repository.find_by_id(location_id)
+        if not location:
+            raise ValueError(f"Unknown location: {location_id}")
+        zone = location.get_zone(zone_id)
+        if not zone:
+            raise ValueError(f"Unknown workout zone: {zone_id}")
+        return zone
+
+    def schedule_class(
+        self,
+        location_id: str,
+        zone_id: str,
+        trainer_id: str,
+        name: str,
+        start_time: datetime,
+        duration: int,
+        capacity: Optional[int] = None
+    ) -> ClassSession:
+        """
+        Schedule a group class in a workout zone; places default to the zone's capacity.
+        """
+        location = self.location_repository.find_by_id(location_id)
+        zone = self._zone(location_id, zone_id)
+        if not zone.is_active:
+            raise ValueError("Workout zone is not active.")
+        if capacity is None:
+            capacity = zone.capacity
+        if not 0 < capacity <= zone.capacity:
+            raise ValueError(f"Capacity must be between 1 and the zone's capacity of {zone.capacity}.")
+        if location.opening_hours and not location.is_within_opening_hours(start_time, duration):
+            raise ValueError("Class falls outside the location's opening hours.")
+
+        new_session = ClassSession(
+            location_id=location_id,
+            zone_id=zone_id,
+            trainer_id=trainer_id,
+            name=name,
+            start_time=start_time,
+            duration=duration,
+            capacity=capacity
+        )
+        return self.session_repository.save(new_session)
+
+    def get_class_by_id(self, session_id: str) -> Optional[ClassSession]:
+        """
+        Retrieve a class by its ID.
+        """
+        return self.session_repository.find_by_id(session_id)
+
+    def list_upcoming_classes(self, location_id: Optional[str] = None) -> List[ClassSession]:
+        """
+        List the classes still to come, optionally at one location.
+        """
+        return self.session_repository.get_upcoming_sessions(location_id)
+
+    def list_classes_by_date(self, date: datetime, location_id: Optional[str] = None) -> List[ClassSession]:
+        """
+        List the classes held on a day, optionally at one location.
+        """
+        return self.session_repository.get_sessions_by_date(date, location_id)
+
+    def list_member_classes(self, member_id: str) -> List[ClassSession]:
+        """
+        List the classes a member is booked on or waiting for.
+        """
+        return self.session_repository.get_member_sessions(member_id)
+
+    def book_class(self, session_id: str, member_id: str) -> Optional[BookingStatus]:
+        """
+        Book a place on a class, joining the waitlist when it is full.
+        """
+        session = self.session_repository.find_by_id(session_id)
+        if not session:
+            return None
+        if session.start_time <= datetime.now():
+            raise ValueError("Class has already started.")
+        return self.session_repository.reserve(session_id, member_id)
+
+    def cancel_booking(self, session_id: str, member_id: str) -> bool:
+        """
+        Cancel a member's place or waitlist entry; the next member waiting takes a freed place.
+        """
+        cancelled, _ = self.session_repository.release(session_id, member_id)
+        return cancelled
+
+    def resize_class(self, session_id: str, capacity: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Change the places on a class, by default to its zone's current capacity.
+        Returns the members promoted from the waitlist.
+        """
+        session = self.session_repository.find_by_id(session_id)
+        if not session:
+            return None
+        zone = self._zone(session.location_id, session.zone_id)
+        if capacity is None:
+            capacity = zone.capacity
+        if not 0 < capacity <= zone.capacity:
+            raise ValueError(f"Capacity must be between 1 and the zone's capacity of {zone.capacity}.")
+        return self.session_repository.resize(session_id, capacity)
+
+    def cancel_class(self, session_id: str) -> bool:
+        """
+        Cancel a class by ID.
+        """
+        return self.session_repository.cancel_session(session_id)
@@ -2,16 +2,48 @@
 Service layer for handling Gym Location-related operations.
 """
 
-from typing import List, Optional
-from repositories.location_repository import LocationRepository
-from models.location import GymLocation, WorkoutZone
+from dataclasses import replace
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+from ..repositories.location_repository import LocationRepository
+from ..models.location import GymLocation, WorkoutZone
+from ..utils.events import ChangeEvent
+from ..utils.metrics import instrument_service
+from ..utils.schedule import AvailabilityIndex, OpeningHoursIndex, ZoneRef, compile_opening_hours
+from ..utils.tracing import trace_service
 
 
+@instrument_service
+@trace_service
 class LocationService:
     """Handles operations related to gym locations and workout zones."""
 
     def __init__(self, location_repository: LocationRepository):
         self.location_repository = location_repository
+        # Built on first use and dropped whenever a location changes
+        self._availability: Optional[AvailabilityIndex] = None
+        self._opening_hours: Optional[OpeningHoursIndex] = None
+        self._unsubscribe = location_repository.event_bus.subscribe(
+            self._on_location_change, location_repository.entity_name
+        )
+
+    def _on_location_change(self, event: ChangeEvent):
+        self._availability = None
+        self._opening_hours = None
+
+    def _availability_index(self) -> AvailabilityIndex:
+        self.location_repository.refresh()
+        index = self._availability
+        if index is None:
+            index = self._availability = AvailabilityIndex(self.location_repository.locations)
+        return index
+
+    def _opening_hours_index(self) -> OpeningHoursIndex:
+        self.location_repository.refresh()
+        index = self._opening_hours
+        if index is None:
+            index = self._opening_hours = OpeningHoursIndex(self.location_repository.locations)
+        return index
 
     def create_location(
         self,
@@ -27,6 +59,7 @@ class LocationService:
         """
         Add a new gym location.
         """
+        compile_opening_hours(opening_hours)  # Raises ValueError for malformed hours
         new_location = GymLocation(
             name=name,
             address=address,
@@ -44,10 +77,14 @@ class LocationService:
         """
         Update details of an existing gym location.
         """
-        location = self.location_repository.find_by_id(location_id)
-        if not location:
+        stored = self.location_repository.find_by_id(location_id)
+        if not stored:
             return None
 
+        if "opening_hours" in updates:
+            compile_opening_hours(updates["opening_hours"])  # Raises ValueError for malformed hours
+        # Change a copy, so snapshots holding the stored location keep seeing it unchanged
+        location = replace(stored)
         for key, value in updates.items():
             if hasattr(location, key):
                 setattr(location, key, value)
@@ -57,11 +94,10 @@ class LocationService:
         """
         Deactivate a gym location.
         """
-        location = self.location_repository.find_by_id(location_id)
-        if not location:
+        stored = self.location_repository.find_by_id(location_id)
+        if not stored:
             return False
-        location.is_active = False
-        self.location_repository.save(location)
+        self.location_repository.save(replace(stored, is_active=False))
         return True
 
     def get_location_by_id(self, location_id: str) -> Optional[GymLocation]:
@@ -83,8 +119,8 @@ class LocationService:
         """
         Add a workout zone to a specific location.
         """
-        location = self.location_repository.find_by_id(location_id)
-        if not location:
+        stored = self.location_repository.find_by_id(location_id)
+        if not stored:
             return None
 
         new_zone = WorkoutZone(
@@ -95,6 +131,7 @@ class LocationService:
             attendant_id=zone_data.get("attendant_id"),
             description=zone_data.get("description"),
         )
+        location = replace(stored, workout_zones=list(stored.workout_zones))
         location.add_workout_zone(new_zone)
         self.location_repository.save(location)
         return new_zone
@@ -103,9 +140,10 @@ class LocationService:
         """
         Remove a workout zone from a specific location by its ID.
         """
-        location = self.location_repository.find_by_id(location_id)
-        if not location:
+        stored = self.location_repository.find_by_id(location_id)
+        if not stored:
             return False
+        location = replace(stored)
         success = location.remove_workout_zone(zone_id)
         if success:
             self.location_repository.save(location)
@@ -119,3 +157,71 @@ class LocationService:
         if not location:
             return None
         return location.get_zone(zone_id)
+
+    def update_zone_schedule(self, location_id: str, zone_id: str, day: str, times: List[str]) -> Optional[WorkoutZone]:
+        """
+        Replace a workout zone's slot times for one day.
+        """
+        stored = self.location_repository.find_by_id(location_id)
+        stored_zone = stored.get_zone(zone_id) if stored else None
+        if not stored_zone:
+            return None
+        zone = replace(stored_zone, schedule=dict(stored_zone.schedule))
+        zone.update_schedule(day, times)
+        zones = [zone if existing.id == zone_id else existing for existing in stored.workout_zones]
+        self.location_repository.save(replace(stored, workout_zones=zones))
+        return zone
+
+    def find_available_zones(
+        self, day: str, time: str, location_id: Optional[str] = None
+    ) -> List[ZoneRef]:
+        """
+        Find the active workout zones across the network with a slot at a time, e.g. Tuesday 18:00.
+        """
+        return self._availability_index().available_zones(day, time, location_id)
+
+    def find_zones_available_throughout(
+        self, day: str, times: Iterable[str], location_id: Optional[str] = None
+    ) -> List[ZoneRef]:
+        """
+        Find the active workout zones with a slot at every one of the given times on a day.
+        """
+        return self._availability_index().available_throughout(day, times, location_id)
+
+    def find_common_slots(self, zone_ids: Iterable[str], day: str) -> List[str]:
+        """
+        List the slot times that all the given workout zones share on a day.
+        """
+        return self._availability_index().common_slots(zone_ids, day)
+
+    def find_overlapping_zones(
+        self, zone_id: str, day: str, location_id: Optional[str] = None
+    ) -> List[ZoneRef]:
+        """
+        Find the other active workout zones with a slot at the same time as a zone on a day.
+        """
+        return self._availability_index().overlapping_zones(zone_id, day, location_id)
+
+    def set_opening_hours(self, location_id: str, day: str, hours: str) -> Optional[GymLocation]:
+        """
+        Set a location's opening hours for one day, e.g. "06:00-22:00".
+        """
+        compile_opening_hours({day: hours})  # Raises ValueError for malformed hours
+        stored = self.location_repository.find_by_id(location_id)
+        if not stored:
+            return None
+        location = replace(stored, opening_hours=dict(stored.opening_hours))
+        location.set_opening_hours(day, hours)
+        return self.location_repository.save(location)
+
+    def find_open_locations(self, when: Union[datetime, int]) -> List[GymLocation]:
+        """
+        Find the active locations open at a time (datetime or epoch seconds).
+        """
+        return self._opening_hours_index().open_locations(when)
+
+    def is_within_opening_hours(self, location_id: str, start: Union[datetime, int], duration: int = 0) -> bool:
+        """
+        Check whether a visit or booking of `duration` minutes fits inside a location's opening hours.
+        """
+        return self._opening_hours_index().within_opening_hours(location_id, start, duration)
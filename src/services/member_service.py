@@ -2,16 +2,30 @@
 Service layer for handling Member-related operations.
 """
 
+from dataclasses import replace
 from typing import List, Optional
-from repositories.member_repository import MemberRepository
-from models.member import Member, MembershipType, HealthInformation
+from ..repositories.member_repository import MemberRepository
+from ..repositories.member_stats_repository import MemberStatsRepository
+from ..models.member import Member, MembershipType, HealthInformation
+from ..models.member_stats import MemberActivityStats
+from ..utils.config import Config
+from ..utils.metrics import instrument_service
+from ..utils.pagination import Page
+from ..utils.tracing import trace_service
 
 
+@instrument_service
+@trace_service
 class MemberService:
     """Handles operations related to gym members."""
 
-    def __init__(self, member_repository: MemberRepository):
+    def __init__(
+        self,
+        member_repository: MemberRepository,
+        stats_repository: Optional[MemberStatsRepository] = None
+    ):
         self.member_repository = member_repository
+        self.stats_repository = stats_repository
 
     def create_member(
         self,
@@ -52,10 +66,12 @@ class MemberService:
         """
         Update details of an existing gym member.
         """
-        member = self.member_repository.find_by_id(member_id)
-        if not member:
+        stored = self.member_repository.find_by_id(member_id)
+        if not stored:
             return None
 
+        # Change a copy, so snapshots holding the stored member keep seeing it unchanged
+        member = replace(stored)
         for key, value in updates.items():
             if hasattr(member, key):
                 setattr(member, key, value)
@@ -65,9 +81,10 @@ class MemberService:
         """
         Deactivate a member's account.
         """
-        member = self.member_repository.find_by_id(member_id)
-        if not member:
+        stored = self.member_repository.find_by_id(member_id)
+        if not stored:
             return False
+        member = replace(stored)
         member.deactivate()
         self.member_repository.save(member)
         return True
@@ -76,9 +93,10 @@ class MemberService:
         """
         Reactivate a member's account.
         """
-        member = self.member_repository.find_by_id(member_id)
-        if not member:
+        stored = self.member_repository.find_by_id(member_id)
+        if not stored:
             return False
+        member = replace(stored)
         member.activate()
         self.member_repository.save(member)
         return True
@@ -96,14 +114,34 @@ class MemberService:
         filters = {"is_active": True} if active_only else {}
         return self.member_repository.find_all(filters=filters)
 
+    def list_members_page(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = Config.PAGE_SIZE,
+        active_only: bool = True
+    ) -> Page[Member]:
+        """
+        List one page of members ordered by ID, continuing after `cursor`.
+        """
+        filters = {"is_active": True} if active_only else None
+        return self.member_repository.find_page("id", cursor, page_size, filters)
+
+    def get_activity_stats(self, member_id: str) -> Optional[MemberActivityStats]:
+        """
+        Retrieve a member's visit and appointment statistics.
+        """
+        if self.stats_repository is None:
+            return None
+        return self.stats_repository.get_by_member_id(member_id)
+
     def update_health_information(
         self, member_id: str, health_info: dict
     ) -> Optional[Member]:
         """
         Update a member's health-related information.
         """
-        member = self.member_repository.find_by_id(member_id)
-        if not member:
+        stored = self.member_repository.find_by_id(member_id)
+        if not stored:
             return None
         updated_health_info = HealthInformation(
             height=health_info["height"],
@@ -114,5 +152,6 @@ class MemberService:
             last_health_check=health_info.get("last_health_check"),
             notes=health_info.get("notes"),
         )
+        member = replace(stored)
         member.update_health_info(updated_health_info)
         return self.member_repository.save(member)
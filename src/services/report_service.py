@@ -0,0 +1,125 @@
+"""
+Service layer for reports computed over all appointments at once.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..repositories.appointment_repository import AppointmentRepository
+from ..repositories.recurring_appointment_repository import RecurringAppointmentRepository
+from ..models.appointment import AppointmentStatus
+from ..models.trainer_utilization import TrainerWeekUtilization
+from ..utils.columns import AppointmentColumns, group_keys
+from ..utils.events import ChangeEvent
+from ..utils.metrics import instrument_service
+from ..utils.recurrence import SECONDS_PER_WEEK
+from ..utils.timestamps import SECONDS_PER_DAY, from_epoch
+from ..utils.tracing import trace_service
+
+# 1970-01-05, the first Monday of epoch time
+_FIRST_MONDAY = 4 * SECONDS_PER_DAY
+
+# Position of each resolved status in the per-row totals: booked, minutes, completed, cancelled, no-show
+_STATUS_SLOTS = {
+    AppointmentStatus.COMPLETED: 2,
+    AppointmentStatus.CANCELLED: 3,
+    AppointmentStatus.NO_SHOW: 4,
+}
+
+
+@instrument_service
+@trace_service
+class ReportService:
+    """Builds management reports from appointment columns."""
+
+    def __init__(
+        self,
+        appointment_repository: AppointmentRepository,
+        recurring_repository: Optional[RecurringAppointmentRepository] = None
+    ):
+        self.appointment_repository = appointment_repository
+        self.recurring_repository = recurring_repository
+        # Stored appointments as columns, built on first use and dropped whenever an appointment changes
+        self._columns: Optional[AppointmentColumns] = None
+        self._unsubscribe = appointment_repository.event_bus.subscribe(
+            self._on_appointment_change, appointment_repository.entity_name
+        )
+
+    def _on_appointment_change(self, event: ChangeEvent):
+        self._columns = None
+
+    def close(self):
+        """Stop following appointment changes."""
+        self._unsubscribe()
+
+    def appointment_columns(
+        self, start: datetime, end: datetime, location_id: Optional[str] = None
+    ) -> AppointmentColumns:
+        """
+        Appointments and recurring occurrences starting in [start, end) as column arrays.
+        """
+        self.appointment_repository.refresh()
+        columns = self._columns
+        if columns is None:
+            with self.appointment_repository.snapshot() as snapshot:
+                columns = self._columns = AppointmentColumns.build(snapshot, AppointmentStatus)
+        columns = columns.between(start, end)
+        if self.recurring_repository is not None:
+            occurrences = AppointmentColumns.build(
+                self.recurring_repository.occurrences(start, end, location_id=location_id),
+                AppointmentStatus, columns.trainers, columns.locations
+            )
+            columns = columns.concat(occurrences)
+        return columns.at_location(location_id) if location_id is not None else columns
+
+    def trainer_utilization(
+        self, start: datetime, end: datetime, location_id: Optional[str] = None
+    ) -> List[TrainerWeekUtilization]:
+        """
+        Booked hours, completion rate and no-show rate per trainer and week for every trainer,
+        over appointments starting in [start, end), optionally at one location.
+        """
+        columns = self.appointment_columns(start, end, location_id)
+        weeks, first_week, week_count = columns.periods(_FIRST_MONDAY, SECONDS_PER_WEEK)
+        if not week_count:
+            return []
+        # One count per (trainer, week, status, duration); durations take few distinct values,
+        # so counting them as part of the key also yields the summed minutes
+        status_count = len(columns.statuses)
+        duration_count = max(columns.duration) + 1
+        counts = Counter(group_keys(
+            [columns.trainer, weeks, columns.status, columns.duration],
+            [len(columns.trainers), week_count, status_count, duration_count]
+        ))
+
+        # Per status code: position of its counter in a row's totals, and whether it counts as booked
+        slots = [_STATUS_SLOTS.get(status) for status in columns.statuses.values]
+        booked = [status is not AppointmentStatus.CANCELLED for status in columns.statuses.values]
+        totals: Dict[int, List[int]] = {}
+        for key, count in counts.items():
+            key, duration = divmod(key, duration_count)
+            trainer_week, status = divmod(key, status_count)
+            row = totals.get(trainer_week)
+            if row is None:
+                row = totals[trainer_week] = [0, 0, 0, 0, 0]
+            if booked[status]:
+                row[0] += count
+                row[1] += duration * count
+            slot = slots[status]
+            if slot is not None:
+                row[slot] += count
+
+        rows = []
+        for trainer_week, (appointments, minutes, completed, cancelled, no_show) in totals.items():
+            trainer, week = divmod(trainer_week, week_count)
+            rows.append(TrainerWeekUtilization(
+                trainer_id=columns.trainers[trainer],
+                week_start=from_epoch(first_week + week * SECONDS_PER_WEEK).date(),
+                appointments_booked=appointments,
+                booked_minutes=minutes,
+                appointments_completed=completed,
+                appointments_cancelled=cancelled,
+                appointments_no_show=no_show
+            ))
+        rows.sort(key=lambda row: (row.trainer_id, row.week_start))
+        return rows
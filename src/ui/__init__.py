@@ -3,10 +3,16 @@ User Interface components for St Mary's Fitness Management System.
 This module provides views for interacting with various system services.
 """
 
-from .appointment_view import AppointmentView
-from .attendance_view import AttendanceView
-from .main_window import MainWindow
-from .member_view import MemberView
+from ..utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "AppointmentView": ".appointment_view",
+    "AttendanceView": ".attendance_view",
+    "MainWindow": ".main_window",
+    "MemberView": ".member_view",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "AppointmentView",
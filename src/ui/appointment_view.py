@@ -5,8 +5,8 @@ Provides views and controls for scheduling, updating, and viewing appointments.
 
 from datetime import datetime
 from typing import List
-from services.appointment_service import AppointmentService
-from models.appointment import Appointment, AppointmentType
+from ..services.appointment_service import AppointmentService
+from ..models.appointment import Appointment, AppointmentType
 
 class AppointmentView:
     """UI class for managing appointments"""
@@ -3,9 +3,9 @@ User interface components for managing attendance records.
 Provides views and controls for logging, updating, and viewing attendance.
 """
 
-from typing import List
-from services.attendance_service import AttendanceService
-from models.attendance import AttendanceRecord
+from typing import List, Optional
+from ..services.attendance_service import AttendanceService
+from ..models.attendance import AttendanceRecord
 from datetime import datetime
 
 class AttendanceView:
@@ -23,6 +23,15 @@ class AttendanceView:
                   f"Check-in: {record.check_in_time}, Check-out: {record.check_out_time or 'N/A'}, "
                   f"Duration: {duration}")
 
+    def display_attendance_page(self, cursor: Optional[str] = None) -> Optional[str]:
+        """Display one page of attendance records, newest first, and return the next page's cursor"""
+        page = self.attendance_service.list_attendance_page(cursor)
+        if not page.items and cursor is None:
+            print("No attendance records found.")
+            return None
+        self.display_attendance_records(page.items)
+        return page.next_cursor
+
     def log_check_in(self):
         """Prompt user to log a new check-in"""
         try:
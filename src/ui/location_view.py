@@ -0,0 +1,71 @@
+"""
+Location management view for St Mary's Fitness Management System.
+Provides user interface for managing gym locations and their workout zones.
+"""
+
+from ..services.location_service import LocationService
+
+
+class LocationView:
+    """View for managing locations"""
+
+    def __init__(self, location_service: LocationService):
+        self.location_service = location_service
+
+    def display_menu(self):
+        """Display the location management menu"""
+        print("\n=== Location Management ===")
+        print("1. View All Locations")
+        print("2. View Workout Zones of a Location")
+        print("3. Deactivate Location")
+        print("0. Back to Main Menu")
+
+        choice = input("Choose an option: ")
+        self.handle_choice(choice)
+
+    def handle_choice(self, choice: str):
+        """Handle user's menu choice"""
+        if choice == "1":
+            self.view_all_locations()
+        elif choice == "2":
+            self.view_workout_zones()
+        elif choice == "3":
+            self.deactivate_location()
+        elif choice == "0":
+            return
+        else:
+            print("Invalid choice. Please try again.")
+            self.display_menu()
+
+    def view_all_locations(self):
+        """Display all locations"""
+        locations = self.location_service.list_all_locations(active_only=False)
+        if not locations:
+            print("No locations found.")
+            return
+        print("\n=== Location List ===")
+        for location in locations:
+            print(f"{location.id}: {location.name} "
+                  f"(capacity {location.total_capacity}, {'Active' if location.is_active else 'Inactive'})")
+
+    def view_workout_zones(self):
+        """Display the workout zones of a location"""
+        location_id = input("\nEnter Location ID: ")
+        location = self.location_service.get_location_by_id(location_id)
+        if not location:
+            print(f"Location ID {location_id} not found.")
+            return
+        print(f"\n=== Workout Zones of {location.name} ===")
+        for zone in location.workout_zones:
+            print(f"{zone.id}: {zone.name} ({zone.type}, capacity {zone.capacity})")
+
+    def deactivate_location(self):
+        """Deactivate a location"""
+        location_id = input("\nEnter Location ID to deactivate: ")
+        try:
+            if self.location_service.deactivate_location(location_id):
+                print(f"Location ID {location_id} deactivated.")
+            else:
+                print(f"Location ID {location_id} not found.")
+        except ValueError as e:
+            print(f"Error: {e}")
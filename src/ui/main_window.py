@@ -3,14 +3,14 @@ Main window for St Mary's Fitness Management System.
 Integrates all views and provides the primary user interface.
 """
 
-from ui.appointment_view import AppointmentView
-from ui.attendance_view import AttendanceView
-from ui.member_view import MemberView
-from ui.location_view import LocationView
-from services.appointment_service import AppointmentService
-from services.attendance_service import AttendanceService
-from services.member_service import MemberService
-from services.location_service import LocationService
+from .appointment_view import AppointmentView
+from .attendance_view import AttendanceView
+from .member_view import MemberView
+from .location_view import LocationView
+from ..services.appointment_service import AppointmentService
+from ..services.attendance_service import AttendanceService
+from ..services.member_service import MemberService
+from ..services.location_service import LocationService
 
 class MainWindow:
     """Main user interface for the fitness management system"""
@@ -58,25 +58,30 @@ class MainWindow:
     def manage_attendance(self):
         """Manage attendance"""
         print("\n=== Manage Attendance ===")
-        self.attendance_view.display_attendance_records(
-            self.attendance_view.attendance_service.get_all_attendance_records()
-        )
-        print("\n1. Log Check-In")
-        print("2. Log Check-Out")
-        print("3. View Attendance Details")
-        print("0. Back to Main Menu")
+        next_cursor = self.attendance_view.display_attendance_page()
+        while True:
+            print("\n1. Log Check-In")
+            print("2. Log Check-Out")
+            print("3. View Attendance Details")
+            if next_cursor:
+                print("4. Show More Records")
+            print("0. Back to Main Menu")
 
-        choice = input("Choose an option: ")
-        if choice == "1":
-            self.attendance_view.log_check_in()
-        elif choice == "2":
-            self.attendance_view.log_check_out()
-        elif choice == "3":
-            self.attendance_view.view_attendance_details()
-        elif choice == "0":
+            choice = input("Choose an option: ")
+            if choice == "4" and next_cursor:
+                next_cursor = self.attendance_view.display_attendance_page(next_cursor)
+                continue
+            if choice == "1":
+                self.attendance_view.log_check_in()
+            elif choice == "2":
+                self.attendance_view.log_check_out()
+            elif choice == "3":
+                self.attendance_view.view_attendance_details()
+            elif choice == "0":
+                return
+            else:
+                print("Invalid choice. Please try again.")
             return
-        else:
-            print("Invalid choice. Please try again.")
 
     def manage_members(self):
         """Manage members"""
@@ -3,7 +3,7 @@ Member management view for St Mary's Fitness Management System.
 Provides user interface for managing members.
 """
 
-from services.member_service import MemberService
+from ..services.member_service import MemberService
 
 
 class MemberView:
@@ -44,14 +44,18 @@ class MemberView:
             self.display_menu()
 
     def view_all_members(self):
-        """Display all members"""
-        members = self.member_service.get_all_members()
-        if not members:
+        """Display all members, one page at a time"""
+        page = self.member_service.list_members_page(active_only=False)
+        if not page.items:
             print("No members found.")
             return
         print("\n=== Member List ===")
-        for member in members:
-            print(f"{member.id}: {member.full_name} ({'Active' if member.is_active else 'Inactive'})")
+        while True:
+            for member in page.items:
+                print(f"{member.id}: {member.full_name} ({'Active' if member.is_active else 'Inactive'})")
+            if not page.has_more or input("Press Enter for more, or 'q' to stop: ").strip().lower() == "q":
+                return
+            page = self.member_service.list_members_page(page.next_cursor, active_only=False)
 
     def add_new_member(self):
         """Add a new member"""
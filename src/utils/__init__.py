@@ -4,5 +4,9 @@ This module consolidates helper functions and configuration tools.
 """
 
 from .config import Config
+from .events import ChangeEvent, ChangeLog, ChangeType, EventBus, change_bus
 
-__all__ = ["Config"]
+__all__ = [
+    "Config",
+    "ChangeEvent", "ChangeLog", "ChangeType", "EventBus", "change_bus",
+]
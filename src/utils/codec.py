@@ -0,0 +1,266 @@
+"""
+Encode/decode functions generated from dataclass field metadata.
+
+For each model class the Python source of a flat `encode(obj) -> dict` and
+`decode(data) -> obj` pair is generated once from its fields and type hints,
+then compiled. Nested dataclasses, enums, datetimes, dates, Optional, List
+and Dict fields are converted inline, so encoding a record is a single
+nested dict display with no per-field dispatch or helper calls. Timestamp
+fields are written as their epoch seconds. Classes with Timestamp fields are
+decoded by filling the instance dict directly and then running __post_init__,
+which skips a descriptor call per timestamp; ISO strings from older files are
+still converted. Fields declared with symbol() are interned through the
+shared symbol table as they are decoded. Fields with defaults may be absent
+from a record; decode_many() and try_decode() skip and report records that
+still do not fit the class instead of failing the whole load.
+"""
+
+import dataclasses
+import itertools
+import threading
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+from .config import Config
+from .symbols import is_symbol, symbols
+from .timestamps import timestamp_field, to_epoch
+
+
+@dataclasses.dataclass(frozen=True)
+class Codec:
+    """Generated conversion functions for one dataclass"""
+    cls: type
+    encode: Callable[[Any], dict]
+    decode: Callable[[dict], Any]
+    source: str
+
+    def decode_many(self, rows: Iterable[Any], origin: str) -> List[Any]:
+        """
+        Decode stored rows, skipping the ones that cannot be decoded.
+
+        :param rows: Rows as read from storage.
+        :param origin: Where the rows were read from, named when a row is skipped.
+        :return: The decoded records.
+        """
+        decode = self.decode
+        records = []
+        for position, row in enumerate(rows):
+            try:
+                records.append(decode(row))
+            except DECODE_ERRORS as e:
+                _report_skipped(origin, position, row, e)
+        return records
+
+    def try_decode(self, row: Any, origin: str) -> Optional[Any]:
+        """
+        Decode one stored row.
+
+        :param row: Row as read from storage.
+        :param origin: Where the row was read from, named when it is skipped.
+        :return: The decoded record, or None if the row was skipped.
+        """
+        try:
+            return self.decode(row)
+        except DECODE_ERRORS as e:
+            _report_skipped(origin, None, row, e)
+            return None
+
+
+# Raised by generated decoders for rows that do not fit the class, e.g. a missing field or unknown enum value
+DECODE_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+def _report_skipped(origin: str, position: Optional[int], row: Any, error: Exception):
+    record_id = row.get("id") if isinstance(row, dict) else None
+    where = f" at position {position}" if position is not None else ""
+    print(f"Skipping {record_id or 'record'}{where} in {origin}: {type(error).__name__}: {error}")
+
+
+_codecs: Dict[type, Codec] = {}
+_lock = threading.RLock()
+
+
+def codec_for(cls: type) -> Codec:
+    """
+    Get the codec of a dataclass, generating it on first use.
+
+    :param cls: Dataclass type.
+    :return: The class's codec.
+    """
+    codec = _codecs.get(cls)
+    if codec is None:
+        with _lock:
+            codec = _codecs.get(cls)
+            if codec is None:
+                codec = _codecs[cls] = _CodecBuilder(cls).build()
+    return codec
+
+
+def _is_optional(hint: Any) -> bool:
+    return get_origin(hint) is Union and type(None) in get_args(hint)
+
+
+def _strip_optional(hint: Any) -> Any:
+    args = [arg for arg in get_args(hint) if arg is not type(None)]
+    return args[0] if len(args) == 1 else Any
+
+
+def _populate(obj: Any, values: dict) -> Any:
+    obj.__dict__ = values
+    obj.__post_init__()
+    return obj
+
+
+def _populate_plain(obj: Any, values: dict) -> Any:
+    obj.__dict__ = values
+    return obj
+
+
+def _fields(cls: type) -> List[Tuple[dataclasses.Field, Any]]:
+    hints = get_type_hints(cls)
+    fields = []
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        hint = hints.get(field.name, Any)
+        if field.default is None and not _is_optional(hint):
+            hint = Optional[hint]  # e.g. `schedule: Dict[...] = None`
+        fields.append((field, hint))
+    return fields
+
+
+class _CodecBuilder:
+    """Generates the source of one class's codec"""
+
+    def __init__(self, cls: type):
+        if not dataclasses.is_dataclass(cls):
+            raise TypeError(f"{cls.__name__} is not a dataclass")
+        self.cls = cls
+        self.namespace: Dict[str, Any] = {
+            "_datetime_from": datetime.fromisoformat,
+            "_date_from": date.fromisoformat,
+            "_to_epoch": to_epoch,
+            "_new": object.__new__,
+            "_intern": symbols.intern,
+        }
+        self._names = itertools.count()
+
+    def build(self) -> Codec:
+        source = (
+            "def encode(obj):\n"
+            f"    return {self._encode_dataclass(self.cls, 'obj')}\n"
+            "\n"
+            "def decode(data):\n"
+            f"    return {self._decode_dataclass(self.cls, 'data')}\n"
+        )
+        exec(compile(source, f"<codec {self.cls.__qualname__}>", "exec"), self.namespace)
+        return Codec(self.cls, self.namespace["encode"], self.namespace["decode"], source)
+
+    def _bind(self, prefix: str, value: Any) -> str:
+        name = f"_{prefix}{next(self._names)}"
+        self.namespace[name] = value
+        return name
+
+    def _variable(self) -> str:
+        return f"_v{next(self._names)}"
+
+    def _encode_dataclass(self, cls: type, expr: str) -> str:
+        return "{" + ", ".join(
+            f"{field.name!r}: {self._encode_field(cls, field, hint, expr)}" for field, hint in _fields(cls)
+        ) + "}"
+
+    def _encode_field(self, cls: type, field: dataclasses.Field, hint: Any, obj: str) -> str:
+        timestamp = timestamp_field(cls, field.name)
+        if timestamp is not None:
+            return f"{obj}.{timestamp.epoch_attribute}"
+        return self._encode_expr(hint, f"{obj}.{field.name}")
+
+    def _decode_dataclass(self, cls: type, expr: str) -> str:
+        fields = _fields(cls)
+        timestamps = {field.name: timestamp_field(cls, field.name) for field, _ in fields}
+        if not any(timestamps.values()) or len(fields) != len(dataclasses.fields(cls)):
+            arguments = ", ".join(
+                f"{field.name}={self._decode_field(cls, field, hint, expr)}" for field, hint in fields
+            )
+            return f"{self._bind('cls', cls)}({arguments})"
+        items = []
+        for field, hint in fields:
+            value = self._decode_field(cls, field, hint, expr)
+            timestamp = timestamps[field.name]
+            if timestamp is None:
+                items.append(f"{field.name!r}: {value}")
+            else:
+                raw = self._variable()
+                items.append(
+                    f"{timestamp.epoch_attribute!r}: "
+                    f"({raw} if ({raw} := {value}) is None or {raw}.__class__ is int else _to_epoch({raw}))"
+                )
+        populate = _populate if hasattr(cls, "__post_init__") else _populate_plain
+        return f"{self._bind('populate', populate)}(_new({self._bind('cls', cls)}), {{{', '.join(items)}}})"
+
+    def _decode_field(self, cls: type, field: dataclasses.Field, hint: Any, data: str) -> str:
+        value = self._decode_value(cls, field, hint, data)
+        if not is_symbol(field) or not Config.INTERN_SYMBOLS:
+            return value
+        interned = self._variable()
+        return f"({interned} if ({interned} := {value}) is None else _intern({interned}, {interned}))"
+
+    def _decode_value(self, cls: type, field: dataclasses.Field, hint: Any, data: str) -> str:
+        key = f"{data}[{field.name!r}]"
+        # The Timestamp descriptor converts whatever form was stored when it is assigned
+        value = key if timestamp_field(cls, field.name) is not None else self._decode_expr(hint, key)
+        if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
+            return value
+        # Fields with defaults may be absent from records written by older versions
+        if field.default is not dataclasses.MISSING:
+            fallback = self._bind("default", field.default)
+            if value == key:
+                return f"{data}.get({field.name!r}, {fallback})"
+        else:
+            fallback = f"{self._bind('factory', field.default_factory)}()"
+        return f"({value} if {field.name!r} in {data} else {fallback})"
+
+    def _encode_expr(self, hint: Any, expr: str) -> str:
+        if _is_optional(hint):
+            inner = self._encode_expr(_strip_optional(hint), expr)
+            return expr if inner == expr else f"(None if {expr} is None else {inner})"
+        origin = get_origin(hint)
+        if hint is datetime or hint is date:
+            return f"{expr}.isoformat()"
+        if isinstance(hint, type) and issubclass(hint, Enum):
+            return f"{expr}.value"
+        if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+            return self._encode_dataclass(hint, expr)
+        if origin in (list, List):
+            item = self._variable()
+            inner = self._encode_expr((get_args(hint) or (Any,))[0], item)
+            return expr if inner == item else f"[{inner} for {item} in {expr}]"
+        if origin in (dict, Dict):
+            key, item = self._variable(), self._variable()
+            inner = self._encode_expr((get_args(hint) or (Any, Any))[1], item)
+            return expr if inner == item else f"{{{key}: {inner} for {key}, {item} in {expr}.items()}}"
+        return expr
+
+    def _decode_expr(self, hint: Any, expr: str) -> str:
+        if _is_optional(hint):
+            inner = self._decode_expr(_strip_optional(hint), expr)
+            return expr if inner == expr else f"(None if {expr} is None else {inner})"
+        origin = get_origin(hint)
+        if hint is datetime:
+            return f"_datetime_from({expr})"
+        if hint is date:
+            return f"_date_from({expr})"
+        if isinstance(hint, type) and issubclass(hint, Enum):
+            members = self._bind("members", {member.value: member for member in hint})
+            return f"{members}[{expr}]"
+        if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+            return self._decode_dataclass(hint, expr)
+        if origin in (list, List):
+            item = self._variable()
+            inner = self._decode_expr((get_args(hint) or (Any,))[0], item)
+            return expr if inner == item else f"[{inner} for {item} in {expr}]"
+        if origin in (dict, Dict):
+            key, item = self._variable(), self._variable()
+            inner = self._decode_expr((get_args(hint) or (Any, Any))[1], item)
+            return expr if inner == item else f"{{{key}: {inner} for {key}, {item} in {expr}.items()}}"
+        return expr
@@ -0,0 +1,221 @@
+"""
+Column arrays of appointments for whole-table reporting.
+
+Reports over every trainer and week would otherwise walk the model objects
+once per trainer and day. AppointmentColumns instead keeps one compact
+`array` per field (trainer code, start epoch seconds, duration, status code,
+location code), sorted by start time so a reporting window is a bisection
+and a slice.
+
+Group-bys run over whole columns without a Python-level loop per row: the
+group columns are combined into one integer key per row with chained
+map(operator...) calls and counted with collections.Counter, all of which
+iterate in C. Python code then runs once per distinct group, not per row.
+Sums are computed the same way by adding the summed column (e.g. duration,
+which takes few distinct values) to the group key and multiplying back.
+"""
+
+import operator
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from enum import Enum
+from itertools import compress, repeat
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+from .timestamps import TimestampValue, to_epoch
+
+V = TypeVar("V", bound=Hashable)
+
+# Array type codes: signed 64-bit for epoch seconds, signed 32-bit (at least) for codes and minutes
+_SECONDS = "q"
+_CODES = "l"
+_SMALL = "b"
+
+
+class Codes(Generic[V]):
+    """Dense integer codes for the distinct values of a column"""
+
+    def __init__(self, values: Iterable[V] = ()):
+        self.values: List[V] = []
+        self._codes: Dict[V, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> V:
+        return self.values[code]
+
+    def code(self, value: V) -> int:
+        """Code of a value, assigning the next free one to a new value"""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get(self, value: V) -> Optional[int]:
+        """Code of a value, or None if it has none"""
+        return self._codes.get(value)
+
+
+def group_keys(columns: Sequence[Sequence[int]], sizes: Sequence[int]) -> Iterator[int]:
+    """
+    Combine integer columns into one key per row, like digits of a number.
+
+    The key of values (a, b, c) with sizes (A, B, C) is (a * B + b) * C + c,
+    so it is decoded with divmod by C, then by B.
+
+    :param columns: Equally long columns of non-negative integers.
+    :param sizes: Exclusive upper bound of the values of each column.
+    :return: Lazy iterator over the row keys, evaluated in C.
+    """
+    keys: Iterator[int] = iter(columns[0])
+    for column, size in zip(columns[1:], sizes[1:]):
+        keys = map(operator.add, map(operator.mul, keys, repeat(size)), column)
+    return keys
+
+
+def group_count(columns: Sequence[Sequence[int]], sizes: Sequence[int]) -> Dict[Tuple[int, ...], int]:
+    """
+    Count the rows of each combination of values of integer columns.
+
+    :param columns: Equally long columns of non-negative integers.
+    :param sizes: Exclusive upper bound of the values of each column.
+    :return: Row count per tuple of column values, for the combinations present.
+    """
+    if not columns:
+        return {}
+    counts = Counter(group_keys(columns, sizes))
+    groups = {}
+    for key, count in counts.items():
+        values = []
+        for size in reversed(sizes[1:]):
+            key, value = divmod(key, size)
+            values.append(value)
+        values.append(key)
+        groups[tuple(reversed(values))] = count
+    return groups
+
+
+class AppointmentColumns:
+    """Appointments as parallel column arrays, ordered by start time"""
+
+    def __init__(
+        self,
+        trainers: Codes[str],
+        locations: Codes[str],
+        statuses: Codes[Enum],
+        trainer: array,
+        start: array,
+        duration: array,
+        status: array,
+        location: array
+    ):
+        self.trainers = trainers
+        self.locations = locations
+        self.statuses = statuses
+        self.trainer = trainer
+        self.start = start
+        self.duration = duration
+        self.status = status
+        self.location = location
+
+    @classmethod
+    def build(
+        cls,
+        appointments: Iterable,
+        status_type: Type[Enum],
+        trainers: Optional[Codes[str]] = None,
+        locations: Optional[Codes[str]] = None
+    ) -> "AppointmentColumns":
+        """
+        Load appointments into columns.
+
+        :param appointments: Appointment models, in any order.
+        :param status_type: Enum of the appointment statuses; codes follow its order.
+        :param trainers: Trainer codes to share with other columns, new ones if omitted.
+        :param locations: Location codes to share with other columns, new ones if omitted.
+        :return: The columns, sorted by start time.
+        """
+        rows = sorted(appointments, key=operator.attrgetter("start_time_epoch"))
+        trainers = trainers if trainers is not None else Codes()
+        locations = locations if locations is not None else Codes()
+        statuses = Codes(status_type)
+        trainer_code, location_code, status_code = trainers.code, locations.code, statuses.code
+        return cls(
+            trainers, locations, statuses,
+            array(_CODES, [trainer_code(row.trainer_id) for row in rows]),
+            array(_SECONDS, [row.start_time_epoch for row in rows]),
+            array(_CODES, [row.duration for row in rows]),
+            array(_SMALL, [status_code(row.status) for row in rows]),
+            array(_CODES, [location_code(row.location_id) for row in rows]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def _with(self, trainer: array, start: array, duration: array, status: array, location: array) -> "AppointmentColumns":
+        return AppointmentColumns(
+            self.trainers, self.locations, self.statuses, trainer, start, duration, status, location
+        )
+
+    def between(self, start: Optional[TimestampValue] = None, end: Optional[TimestampValue] = None) -> "AppointmentColumns":
+        """
+        Rows starting in [start, end), found by bisecting the start column.
+
+        :param start: Earliest start time, None for no limit.
+        :param end: Latest start time (exclusive), None for no limit.
+        :return: Columns sharing this table's codes.
+        """
+        low = 0 if start is None else bisect_left(self.start, to_epoch(start, round_up=True))
+        high = len(self) if end is None else bisect_left(self.start, to_epoch(end, round_up=True))
+        window = slice(low, max(low, high))
+        return self._with(
+            self.trainer[window], self.start[window], self.duration[window],
+            self.status[window], self.location[window]
+        )
+
+    def at_location(self, location_id: str) -> "AppointmentColumns":
+        """
+        Rows of one location.
+
+        :param location_id: ID of the location.
+        :return: Columns sharing this table's codes.
+        """
+        code = self.locations.get(location_id)
+        mask = bytes(map(operator.eq, self.location, repeat(code))) if code is not None else bytes(len(self))
+        return self._with(*(
+            array(column.typecode, compress(column, mask))
+            for column in (self.trainer, self.start, self.duration, self.status, self.location)
+        ))
+
+    def concat(self, other: "AppointmentColumns") -> "AppointmentColumns":
+        """
+        Rows of both tables; the other table must share this table's codes.
+
+        :param other: Columns built with this table's trainer and location codes.
+        :return: Columns with this table's rows followed by the other's.
+        """
+        if other.trainers is not self.trainers or other.locations is not self.locations:
+            raise ValueError("Columns must share their trainer and location codes to be concatenated.")
+        return self._with(
+            self.trainer + other.trainer, self.start + other.start, self.duration + other.duration,
+            self.status + other.status, self.location + other.location
+        )
+
+    def periods(self, origin: int, length: int) -> Tuple[array, int, int]:
+        """
+        Number the periods (e.g. weeks) rows start in.
+
+        :param origin: Epoch seconds of the start of any period.
+        :param length: Seconds per period.
+        :return: Period of each row counted from the first period present, that
+            first period's start time, and the number of periods spanned.
+        """
+        if not len(self):
+            return array(_CODES), origin, 0
+        first = origin + (min(self.start) - origin) // length * length
+        periods = array(_CODES, map(operator.floordiv, map(operator.sub, self.start, repeat(first)), repeat(length)))
+        return periods, first, max(periods) + 1
@@ -12,14 +12,63 @@ class Config:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///app.db")
     MAX_CONNECTIONS: int = int(os.getenv("MAX_CONNECTIONS", 10))
 
+    # Storage configurations
+    DATA_DIR: str = os.getenv("DATA_DIR", "data")
+    STORAGE_LOCK_TIMEOUT: float = float(os.getenv("STORAGE_LOCK_TIMEOUT", 10))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", os.path.join(DATA_DIR, "archive"))
+    JOURNAL_ENABLED: bool = os.getenv("JOURNAL_ENABLED", "True").lower() == "true"
+    JOURNAL_COMPACT_MIN_ENTRIES: int = int(os.getenv("JOURNAL_COMPACT_MIN_ENTRIES", 1000))
+    JOURNAL_COMPACT_RATIO: float = float(os.getenv("JOURNAL_COMPACT_RATIO", 0.5))
+    INTERN_SYMBOLS: bool = os.getenv("INTERN_SYMBOLS", "True").lower() == "true"
+    ATTENDANCE_RETENTION_DAYS: int = int(os.getenv("ATTENDANCE_RETENTION_DAYS", 90))
+    # Decoded archive months kept in memory for history queries
+    ARCHIVE_SEGMENT_CACHE_SIZE: int = int(os.getenv("ARCHIVE_SEGMENT_CACHE_SIZE", 4))
+    # Partition members, attendance and appointments by location into one set of files per site
+    STORAGE_SHARDED: bool = os.getenv("STORAGE_SHARDED", "False").lower() == "true"
+    # Serve each sharded site's files from its own worker process
+    SHARD_WORKERS: bool = os.getenv("SHARD_WORKERS", "False").lower() == "true"
+    # Replication: followers sync every poll interval, and before a read once they lag more than the bound
+    REPLICA_POLL_INTERVAL: float = float(os.getenv("REPLICA_POLL_INTERVAL", 0.5))
+    REPLICA_MAX_LAG: float = float(os.getenv("REPLICA_MAX_LAG", 2))
+    REPLICATION_ADDRESS: str = os.getenv("REPLICATION_ADDRESS", "127.0.0.1:8090")
+    REPLICATION_AUTHKEY: str = os.getenv("REPLICATION_AUTHKEY", "")
+    # Shared read cache: the writing process maps members and locations into compact image files
+    # that other processes read in place; an empty directory means the data directory
+    READ_CACHE_ENABLED: bool = os.getenv("READ_CACHE_ENABLED", "False").lower() == "true"
+    READ_CACHE_DIR: str = os.getenv("READ_CACHE_DIR", "")
+    READ_CACHE_DELAY: float = float(os.getenv("READ_CACHE_DELAY", 0.1))
+    # How far ahead open-ended recurring appointments are listed and checked for conflicts
+    RECURRENCE_HORIZON_DAYS: int = int(os.getenv("RECURRENCE_HORIZON_DAYS", 90))
+
     # Logging configurations
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "app.log")
 
+    # Observability configurations
+    # While metrics are enabled, /metrics is served on METRICS_PORT and METRICS_FILE is written on exit;
+    # a port of 0 or an empty file name turns that export off
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+    METRICS_FILE: str = os.getenv("METRICS_FILE", "metrics.prom")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", 9108))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "trace.json")
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", 0))
+    TRACE_SLOW_MS: float = float(os.getenv("TRACE_SLOW_MS", 0))
+
+    # API server configurations
+    API_HOST: str = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT: int = int(os.getenv("API_PORT", 8080))
+    API_MAX_BODY: int = int(os.getenv("API_MAX_BODY", 1024 * 1024))
+    API_IDLE_TIMEOUT: float = float(os.getenv("API_IDLE_TIMEOUT", 30))
+    REQUEST_DEDUPE_TTL: float = float(os.getenv("REQUEST_DEDUPE_TTL", 300))
+    REQUEST_DEDUPE_MAX_ENTRIES: int = int(os.getenv("REQUEST_DEDUPE_MAX_ENTRIES", 100_000))
+    # Seconds a retried request waits for its first attempt before it is answered "in progress"
+    REQUEST_DEDUPE_WAIT: float = float(os.getenv("REQUEST_DEDUPE_WAIT", 5))
+
     # Application settings
     APP_NAME: str = "St Mary's Fitness Management System"
     VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    PAGE_SIZE: int = int(os.getenv("PAGE_SIZE", 20))
 
     # Email configurations
     EMAIL_SERVER: str = os.getenv("EMAIL_SERVER", "smtp.example.com")
@@ -28,9 +77,14 @@ class Config:
     EMAIL_PASSWORD: str = os.getenv("EMAIL_PASSWORD", "")
     EMAIL_USE_TLS: bool = os.getenv("EMAIL_USE_TLS", "True").lower() == "true"
 
+    # Settings display() masks
+    _SECRETS = ("REPLICATION_AUTHKEY", "EMAIL_PASSWORD")
+
     @classmethod
     def display(cls):
-        """Display the current configuration settings."""
+        """Display the current configuration settings, with secrets masked."""
         settings = {key: getattr(cls, key) for key in dir(cls) if not key.startswith("_")}
         for key, value in settings.items():
+            if key in cls._SECRETS and value:
+                value = "********"
             print(f"{key}: {value}")
@@ -0,0 +1,156 @@
+"""
+Deduplication of retried requests by client request id.
+
+Turnstiles and kiosks retry a request when its response is lost, so the
+same operation can arrive several times. A RequestCache remembers the
+outcome of each request id for a limited time: a retry gets the original
+result (or the original rejection) back without running the operation, or
+touching storage, again. A retry arriving while the first attempt still runs
+waits a short while for its outcome, and is otherwise told to try later; it
+never runs the operation a second time.
+
+Entries expire in the order they were added, so expiry and the size bound
+both evict from the front of one ordered dict and every call stays O(1).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+from .metrics import metrics
+
+metrics.describe("request_cache_hits_total", "Retried requests answered from the dedupe cache.")
+metrics.describe("request_cache_evictions_total", "Dedupe cache entries dropped to stay within the size bound.")
+metrics.describe("request_cache_in_progress_total", "Retries turned away while the first attempt was still running.")
+
+
+class RequestInProgressError(Exception):
+    """A retry arrived while the first attempt of the request was still running"""
+
+
+class _Outcome:
+    """Result or rejection of one request, with the arguments it was made with"""
+
+    __slots__ = ("expires", "fingerprint", "value", "error_type", "error_args")
+
+    def __init__(self, expires: float, fingerprint: Any, value: Any = None, error: Optional[BaseException] = None):
+        self.expires = expires
+        self.fingerprint = fingerprint
+        self.value = value
+        # The rejection is kept as its type and arguments, so every retry raises its own exception
+        self.error_type = type(error) if error is not None else None
+        self.error_args = error.args if error is not None else ()
+
+    def resolve(self) -> Any:
+        if self.error_type is not None:
+            raise self.error_type(*self.error_args)
+        return self.value
+
+
+class RequestCache:
+    """Bounded, time-expiring record of request outcomes keyed by request id"""
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int,
+        wait: float = 5.0,
+        remembered_errors: Tuple[Type[BaseException], ...] = (ValueError,),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param name: Label of the cache in metrics.
+        :param ttl: Seconds an outcome is remembered.
+        :param max_entries: Most outcomes held; the oldest are dropped first.
+        :param wait: Seconds a retry waits for an attempt that is still running.
+        :param remembered_errors: Exceptions that are a final answer to a request
+            (e.g. a rejected check-in) and are raised again on retry, rebuilt
+            from their type and arguments. Other exceptions are not remembered,
+            so a retry runs the operation again.
+        :param clock: Monotonic time source.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait = wait
+        self.remembered_errors = remembered_errors
+        self._clock = clock
+        self._outcomes: "OrderedDict[Hashable, _Outcome]" = OrderedDict()
+        # Requests being run, so a retry arriving meanwhile waits for the first attempt
+        self._pending: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def run(self, request_id: Optional[Hashable], operation: Callable[[], Any], fingerprint: Any = None) -> Any:
+        """
+        Run an operation once per request id.
+
+        :param request_id: Client-chosen id of the request, None to always run the operation.
+        :param operation: Function performing the request.
+        :param fingerprint: Arguments of the request; reusing a request id with
+            different arguments is rejected instead of returning another request's result.
+        :return: The operation's result, or the remembered result of an earlier attempt.
+        :raises ValueError: If the request id was used for a request with other arguments.
+        :raises RequestInProgressError: If an earlier attempt is still running after `wait` seconds.
+        """
+        if request_id is None:
+            return operation()
+        while True:
+            with self._lock:
+                outcome = self._lookup(request_id)
+                if outcome is None:
+                    pending = self._pending.get(request_id)
+                    if pending is None:
+                        pending = self._pending[request_id] = threading.Event()
+                        break
+            if outcome is not None:
+                if outcome.fingerprint != fingerprint:
+                    raise ValueError("Request id was already used for a different request.")
+                metrics.inc("request_cache_hits_total", cache=self.name)
+                return outcome.resolve()
+            if not pending.wait(self.wait):
+                # Running the request again could repeat it; the client retries later instead
+                metrics.inc("request_cache_in_progress_total", cache=self.name)
+                raise RequestInProgressError("The request is still being processed; retry later.")
+
+        outcome = None
+        try:
+            outcome = _Outcome(0, fingerprint, value=operation())
+        except self.remembered_errors as e:
+            outcome = _Outcome(0, fingerprint, error=e)
+        finally:
+            with self._lock:
+                if outcome is not None:
+                    self._store(request_id, outcome)
+                del self._pending[request_id]
+            pending.set()
+        return outcome.resolve()
+
+    def clear(self):
+        """Forget all remembered outcomes."""
+        with self._lock:
+            self._outcomes.clear()
+
+    def _lookup(self, request_id: Hashable) -> Optional[_Outcome]:
+        self._expire()
+        return self._outcomes.get(request_id)
+
+    def _store(self, request_id: Hashable, outcome: _Outcome):
+        outcome.expires = self._clock() + self.ttl
+        self._outcomes[request_id] = outcome
+        self._outcomes.move_to_end(request_id)
+        while len(self._outcomes) > self.max_entries:
+            self._outcomes.popitem(last=False)
+            metrics.inc("request_cache_evictions_total", cache=self.name)
+
+    def _expire(self):
+        now = self._clock()
+        outcomes = self._outcomes
+        while outcomes:
+            request_id, outcome = next(iter(outcomes.items()))
+            if outcome.expires > now:
+                break
+            del outcomes[request_id]
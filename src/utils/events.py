@@ -0,0 +1,163 @@
+"""
+In-process change-data-capture for the repositories.
+Repositories publish a ChangeEvent for every create, update and delete so that
+derived views can maintain themselves incrementally instead of re-scanning.
+"""
+
+import json
+import threading
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class ChangeType(Enum):
+    """Kinds of change published by repositories"""
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    RELOADED = "reloaded"  # Data was reloaded from disk after an external write
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A single change to an entity held by a repository"""
+    entity: str
+    change_type: ChangeType
+    entity_id: Optional[str]
+    before: Optional[Any] = None  # Previously stored instance, None if the record was changed in place
+    after: Optional[Any] = None
+    sequence: int = 0
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> dict:
+        """Convert the event into a JSON-compatible dictionary"""
+        return {
+            "entity": self.entity,
+            "change_type": self.change_type.value,
+            "entity_id": self.entity_id,
+            "before": _plain(self.before),
+            "after": _plain(self.after),
+            "sequence": self.sequence,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+Handler = Callable[[ChangeEvent], None]
+
+
+class EventBus:
+    """Synchronous publish/subscribe bus for repository change events"""
+
+    def __init__(self):
+        self._handlers: Dict[Optional[str], List[Handler]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Handler, entity: Optional[str] = None) -> Callable[[], None]:
+        """
+        Register a handler for change events.
+
+        :param handler: Callable invoked with each ChangeEvent.
+        :param entity: Only deliver events for this entity name, or None for all entities.
+        :return: A function that removes the subscription.
+        """
+        with self._lock:
+            self._handlers.setdefault(entity, []).append(handler)
+
+        def unsubscribe():
+            with self._lock:
+                handlers = self._handlers.get(entity, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+        return unsubscribe
+
+    def has_subscribers(self, entity: str) -> bool:
+        """Check whether any handler would receive events for an entity"""
+        return bool(self._handlers.get(entity) or self._handlers.get(None))
+
+    def publish(
+        self,
+        entity: str,
+        change_type: ChangeType,
+        entity_id: Optional[str],
+        before: Optional[Any] = None,
+        after: Optional[Any] = None
+    ) -> Optional[ChangeEvent]:
+        """
+        Publish a change to every interested handler.
+
+        :param entity: Name of the changed entity type, e.g. "attendance".
+        :param change_type: Kind of change.
+        :param entity_id: ID of the changed entity, None for whole-collection changes.
+        :param before: Instance stored before the change, None if there is no separate pre-image.
+        :param after: Instance stored after the change.
+        :return: The published event, or None if nobody is subscribed.
+        """
+        if not self.has_subscribers(entity):
+            return None
+        with self._lock:
+            self._sequence += 1
+            event = ChangeEvent(entity, change_type, entity_id, before, after, self._sequence)
+            handlers = list(self._handlers.get(entity, [])) + list(self._handlers.get(None, []))
+        for handler in handlers:
+            handler(event)
+        return event
+
+
+class ChangeLog:
+    """Subscriber that persists the change stream as JSON lines"""
+
+    def __init__(self, path: str, bus: Optional[EventBus] = None, entity: Optional[str] = None):
+        """
+        Open the log and subscribe it to a bus.
+
+        :param path: File the events are appended to.
+        :param bus: Bus to subscribe to, defaults to the shared change_bus.
+        :param entity: Only persist events for this entity name, or None for all entities.
+        """
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+        self._unsubscribe = (bus or change_bus).subscribe(self, entity)
+
+    def __call__(self, event: ChangeEvent):
+        line = json.dumps(event.to_dict(), default=_json_default)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Stop recording and close the log file."""
+        self._unsubscribe()
+        self._file.close()
+
+    @staticmethod
+    def read(path: str) -> Iterator[dict]:
+        """
+        Iterate over the events recorded in a log file.
+
+        :param path: Path of the log file.
+        :return: Iterator of event dictionaries in publication order.
+        """
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _plain(value: Any) -> Any:
+    return asdict(value) if is_dataclass(value) else value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Shared bus used by repositories unless one is passed explicitly
+change_bus = EventBus()
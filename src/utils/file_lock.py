@@ -0,0 +1,138 @@
+"""
+Cross-process coordination helpers for the JSON data files.
+Provides an advisory file lock and cheap on-disk change detection.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@dataclass(frozen=True)
+class FileStamp:
+    """Identity of a file's on-disk contents, used to detect external writes"""
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def of(cls, path) -> Optional["FileStamp"]:
+        """
+        Take the stamp of a file.
+
+        :param path: Path of the file.
+        :return: The file's stamp, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return cls(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class FileLock:
+    """
+    Advisory, re-entrant lock shared by every process using the same data file.
+
+    The lock is held on a sidecar ``<file>.lock`` so that the data file itself
+    can be replaced atomically while the lock is held.
+    """
+
+    def __init__(self, path, timeout: Optional[float] = None, poll_interval: float = 0.01):
+        """
+        Initialize the lock for a data file.
+
+        :param path: Path of the data file to protect.
+        :param timeout: Seconds to wait for the lock, or None to wait forever.
+        :param poll_interval: Seconds between attempts while waiting.
+        """
+        self.lock_path = f"{os.fspath(path)}.lock"
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self):
+        """Acquire the lock, blocking until it is available."""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = self._acquire_file_lock()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        """Release one level of the lock."""
+        self._depth -= 1
+        if self._depth == 0:
+            self._release_file_lock(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    @property
+    def is_held(self) -> bool:
+        """Check whether the current process holds the lock"""
+        return self._depth > 0
+
+    def _acquire_file_lock(self) -> int:
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return fd
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for lock on {self.lock_path}")
+                time.sleep(self.poll_interval)
+
+    def _release_file_lock(self, fd: int):
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def atomic_write_text(path, text: str):
+    """
+    Write a file by replacing it atomically, so readers never see a partial write.
+
+    :param path: Destination path.
+    :param text: Full contents to write.
+    """
+    path = os.fspath(path)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,83 @@
+"""
+Attribute filters used by the repositories' find_all methods.
+
+Filters map a field name to a value, optionally suffixed with a lookup:
+``field__gte``, ``field__lte``, ``field__gt``, ``field__lt``, ``field__in``
+or ``field__isnull``. A plain field name tests for equality.
+
+Lookups on Timestamp fields compare the stored epoch seconds against bounds
+converted once per filter, so no datetime is built per item.
+"""
+
+import operator
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+from .timestamps import to_epoch, timestamp_field
+
+_LOOKUPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "gte": operator.ge,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "in": lambda value, options: value in options,
+    "isnull": lambda value, expected: (value is None) == bool(expected),
+}
+
+
+def compile_filters(filters: Dict[str, Any]) -> Callable[[Any], bool]:
+    """
+    Turn a filter dictionary into a predicate over model instances.
+
+    :param filters: Field lookups and the values to compare against.
+    :return: A function returning True for instances matching every filter.
+    """
+    lookups: List[Tuple[str, str, Any]] = []
+    for key, expected in filters.items():
+        field_name, _, lookup = key.partition("__")
+        if lookup and lookup not in _LOOKUPS:
+            raise ValueError(f"Unsupported filter lookup: {key}")
+        lookups.append((field_name, lookup, expected))
+    # Tests per model class, since Timestamp fields are read as integers
+    tests_by_class: Dict[type, List[Tuple[str, Callable[[Any, Any], bool], Any]]] = {}
+
+    def predicate(item: Any) -> bool:
+        tests = tests_by_class.get(item.__class__)
+        if tests is None:
+            tests = tests_by_class[item.__class__] = _compile_tests(item.__class__, lookups)
+        for field_name, test, expected in tests:
+            value = getattr(item, field_name)
+            if value is None and test is not _LOOKUPS["isnull"] and expected is not None:
+                return False
+            if not test(value, expected):
+                return False
+        return True
+    return predicate
+
+
+def _compile_tests(cls: type, lookups: List[Tuple[str, str, Any]]) -> List[Tuple[str, Callable[[Any, Any], bool], Any]]:
+    tests = []
+    for field_name, lookup, expected in lookups:
+        timestamp = timestamp_field(cls, field_name)
+        if timestamp is not None:
+            field_name = timestamp.epoch_attribute
+            if lookup != "isnull":
+                expected = _epoch_operand(lookup, expected)
+        tests.append((field_name, _LOOKUPS[lookup] if lookup else operator.eq, expected))
+    return tests
+
+
+def _epoch_operand(lookup: str, expected: Any) -> Any:
+    """Convert a filter value on a Timestamp field into epoch seconds with the same outcome"""
+    if lookup == "in":
+        return {_epoch_operand("", option) for option in expected}
+    if expected is None or not isinstance(expected, (date, str)):
+        return expected
+    # Stored values are whole seconds: round a fractional bound so that
+    # x >= 10.5 becomes x >= 11, x < 10.5 becomes x < 11, and x == 10.5 matches nothing
+    seconds = to_epoch(expected)
+    fractional = to_epoch(expected, round_up=True) != seconds
+    if fractional and lookup in ("gte", "lt"):
+        return seconds + 1
+    if fractional and not lookup:
+        return seconds + 0.5
+    return seconds
@@ -0,0 +1,206 @@
+"""
+Dirty tracking and journal persistence for the JSON repositories.
+
+A repository's data lives in a snapshot file (the JSON array) plus an
+append-only journal next to it (`<file>.journal`, one JSON entry per line).
+Saving appends only the records marked dirty since the last save; once the
+journal grows past a fraction of the dataset the repository writes a fresh
+snapshot and starts an empty journal.
+
+Other processes notice appended entries by the journal's size and replay
+only those, and notice a compaction by the journal being replaced.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+from .config import Config
+from .file_lock import atomic_write_text
+
+T = TypeVar("T")
+
+# Attribute under which a model keeps the DirtySet of the repository holding it
+TRACKER_ATTRIBUTE = "_dirty_set"
+
+
+class DirtySet:
+    """Records changed or deleted since a repository's last save"""
+
+    def __init__(self):
+        self.changed: Dict[str, Any] = {}
+        self.deleted: Set[str] = set()
+        # Changed items whose last change was made in place, not stored through the repository
+        self.touched: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.changed) + len(self.deleted)
+
+    def track(self, item: Any):
+        """Bind an item so that its BaseModel.update() marks it changed here."""
+        item.__dict__[TRACKER_ATTRIBUTE] = self
+
+    def untrack(self, item: Any):
+        """Unbind an item that is no longer stored, so changing it no longer marks it changed."""
+        if item.__dict__.get(TRACKER_ATTRIBUTE) is self:
+            del item.__dict__[TRACKER_ATTRIBUTE]
+
+    def mark_changed(self, item: Any, in_place: bool = False):
+        """
+        Record an added or modified item.
+
+        :param item: The item as stored.
+        :param in_place: The stored item itself was changed, rather than replaced through the repository.
+        """
+        self.deleted.discard(item.id)
+        self.changed[item.id] = item
+        if in_place:
+            self.touched[item.id] = item
+        else:
+            self.touched.pop(item.id, None)
+
+    def mark_deleted(self, item_id: str):
+        """Record a deleted item."""
+        self.changed.pop(item_id, None)
+        self.touched.pop(item_id, None)
+        self.deleted.add(item_id)
+
+    def take_touched(self) -> List[Any]:
+        """Items changed in place since the last call."""
+        touched, self.touched = list(self.touched.values()), {}
+        return touched
+
+    def clear(self):
+        """Forget all changes, e.g. after they were saved."""
+        self.changed = {}
+        self.deleted = set()
+        self.touched = {}
+
+    def entries(self, serialize: Callable[[Any], dict]) -> List[dict]:
+        """
+        Journal entries describing the changes.
+
+        :param serialize: Converts an item into its JSON form.
+        :return: "put" entries for changed items and "delete" entries for deleted ones.
+        """
+        entries = [{"op": "put", "item": serialize(item)} for item in self.changed.values()]
+        entries.extend({"op": "delete", "id": item_id} for item_id in sorted(self.deleted))
+        return entries
+
+
+class Journal:
+    """Append-only change log stored next to a snapshot file"""
+
+    def __init__(self, snapshot_path: Union[str, Path]):
+        """
+        Initialize the journal.
+
+        :param snapshot_path: Path of the snapshot file the journal belongs to.
+        """
+        self.path = Path(f"{snapshot_path}.journal")
+        self.offset = 0  # Bytes read or written so far
+        self.entry_count = 0  # Entries since the last snapshot
+        self._inode: Optional[int] = None
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def open(self):
+        """Start reading the journal from the beginning, e.g. after loading the snapshot."""
+        stat = self._stat()
+        self._inode = stat.st_ino if stat else None
+        self.offset = 0
+        self.entry_count = 0
+
+    def was_replaced(self) -> bool:
+        """Check whether the journal was compacted since it was opened"""
+        stat = self._stat()
+        return (stat.st_ino if stat else None) != self._inode or (stat is not None and stat.st_size < self.offset)
+
+    def has_new_entries(self) -> bool:
+        """Check whether entries were appended since they were last read"""
+        stat = self._stat()
+        return stat is not None and stat.st_size > self.offset
+
+    def read_new(self) -> List[dict]:
+        """
+        Read the entries appended since the last read.
+
+        A partially written last line is left for the next read.
+        """
+        if not self.has_new_entries():
+            return []
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            chunk = file.read()
+        end = chunk.rfind(b"\n") + 1
+        entries = [json.loads(line) for line in chunk[:end].splitlines() if line.strip()]
+        self.offset += end
+        self.entry_count += len(entries)
+        return entries
+
+    def append(self, entries: List[dict]):
+        """
+        Append entries durably. The caller must hold the repository's write lock
+        and have read all earlier entries.
+        """
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode()
+        with open(self.path, "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        if self._inode is None:
+            self._inode = os.stat(self.path).st_ino
+        self.offset += len(data)
+        self.entry_count += len(entries)
+
+    def reset(self):
+        """Replace the journal with an empty one after a new snapshot was written."""
+        atomic_write_text(self.path, "")
+        self.open()
+
+    def needs_compaction(self, row_count: int) -> bool:
+        """Check whether the journal has grown large enough to fold into a new snapshot"""
+        if not Config.JOURNAL_ENABLED:
+            return True
+        return self.entry_count >= max(Config.JOURNAL_COMPACT_MIN_ENTRIES, row_count * Config.JOURNAL_COMPACT_RATIO)
+
+
+def replay(items: List[T], entries: Iterable[dict], deserialize: Callable[[dict], T]) -> Tuple[List[str], List[T]]:
+    """
+    Apply journal entries to a list of items in place.
+
+    :param items: Items loaded so far; "put" entries replace or append, "delete" entries remove.
+    :param entries: Journal entries in write order.
+    :param deserialize: Converts an entry's JSON form into an item, or returns None to skip the entry.
+    :return: IDs of removed items and the items that were put.
+    """
+    positions = {item.id: index for index, item in enumerate(items)}
+    removed: List[str] = []
+    put: Dict[str, T] = {}
+    for entry in entries:
+        if entry["op"] == "put":
+            item = deserialize(entry["item"])
+            if item is None:
+                continue
+            position = positions.get(item.id)
+            if position is None:
+                positions[item.id] = len(items)
+                items.append(item)
+            else:
+                items[position] = item
+            put[item.id] = item
+        else:
+            position = positions.pop(entry["id"], None)
+            if position is not None:
+                items[position] = None
+                removed.append(entry["id"])
+                put.pop(entry["id"], None)
+    if removed:
+        items[:] = [item for item in items if item is not None]
+    return removed, list(put.values())
@@ -0,0 +1,34 @@
+"""
+Lazy package exports.
+Lets a package's __init__ name its public classes without importing the
+submodules that define them until they are first used.
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build module-level __getattr__ and __dir__ functions for a package.
+
+    :param package: The package's __name__.
+    :param exports: Maps each exported name to the relative module defining it,
+        e.g. {"Member": ".member"}. A name mapped to ".<name>" exports the submodule itself.
+    :return: The (__getattr__, __dir__) pair to assign in the package namespace.
+    """
+    def __getattr__(name: str):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(module_name, package)
+        value = module if module_name == f".{name}" else getattr(module, name)
+        # Cache on the package so later lookups bypass __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,311 @@
+"""
+Lightweight metrics collection with Prometheus text-format export.
+
+Metrics are only recorded when Config.METRICS_ENABLED is set; otherwise
+services are left undecorated and every recording call returns immediately.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+from .config import Config
+from .file_lock import atomic_write_text
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Bucketed distribution of observed values for one label set"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class _NullTimer:
+    """Timer returned while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Context manager that observes its elapsed time into a histogram"""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Holds counters, gauges and histograms and renders them in Prometheus text format"""
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Set the HELP text of a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """
+        Increase a counter.
+
+        :param name: Metric name.
+        :param amount: Amount to add.
+        :param labels: Label values identifying the series.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str):
+        """
+        Set a gauge to its current value.
+
+        :param name: Metric name.
+        :param value: Current value.
+        :param labels: Label values identifying the series.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Record a value, typically a duration in seconds, in a histogram.
+
+        :param name: Metric name.
+        :param value: Observed value.
+        :param labels: Label values identifying the series.
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.total += value
+            histogram.count += 1
+
+    def time(self, name: str, **labels: str):
+        """
+        Time a block of code into a histogram.
+
+        :param name: Histogram name.
+        :param labels: Label values identifying the series.
+        :return: A context manager, which does nothing while metrics are disabled.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.extend(self._header(name, "counter"))
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in sorted(self._gauges.items()):
+                lines.extend(self._header(name, "gauge"))
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.extend(self._header(name, "histogram"))
+                for labels, histogram in sorted(series.items(), key=lambda item: item[0]):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    inf_labels = labels + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_labels(inf_labels)} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Write the current metrics to a file, e.g. for the node exporter textfile collector.
+
+        :param path: Destination path, replaced atomically.
+        """
+        atomic_write_text(path, self.render())
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the metrics on http://host:port/metrics from a background thread.
+
+        :param port: Port to listen on.
+        :param host: Interface to bind.
+        :return: The running server; call shutdown() to stop it.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        return server
+
+    def reset(self):
+        """Discard all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def _header(self, name: str, metric_type: str):
+        if name in self._help:
+            yield f"# HELP {name} {self._help[name]}"
+        yield f"# TYPE {name} {metric_type}"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Shared registry used by the services and repositories
+metrics = MetricsRegistry(enabled=Config.METRICS_ENABLED)
+metrics.describe("service_calls_total", "Calls to public service methods.")
+metrics.describe("service_call_errors_total", "Service calls that raised an exception.")
+metrics.describe("service_call_duration_seconds", "Latency of public service methods.")
+metrics.describe("repository_load_duration_seconds", "Time spent loading repository data files.")
+metrics.describe("repository_save_duration_seconds", "Time spent saving repository data files.")
+metrics.describe("repository_bytes_written_total", "Bytes written to repository data files.")
+
+
+@contextmanager
+def exporting(
+    registry: Optional[MetricsRegistry] = None,
+    path: Optional[str] = None,
+    port: Optional[int] = None,
+    host: Optional[str] = None
+) -> Iterator[Optional[ThreadingHTTPServer]]:
+    """
+    Serve the metrics while a block runs, and write them to a file when it ends.
+
+    Nothing is exported while the registry is disabled. An empty path or a
+    port of 0 turns off that way of exporting.
+
+    :param registry: Registry to export, defaults to the shared one.
+    :param path: File written on exit, defaults to Config.METRICS_FILE.
+    :param port: Port /metrics is served on, defaults to Config.METRICS_PORT.
+    :param host: Interface to bind, defaults to Config.API_HOST.
+    :return: A context manager yielding the metrics server, or None when not serving.
+    """
+    registry = registry or metrics
+    path = Config.METRICS_FILE if path is None else path
+    port = Config.METRICS_PORT if port is None else port
+    server = None
+    if registry.enabled and port:
+        server = registry.serve(port, host or Config.API_HOST)
+    try:
+        yield server
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if registry.enabled and path:
+            registry.write(path)
+
+
+def instrument_service(cls=None, *, registry: Optional[MetricsRegistry] = None):
+    """
+    Class decorator recording call counts, errors and latency of every public method.
+
+    When the registry is disabled at decoration time the class is returned
+    unchanged, so disabled metrics cost nothing on the call path.
+    """
+    registry = registry or metrics
+
+    def decorate(service_cls):
+        if not registry.enabled:
+            return service_cls
+        for name, member in list(vars(service_cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member):
+                continue
+            setattr(service_cls, name, _instrumented(registry, service_cls.__name__, name, member))
+        return service_cls
+
+    return decorate(cls) if cls is not None else decorate
+
+
+def _instrumented(registry: MetricsRegistry, service: str, method: str, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            registry.inc("service_call_errors_total", service=service, method=method)
+            raise
+        finally:
+            registry.inc("service_calls_total", service=service, method=method)
+            registry.observe("service_call_duration_seconds", time.perf_counter() - started,
+                             service=service, method=method)
+    return wrapper
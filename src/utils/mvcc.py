@@ -0,0 +1,117 @@
+"""
+Point-in-time snapshots of repository data.
+
+Repositories keep their records in a list that is never modified while a
+snapshot still reads it: the first write after a snapshot is taken copies
+the list (copy-on-write) and bumps the version, and records themselves are
+replaced rather than mutated on the write paths. A snapshot therefore sees
+one consistent version for as long as it is held, and the old list is
+freed as soon as the last snapshot of it is released. The exception is a
+record changed in place and saved with BaseModel.update() and the
+repository's flush(): snapshots holding that record see the change at once.
+
+Taking a snapshot and changing the list hold a short in-process lock, so a
+snapshot never pins a list that a writer is still changing in place.
+"""
+
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, TypeVar
+from .filters import compile_filters
+
+T = TypeVar("T")
+
+
+class Snapshot(Generic[T]):
+    """A read-only view of a repository's records at one version"""
+
+    def __init__(self, version: int, items: Sequence[T]):
+        self.version = version
+        self._items: Optional[Sequence[T]] = items
+
+    def __enter__(self) -> "Snapshot[T]":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def items(self) -> Sequence[T]:
+        """Records of this version; do not modify them"""
+        if self._items is None:
+            raise RuntimeError("Snapshot was released")
+        return self._items
+
+    @property
+    def released(self) -> bool:
+        """Check whether the snapshot no longer pins its version"""
+        return self._items is None
+
+    def release(self):
+        """Stop pinning the version so its records can be reclaimed."""
+        self._items = None
+
+    def find_all(self, filters: Optional[Dict[str, Any]] = None) -> List[T]:
+        """Records of this version matching the given field lookups"""
+        if not filters:
+            return list(self.items)
+        predicate = compile_filters(filters)
+        return [item for item in self.items if predicate(item)]
+
+    def get_by_id(self, item_id: str) -> Optional[T]:
+        """Record of this version with the given ID"""
+        return next((item for item in self.items if item.id == item_id), None)
+
+
+class VersionedList(Generic[T]):
+    """
+    A list of records with copy-on-write versions.
+
+    Writers change the list in place inside writing(), or call replace() to
+    install a new list; readers call snapshot() to pin the current version.
+    """
+
+    def __init__(self, items: Optional[List[T]] = None):
+        self.items: List[T] = items if items is not None else []
+        self.version = 0
+        self._snapshots: "weakref.WeakSet[Snapshot[T]]" = weakref.WeakSet()
+        self._lock = threading.RLock()
+
+    def snapshot(self) -> Snapshot[T]:
+        """Pin the current version."""
+        with self._lock:
+            snapshot = Snapshot(self.version, self.items)
+            self._snapshots.add(snapshot)
+        return snapshot
+
+    @contextmanager
+    def writing(self) -> Iterator[List[T]]:
+        """
+        Start a new version and yield the list to modify in place.
+
+        The list is copied first if a snapshot still reads the current version,
+        and no snapshot can be taken until the block ends.
+        """
+        with self._lock:
+            if any(not snapshot.released and snapshot.version == self.version for snapshot in list(self._snapshots)):
+                self.items = list(self.items)
+            self.version += 1
+            yield self.items
+
+    def replace(self, items: List[T]):
+        """Install a new list as the next version."""
+        with self._lock:
+            self.items = items
+            self.version += 1
+
+    def pinned_versions(self) -> List[int]:
+        """Versions still held by unreleased snapshots"""
+        return sorted({snapshot.version for snapshot in list(self._snapshots) if not snapshot.released})
@@ -0,0 +1,189 @@
+"""
+Keyset pagination over in-memory repositories.
+
+A SortedIndex keeps a repository's items ordered by one field (ties broken by
+id), so a page is found by bisecting to the cursor and reading forward; the
+cost of a page does not depend on how many items come before it. Cursors are
+opaque strings carrying the last item's sort value and id, and stay valid
+while items are added or removed. Timestamp fields are ordered by their
+epoch seconds.
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+from .timestamps import to_epoch, timestamp_field
+
+T = TypeVar("T")
+
+# Sort keys are (has_value, value, id) so that None values sort first without being compared
+SortKey = Tuple[bool, Any, str]
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results and the cursor of the page after it"""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        """Check whether another page follows"""
+        return self.next_cursor is not None
+
+
+def encode_cursor(order_by: str, key: SortKey) -> str:
+    """
+    Encode a sort key as an opaque cursor.
+
+    :param order_by: Field the page is ordered by.
+    :param key: Sort key of the last item on the page.
+    :return: URL-safe cursor string.
+    """
+    _, value, item_id = key
+    if isinstance(value, datetime):
+        encoded = ["datetime", value.isoformat()]
+    elif isinstance(value, date):
+        encoded = ["date", value.isoformat()]
+    else:
+        encoded = ["value", value]
+    raw = json.dumps({"order_by": order_by, "value": encoded, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str) -> SortKey:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    :param cursor: Cursor string.
+    :param order_by: Field the caller is paginating by; must match the cursor's.
+    :return: Sort key to continue after.
+    :raises ValueError: If the cursor is malformed or belongs to another ordering.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        kind, value = raw["value"]
+        item_id = raw["id"]
+        cursor_order = raw["order_by"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if cursor_order != order_by:
+        raise ValueError(f"Cursor is for ordering by {cursor_order!r}, not {order_by!r}")
+    if kind == "datetime":
+        value = datetime.fromisoformat(value)
+    elif kind == "date":
+        value = date.fromisoformat(value)
+    return value is not None, value, item_id
+
+
+class SortedIndex(Generic[T]):
+    """Items kept in sort-key order, maintained incrementally as items change"""
+
+    def __init__(self, field_name: str, items: Iterable[T] = ()):
+        """
+        Build the index.
+
+        :param field_name: Attribute the items are ordered by; items also need an id.
+        :param items: Initial items.
+        """
+        self.field_name = field_name
+        # Attribute holding the sort value per model class; Timestamp fields sort by their integer
+        self._attributes: Dict[type, str] = {}
+        self._epoch = False
+        entries = sorted(((self.key_of(item), item) for item in items), key=lambda entry: entry[0])
+        self._keys: List[SortKey] = [key for key, _ in entries]
+        self._items: List[T] = [item for _, item in entries]
+        self._key_by_id: Dict[str, SortKey] = {key[2]: key for key in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def key_of(self, item: T) -> SortKey:
+        """Sort key of an item"""
+        attribute = self._attributes.get(item.__class__)
+        if attribute is None:
+            attribute = self._attributes[item.__class__] = self._attribute_of(item.__class__)
+        value = getattr(item, attribute)
+        return value is not None, value, item.id
+
+    def _attribute_of(self, cls: type) -> str:
+        timestamp = timestamp_field(cls, self.field_name)
+        if timestamp is None:
+            return self.field_name
+        self._epoch = True
+        return timestamp.epoch_attribute
+
+    def _bound(self, value: Any, round_up: bool = False) -> Any:
+        """Convert a range bound or cursor value into the index's sort values"""
+        if self._epoch and isinstance(value, (date, str)):
+            return to_epoch(value, round_up)
+        return value
+
+    def add(self, item: T):
+        """Insert an item, replacing any item with the same id."""
+        self.remove(item.id)
+        key = self.key_of(item)
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._items.insert(position, item)
+        self._key_by_id[item.id] = key
+
+    def remove(self, item_id: str):
+        """Remove the item with the given id, if indexed."""
+        key = self._key_by_id.pop(item_id, None)
+        if key is None:
+            return
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._items[position]
+
+    def page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        predicate: Optional[Callable[[T], bool]] = None,
+        descending: bool = False,
+        start: Any = None,
+        end: Any = None
+    ) -> Page[T]:
+        """
+        Read one page.
+
+        Items outside [start, end] are skipped by bisection. Items rejected by the
+        predicate are skipped one by one, so a selective predicate reads further.
+
+        :param cursor: Cursor from the previous page, None for the first page.
+        :param limit: Maximum number of items on the page.
+        :param predicate: Optional filter applied to each candidate item.
+        :param descending: Order from the largest sort value to the smallest.
+        :param start: Smallest sort value to include.
+        :param end: Largest sort value to include.
+        :return: The page and the cursor of the next one.
+        """
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+        low = 0 if start is None else bisect_left(self._keys, (True, self._bound(start, round_up=True), ""))
+        high = len(self._keys) if end is None else bisect_right(self._keys, (True, self._bound(end), "\U0010ffff"))
+        if cursor is not None:
+            has_value, value, item_id = decode_cursor(cursor, self.field_name)
+            after = has_value, self._bound(value), item_id
+            if descending:
+                high = min(high, bisect_left(self._keys, after))
+            else:
+                low = max(low, bisect_right(self._keys, after))
+
+        positions = range(high - 1, low - 1, -1) if descending else range(low, high)
+        items: List[T] = []
+        last_key: Optional[SortKey] = None
+        for position in positions:
+            item = self._items[position]
+            if predicate is not None and not predicate(item):
+                continue
+            if len(items) == limit:
+                return Page(items, encode_cursor(self.field_name, last_key))
+            items.append(item)
+            last_key = self._keys[position]
+        return Page(items, None)
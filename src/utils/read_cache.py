@@ -0,0 +1,361 @@
+"""
+Read-only image of the hot, compact tables shared by every process.
+
+Worker processes that only need to resolve a member's name and status or a
+location's and zone's capacity should not each load members.json and
+locations.json. The process that writes members and locations instead
+keeps a compact binary image of those columns in a file (put
+Config.READ_CACHE_DIR on a tmpfs such as /dev/shm to keep it in RAM).
+Readers map the image with mmap, so all processes share the same pages
+of the OS page cache and nothing is copied until a row is read.
+
+Image layout (little-endian):
+
+    header   magic "SMRC", superseded flag, row count, column count,
+             heap offset, generation (one more than the image it replaced)
+    records  row count x column count 64-bit cells, rows sorted by key
+    heap     UTF-8 bytes of the string cells
+
+A string cell holds (offset << 32 | length) into the heap, or NULL_STRING
+for None; other cells hold the integer or boolean value. A key lookup is a
+binary search over the first column.
+
+A new image is written to a temporary file and renamed into place under
+the image's file lock, then the previous image's superseded flag is set.
+Readers check that flag in their mapping before every read (no system
+call) and map the new file once it is set.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .config import Config
+from .events import ChangeEvent, ChangeType
+from .file_lock import FileLock
+from .metrics import metrics
+
+metrics.describe("read_cache_publish_total", "Read cache images written.")
+
+_MAGIC = b"SMRC"
+_HEADER = struct.Struct("<4sIIIQQ")
+_SUPERSEDED = struct.Struct("<I")
+_SUPERSEDED_OFFSET = 4
+NULL_STRING = -1
+
+# Column kinds of an image
+STR, INT, BOOL = "str", "int", "bool"
+
+
+class TableImage:
+    """A memory-mapped table image, remapped when the writer replaces it"""
+
+    def __init__(self, path: str, kinds: Sequence[str]):
+        """
+        :param path: Image file.
+        :param kinds: Kind of each column (STR, INT or BOOL); the first column is the STR key.
+        """
+        self.path = path
+        self.kinds = tuple(kinds)
+        self._map: Optional[mmap.mmap] = None
+        self._cells: Optional[memoryview] = None
+        self._rows = 0
+        self._heap = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def write(path: str, kinds: Sequence[str], rows: Iterable[Sequence[Any]]):
+        """
+        Replace the image with new rows and tell readers of the previous one.
+
+        :param path: Image file.
+        :param kinds: Kind of each column; the first column is the STR key.
+        :param rows: Rows of cell values, in any order; keys must be unique.
+        """
+        rows = sorted(rows, key=lambda row: row[0].encode())
+        heap = bytearray()
+        cells = []
+        for row in rows:
+            for kind, value in zip(kinds, row):
+                if kind != STR:
+                    cells.append(int(value))
+                elif value is None:
+                    cells.append(NULL_STRING)
+                else:
+                    encoded = value.encode()
+                    cells.append(len(heap) << 32 | len(encoded))
+                    heap += encoded
+        records = struct.pack(f"<{len(cells)}q", *cells)
+
+        # Locked so that concurrent writers each supersede the image they replace
+        with FileLock(path, timeout=Config.STORAGE_LOCK_TIMEOUT):
+            try:
+                previous = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                previous, generation = None, 1
+            else:
+                header = os.pread(previous, _HEADER.size, 0)
+                generation = _HEADER.unpack(header)[5] + 1 if len(header) == _HEADER.size else 1
+            try:
+                tmp_path = f"{path}.tmp.{os.getpid()}"
+                with open(tmp_path, "wb") as file:
+                    file.write(_HEADER.pack(
+                        _MAGIC, 0, len(rows), len(kinds), _HEADER.size + len(records), generation
+                    ))
+                    file.write(records)
+                    file.write(heap)
+                os.replace(tmp_path, path)
+                if previous is not None:
+                    os.pwrite(previous, _SUPERSEDED.pack(1), _SUPERSEDED_OFFSET)
+            finally:
+                if previous is not None:
+                    os.close(previous)
+        metrics.inc("read_cache_publish_total", file=os.path.basename(path))
+
+    def _current(self) -> bool:
+        """Map the image if it is not mapped or was superseded; False if there is no image."""
+        if self._map is not None and not _SUPERSEDED.unpack_from(self._map, _SUPERSEDED_OFFSET)[0]:
+            return True
+        with self._lock:
+            if self._map is not None and not _SUPERSEDED.unpack_from(self._map, _SUPERSEDED_OFFSET)[0]:
+                return True
+            self.close()
+            try:
+                with open(self.path, "rb") as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):  # ValueError: empty file
+                return False
+            magic, _, rows, columns, heap, generation = _HEADER.unpack_from(mapped)
+            if magic != _MAGIC or columns != len(self.kinds):
+                mapped.close()
+                raise ValueError(f"{self.path} is not an image of {len(self.kinds)} columns")
+            self._cells = memoryview(mapped)[_HEADER.size:heap].cast("q")
+            self._map, self._rows, self._heap, self.generation = mapped, rows, heap, generation
+            return True
+
+    def close(self):
+        """Unmap the image; the next read maps it again."""
+        if self._cells is not None:
+            self._cells.release()
+            self._cells = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __len__(self) -> int:
+        return self._rows if self._current() else 0
+
+    def _value(self, row: int, column: int) -> Any:
+        cell = self._cells[row * len(self.kinds) + column]
+        kind = self.kinds[column]
+        if kind == INT:
+            return cell
+        if kind == BOOL:
+            return bool(cell)
+        if cell == NULL_STRING:
+            return None
+        start = self._heap + (cell >> 32)
+        return self._map[start:start + (cell & 0xFFFFFFFF)].decode()
+
+    def _key(self, row: int) -> bytes:
+        cell = self._cells[row * len(self.kinds)]
+        start = self._heap + (cell >> 32)
+        return self._map[start:start + (cell & 0xFFFFFFFF)]
+
+    def _row(self, row: int) -> Tuple:
+        return tuple(self._value(row, column) for column in range(len(self.kinds)))
+
+    def get(self, key: str) -> Optional[Tuple]:
+        """
+        Row with a key.
+
+        :param key: Value of the first column.
+        :return: The row's values, None if there is no such row or no image yet.
+        """
+        if not self._current():
+            return None
+        encoded = key.encode()
+        row = bisect_left(range(self._rows), encoded, key=self._key)
+        return self._row(row) if row < self._rows and self._key(row) == encoded else None
+
+    def with_prefix(self, prefix: str) -> List[Tuple]:
+        """
+        Rows whose key starts with a prefix, in key order.
+
+        :param prefix: Start of the keys.
+        :return: The rows' values.
+        """
+        if not self._current():
+            return []
+        encoded = prefix.encode()
+        low = bisect_left(range(self._rows), encoded, key=self._key)
+        # 0xff never occurs in UTF-8, so it sorts after every key with the prefix
+        high = bisect_left(range(low, self._rows), encoded + b"\xff", key=self._key) + low
+        return [self._row(row) for row in range(low, high)]
+
+    def __iter__(self) -> Iterator[Tuple]:
+        if not self._current():
+            return iter(())
+        return (self._row(row) for row in range(self._rows))
+
+
+@dataclass(frozen=True)
+class MemberEntry:
+    """A member as held in the read cache"""
+    id: str
+    name: str
+    is_active: bool
+    home_location_id: Optional[str]
+
+
+@dataclass(frozen=True)
+class LocationEntry:
+    """A location as held in the read cache"""
+    id: str
+    name: str
+    total_capacity: int
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class ZoneEntry:
+    """A workout zone as held in the read cache"""
+    location_id: str
+    id: str
+    name: str
+    capacity: int
+    is_active: bool
+
+
+_MEMBER_KINDS = (STR, STR, BOOL, STR)
+_LOCATION_KINDS = (STR, STR, INT, BOOL)
+# Zones are keyed "<location id>/<zone id>" so that a location's zones are one key range
+_ZONE_KINDS = (STR, STR, STR, STR, INT, BOOL)
+
+MEMBERS_IMAGE = "members.image"
+LOCATIONS_IMAGE = "locations.image"
+ZONES_IMAGE = "zones.image"
+
+
+class ReadCache:
+    """Members, locations and zones read from the shared images of a directory"""
+
+    def __init__(self, directory: str):
+        """
+        :param directory: Directory the writer publishes the images to.
+        """
+        self.directory = directory
+        self.members = TableImage(os.path.join(directory, MEMBERS_IMAGE), _MEMBER_KINDS)
+        self.locations = TableImage(os.path.join(directory, LOCATIONS_IMAGE), _LOCATION_KINDS)
+        self.zones = TableImage(os.path.join(directory, ZONES_IMAGE), _ZONE_KINDS)
+
+    def get_member(self, member_id: str) -> Optional[MemberEntry]:
+        """Member with an ID, None if unknown"""
+        row = self.members.get(member_id)
+        return MemberEntry(*row) if row else None
+
+    def get_location(self, location_id: str) -> Optional[LocationEntry]:
+        """Location with an ID, None if unknown"""
+        row = self.locations.get(location_id)
+        return LocationEntry(*row) if row else None
+
+    def get_zones(self, location_id: str) -> List[ZoneEntry]:
+        """Workout zones of a location"""
+        return [ZoneEntry(*row[1:]) for row in self.zones.with_prefix(f"{location_id}/")]
+
+    def get_zone(self, location_id: str, zone_id: str) -> Optional[ZoneEntry]:
+        """Workout zone of a location, None if unknown"""
+        row = self.zones.get(f"{location_id}/{zone_id}")
+        return ZoneEntry(*row[1:]) if row else None
+
+    def close(self):
+        """Unmap the images."""
+        for table in (self.members, self.locations, self.zones):
+            table.close()
+
+
+class ReadCachePublisher:
+    """
+    Rewrites the read cache images after members or locations change.
+
+    Only changes made by this process (created, updated, deleted events) are
+    published, so among several processes the one that wrote a change
+    refreshes the images; changes arriving within `delay` seconds are
+    written as one image.
+    """
+
+    def __init__(
+        self,
+        member_repository: Any,
+        location_repository: Any,
+        directory: str,
+        delay: float = 0.1
+    ):
+        """
+        Publish the images if they do not exist yet and follow later changes.
+
+        :param member_repository: Repository of the members (may be sharded).
+        :param location_repository: Repository of the locations.
+        :param directory: Directory the images are written to.
+        :param delay: Seconds to wait for further changes before rewriting an image.
+        """
+        self.member_repository = member_repository
+        self.location_repository = location_repository
+        self.directory = directory
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending: Optional[threading.Timer] = None
+        os.makedirs(directory, exist_ok=True)
+        self._unsubscribes: List[Callable[[], None]] = [
+            member_repository.event_bus.subscribe(self._on_change, member_repository.entity_name),
+            location_repository.event_bus.subscribe(self._on_change, location_repository.entity_name),
+        ]
+        if not all(os.path.exists(os.path.join(directory, name)) for name in (MEMBERS_IMAGE, LOCATIONS_IMAGE, ZONES_IMAGE)):
+            self.publish()
+
+    def _on_change(self, event: ChangeEvent):
+        if event.change_type == ChangeType.RELOADED:
+            return  # Written by another process, which publishes it
+        with self._lock:
+            if self._pending is None:
+                self._pending = threading.Timer(self.delay, self.publish)
+                self._pending.daemon = True
+                self._pending.start()
+
+    def publish(self):
+        """Write all images from the current members and locations now."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+        members = self.member_repository.get_all()
+        locations = self.location_repository.get_all_locations()
+        TableImage.write(
+            os.path.join(self.directory, MEMBERS_IMAGE), _MEMBER_KINDS,
+            ((member.id, member.full_name, member.is_active, member.home_location_id) for member in members)
+        )
+        TableImage.write(
+            os.path.join(self.directory, LOCATIONS_IMAGE), _LOCATION_KINDS,
+            ((location.id, location.name, location.total_capacity, location.is_active) for location in locations)
+        )
+        TableImage.write(
+            os.path.join(self.directory, ZONES_IMAGE), _ZONE_KINDS,
+            (
+                (f"{location.id}/{zone.id}", location.id, zone.id, zone.name, zone.capacity, zone.is_active)
+                for location in locations for zone in location.workout_zones
+            )
+        )
+
+    def close(self):
+        """Stop following changes, writing any change still pending first."""
+        for unsubscribe in self._unsubscribes:
+            unsubscribe()
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.cancel()
+            self.publish()
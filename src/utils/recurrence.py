@@ -0,0 +1,113 @@
+"""
+Lazy expansion of recurring appointments.
+
+A series is stored as one record: the start of its first occurrence, a
+period and optional limits (an end time, a number of occurrences, skipped
+dates). The start of the k-th occurrence is `first + k * period`, so the
+first occurrence inside a query window is found by arithmetic and the
+generators below yield only the occurrences in the window, one at a time.
+An open-ended series is never materialized.
+
+All times are epoch seconds (see timestamps); naive wall-clock days are
+whole multiples of SECONDS_PER_DAY, so the date of an occurrence is its
+start rounded down to the day.
+"""
+
+from typing import AbstractSet, Any, Iterable, Iterator, Optional, Tuple
+from .timestamps import SECONDS_PER_DAY
+
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+
+# (start, end, item) with times in epoch seconds
+TimedItem = Tuple[int, int, Any]
+
+
+def day_of(seconds: int) -> int:
+    """Epoch seconds of the midnight starting the day of a time"""
+    return seconds - seconds % SECONDS_PER_DAY
+
+
+def occurrence_starts(
+    first: int,
+    period: int,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    until: Optional[int] = None,
+    count: Optional[int] = None,
+    skipped_days: AbstractSet[int] = frozenset()
+) -> Iterator[int]:
+    """
+    Yield the start times of a series' occurrences inside a window, in order.
+
+    :param first: Start of the first occurrence.
+    :param period: Seconds between occurrences.
+    :param start: Earliest start to yield (inclusive), None for the first occurrence.
+    :param end: Latest start to yield (exclusive), None for no limit.
+    :param until: Last start the series allows (inclusive), None for no limit.
+    :param count: Number of occurrences in the series, None for no limit.
+    :param skipped_days: Midnights (see day_of) of days without an occurrence.
+    :return: Iterator over occurrence start times.
+    """
+    index = 0 if start is None or start <= first else -(-(start - first) // period)
+    stop = end if until is None else until + 1 if end is None else min(end, until + 1)
+    seconds = first + index * period
+    while (count is None or index < count) and (stop is None or seconds < stop):
+        if not skipped_days or day_of(seconds) not in skipped_days:
+            yield seconds
+        index += 1
+        seconds += period
+
+
+def is_occurrence(
+    seconds: int,
+    first: int,
+    period: int,
+    until: Optional[int] = None,
+    count: Optional[int] = None,
+    skipped_days: AbstractSet[int] = frozenset()
+) -> bool:
+    """
+    Check whether a series has an occurrence starting at a time.
+
+    :param seconds: Start time to check.
+    :param first: Start of the first occurrence.
+    :param period: Seconds between occurrences.
+    :param until: Last start the series allows, None for no limit.
+    :param count: Number of occurrences in the series, None for no limit.
+    :param skipped_days: Midnights of days without an occurrence.
+    :return: True if an occurrence starts at that time.
+    """
+    index, remainder = divmod(seconds - first, period)
+    return (
+        remainder == 0 and index >= 0
+        and (count is None or index < count)
+        and (until is None or seconds <= until)
+        and day_of(seconds) not in skipped_days
+    )
+
+
+def overlapping(intervals: Iterable[TimedItem], others: Iterable[TimedItem]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield the pairs of overlapping intervals from two streams sorted by start.
+
+    Both streams are consumed lazily in one pass, so a series can be checked
+    against existing bookings without expanding either side into a list.
+    Intervals that merely touch (one ends when the other starts) do not overlap.
+
+    :param intervals: (start, end, item) tuples sorted by start.
+    :param others: (start, end, item) tuples sorted by start.
+    :return: Iterator over (item, other item) pairs.
+    """
+    others = iter(others)
+    # Intervals from `others` that may still overlap upcoming ones, i.e. end after the current start
+    active = []
+    upcoming = next(others, None)
+    for start, end, item in intervals:
+        active = [other for other in active if other[1] > start]
+        while upcoming is not None and upcoming[0] < end:
+            if upcoming[1] > start:
+                active.append(upcoming)
+            upcoming = next(others, None)
+        for other in active:
+            if other[0] < end:
+                yield item, other[2]
@@ -0,0 +1,325 @@
+"""
+Leader/follower replication of the data directory.
+
+Every repository file is a JSON snapshot plus an append-only journal (see
+journal), so those files already are the mutation log. A ReplicationSource
+on the leader answers a follower's file positions with the complete journal
+lines appended since, or with a copy of the snapshot and its journal when
+the follower has no copy yet or the leader compacted the file since
+(catch-up from snapshot). A Follower writes what it receives into its own
+data directory, where an ordinary AppContext picks the changes up through
+the repositories' refresh(), exactly as it notices writes by other
+processes. Followers only serve reads; writes go to the leader.
+
+A follower reads the source directly when the leader's data directory is
+shared with it (same host or a shared mount), or over a local socket
+through ReplicationServer and RemoteSource.
+
+Lag is the time since the follower last held everything the leader had
+written, by the leader's clock, exported as the replica_lag_seconds gauge.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Tuple
+from .config import Config
+from .file_lock import FileLock, FileStamp, atomic_write_text
+from .metrics import metrics
+
+metrics.describe("replication_snapshots_shipped_total", "Snapshot copies sent to followers.")
+metrics.describe("replication_bytes_shipped_total", "Snapshot and journal bytes sent to followers.")
+metrics.describe("replica_lag_seconds", "Seconds since the follower last held all of the leader's writes.")
+metrics.describe("replica_snapshots_applied_total", "Snapshot copies installed by the follower.")
+metrics.describe("replica_bytes_applied_total", "Snapshot and journal bytes written by the follower.")
+
+
+@dataclass(frozen=True)
+class FilePosition:
+    """How far a follower has copied one data file"""
+    snapshot: FileStamp  # Leader's stamp of the snapshot the copy started from
+    journal_inode: Optional[int]  # Leader's journal the offset refers to, None if it had none
+    journal_offset: int = 0
+
+
+@dataclass
+class FileUpdate:
+    """Changes to one data file, named by its path relative to the data directory"""
+    name: str
+    position: FilePosition
+    journal: bytes = b""  # Entries to append, or the whole journal when a snapshot is sent
+    snapshot: Optional[bytes] = None  # Whole snapshot file, None for journal entries only
+
+    @property
+    def size(self) -> int:
+        """Bytes carried by the update"""
+        return len(self.journal) + len(self.snapshot or b"")
+
+
+Positions = Dict[str, FilePosition]
+
+
+class ReplicationSource:
+    """Reads a leader's data directory as a stream of file updates"""
+
+    def __init__(self, data_dir: str):
+        """
+        :param data_dir: The leader's data directory.
+        """
+        self.data_dir = data_dir
+
+    def files(self) -> List[str]:
+        """
+        Data files of the directory and its subdirectories (e.g. shards, the archive).
+
+        :return: Paths relative to the data directory.
+        """
+        names = []
+        for directory, _, files in os.walk(self.data_dir):
+            for file_name in files:
+                if file_name.endswith(".json"):
+                    names.append(os.path.relpath(os.path.join(directory, file_name), self.data_dir))
+        return sorted(names)
+
+    def changes(self, positions: Positions) -> Tuple[float, List[FileUpdate]]:
+        """
+        Updates bringing a follower from its positions to the current files.
+
+        :param positions: The follower's position per file; files without one are sent whole.
+        :return: The leader's time before reading, which the follower is then current up to, and the updates.
+        """
+        now = time.time()
+        updates = []
+        for name in self.files():
+            update = self._update(name, positions.get(name))
+            if update is not None:
+                updates.append(update)
+                metrics.inc("replication_bytes_shipped_total", update.size)
+        return now, updates
+
+    def _update(self, name: str, position: Optional[FilePosition]) -> Optional[FileUpdate]:
+        path = os.path.join(self.data_dir, name)
+        stamp = FileStamp.of(path)
+        if stamp is None:
+            return None
+        if position is None or position.snapshot != stamp:
+            return self._copy(name)
+        try:
+            journal = open(f"{path}.journal", "rb")
+        except FileNotFoundError:
+            return None if position.journal_inode is None else self._copy(name)
+        with journal:
+            if os.fstat(journal.fileno()).st_ino != position.journal_inode:
+                return self._copy(name)
+            journal.seek(position.journal_offset)
+            chunk = journal.read()
+        # A partially written last line is left for the next round
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            return None
+        return FileUpdate(name, replace(position, journal_offset=position.journal_offset + end), chunk[:end])
+
+    def _copy(self, name: str) -> Optional[FileUpdate]:
+        """Read a snapshot and its journal together, holding the file's write lock."""
+        path = os.path.join(self.data_dir, name)
+        with FileLock(path, timeout=Config.STORAGE_LOCK_TIMEOUT):
+            stamp = FileStamp.of(path)
+            if stamp is None:
+                return None
+            with open(path, "rb") as file:
+                snapshot = file.read()
+            try:
+                with open(f"{path}.journal", "rb") as file:
+                    inode = os.fstat(file.fileno()).st_ino
+                    journal = file.read()
+            except FileNotFoundError:
+                inode, journal = None, b""
+        journal = journal[:journal.rfind(b"\n") + 1]
+        metrics.inc("replication_snapshots_shipped_total")
+        return FileUpdate(name, FilePosition(stamp, inode, len(journal)), journal, snapshot)
+
+
+class ReplicationServer:
+    """Serves a ReplicationSource to followers over a socket"""
+
+    def __init__(self, source: ReplicationSource, address: Any, authkey: bytes):
+        """
+        Start listening.
+
+        :param source: Source of the leader's data directory.
+        :param address: (host, port) for TCP or a file path for a Unix socket.
+        :param authkey: Shared secret followers must present; messages are pickled, so it is required.
+        """
+        if not authkey:
+            raise ValueError("Replication requires an authentication key.")
+        self.source = source
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        self._closed = threading.Event()
+
+    def serve_forever(self):
+        """Answer followers, one thread per connection, until closed."""
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed.is_set():
+                    break
+                continue  # e.g. a client with the wrong key
+            threading.Thread(target=self._serve, args=(connection,), name="replication-server", daemon=True).start()
+
+    def start(self) -> threading.Thread:
+        """Serve from a background thread."""
+        thread = threading.Thread(target=self.serve_forever, name="replication-listener", daemon=True)
+        thread.start()
+        return thread
+
+    def _serve(self, connection):
+        with connection:
+            while True:
+                try:
+                    positions = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(self.source.changes(positions))
+
+    def close(self):
+        """Stop accepting followers."""
+        self._closed.set()
+        self._listener.close()
+
+
+class RemoteSource:
+    """A ReplicationSource reached through a ReplicationServer"""
+
+    def __init__(self, address: Any, authkey: bytes):
+        """
+        :param address: Address the leader's ReplicationServer listens on.
+        :param authkey: The server's authentication key.
+        """
+        if not authkey:
+            raise ValueError("Replication requires an authentication key.")
+        self.address = address
+        self.authkey = authkey
+        self._connection = None
+
+    def changes(self, positions: Positions) -> Tuple[float, List[FileUpdate]]:
+        """
+        Ask the leader for the updates after the positions, reconnecting once if the connection dropped.
+        """
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = Client(self.address, authkey=self.authkey)
+            try:
+                self._connection.send(positions)
+                return self._connection.recv()
+            except (EOFError, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        """Close the connection to the leader."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class Follower:
+    """Keeps a replica data directory current with a leader's"""
+
+    def __init__(
+        self,
+        source: Any,
+        replica_dir: str,
+        max_lag: float = Config.REPLICA_MAX_LAG,
+        poll_interval: float = Config.REPLICA_POLL_INTERVAL
+    ):
+        """
+        :param source: ReplicationSource on a shared directory, or a RemoteSource.
+        :param replica_dir: Data directory the replica is kept in.
+        :param max_lag: Seconds of lag ensure_current() tolerates before syncing.
+        :param poll_interval: Seconds between syncs of the background thread.
+        """
+        self.source = source
+        self.replica_dir = replica_dir
+        self.max_lag = max_lag
+        self.poll_interval = poll_interval
+        # Starts empty, so the first sync copies every file from its snapshot
+        self.positions: Positions = {}
+        self.caught_up_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(replica_dir, exist_ok=True)
+
+    @property
+    def lag(self) -> float:
+        """Seconds since the replica last held all of the leader's writes, infinite before the first sync"""
+        if self.caught_up_at is None:
+            return float("inf")
+        return max(0.0, time.time() - self.caught_up_at)
+
+    def sync(self) -> int:
+        """
+        Fetch the leader's changes since the last sync and write them into the replica.
+
+        :return: Number of files updated.
+        """
+        with self._lock:
+            leader_time, updates = self.source.changes(self.positions)
+            for update in updates:
+                self._apply(update)
+            self.caught_up_at = leader_time
+        metrics.set("replica_lag_seconds", self.lag)
+        return len(updates)
+
+    def ensure_current(self, max_lag: Optional[float] = None):
+        """
+        Sync now unless the replica lags by at most max_lag seconds.
+
+        :param max_lag: Tolerated lag, defaults to the follower's max_lag.
+        """
+        if self.lag > (self.max_lag if max_lag is None else max_lag):
+            self.sync()
+
+    def _apply(self, update: FileUpdate):
+        path = os.path.join(self.replica_dir, update.name)
+        journal_path = f"{path}.journal"
+        if update.snapshot is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Journal first: a reader between the two writes sees the old snapshot with newer
+            # entries and reloads once more when the snapshot changes, but never older entries
+            atomic_write_text(journal_path, update.journal.decode())
+            atomic_write_text(path, update.snapshot.decode())
+            metrics.inc("replica_snapshots_applied_total")
+        else:
+            with open(journal_path, "ab") as file:
+                file.write(update.journal)
+        self.positions[update.name] = update.position
+        metrics.inc("replica_bytes_applied_total", update.size)
+
+    def start(self):
+        """Sync every poll_interval seconds from a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-follower", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.sync()
+            except (OSError, EOFError) as e:
+                print(f"Replication from the leader failed: {e}")
+                metrics.set("replica_lag_seconds", self.lag)
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,383 @@
+"""
+Compiled workout zone schedules and location opening hours, with indexes
+across the network.
+
+A zone's schedule (day name -> list of "HH:MM" slot times) compiles into one
+integer per day with the bit of each listed slot's minute of the day set.
+The AvailabilityIndex turns these around: for every day and slot minute it
+keeps a bitmask over all zones of all locations, one bit per zone. "Which
+zones are free on Tuesday at 18:00" is then a dictionary lookup, narrowing
+to one location or to active zones is an AND with a precomputed mask, and
+questions over several slots or zones are ANDs and ORs of those masks.
+
+Opening hours (day name -> "HH:MM-HH:MM") compile into sorted, merged
+intervals of minutes since Monday 00:00. The OpeningHoursIndex splits the
+week at every interval boundary and keeps a bitmask of the locations open in
+each segment, so "which locations are open at T" is one bisection and
+checking a booking against a location's hours is a bisection over that
+location's intervals.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# 1970-01-01, the start of epoch time, was a Thursday
+_EPOCH_MINUTE_OF_WEEK = DAYS.index("Thursday") * MINUTES_PER_DAY
+
+# Half-open [start, end) range of minutes since Monday 00:00
+Interval = Tuple[int, int]
+
+
+def parse_time(value: str) -> int:
+    """
+    Convert an "HH:MM" time into minutes since midnight.
+
+    :raises ValueError: If the time is malformed or out of range.
+    """
+    hours, separator, minutes = value.partition(":")
+    if not separator or not hours.isdigit() or not minutes.isdigit():
+        raise ValueError(f"Invalid time: {value!r}")
+    minute = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or minute >= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time: {value!r}")
+    return minute
+
+
+def minute_of_week(when: Union[datetime, int]) -> int:
+    """
+    Minutes since Monday 00:00 of a time.
+
+    :param when: A datetime, or epoch seconds such as a Timestamp field's `<field>_epoch`.
+    """
+    if isinstance(when, datetime):
+        return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+    return (when // 60 + _EPOCH_MINUTE_OF_WEEK) % MINUTES_PER_WEEK
+
+
+def format_time(minute: int) -> str:
+    """Convert minutes since midnight into "HH:MM"."""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def bit_positions(mask: int) -> Iterator[int]:
+    """Positions of the set bits of a mask, lowest first"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def compile_schedule(schedule: Optional[Dict[str, List[str]]]) -> Dict[str, int]:
+    """
+    Compile a schedule into per-day slot bitmaps.
+
+    :param schedule: Day name -> slot times as "HH:MM".
+    :return: Day name -> bitmap with bit `minute of the day` set for each slot;
+        days without slots are left out, as are malformed times, which no
+        query can match.
+    """
+    bitmaps = {}
+    for day, times in (schedule or {}).items():
+        bitmap = 0
+        for time in times:
+            try:
+                bitmap |= 1 << parse_time(time)
+            except ValueError:
+                continue
+        if bitmap:
+            bitmaps[day] = bitmap
+    return bitmaps
+
+
+def slot_times(bitmap: int) -> List[str]:
+    """Slot times of a day bitmap as "HH:MM", in order"""
+    return [format_time(minute) for minute in bit_positions(bitmap)]
+
+
+def compile_opening_hours(opening_hours: Optional[Dict[str, str]]) -> List[Interval]:
+    """
+    Compile opening hours into intervals of the week.
+
+    A day's hours are "HH:MM-HH:MM", several ranges separated by commas, or
+    empty/"closed". A closing time of "24:00" means midnight, and a closing time
+    before the opening time runs past midnight into the next day.
+
+    :param opening_hours: Day name -> hours.
+    :return: Sorted, non-overlapping [start, end) intervals of minutes since Monday 00:00.
+    :raises ValueError: If a day name or time range is malformed.
+    """
+    if opening_hours is not None and not isinstance(opening_hours, dict):
+        raise ValueError(f"Opening hours must map day names to hours, not {type(opening_hours).__name__}")
+    intervals: List[Interval] = []
+    for day, hours in (opening_hours or {}).items():
+        if day not in DAYS:
+            raise ValueError(f"Invalid day: {day!r}")
+        if not hours:
+            continue
+        if not isinstance(hours, str):
+            raise ValueError(f"Invalid opening hours for {day}: {hours!r}")
+        if hours.strip().lower() == "closed":
+            continue
+        day_start = DAYS.index(day) * MINUTES_PER_DAY
+        for hours_range in hours.split(","):
+            opening, separator, closing = hours_range.strip().partition("-")
+            if not separator:
+                raise ValueError(f"Invalid opening hours for {day}: {hours!r}")
+            start = parse_time(opening.strip())
+            end = MINUTES_PER_DAY if closing.strip() == "24:00" else parse_time(closing.strip())
+            if end <= start:
+                end += MINUTES_PER_DAY
+            start, end = day_start + start, day_start + end
+            if end > MINUTES_PER_WEEK:
+                # Sunday night into Monday morning
+                intervals.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            intervals.append((start, end))
+
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _covers(intervals: List[Interval], starts: List[int], start: int, end: int) -> bool:
+    position = bisect_right(starts, start) - 1
+    return position >= 0 and intervals[position][1] >= end
+
+
+def within_intervals(
+    intervals: List[Interval],
+    start: Union[datetime, int],
+    duration: int = 0,
+    starts: Optional[List[int]] = None
+) -> bool:
+    """
+    Check whether a span lies inside compiled opening hours.
+
+    :param intervals: Result of compile_opening_hours().
+    :param start: Start as a datetime or epoch seconds.
+    :param duration: Length in minutes; 0 checks a single moment.
+    :param starts: The intervals' start minutes, if already at hand.
+    """
+    if duration >= MINUTES_PER_WEEK:
+        return intervals == [(0, MINUTES_PER_WEEK)]
+    if starts is None:
+        starts = [interval_start for interval_start, _ in intervals]
+    first = minute_of_week(start)
+    last = first + max(duration, 1)
+    if last <= MINUTES_PER_WEEK:
+        return _covers(intervals, starts, first, last)
+    return _covers(intervals, starts, first, MINUTES_PER_WEEK) and \
+        _covers(intervals, starts, 0, last - MINUTES_PER_WEEK)
+
+
+@dataclass(frozen=True)
+class ZoneRef:
+    """A workout zone together with the location it belongs to"""
+    location_id: str
+    zone: Any
+
+
+class AvailabilityIndex:
+    """Schedules of every zone in the network as per-slot zone bitmasks"""
+
+    def __init__(self, locations: Iterable[Any] = ()):
+        """
+        Build the index.
+
+        :param locations: GymLocation instances whose workout zones are indexed.
+        """
+        self._zones: List[ZoneRef] = []
+        self._ordinals: Dict[str, int] = {}
+        self._bitmaps: List[Dict[str, int]] = []  # Per zone ordinal: day -> slot bitmap
+        self._location_masks: Dict[str, int] = {}
+        self._active_mask = 0
+        self._slots: Dict[str, Dict[int, int]] = {day: {} for day in DAYS}  # Day -> minute -> zone mask
+        for location in locations:
+            for zone in location.workout_zones:
+                self._add(location, zone)
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def _add(self, location: Any, zone: Any):
+        ordinal = len(self._zones)
+        bit = 1 << ordinal
+        bitmaps = zone.slot_bitmaps()
+        self._zones.append(ZoneRef(location.id, zone))
+        self._ordinals[zone.id] = ordinal
+        self._bitmaps.append(bitmaps)
+        self._location_masks[location.id] = self._location_masks.get(location.id, 0) | bit
+        if location.is_active and zone.is_active:
+            self._active_mask |= bit
+        for day, bitmap in bitmaps.items():
+            slots = self._slots.setdefault(day, {})
+            for minute in bit_positions(bitmap):
+                slots[minute] = slots.get(minute, 0) | bit
+
+    def _scope(self, location_id: Optional[str], active_only: bool) -> int:
+        scope = self._active_mask if active_only else (1 << len(self._zones)) - 1
+        if location_id is not None:
+            scope &= self._location_masks.get(location_id, 0)
+        return scope
+
+    def _refs(self, mask: int) -> List[ZoneRef]:
+        return [self._zones[ordinal] for ordinal in bit_positions(mask)]
+
+    def available_mask(self, day: str, time: str) -> int:
+        """Bitmask of the zones with a slot at a time; bit i is the i-th indexed zone"""
+        return self._slots.get(day, {}).get(parse_time(time), 0)
+
+    def available_zones(
+        self,
+        day: str,
+        time: str,
+        location_id: Optional[str] = None,
+        active_only: bool = True
+    ) -> List[ZoneRef]:
+        """
+        Zones with a slot at a given time.
+
+        :param day: Day name, e.g. "Tuesday".
+        :param time: Slot time as "HH:MM".
+        :param location_id: Only consider zones of this location.
+        :param active_only: Skip inactive zones and zones of inactive locations.
+        :return: The matching zones with their locations.
+        """
+        return self._refs(self.available_mask(day, time) & self._scope(location_id, active_only))
+
+    def available_throughout(
+        self,
+        day: str,
+        times: Iterable[str],
+        location_id: Optional[str] = None,
+        active_only: bool = True
+    ) -> List[ZoneRef]:
+        """
+        Zones with a slot at every one of several times, e.g. for a recurring booking.
+
+        :param day: Day name.
+        :param times: Slot times as "HH:MM".
+        :param location_id: Only consider zones of this location.
+        :param active_only: Skip inactive zones and zones of inactive locations.
+        :return: The matching zones with their locations.
+        """
+        mask = self._scope(location_id, active_only)
+        for time in times:
+            mask &= self.available_mask(day, time)
+            if not mask:
+                break
+        return self._refs(mask)
+
+    def common_slots(self, zone_ids: Iterable[str], day: str) -> List[str]:
+        """
+        Slot times shared by all the given zones on a day.
+
+        :raises KeyError: If a zone is not indexed.
+        """
+        bitmap = None
+        for zone_id in zone_ids:
+            zone_bitmap = self._bitmaps[self._ordinals[zone_id]].get(day, 0)
+            bitmap = zone_bitmap if bitmap is None else bitmap & zone_bitmap
+        return slot_times(bitmap or 0)
+
+    def overlapping_zones(
+        self,
+        zone_id: str,
+        day: str,
+        location_id: Optional[str] = None,
+        active_only: bool = True
+    ) -> List[ZoneRef]:
+        """
+        Other zones with at least one slot at the same time as a zone on a day.
+
+        :raises KeyError: If the zone is not indexed.
+        """
+        ordinal = self._ordinals[zone_id]
+        slots = self._slots.get(day, {})
+        mask = 0
+        for minute in bit_positions(self._bitmaps[ordinal].get(day, 0)):
+            mask |= slots[minute]
+        return self._refs(mask & ~(1 << ordinal) & self._scope(location_id, active_only))
+
+
+class OpeningHoursIndex:
+    """Opening hours of every location as location bitmasks per segment of the week"""
+
+    def __init__(self, locations: Iterable[Any] = ()):
+        """
+        Build the index.
+
+        :param locations: GymLocation instances; inactive ones and ones whose hours do not compile are never open.
+        """
+        self._locations: List[Any] = []
+        self._ordinals: Dict[str, int] = {}
+        self._intervals: List[Tuple[List[Interval], List[int]]] = []  # Per location ordinal: intervals and their starts
+        boundaries = {0}
+        for location in locations:
+            try:
+                intervals = location.opening_intervals()
+            except ValueError as e:
+                print(f"Skipping location {location.id} in the opening hours index: {e}")
+                continue
+            self._ordinals[location.id] = len(self._locations)
+            self._locations.append(location)
+            self._intervals.append((intervals, [start for start, _ in intervals]))
+            for start, end in intervals:
+                boundaries.update((start, end))
+        # Segment i covers [self._boundaries[i], self._boundaries[i + 1])
+        self._boundaries = sorted(minute for minute in boundaries if minute < MINUTES_PER_WEEK)
+        self._open_masks = [0] * len(self._boundaries)
+        for ordinal, location in enumerate(self._locations):
+            if not location.is_active:
+                continue
+            for start, end in self._intervals[ordinal][0]:
+                first = bisect_right(self._boundaries, start) - 1
+                for segment in range(first, len(self._boundaries)):
+                    if self._boundaries[segment] >= end:
+                        break
+                    self._open_masks[segment] |= 1 << ordinal
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def open_mask(self, when: Union[datetime, int]) -> int:
+        """Bitmask of the locations open at a time; bit i is the i-th indexed location"""
+        return self._open_masks[bisect_right(self._boundaries, minute_of_week(when)) - 1]
+
+    def open_locations(self, when: Union[datetime, int]) -> List[Any]:
+        """
+        Active locations open at a time.
+
+        :param when: A datetime or epoch seconds.
+        :return: The open locations.
+        """
+        return [self._locations[ordinal] for ordinal in bit_positions(self.open_mask(when))]
+
+    def is_open(self, location_id: str, when: Union[datetime, int]) -> bool:
+        """Check whether an indexed, active location is open at a time"""
+        ordinal = self._ordinals.get(location_id)
+        return ordinal is not None and bool(self.open_mask(when) >> ordinal & 1)
+
+    def within_opening_hours(self, location_id: str, start: Union[datetime, int], duration: int = 0) -> bool:
+        """
+        Check whether a booking lies inside a location's opening hours.
+
+        :param location_id: ID of the location.
+        :param start: Start of the booking as a datetime or epoch seconds.
+        :param duration: Length of the booking in minutes.
+        :return: False for unknown or inactive locations.
+        """
+        ordinal = self._ordinals.get(location_id)
+        if ordinal is None or not self._locations[ordinal].is_active:
+            return False
+        intervals, starts = self._intervals[ordinal]
+        return within_intervals(intervals, start, duration, starts)
@@ -0,0 +1,52 @@
+"""
+Shared symbol table for repeated identifier strings.
+
+Foreign keys such as `member_id` or `location_id` repeat across millions of
+attendance and appointment records, but JSON decoding creates a new string
+for every occurrence. Fields declared with symbol() are interned through
+the shared table when records are decoded, so all records referring to the
+same entity hold one string object.
+"""
+
+import dataclasses
+from typing import Any, Dict
+
+# Field metadata key marking a field whose values are interned
+SYMBOL_METADATA = "symbol"
+
+
+def symbol(**kwargs: Any) -> Any:
+    """
+    Declare a dataclass field holding a repeated identifier.
+
+    :param kwargs: Other dataclasses.field arguments, e.g. default=None.
+    :return: The field.
+    """
+    return dataclasses.field(metadata={SYMBOL_METADATA: True}, **kwargs)
+
+
+def is_symbol(field: dataclasses.Field) -> bool:
+    """Check whether a dataclass field was declared with symbol()"""
+    return bool(field.metadata.get(SYMBOL_METADATA))
+
+
+class SymbolTable:
+    """Canonical instances of identifier strings"""
+
+    def __init__(self):
+        self._symbols: Dict[str, str] = {}
+        # Bound once so generated decoders call the dict method directly
+        self.intern = self._symbols.setdefault
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._symbols
+
+    def clear(self):
+        """Forget all symbols; strings already shared by records stay valid."""
+        self._symbols.clear()
+
+
+symbols = SymbolTable()
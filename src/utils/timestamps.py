@@ -0,0 +1,119 @@
+"""
+Timestamps stored as integer epoch seconds.
+
+A model field declared with a Timestamp descriptor keeps whole seconds since
+1970-01-01 in the naive local wall-clock time used throughout the system, and
+only builds the `datetime` when the field is read, caching it on the instance.
+The integer is available as `<field>_epoch` (e.g. `record.check_in_time_epoch`),
+which is what filters, sorted indexes and the codecs work with, and what is
+persisted. Assigning a datetime, date, ISO string or int is accepted;
+sub-second precision is dropped.
+"""
+
+from dataclasses import MISSING
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Tuple, Union
+
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+_SECOND = timedelta(seconds=1)
+
+TimestampValue = Union[datetime, date, str, int]
+
+
+def to_epoch(value: TimestampValue, round_up: bool = False) -> int:
+    """
+    Convert a timestamp into epoch seconds.
+
+    :param value: A datetime (aware ones are converted to local time), a date
+        (its midnight), an ISO-format string or epoch seconds.
+    :param round_up: Round a fractional second up instead of down, e.g. for
+        the lower bound of a range.
+    :return: Seconds since the epoch.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        seconds = (value - EPOCH) // _SECOND
+        return seconds + 1 if round_up and value.microsecond else seconds
+    if isinstance(value, date):
+        return (value - EPOCH.date()).days * SECONDS_PER_DAY
+    if isinstance(value, str):
+        return to_epoch(datetime.fromisoformat(value), round_up)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise TypeError(f"Cannot convert {type(value).__name__} to a timestamp")
+
+
+def from_epoch(seconds: int) -> datetime:
+    """Convert epoch seconds into a naive datetime"""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def day_range(day: Union[datetime, date]) -> Tuple[int, int]:
+    """
+    Epoch seconds covering one calendar day.
+
+    :param day: The day, or any time on it.
+    :return: Start (inclusive) and end (exclusive) of the day.
+    """
+    start = to_epoch(day.date() if isinstance(day, datetime) else day)
+    return start, start + SECONDS_PER_DAY
+
+
+class Timestamp:
+    """
+    Dataclass field descriptor storing a datetime as epoch seconds.
+
+    Declare it as the field's default: `check_in_time: datetime = Timestamp()`
+    for a required field, `Timestamp(default=None)` for an optional one.
+    """
+
+    def __init__(self, default: Any = MISSING):
+        self.default = default
+        self.name = ""
+        self.epoch_attribute = ""
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        self.epoch_attribute = f"{name}_epoch"
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            # Dataclasses read the default through class access
+            if self.default is MISSING:
+                raise AttributeError(self.name)
+            return self.default
+        # The instance dict slot under the field's own name is shadowed by this
+        # data descriptor, so it holds the materialized datetime
+        values = instance.__dict__
+        try:
+            return values[self.name]
+        except KeyError:
+            pass
+        try:
+            seconds = values[self.epoch_attribute]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        value = values[self.name] = None if seconds is None else EPOCH + timedelta(seconds=seconds)
+        return value
+
+    def __set__(self, instance: Any, value: Optional[TimestampValue]):
+        values = instance.__dict__
+        values.pop(self.name, None)
+        values[self.epoch_attribute] = value if value is None or type(value) is int else to_epoch(value)
+
+
+def timestamp_field(cls: type, name: str) -> Optional[Timestamp]:
+    """
+    Get the Timestamp descriptor of a field.
+
+    :param cls: Model class.
+    :param name: Field name.
+    :return: The descriptor, or None if the field is not a Timestamp.
+    """
+    for klass in getattr(cls, "__mro__", ()):
+        if name in klass.__dict__:
+            attribute = klass.__dict__[name]
+            return attribute if isinstance(attribute, Timestamp) else None
+    return None
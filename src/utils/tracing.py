@@ -0,0 +1,188 @@
+"""
+Sampled tracing of the service -> repository -> disk I/O path.
+
+Spans nest through a context variable. Sampling is decided once per root span,
+and finished traces are appended to a trace log in Chrome trace-event format.
+The log can be opened directly in chrome://tracing or Perfetto.
+"""
+
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from .config import Config
+
+
+class _NullSpan:
+    """Span used when tracing is off or the trace was not sampled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **args):
+        """Attach arguments to the span (ignored)."""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Trace:
+    """Spans collected for one sampled root span"""
+
+    def __init__(self):
+        self.events: List[dict] = []
+
+
+class _UnsampledRoot(_NullSpan):
+    """Marks a root span that was not sampled, so its children are skipped too"""
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """A timed, named section of a sampled trace"""
+
+    def __init__(self, tracer: "Tracer", name: str, trace: _Trace, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.trace = trace
+        self.args = args
+        self.is_root = False
+
+    def set(self, **args):
+        """Attach arguments to the span, e.g. the number of rows scanned."""
+        self.args.update(args)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self._start_us = time.time_ns() // 1000
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.events.append({
+            "name": self.name,
+            "cat": self.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": self._start_us,
+            "dur": round(duration * 1_000_000, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        if self.is_root and duration * 1000 >= self.tracer.slow_threshold_ms:
+            self.tracer.write(self.trace.events)
+        return False
+
+
+_current_span: ContextVar[Optional[object]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and writes sampled traces to a Chrome trace-event log"""
+
+    def __init__(self, path: str, sample_rate: float = 0.0, slow_threshold_ms: float = 0.0):
+        """
+        Initialize the tracer.
+
+        :param path: Trace log file, appended to.
+        :param sample_rate: Fraction of root spans to trace, 0 disables tracing.
+        :param slow_threshold_ms: Only write traces whose root span took at least this long.
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Check whether any spans are sampled"""
+        return self.sample_rate > 0
+
+    def span(self, name: str, **args):
+        """
+        Open a span as a context manager.
+
+        :param name: Dotted span name, e.g. "repository.write"; the first part is the category.
+        :param args: Arguments recorded with the span.
+        """
+        if self.sample_rate <= 0:
+            return _NULL_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return _UnsampledRoot()
+            span = Span(self, name, _Trace(), args)
+            span.is_root = True
+            return span
+        if isinstance(parent, Span):
+            return Span(self, name, parent.trace, args)
+        return _NULL_SPAN
+
+    def write(self, events: List[dict]):
+        """
+        Append finished spans to the trace log.
+
+        The log is a JSON array whose closing bracket is omitted, which the
+        trace viewers accept, so it can be appended to by several processes.
+        """
+        text = "".join(json.dumps(event, default=str) + ",\n" for event in events)
+        with self._lock:
+            with open(self.path, 'a') as file:
+                if file.tell() == 0:
+                    text = "[\n" + text
+                file.write(text)
+
+
+tracer = Tracer(Config.TRACE_FILE, Config.TRACE_SAMPLE_RATE, Config.TRACE_SLOW_MS)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator running a function inside a span.
+
+    :param name: Span name, defaults to the function's qualified name.
+    """
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(span_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def trace_service(cls):
+    """
+    Class decorator opening a span around every public method.
+
+    Classes are left unchanged when tracing is disabled at decoration time.
+    """
+    if not tracer.enabled:
+        return cls
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.isfunction(member):
+            setattr(cls, name, traced(f"service.{cls.__name__}.{name}")(member))
+    return cls
@@ -0,0 +1,93 @@
+"""
+Model builders and fixtures shared by the tests.
+"""
+
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime
+from src.models.appointment import Appointment, AppointmentType
+from src.models.attendance import AttendanceRecord
+from src.models.common import Address
+from src.models.location import GymLocation, WorkoutZone
+from src.models.member import HealthInformation, Member, MembershipType
+
+ADDRESS = Address(street="1 High St", city="Leeds", state="WY", postal_code="LS1", country="UK")
+CHECK_IN_TIME = datetime(2025, 1, 2, 6)
+
+
+def make_member(index: int = 1, **changes) -> Member:
+    """A regular member with unique names and email per index, with the given fields changed."""
+    member = Member(
+        first_name=f"First{index}",
+        last_name=f"Last{index}",
+        email=f"member{index}@example.com",
+        phone="0113 000 0000",
+        address=ADDRESS,
+        membership_type=MembershipType.REGULAR,
+        health_info=HealthInformation(
+            height=180.0,
+            weight=75.0,
+            medical_conditions=[],
+            emergency_contact_name="Contact",
+            emergency_contact_phone="0113 111 1111",
+        ),
+    )
+    return replace(member, **changes) if changes else member
+
+
+def make_zone(name: str = "Studio", **changes) -> WorkoutZone:
+    """A workout zone for 20 people, with the given fields changed."""
+    zone = WorkoutZone(name=name, type="studio", capacity=20, equipment=[], attendant_id=None)
+    return replace(zone, **changes) if changes else zone
+
+
+def make_location(name: str = "Central", zone_names=(), **changes) -> GymLocation:
+    """A location with one zone per name, with the given fields changed."""
+    location = GymLocation(
+        name=name,
+        address=ADDRESS,
+        manager_id="manager",
+        workout_zones=[make_zone(zone_name) for zone_name in zone_names],
+        amenities=[],
+        total_capacity=100,
+        contact_phone="0113 222 2222",
+        contact_email="gym@example.com",
+        opening_hours={"Monday": "06:00-22:00"},
+    )
+    return replace(location, **changes) if changes else location
+
+
+def make_attendance(check_in_time: datetime = CHECK_IN_TIME, **changes) -> AttendanceRecord:
+    """A visit of member "m1" at location "central", with the given fields changed."""
+    fields = dict(member_id="m1", location_id="central", check_in_time=check_in_time)
+    fields.update(changes)
+    return AttendanceRecord(**fields)
+
+
+def make_appointment(start_time: datetime = datetime(2030, 1, 7, 10), **changes) -> Appointment:
+    """A 60-minute personal training session of member "m1" with trainer "t1", with the given fields changed."""
+    fields = dict(
+        member_id="m1",
+        trainer_id="t1",
+        location_id="central",
+        appointment_type=AppointmentType.PERSONAL_TRAINING,
+        start_time=start_time,
+        duration=60,
+    )
+    fields.update(changes)
+    return Appointment(**fields)
+
+
+class DataDirTestCase(unittest.TestCase):
+    """A test case with a fresh, empty data directory in self.data_dir"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = tmp.name
+
+    def path(self, *names: str) -> str:
+        """Path of a file in the data directory."""
+        return os.path.join(self.data_dir, *names)
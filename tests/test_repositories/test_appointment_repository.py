@@ -0,0 +1,78 @@
+"""
+Tests for appointment status changes and the versions readers see of them.
+"""
+
+import unittest
+from dataclasses import replace
+from datetime import datetime
+from src.models.appointment import AppointmentStatus
+from src.repositories.appointment_repository import AppointmentRepository
+from src.utils.events import ChangeType, EventBus
+from tests.helpers import DataDirTestCase, make_appointment
+
+
+class AppointmentRepositoryTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bus = EventBus()
+        self.repository = AppointmentRepository(self.path("appointments.json"), event_bus=self.bus)
+        self.appointment = self.repository.schedule_appointment(make_appointment())
+
+    def test_cancel_leaves_open_snapshots_unchanged(self):
+        with self.repository.snapshot() as snapshot:
+            self.assertTrue(self.repository.cancel_appointment(self.appointment.id, "ill"))
+            self.assertEqual(snapshot.get_by_id(self.appointment.id).status, AppointmentStatus.SCHEDULED)
+        stored = self.repository.get_by_id(self.appointment.id)
+        self.assertEqual((stored.status, stored.notes), (AppointmentStatus.CANCELLED, "Cancelled: ill"))
+        self.assertFalse(self.repository.cancel_appointment(self.appointment.id))
+
+    def test_complete_leaves_open_snapshots_unchanged(self):
+        self.repository.update(replace(self.appointment, status=AppointmentStatus.IN_PROGRESS))
+        with self.repository.snapshot() as snapshot:
+            self.assertTrue(self.repository.complete_appointment(self.appointment.id, "done"))
+            self.assertEqual(snapshot.get_by_id(self.appointment.id).status, AppointmentStatus.IN_PROGRESS)
+        self.assertEqual(self.repository.get_by_id(self.appointment.id).status, AppointmentStatus.COMPLETED)
+        self.assertFalse(self.repository.complete_appointment(self.appointment.id))
+
+    def test_status_changes_are_persisted(self):
+        self.repository.cancel_appointment(self.appointment.id)
+        reopened = AppointmentRepository(self.path("appointments.json"), event_bus=EventBus())
+        self.assertEqual(reopened.get_by_id(self.appointment.id).status, AppointmentStatus.CANCELLED)
+
+    def test_status_change_events_carry_the_previous_version(self):
+        events = []
+        self.bus.subscribe(events.append, "appointment")
+        self.repository.cancel_appointment(self.appointment.id)
+
+        self.assertEqual([event.change_type for event in events], [ChangeType.UPDATED])
+        self.assertEqual(events[0].before.status, AppointmentStatus.SCHEDULED)
+        self.assertEqual(events[0].after.status, AppointmentStatus.CANCELLED)
+        self.assertIs(events[0].before, self.appointment)
+
+    def test_flush_moves_records_changed_in_place_within_the_page_order(self):
+        later = self.repository.schedule_appointment(make_appointment(datetime(2030, 1, 7, 11)))
+        page = self.repository.find_page("start_time")
+        self.assertEqual([item.id for item in page.items], [self.appointment.id, later.id])
+
+        self.appointment.start_time = datetime(2030, 1, 7, 12)
+        self.appointment.update()
+        self.repository.flush()
+        page = self.repository.find_page("start_time")
+        self.assertEqual([item.id for item in page.items], [later.id, self.appointment.id])
+        reopened = AppointmentRepository(self.path("appointments.json"), event_bus=EventBus())
+        self.assertEqual(reopened.get_by_id(self.appointment.id).start_time, datetime(2030, 1, 7, 12))
+
+    def test_replaced_record_no_longer_marks_changes(self):
+        stale = self.appointment
+        self.repository.update(replace(stale, notes="current"))
+        stale.notes = "stale"
+        stale.update()
+        self.repository.flush()
+
+        reopened = AppointmentRepository(self.path("appointments.json"), event_bus=EventBus())
+        self.assertEqual(reopened.get_by_id(stale.id).notes, "current")
+
+
+if __name__ == "__main__":
+    unittest.main()
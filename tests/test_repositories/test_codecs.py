@@ -0,0 +1,137 @@
+"""
+Tests for the generated model codecs and how repositories load records they cannot decode.
+"""
+
+import contextlib
+import io
+import json
+import unittest
+from dataclasses import replace
+from datetime import datetime
+from src.models.appointment import Appointment, AppointmentStatus, AppointmentType
+from src.models.attendance import AttendanceRecord
+from src.models.member import Member, MembershipType
+from src.repositories.attendance_repository import AttendanceRepository
+from src.repositories.member_repository import MemberRepository
+from src.utils.codec import codec_for
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase, make_attendance, make_location, make_member, make_zone
+
+
+def make_premium_member() -> Member:
+    member = make_member(membership_type=MembershipType.PREMIUM, home_location_id="central")
+    member.health_info = replace(
+        member.health_info, medical_conditions=["asthma"], last_health_check=datetime(2025, 3, 1, 9, 30)
+    )
+    return member
+
+
+def round_trip(item):
+    codec = codec_for(type(item))
+    return codec.decode(json.loads(json.dumps(codec.encode(item))))
+
+
+class CodecRoundTripTest(unittest.TestCase):
+
+    def test_member(self):
+        member = make_premium_member()
+        decoded = round_trip(member)
+        self.assertEqual(decoded, member)
+        self.assertIs(decoded.membership_type, MembershipType.PREMIUM)
+        self.assertEqual(decoded.health_info.last_health_check, datetime(2025, 3, 1, 9, 30))
+
+    def test_location_with_zones(self):
+        zone = make_zone(equipment=["bikes"], schedule={"Monday": ["07:00", "18:00"]})
+        location = make_location(workout_zones=[zone], amenities=["sauna"])
+        decoded = round_trip(location)
+        self.assertEqual(decoded, location)
+        self.assertEqual(decoded.workout_zones[0].schedule, {"Monday": ["07:00", "18:00"]})
+
+    def test_attendance_record(self):
+        record = make_attendance(datetime(2025, 1, 2, 7, 15))
+        decoded = round_trip(record)
+        self.assertEqual(decoded, record)
+        self.assertIsNone(decoded.check_out_time)
+        self.assertTrue(decoded.is_active())
+
+    def test_appointment(self):
+        appointment = Appointment(
+            member_id="m1",
+            trainer_id="t1",
+            location_id="central",
+            appointment_type=AppointmentType.CONSULTATION,
+            start_time=datetime(2025, 1, 2, 10),
+            duration=45,
+            status=AppointmentStatus.COMPLETED,
+        )
+        decoded = round_trip(appointment)
+        self.assertEqual(decoded, appointment)
+        self.assertIs(decoded.status, AppointmentStatus.COMPLETED)
+
+
+class CodecOlderRecordsTest(unittest.TestCase):
+
+    def test_address_without_country(self):
+        row = codec_for(Member).encode(make_member())
+        del row["address"]["country"]
+        member = codec_for(Member).decode(row)
+        self.assertEqual(member.address.country, "")
+        self.assertEqual(str(member.address), "1 High St, Leeds, WY LS1")
+
+    def test_missing_fields_take_their_defaults(self):
+        row = codec_for(Member).encode(make_member())
+        for name in ("home_location_id", "is_active", "updated_at"):
+            del row[name]
+        member = codec_for(Member).decode(row)
+        self.assertIsNone(member.home_location_id)
+        self.assertTrue(member.is_active)
+        self.assertIsNone(member.updated_at)
+
+    def test_decode_many_skips_rows_that_do_not_fit(self):
+        codec = codec_for(Member)
+        good = codec.encode(make_member())
+        missing_email = codec.encode(make_member())
+        del missing_email["email"]
+        unknown_type = dict(codec.encode(make_member()), membership_type="platinum")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            members = codec.decode_many([good, missing_email, unknown_type, "not a record"], "members.json")
+
+        self.assertEqual([member.id for member in members], [good["id"]])
+        report = output.getvalue()
+        self.assertIn(f"{missing_email['id']} at position 1 in members.json", report)
+        self.assertIn(f"{unknown_type['id']} at position 2 in members.json", report)
+        self.assertIn("position 3", report)
+
+
+class RepositoryLoadTest(DataDirTestCase):
+
+    def test_member_file_from_before_country(self):
+        rows = [codec_for(Member).encode(make_member()) for _ in range(3)]
+        for row in rows:
+            del row["address"]["country"]
+        path = self.path("members.json")
+        with open(path, "w") as file:
+            json.dump(rows, file)
+
+        repository = MemberRepository(path, event_bus=EventBus())
+        self.assertEqual(len(repository.get_all()), 3)
+
+    def test_bad_rows_and_journal_entries_are_skipped(self):
+        codec = codec_for(AttendanceRecord)
+        records = [make_attendance(member_id=f"m{index}") for index in range(3)]
+        rows = [codec.encode(record) for record in records]
+        del rows[1]["member_id"]
+        path = self.path("attendance.json")
+        with open(path, "w") as file:
+            json.dump(rows, file)
+        with open(f"{path}.journal", "w") as file:
+            file.write(json.dumps({"op": "put", "item": {"id": "broken"}}) + "\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            repository = AttendanceRepository(path, event_bus=EventBus())
+        self.assertEqual([record.id for record in repository.get_all()], [records[0].id, records[2].id])
+
+
+if __name__ == "__main__":
+    unittest.main()
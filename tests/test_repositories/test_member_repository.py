@@ -0,0 +1,119 @@
+"""
+Tests for member persistence through the snapshot file and its change journal.
+"""
+
+import json
+import os
+import unittest
+from dataclasses import replace
+from unittest import mock
+from src.repositories.member_repository import MemberRepository
+from src.utils.config import Config
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase, make_member
+
+
+class MemberRepositoryJournalTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.path("members.json")
+        self.journal_path = f"{self.file_path}.journal"
+        self.repository = self.open()
+
+    def open(self) -> MemberRepository:
+        return MemberRepository(self.file_path, event_bus=EventBus())
+
+    def journal_entries(self) -> list:
+        with open(self.journal_path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def snapshot_rows(self) -> list:
+        with open(self.file_path) as file:
+            return json.load(file)
+
+    def test_writes_are_appended_to_the_journal(self):
+        first, second = make_member(1), make_member(2)
+        self.repository.add_many([first, second])
+        self.repository.update(replace(first, phone="0113 222 2222"))
+        self.repository.delete(second.id)
+
+        self.assertEqual(self.snapshot_rows(), [])
+        self.assertEqual([entry["op"] for entry in self.journal_entries()], ["put", "put", "put", "delete"])
+
+    def test_new_instance_replays_the_journal(self):
+        first, second = make_member(1), make_member(2)
+        self.repository.add_many([first, second])
+        self.repository.update(replace(first, phone="0113 222 2222"))
+        self.repository.delete(second.id)
+
+        reopened = self.open()
+        self.assertEqual([member.id for member in reopened.get_all()], [first.id])
+        self.assertEqual(reopened.get_by_id(first.id).phone, "0113 222 2222")
+        self.assertEqual(reopened.get_by_id(first.id).address, first.address)
+
+    def test_in_place_update_is_journalled_by_flush(self):
+        member = make_member(1)
+        self.repository.add(member)
+        member.email = "changed@example.com"
+        member.update()
+        self.repository.flush()
+
+        self.assertEqual(self.open().get_by_id(member.id).email, "changed@example.com")
+
+    def test_open_instance_catches_up_with_appended_entries(self):
+        other = self.open()
+        member = make_member(1)
+        self.repository.add(member)
+
+        self.assertIsNotNone(other.get_by_id(member.id))
+        self.repository.delete(member.id)
+        self.assertIsNone(other.get_by_id(member.id))
+
+    def test_partially_written_entry_is_read_once_complete(self):
+        self.repository.add(make_member(1))
+        late = make_member(2)
+        line = json.dumps({"op": "put", "item": self.repository._serialize(late)}) + "\n"
+        with open(self.journal_path, "a") as file:
+            file.write(line[:20])
+
+        reopened = self.open()
+        self.assertEqual(len(reopened.get_all()), 1)
+        with open(self.journal_path, "a") as file:
+            file.write(line[20:])
+        self.assertIsNotNone(reopened.get_by_id(late.id))
+
+    def test_compaction_rewrites_the_file_and_empties_the_journal(self):
+        other = self.open()
+        members = [make_member(index) for index in range(4)]
+        with mock.patch.object(Config, "JOURNAL_COMPACT_MIN_ENTRIES", 3), \
+                mock.patch.object(Config, "JOURNAL_COMPACT_RATIO", 0):
+            for member in members:
+                self.repository.add(member)
+
+        self.assertEqual(self.journal_entries(), [])
+        self.assertEqual(sorted(row["id"] for row in self.snapshot_rows()), sorted(member.id for member in members))
+        self.assertEqual(sorted(member.id for member in other.get_all()), sorted(member.id for member in members))
+        self.assertEqual(len(self.open().get_all()), len(members))
+
+    def test_explicit_compaction(self):
+        member = make_member(1)
+        self.repository.add(member)
+        self.repository.update(replace(member, last_name="Compacted"))
+        self.repository.compact()
+
+        self.assertEqual(self.journal_entries(), [])
+        self.assertEqual([row["last_name"] for row in self.snapshot_rows()], ["Compacted"])
+        self.assertEqual(self.open().get_by_id(member.id).last_name, "Compacted")
+
+    def test_deleted_journal_is_treated_as_empty(self):
+        member = make_member(1)
+        self.repository.add(member)
+        self.repository.compact()
+        os.remove(self.journal_path)
+
+        self.assertEqual([loaded.id for loaded in self.open().get_all()], [member.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the per-member activity statistics kept from attendance and appointment events.
+"""
+
+import os
+import unittest
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta
+from src.models.appointment import AppointmentStatus
+from src.repositories.appointment_repository import AppointmentRepository
+from src.repositories.attendance_repository import AttendanceRepository
+from src.repositories.member_stats_repository import MemberStatsRepository
+from src.utils.events import EventBus
+from tests.helpers import CHECK_IN_TIME, DataDirTestCase, make_appointment, make_attendance
+
+
+def rows(repository: MemberStatsRepository) -> list:
+    return sorted((asdict(stats) for stats in repository.get_all()), key=lambda row: row["member_id"])
+
+
+class MemberStatsRepositoryTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bus = EventBus()
+        self.attendance = AttendanceRepository(self.path("attendance.json"), event_bus=self.bus)
+        self.appointments = AppointmentRepository(self.path("appointments.json"), event_bus=self.bus)
+        self.stats = self.open_stats()
+
+    def open_stats(self, **kwargs) -> MemberStatsRepository:
+        repository = MemberStatsRepository(self.path("member_stats.json"), event_bus=self.bus, **kwargs)
+        self.addCleanup(repository.close)
+        return repository
+
+    def record_activity(self):
+        """m1: a finished 90-minute visit, an open visit, a completed and a pending appointment; m2: a cancellation."""
+        finished = self.attendance.add(make_attendance())
+        self.attendance.update(replace(finished, check_out_time=CHECK_IN_TIME + timedelta(minutes=90)))
+        self.attendance.add(make_attendance(CHECK_IN_TIME + timedelta(days=1)))
+        completed = self.appointments.add(make_appointment())
+        self.appointments.update(replace(completed, status=AppointmentStatus.COMPLETED))
+        self.appointments.add(make_appointment(datetime(2030, 1, 8, 10)))
+        cancelled = self.appointments.add(make_appointment(member_id="m2"))
+        self.appointments.update(replace(cancelled, status=AppointmentStatus.CANCELLED))
+
+    def test_events_keep_the_totals(self):
+        self.record_activity()
+        m1 = self.stats.get_by_member_id("m1")
+        self.assertEqual((m1.visit_count, m1.completed_visits, m1.total_visit_minutes), (2, 1, 90))
+        self.assertEqual(m1.last_visit, CHECK_IN_TIME + timedelta(days=1))
+        self.assertEqual((m1.appointments_booked, m1.appointments_completed), (2, 1))
+        self.assertEqual((len(m1.open_visits), len(m1.pending_appointments)), (1, 1))
+        self.assertEqual(self.stats.get_by_member_id("m2").appointments_cancelled, 1)
+
+    def test_each_resolution_is_counted_once(self):
+        appointment = self.appointments.add(make_appointment())
+        completed = replace(appointment, status=AppointmentStatus.COMPLETED)
+        self.appointments.update(completed)
+        self.appointments.update(replace(completed, notes="Late"))
+        self.assertEqual(self.stats.get_by_member_id("m1").appointments_completed, 1)
+
+        pending = self.appointments.add(make_appointment(datetime(2030, 1, 8, 10)))
+        self.appointments.delete(pending.id)
+        self.assertEqual(self.stats.get_by_member_id("m1").pending_appointments, {})
+
+    def test_rebuild_matches_the_event_totals(self):
+        self.record_activity()
+        expected = rows(self.stats)
+        self.stats.rebuild(self.attendance.get_all(), self.appointments.get_all())
+        self.assertEqual(rows(self.stats), expected)
+        self.assertEqual(rows(self.open_stats()), expected)
+
+    def test_changes_are_journaled_and_read_by_other_instances(self):
+        self.attendance.add(make_attendance())
+        other = self.open_stats()
+        other.close()
+        size = os.path.getsize(self.path("member_stats.json"))
+
+        self.attendance.add(make_attendance(CHECK_IN_TIME + timedelta(days=1)))
+        self.assertEqual(os.path.getsize(self.path("member_stats.json")), size)
+        self.assertGreater(os.path.getsize(self.path("member_stats.json.journal")), 0)
+        self.assertEqual(other.get_by_member_id("m1").visit_count, 2)
+
+    def test_snapshots_keep_the_previous_totals(self):
+        self.attendance.add(make_attendance())
+        with self.stats.snapshot() as snapshot:
+            self.attendance.add(make_attendance(CHECK_IN_TIME + timedelta(days=1)))
+            self.assertEqual(snapshot.get_by_id("m1").visit_count, 1)
+        self.assertEqual(self.stats.get_by_member_id("m1").visit_count, 2)
+
+    def test_missing_table_is_rebuilt_from_the_source(self):
+        self.record_activity()
+        expected = rows(self.stats)
+        self.stats.close()
+        os.remove(self.path("member_stats.json"))
+
+        def source():
+            return self.attendance.get_all(), self.appointments.get_all()
+        stats = self.open_stats(source=source)
+        self.assertEqual(rows(stats), expected)
+        self.assertTrue(os.path.exists(self.path("member_stats.json")))
+
+        os.remove(self.path("member_stats.json"))
+        self.assertEqual(stats.get_by_member_id("m1").visit_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for keyset pagination through the repositories' sort indexes.
+"""
+
+import unittest
+from datetime import timedelta
+from unittest import mock
+from src.repositories.attendance_repository import AttendanceRepository
+from src.utils.events import EventBus
+from src.utils.pagination import SortedIndex
+from tests.helpers import CHECK_IN_TIME, DataDirTestCase, make_attendance
+
+
+class FindPageTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repository = self.open()
+        self.records = [make_attendance(CHECK_IN_TIME + timedelta(hours=hour)) for hour in range(5)]
+        self.repository.add_many(self.records)
+
+    def open(self) -> AttendanceRepository:
+        return AttendanceRepository(self.path("attendance.json"), event_bus=EventBus())
+
+    def ids(self, page) -> list:
+        return [record.id for record in page.items]
+
+    def test_pages_continue_after_the_cursor(self):
+        first = self.repository.find_page("check_in_time", limit=2)
+        second = self.repository.find_page("check_in_time", first.next_cursor, limit=2)
+        last = self.repository.find_page("check_in_time", second.next_cursor, limit=2)
+
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(last), [record.id for record in self.records])
+        self.assertIsNone(last.next_cursor)
+
+    def test_descending_order_and_inclusive_bounds(self):
+        page = self.repository.find_page(
+            "check_in_time", descending=True, start=self.records[1].check_in_time, end=self.records[3].check_in_time
+        )
+        self.assertEqual(self.ids(page), [record.id for record in reversed(self.records[1:4])])
+
+    def test_writes_keep_the_index_current(self):
+        self.repository.find_page("check_in_time")
+        earliest = self.repository.add(make_attendance(CHECK_IN_TIME - timedelta(hours=1)))
+        self.repository.delete(self.records[0].id)
+
+        page = self.repository.find_page("check_in_time", limit=2)
+        self.assertEqual(self.ids(page), [earliest.id, self.records[1].id])
+
+    def test_declared_orderings_are_sorted_as_the_data_loads(self):
+        reopened = self.open()
+        with mock.patch("src.repositories.base_repository.SortedIndex", wraps=SortedIndex) as built:
+            page = reopened.find_page("check_in_time", limit=1)
+        built.assert_not_called()
+        self.assertEqual(self.ids(page), [self.records[0].id])
+
+    def test_requested_orderings_are_rebuilt_on_reload(self):
+        self.repository.find_page("member_id")
+        other = self.open()
+        late = other.add(make_attendance(CHECK_IN_TIME, member_id="m0"))
+        other.compact()
+
+        self.assertTrue(self.repository.refresh())
+        with mock.patch("src.repositories.base_repository.SortedIndex", wraps=SortedIndex) as built:
+            page = self.repository.find_page("member_id", limit=1)
+        built.assert_not_called()
+        self.assertEqual(self.ids(page), [late.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for the memory-mapped read cache of members, locations and zones.
+"""
+
+import os
+import unittest
+from dataclasses import replace
+from src.repositories.location_repository import LocationRepository
+from src.repositories.member_repository import MemberRepository
+from src.utils.events import EventBus
+from src.utils.read_cache import (
+    BOOL, INT, LOCATIONS_IMAGE, MEMBERS_IMAGE, STR, ZONES_IMAGE, LocationEntry, MemberEntry, ReadCache,
+    ReadCachePublisher, TableImage
+)
+from tests.helpers import DataDirTestCase, make_location, make_member
+
+
+class TableImageTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.image_path = self.path("table.image")
+        self.kinds = (STR, STR, INT, BOOL)
+
+    def test_round_trip(self):
+        rows = [("b", None, -5, True), ("a", "Zoë", 2 ** 40, False), ("a/1", "", 0, True)]
+        TableImage.write(self.image_path, self.kinds, rows)
+        image = TableImage(self.image_path, self.kinds)
+
+        self.assertEqual(len(image), 3)
+        self.assertEqual(list(image), sorted(rows))
+        self.assertEqual(image.get("b"), ("b", None, -5, True))
+        self.assertEqual(image.get("a"), ("a", "Zoë", 2 ** 40, False))
+        self.assertIsNone(image.get("c"))
+        self.assertEqual(image.with_prefix("a/"), [("a/1", "", 0, True)])
+        image.close()
+
+    def test_missing_image_reads_as_empty(self):
+        image = TableImage(self.image_path, self.kinds)
+        self.assertEqual(len(image), 0)
+        self.assertIsNone(image.get("a"))
+        self.assertEqual(image.with_prefix("a"), [])
+
+    def test_open_reader_sees_the_replacing_image(self):
+        TableImage.write(self.image_path, self.kinds, [("a", "first", 1, True)])
+        image = TableImage(self.image_path, self.kinds)
+        self.assertEqual(image.get("a")[1], "first")
+
+        TableImage.write(self.image_path, self.kinds, [("a", "second", 1, True), ("b", "new", 2, False)])
+        self.assertEqual(image.get("a")[1], "second")
+        self.assertEqual(image.generation, 2)
+        self.assertEqual(len(image), 2)
+        image.close()
+
+    def test_image_of_other_columns_is_rejected(self):
+        TableImage.write(self.image_path, self.kinds, [("a", "first", 1, True)])
+        with self.assertRaises(ValueError):
+            TableImage(self.image_path, (STR, INT)).get("a")
+
+
+class ReadCachePublisherTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.path("cache")
+        bus = EventBus()
+        self.members = MemberRepository(self.path("members.json"), event_bus=bus)
+        self.locations = LocationRepository(self.path("locations.json"), event_bus=bus)
+        self.location = self.locations.add(make_location("Central", ["Studio", "Pool"]))
+        self.member = self.members.add(make_member(1, home_location_id=self.location.id))
+        self.publisher = ReadCachePublisher(self.members, self.locations, self.cache_dir, delay=60)
+        self.cache = ReadCache(self.cache_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        self.publisher.close()
+
+    def test_images_are_published_when_missing(self):
+        for name in (MEMBERS_IMAGE, LOCATIONS_IMAGE, ZONES_IMAGE):
+            self.assertTrue(os.path.exists(os.path.join(self.cache_dir, name)))
+
+    def test_lookups(self):
+        self.assertEqual(self.cache.get_member(self.member.id),
+                         MemberEntry(self.member.id, "First1 Last1", True, self.location.id))
+        self.assertEqual(self.cache.get_location(self.location.id),
+                         LocationEntry(self.location.id, "Central", 100, True))
+        zones = self.cache.get_zones(self.location.id)
+        self.assertEqual(sorted(zone.name for zone in zones), ["Pool", "Studio"])
+        zone = self.location.workout_zones[0]
+        self.assertEqual(self.cache.get_zone(self.location.id, zone.id).capacity, 20)
+
+    def test_unknown_ids(self):
+        self.assertIsNone(self.cache.get_member("unknown"))
+        self.assertIsNone(self.cache.get_location("unknown"))
+        self.assertIsNone(self.cache.get_zone(self.location.id, "unknown"))
+        self.assertEqual(self.cache.get_zones("unknown"), [])
+
+    def test_changes_are_published_to_open_readers(self):
+        self.assertTrue(self.cache.get_member(self.member.id).is_active)
+        self.members.update(replace(self.member, is_active=False))
+        other = self.members.add(make_member(2))
+        self.assertIsNone(self.cache.get_member(other.id))
+
+        # Pending changes are written when the publisher stops following them
+        self.publisher.close()
+        self.assertFalse(self.cache.get_member(self.member.id).is_active)
+        self.assertIsNone(self.cache.get_member(other.id).home_location_id)
+
+    def test_existing_images_are_not_rewritten_on_start(self):
+        self.assertIsNotNone(self.cache.get_member(self.member.id))
+        generation = self.cache.members.generation
+        ReadCachePublisher(self.members, self.locations, self.cache_dir).close()
+        self.assertIsNotNone(self.cache.get_member(self.member.id))
+        self.assertEqual(self.cache.members.generation, generation)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for repositories partitioned into one file per location.
+"""
+
+import os
+import unittest
+from dataclasses import replace
+from datetime import timedelta
+from src.cli import shard_data
+from src.models.attendance import AttendanceRecord
+from src.repositories.attendance_repository import AttendanceRepository
+from src.repositories.member_repository import MemberRepository
+from src.repositories.sharded_repository import UNASSIGNED_SHARD, ShardedRepository, shard_directory
+from src.utils.events import EventBus
+from tests.helpers import CHECK_IN_TIME, DataDirTestCase, make_attendance, make_member
+
+
+def make_record(location_id: str, hour: int = 0) -> AttendanceRecord:
+    return make_attendance(CHECK_IN_TIME + timedelta(hours=hour), location_id=location_id)
+
+
+class ShardedRepositoryTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repository = self.open()
+
+    def open(self) -> ShardedRepository:
+        return ShardedRepository(AttendanceRepository, self.data_dir, "attendance.json", event_bus=EventBus())
+
+    def shard_ids(self, key) -> list:
+        path = os.path.join(shard_directory(self.data_dir, key), "attendance.json")
+        return [record.id for record in AttendanceRepository(path, event_bus=EventBus()).get_all()]
+
+    def test_items_are_written_to_the_shard_of_their_location(self):
+        north, south = make_record("north"), make_record("south/east")
+        self.repository.add_many([north, south])
+
+        self.assertEqual(self.repository.shard_keys, ["north", "south/east"])
+        self.assertEqual(self.shard_ids("north"), [north.id])
+        self.assertEqual(self.shard_ids("south/east"), [south.id])
+        self.assertTrue(os.path.isdir(self.path("shards", "south%2Feast")))
+
+    def test_reads_span_all_shards(self):
+        records = [make_record(location, hour) for hour, location in enumerate(["north", "south", "north"])]
+        self.repository.add_many(records)
+
+        self.assertEqual(len(self.repository.get_all()), 3)
+        self.assertEqual(self.repository.get_by_id(records[1].id), records[1])
+        self.assertEqual(len(self.repository.find_all({"location_id": "north"})), 2)
+        self.assertEqual(self.repository.find_all({"location_id": "west"}), [])
+        page = self.repository.find_page("check_in_time", limit=2)
+        self.assertEqual([record.id for record in page.items], [records[0].id, records[1].id])
+        self.assertEqual(self.repository.find_page("check_in_time", page.next_cursor, limit=2).items, [records[2]])
+
+    def test_update_moves_an_item_to_its_new_shard(self):
+        record = make_record("north")
+        self.repository.add(record)
+        self.assertTrue(self.repository.update(replace(record, location_id="south")))
+
+        self.assertEqual(self.shard_ids("north"), [])
+        self.assertEqual(self.shard_ids("south"), [record.id])
+        self.assertEqual(self.repository.get_by_id(record.id).location_id, "south")
+        self.assertFalse(self.repository.update(make_record("north")))
+
+    def test_delete(self):
+        first, second = make_record("north"), make_record("south")
+        self.repository.add_many([first, second])
+
+        self.assertTrue(self.repository.delete(first.id))
+        self.assertFalse(self.repository.delete(first.id))
+        self.assertEqual(self.repository.delete_many([second.id, "unknown"]), 1)
+        self.assertEqual(self.repository.get_all(), [])
+
+    def test_new_instance_finds_existing_shards(self):
+        records = [make_record("north"), make_record("south")]
+        self.repository.add_many(records)
+        self.repository.compact()
+
+        reopened = self.open()
+        self.assertEqual(reopened.shard_keys, ["north", "south"])
+        self.assertEqual(reopened.get_by_id(records[1].id), records[1])
+
+    def test_shards_created_elsewhere_are_discovered(self):
+        other = self.open()
+        record = make_record("north")
+        other.add(record)
+
+        self.assertEqual(self.repository.get_by_id(record.id), record)
+        self.assertEqual(self.repository.shard_keys, ["north"])
+
+    def test_items_without_a_location_go_to_the_unassigned_shard(self):
+        members = ShardedRepository(MemberRepository, self.data_dir, "members.json", "home_location_id",
+                                    event_bus=EventBus())
+        member = make_member()
+        members.add(member)
+
+        self.assertEqual(members.shard_keys, [None])
+        self.assertTrue(os.path.isdir(self.path("shards", UNASSIGNED_SHARD)))
+        self.assertTrue(members.update(replace(member, home_location_id="north")))
+        self.assertEqual(members.shard_keys, [None, "north"])
+        self.assertEqual(members.find_all({"home_location_id": None}), [])
+
+
+class ShardDataTest(DataDirTestCase):
+
+    def test_single_files_are_copied_into_shards(self):
+        bus = EventBus()
+        AttendanceRepository(self.path("attendance.json"), event_bus=bus).add_many(
+            [make_record("north"), make_record("south"), make_record("north", 1)])
+        MemberRepository(self.path("members.json"), event_bus=bus).add_many(
+            [make_member(1), make_member(2, home_location_id="north")])
+
+        self.assertEqual(shard_data(self.data_dir), {"members": 2, "attendance": 3, "appointments": 0})
+        attendance = ShardedRepository(AttendanceRepository, self.data_dir, "attendance.json", event_bus=bus)
+        self.assertEqual(len(attendance.find_all({"location_id": "north"})), 2)
+        members = ShardedRepository(MemberRepository, self.data_dir, "members.json", "home_location_id", event_bus=bus)
+        self.assertEqual(members.shard_keys, [None, "north"])
+        with self.assertRaises(ValueError):
+            shard_data(self.data_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for timestamp fields stored as epoch seconds, in memory and in repository files.
+"""
+
+import json
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from src.models.attendance import AttendanceRecord
+from src.repositories.attendance_repository import AttendanceRepository
+from src.utils.codec import codec_for
+from src.utils.events import EventBus
+from src.utils.timestamps import SECONDS_PER_DAY, day_range, from_epoch, to_epoch
+from tests.helpers import DataDirTestCase, make_attendance
+
+
+class TimestampFieldTest(unittest.TestCase):
+
+    def test_datetime_is_kept_as_epoch_seconds(self):
+        record = make_attendance(datetime(2025, 1, 2, 7, 15, 30, 999999))
+        self.assertEqual(record.check_in_time_epoch, to_epoch(datetime(2025, 1, 2, 7, 15, 30)))
+        self.assertEqual(record.check_in_time, datetime(2025, 1, 2, 7, 15, 30))
+
+    def test_other_forms_are_accepted(self):
+        expected = to_epoch(datetime(2025, 1, 2))
+        for value in (datetime(2025, 1, 2), date(2025, 1, 2), "2025-01-02T00:00:00", expected):
+            self.assertEqual(make_attendance(value).check_in_time_epoch, expected)
+
+    def test_aware_datetime_is_converted_to_local_time(self):
+        aware = datetime(2025, 1, 2, 12, tzinfo=timezone.utc)
+        self.assertEqual(make_attendance(aware).check_in_time, aware.astimezone().replace(tzinfo=None))
+
+    def test_assignment_replaces_the_cached_datetime(self):
+        record = make_attendance(datetime(2025, 1, 2, 7))
+        self.assertEqual(record.check_in_time.hour, 7)
+        record.check_in_time = datetime(2025, 1, 2, 9)
+        self.assertEqual(record.check_in_time.hour, 9)
+        record.check_out_time = None
+        self.assertIsNone(record.check_out_time_epoch)
+
+    def test_duration_uses_epoch_seconds(self):
+        record = make_attendance(datetime(2025, 1, 2, 7), check_out_time=datetime(2025, 1, 2, 8, 30))
+        self.assertEqual(record.duration, 90)
+
+    def test_conversions(self):
+        moment = datetime(2025, 1, 2, 7, 15, 30, 500000)
+        self.assertEqual(from_epoch(to_epoch(moment)), moment.replace(microsecond=0))
+        self.assertEqual(to_epoch(moment, round_up=True), to_epoch(moment) + 1)
+        start, end = day_range(moment)
+        self.assertEqual((start, end), (to_epoch(date(2025, 1, 2)), to_epoch(date(2025, 1, 2)) + SECONDS_PER_DAY))
+        with self.assertRaises(TypeError):
+            to_epoch(1.5)
+
+
+class TimestampStorageTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.path("attendance.json")
+
+    def test_codec_writes_epoch_seconds(self):
+        record = make_attendance(datetime(2025, 1, 2, 7), check_out_time=datetime(2025, 1, 2, 8))
+        row = codec_for(AttendanceRecord).encode(record)
+        self.assertEqual(row["check_in_time"], record.check_in_time_epoch)
+        self.assertEqual(row["check_out_time"], record.check_out_time_epoch)
+        self.assertIsInstance(row["created_at"], int)
+
+    def test_iso_strings_from_older_files_are_converted(self):
+        row = codec_for(AttendanceRecord).encode(make_attendance(datetime(2025, 1, 2, 7)))
+        row.update(check_in_time="2025-01-02T07:00:00", check_out_time=None, created_at="2025-01-01T12:00:00")
+        record = codec_for(AttendanceRecord).decode(row)
+        self.assertEqual(record.check_in_time_epoch, to_epoch(datetime(2025, 1, 2, 7)))
+        self.assertEqual(record.created_at, datetime(2025, 1, 1, 12))
+        self.assertTrue(record.is_active())
+
+    def test_repository_round_trip(self):
+        repository = AttendanceRepository(self.file_path, event_bus=EventBus())
+        start = datetime(2025, 1, 2, 6)
+        repository.add_many(make_attendance(start + timedelta(hours=hour)) for hour in range(4))
+        repository.compact()
+
+        with open(self.file_path) as file:
+            self.assertTrue(all(isinstance(row["check_in_time"], int) for row in json.load(file)))
+        reopened = AttendanceRepository(self.file_path, event_bus=EventBus())
+        self.assertEqual(sorted(record.check_in_time for record in reopened.get_all()),
+                         [start + timedelta(hours=hour) for hour in range(4)])
+
+    def test_range_filters_accept_datetimes(self):
+        repository = AttendanceRepository(self.file_path, event_bus=EventBus())
+        start = datetime(2025, 1, 2, 6)
+        repository.add_many(make_attendance(start + timedelta(hours=hour)) for hour in range(4))
+
+        found = repository.find_all(filters={
+            "check_in_time__gte": start + timedelta(hours=1),
+            "check_in_time__lt": start + timedelta(hours=3),
+        })
+        self.assertEqual(sorted(record.check_in_time.hour for record in found), [7, 8])
+        self.assertEqual(len(repository.get_attendance_by_date(start)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
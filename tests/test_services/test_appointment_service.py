@@ -0,0 +1,114 @@
+"""
+Tests for appointment booking, trainer conflicts and recurring appointments.
+"""
+
+import threading
+import time
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from src.models.appointment import AppointmentStatus, AppointmentType
+from src.repositories.appointment_repository import AppointmentRepository
+from src.repositories.recurring_appointment_repository import RecurringAppointmentRepository
+from src.services.appointment_service import AppointmentService
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase
+
+MONDAY = datetime(2030, 1, 7, 10)
+
+
+class AppointmentServiceTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        bus = EventBus()
+        self.appointments = AppointmentRepository(self.path("appointments.json"), event_bus=bus)
+        self.series = RecurringAppointmentRepository(self.path("recurring_appointments.json"), event_bus=bus)
+        self.service = AppointmentService(self.appointments, self.series)
+
+    def book(self, start_time: datetime, trainer_id: str = "t1", duration: int = 60):
+        return self.service.create_appointment(
+            "m1", trainer_id, "central", AppointmentType.PERSONAL_TRAINING, start_time, duration
+        )
+
+    def book_weekly(self, count: int = 3):
+        return self.service.create_recurring_appointment(
+            "m1", "t1", "central", AppointmentType.PERSONAL_TRAINING, MONDAY, 60, count=count
+        )
+
+    def starts(self) -> list:
+        return [appointment.start_time for appointment in self.service.list_appointments(MONDAY, datetime(2030, 2, 1))]
+
+    def test_overlapping_booking_is_rejected(self):
+        booked = self.book(MONDAY)
+        with self.assertRaises(ValueError):
+            self.book(MONDAY.replace(minute=30))
+        self.book(MONDAY.replace(minute=30), trainer_id="t2")
+        self.book(MONDAY.replace(hour=12))
+
+        self.service.cancel_appointment(booked.id)
+        self.book(MONDAY.replace(minute=30))
+
+    def test_concurrent_bookings_cannot_both_pass_the_conflict_check(self):
+        find_conflicts = self.service.find_conflicts
+
+        def slow_find_conflicts(*args, **kwargs):
+            conflicts = find_conflicts(*args, **kwargs)
+            time.sleep(0.05)  # Let the other booking check the same slot before this one is saved
+            return conflicts
+
+        errors = []
+
+        def book():
+            try:
+                self.book(MONDAY)
+            except ValueError as error:
+                errors.append(error)
+
+        with mock.patch.object(self.service, "find_conflicts", side_effect=slow_find_conflicts):
+            threads = [threading.Thread(target=book) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(self.appointments.get_all()), 1)
+
+    def test_series_occurrences_are_listed_and_block_the_trainer(self):
+        self.book_weekly()
+        self.assertEqual(self.starts(), [datetime(2030, 1, 7, 10), datetime(2030, 1, 14, 10), datetime(2030, 1, 21, 10)])
+        self.assertEqual(self.appointments.get_all(), [])
+        with self.assertRaises(ValueError):
+            self.book(datetime(2030, 1, 14, 10, 30))
+        with self.assertRaises(ValueError):
+            self.book_weekly(count=1)
+
+    def test_changed_occurrence_is_stored_and_skipped_by_its_series(self):
+        series = self.book_weekly()
+        occurrence_id = series.occurrence_id(datetime(2030, 1, 14, 10))
+        self.assertTrue(self.service.reschedule_appointment(occurrence_id, datetime(2030, 1, 14, 15)))
+
+        self.assertEqual(self.starts(), [datetime(2030, 1, 7, 10), datetime(2030, 1, 14, 15), datetime(2030, 1, 21, 10)])
+        self.assertEqual(self.series.get_by_id(series.id).exceptions, [date(2030, 1, 14)])
+        stored = self.appointments.get_by_id(occurrence_id)
+        self.assertEqual((stored.series_id, stored.start_time), (series.id, datetime(2030, 1, 14, 15)))
+
+        self.assertTrue(self.service.cancel_appointment(occurrence_id))
+        self.assertFalse(self.service.cancel_appointment(occurrence_id))
+        self.assertEqual(self.appointments.get_by_id(occurrence_id).status, AppointmentStatus.CANCELLED)
+        self.assertEqual(self.series.get_by_id(series.id).exceptions, [date(2030, 1, 14)])
+
+    def test_occurrence_is_skipped_before_it_is_stored(self):
+        series = self.book_weekly()
+        occurrence_id = series.occurrence_id(datetime(2030, 1, 14, 10))
+        with mock.patch.object(self.appointments, "save", side_effect=IOError("disk full")):
+            with self.assertRaises(IOError):
+                self.service.cancel_appointment(occurrence_id)
+
+        # A failed second write leaves the occurrence missing, never listed twice
+        self.assertEqual(self.starts(), [datetime(2030, 1, 7, 10), datetime(2030, 1, 21, 10)])
+        self.assertEqual(self.series.get_by_id(series.id).exceptions, [date(2030, 1, 14)])
+
+
+if __name__ == "__main__":
+    unittest.main()
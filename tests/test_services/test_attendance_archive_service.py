@@ -0,0 +1,96 @@
+"""
+Tests for attendance history queries over archived and live attendance.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from src.repositories.attendance_archive_repository import AttendanceArchiveRepository
+from src.repositories.attendance_repository import AttendanceRepository
+from src.services.attendance_archive_service import AttendanceArchiveService
+from src.services.attendance_service import AttendanceService
+from src.utils.config import Config
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase, make_attendance
+
+NOW = datetime(2025, 6, 1, 12)
+
+
+def make_visit(check_in_time: datetime, member_id: str = "m1"):
+    return make_attendance(check_in_time, member_id=member_id, check_out_time=check_in_time + timedelta(hours=1))
+
+
+class AttendanceArchiveServiceTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.attendance_repository = AttendanceRepository(self.path("attendance.json"), event_bus=EventBus())
+        self.archive_repository = AttendanceArchiveRepository(self.path("archive"))
+        self.archive_service = AttendanceArchiveService(self.attendance_repository, self.archive_repository)
+        self.service = AttendanceService(self.attendance_repository, self.archive_service)
+        # m1 visits in January and March (archived) and in May (live); m2 only in February (archived)
+        self.visits = [
+            make_visit(datetime(2025, 1, 10, 7)),
+            make_visit(datetime(2025, 2, 10, 7), member_id="m2"),
+            make_visit(datetime(2025, 3, 10, 7)),
+            make_visit(datetime(2025, 5, 10, 7)),
+        ]
+        self.attendance_repository.add_many(self.visits)
+        self.archive_service.compact(retention_days=60, now=NOW)
+
+    def test_compact_moves_old_visits_to_the_archive(self):
+        self.assertEqual([record.id for record in self.attendance_repository.get_all()], [self.visits[3].id])
+        self.assertEqual(self.archive_repository.list_segments(), ["2025-01", "2025-02", "2025-03"])
+
+    def test_history_combines_archived_and_live_visits(self):
+        history = self.service.get_attendance_history("m1")
+        self.assertEqual([record.id for record in history], [self.visits[0].id, self.visits[2].id, self.visits[3].id])
+        self.assertEqual(len(self.service.list_all_attendance()), 4)
+
+    def test_member_history_reads_only_the_months_with_their_visits(self):
+        with mock.patch.object(self.archive_repository, "read_segment",
+                               wraps=self.archive_repository.read_segment) as read_segment:
+            self.service.get_attendance_history("m2")
+        self.assertEqual([call.args[0] for call in read_segment.call_args_list], ["2025-02"])
+
+    def test_range_reads_only_the_months_in_range(self):
+        with mock.patch.object(self.archive_repository, "read_segment",
+                               wraps=self.archive_repository.read_segment) as read_segment:
+            records = self.service.list_all_attendance(datetime(2025, 2, 1), datetime(2025, 3, 1))
+        self.assertEqual([record.id for record in records], [self.visits[1].id])
+        self.assertEqual([call.args[0] for call in read_segment.call_args_list], ["2025-02"])
+
+    def test_end_of_range_is_included(self):
+        for end in (datetime(2025, 3, 10, 7), datetime(2025, 5, 10, 7)):
+            records = self.service.list_attendance_for_member("m1", datetime(2025, 1, 10, 7), end)
+            self.assertEqual(records[0].check_in_time, datetime(2025, 1, 10, 7))
+            self.assertEqual(records[-1].check_in_time, end)
+        page = self.service.list_attendance_page(start_date=datetime(2025, 5, 1), end_date=datetime(2025, 5, 10, 7))
+        self.assertEqual([record.id for record in page.items], [self.visits[3].id])
+
+    def test_daily_history_combines_summaries_with_live_visits(self):
+        self.attendance_repository.add(make_visit(datetime(2025, 5, 10, 18)))
+        history = self.service.get_daily_visit_history("m1", datetime(2025, 1, 1), datetime(2025, 5, 10))
+        self.assertEqual([(summary.day.month, summary.visits) for summary in history], [(1, 1), (3, 1), (5, 2)])
+        self.assertEqual(history[-1].total_minutes, 120)
+
+    def test_decoded_segments_are_cached_up_to_the_limit(self):
+        archive_repository = AttendanceArchiveRepository(self.path("archive"))
+        first = archive_repository.read_segment("2025-01")
+        self.assertIs(archive_repository.read_segment("2025-01"), first)
+        with mock.patch.object(Config, "ARCHIVE_SEGMENT_CACHE_SIZE", 1):
+            archive_repository.read_segment("2025-02")
+            self.assertIsNot(archive_repository.read_segment("2025-01"), first)
+
+    def test_segment_rewritten_by_another_process_is_read_again(self):
+        self.archive_repository.read_segment("2025-01")
+        other = AttendanceArchiveRepository(self.path("archive"))
+        late = make_visit(datetime(2025, 1, 20, 7))
+        other.archive([late])
+
+        self.assertIn(late.id, [record.id for record in self.archive_repository.read_segment("2025-01")])
+        self.assertIn(late.id, [record.id for record in self.service.get_attendance_history("m1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
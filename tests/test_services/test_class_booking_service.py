@@ -0,0 +1,141 @@
+"""
+Tests for group class booking, including contention between many bookers.
+"""
+
+import multiprocessing
+import threading
+import unittest
+from datetime import datetime, timedelta
+from src.models.class_session import BookingStatus
+from src.repositories.class_session_repository import ClassSessionRepository
+from src.repositories.location_repository import LocationRepository
+from src.services.class_booking_service import ClassBookingService
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase, make_location, make_zone
+
+CAPACITY = 12
+
+
+def _book_from_process(file_path: str, session_id: str, member_ids: list, start: "multiprocessing.synchronize.Event"):
+    repository = ClassSessionRepository(file_path, event_bus=EventBus())
+    start.wait()
+    for member_id in member_ids:
+        repository.reserve(session_id, member_id)
+
+
+class ClassBookingServiceTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bus = EventBus()
+        self.location_repository = LocationRepository(self.path("locations.json"), event_bus=self.bus)
+        self.zone = make_zone(capacity=CAPACITY)
+        self.location = make_location(workout_zones=[self.zone], opening_hours={})
+        self.location_repository.add_location(self.location)
+        self.session_file = self.path("class_sessions.json")
+        self.session_repository = ClassSessionRepository(self.session_file, event_bus=self.bus)
+        self.service = ClassBookingService(self.session_repository, self.location_repository)
+        self.session = self.service.schedule_class(
+            self.location.id, self.zone.id, "trainer", "Spin", datetime.now() + timedelta(days=1), 45
+        )
+
+    def assert_not_overbooked(self, session):
+        self.assertLessEqual(len(session.attendee_ids), session.capacity)
+        self.assertEqual(len(set(session.attendee_ids)), len(session.attendee_ids))
+        self.assertFalse(set(session.attendee_ids) & set(session.waitlist))
+
+    def test_capacity_comes_from_zone(self):
+        self.assertEqual(self.session.capacity, CAPACITY)
+        with self.assertRaises(ValueError):
+            self.service.schedule_class(
+                self.location.id, self.zone.id, "trainer", "Spin", datetime.now() + timedelta(days=1), 45,
+                capacity=CAPACITY + 1
+            )
+
+    def test_waitlist_is_promoted_in_order(self):
+        members = [f"member-{i}" for i in range(CAPACITY + 3)]
+        statuses = [self.service.book_class(self.session.id, member_id) for member_id in members]
+        self.assertEqual(statuses, [BookingStatus.BOOKED] * CAPACITY + [BookingStatus.WAITLISTED] * 3)
+        self.assertEqual(self.service.book_class(self.session.id, members[0]), BookingStatus.BOOKED)
+
+        self.assertTrue(self.service.cancel_booking(self.session.id, members[3]))
+        self.assertTrue(self.service.cancel_booking(self.session.id, members[CAPACITY + 1]))
+        self.assertTrue(self.service.cancel_booking(self.session.id, members[5]))
+        self.assertFalse(self.service.cancel_booking(self.session.id, members[5]))
+
+        session = self.service.get_class_by_id(self.session.id)
+        self.assertEqual(session.attendee_ids[-2:], [members[CAPACITY], members[CAPACITY + 2]])
+        self.assertEqual(session.waitlist, [])
+        self.assertEqual(session.available_places, 0)
+
+        reloaded = ClassSessionRepository(self.session_file, event_bus=EventBus()).get_by_id(self.session.id)
+        self.assertEqual(reloaded.attendee_ids, session.attendee_ids)
+
+    def test_concurrent_threads_never_overbook(self):
+        members = [f"member-{i}" for i in range(CAPACITY * 8)]
+        barrier = threading.Barrier(len(members))
+        results = {}
+
+        def book(member_id):
+            barrier.wait()
+            results[member_id] = self.service.book_class(self.session.id, member_id)
+
+        threads = [threading.Thread(target=book, args=(member_id,)) for member_id in members]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session = self.service.get_class_by_id(self.session.id)
+        self.assert_not_overbooked(session)
+        self.assertEqual(len(session.attendee_ids), CAPACITY)
+        self.assertEqual(sorted(session.attendee_ids + session.waitlist), sorted(members))
+        booked = {member_id for member_id, status in results.items() if status is BookingStatus.BOOKED}
+        self.assertEqual(booked, set(session.attendee_ids))
+
+        # Cancellations racing new bookings still leave the class exactly full, promoted in waitlist order
+        waiting = list(session.waitlist)
+        leaving = session.attendee_ids[:CAPACITY // 2]
+        late = [f"late-{i}" for i in range(CAPACITY)]
+        barrier = threading.Barrier(len(leaving) + len(late))
+
+        def cancel(member_id):
+            barrier.wait()
+            self.service.cancel_booking(self.session.id, member_id)
+
+        threads = [threading.Thread(target=cancel, args=(member_id,)) for member_id in leaving]
+        threads += [threading.Thread(target=book, args=(member_id,)) for member_id in late]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session = self.service.get_class_by_id(self.session.id)
+        self.assert_not_overbooked(session)
+        self.assertEqual(len(session.attendee_ids), CAPACITY)
+        self.assertEqual(session.attendee_ids[CAPACITY - len(leaving):], waiting[:len(leaving)])
+        self.assertEqual(session.waitlist[:len(waiting) - len(leaving)], waiting[len(leaving):])
+
+    def test_concurrent_processes_never_overbook(self):
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        start = context.Event()
+        groups = [[f"process-{p}-member-{i}" for i in range(CAPACITY)] for p in range(4)]
+        processes = [
+            context.Process(target=_book_from_process, args=(self.session_file, self.session.id, members, start))
+            for members in groups
+        ]
+        for process in processes:
+            process.start()
+        start.set()
+        for process in processes:
+            process.join(timeout=120)
+            self.assertEqual(process.exitcode, 0)
+
+        session = ClassSessionRepository(self.session_file, event_bus=EventBus()).get_by_id(self.session.id)
+        self.assert_not_overbooked(session)
+        self.assertEqual(len(session.attendee_ids), CAPACITY)
+        self.assertEqual(sorted(session.attendee_ids + session.waitlist), sorted(sum(groups, [])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for finding workout zones and open locations through the location service's indexes.
+"""
+
+import unittest
+from datetime import datetime
+from src.repositories.location_repository import LocationRepository
+from src.services.location_service import LocationService
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase, make_location, make_zone
+
+
+class LocationServiceTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repository = LocationRepository(self.path("locations.json"), event_bus=EventBus())
+        self.service = LocationService(self.repository)
+        self.zone = make_zone("Studio", schedule={"Tuesday": ["18:00"]})
+        self.location = self.repository.save(make_location("Central", workout_zones=[self.zone]))
+
+    def zone_names(self, day: str, time: str) -> list:
+        return [ref.zone.name for ref in self.service.find_available_zones(day, time)]
+
+    def test_index_follows_schedule_and_zone_changes(self):
+        self.assertEqual(self.zone_names("Tuesday", "18:00"), ["Studio"])
+
+        self.service.update_zone_schedule(self.location.id, self.zone.id, "Tuesday", ["19:00"])
+        self.assertEqual(self.zone_names("Tuesday", "18:00"), [])
+        self.assertEqual(self.zone_names("Tuesday", "19:00"), ["Studio"])
+
+        pool = self.service.add_workout_zone(self.location.id, {"name": "Pool", "type": "pool", "capacity": 10})
+        self.service.update_zone_schedule(self.location.id, pool.id, "Tuesday", ["19:00"])
+        self.assertEqual(self.zone_names("Tuesday", "19:00"), ["Studio", "Pool"])
+        self.assertEqual(self.service.find_common_slots([self.zone.id, pool.id], "Tuesday"), ["19:00"])
+
+        self.service.deactivate_location(self.location.id)
+        self.assertEqual(self.zone_names("Tuesday", "19:00"), [])
+
+    def test_stored_zone_is_not_changed_in_place(self):
+        stored_zone = self.repository.find_by_id(self.location.id).get_zone(self.zone.id)
+        self.service.update_zone_schedule(self.location.id, self.zone.id, "Tuesday", ["19:00"])
+        self.assertEqual(stored_zone.schedule, {"Tuesday": ["18:00"]})
+        self.assertEqual(self.service.get_workout_zone(self.location.id, self.zone.id).schedule, {"Tuesday": ["19:00"]})
+        self.assertIsNone(self.service.update_zone_schedule(self.location.id, "unknown", "Tuesday", []))
+
+    def test_open_locations_follow_opening_hours_changes(self):
+        monday_evening = datetime(2030, 1, 7, 21)
+        self.assertEqual(self.service.find_open_locations(monday_evening), [self.location])
+        self.assertTrue(self.service.is_within_opening_hours(self.location.id, monday_evening, 60))
+
+        self.service.set_opening_hours(self.location.id, "Monday", "06:00-21:30")
+        self.assertFalse(self.service.is_within_opening_hours(self.location.id, monday_evening, 60))
+        self.service.update_location(self.location.id, {"opening_hours": {"Monday": "closed"}})
+        self.assertEqual(self.service.find_open_locations(monday_evening), [])
+
+    def test_malformed_opening_hours_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.service.set_opening_hours(self.location.id, "Monday", "06:00-late")
+        with self.assertRaises(ValueError):
+            self.service.update_location(self.location.id, {"opening_hours": {"Mon": "06:00-22:00"}})
+        with self.assertRaises(ValueError):
+            self.service.create_location("North", "2 Low St", "manager", [], 50, "0113", "north@example.com",
+                                         {"Monday": "6am-10pm"})
+        self.assertEqual(self.repository.find_by_id(self.location.id).opening_hours, {"Monday": "06:00-22:00"})
+        self.assertEqual(len(self.repository.get_all()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the trainer utilization report and the appointment columns it is computed from.
+"""
+
+import unittest
+from datetime import date, datetime
+from src.models.appointment import AppointmentStatus, AppointmentType
+from src.repositories.appointment_repository import AppointmentRepository
+from src.repositories.recurring_appointment_repository import RecurringAppointmentRepository
+from src.services.appointment_service import AppointmentService
+from src.services.report_service import ReportService
+from src.utils.columns import AppointmentColumns, Codes, group_count
+from src.utils.events import EventBus
+from src.utils.recurrence import SECONDS_PER_WEEK
+from src.utils.timestamps import to_epoch
+from tests.helpers import DataDirTestCase, make_appointment
+
+MONDAY = datetime(2030, 1, 7, 10)
+NEXT_MONDAY = datetime(2030, 1, 14, 10)
+
+
+class AppointmentColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = AppointmentColumns.build([
+            make_appointment(NEXT_MONDAY, trainer_id="t2", location_id="north", duration=45),
+            make_appointment(MONDAY, status=AppointmentStatus.COMPLETED),
+            make_appointment(MONDAY.replace(hour=12), trainer_id="t2"),
+        ], AppointmentStatus)
+
+    def test_rows_are_ordered_by_start_time(self):
+        self.assertEqual(list(self.columns.trainers), ["t1", "t2"])
+        self.assertEqual(list(self.columns.trainer), [0, 1, 1])
+        self.assertEqual(list(self.columns.duration), [60, 60, 45])
+        self.assertEqual([self.columns.statuses[code] for code in self.columns.status],
+                         [AppointmentStatus.COMPLETED, AppointmentStatus.SCHEDULED, AppointmentStatus.SCHEDULED])
+
+    def test_windows_and_locations(self):
+        self.assertEqual(len(self.columns.between(MONDAY, NEXT_MONDAY)), 2)
+        self.assertEqual(len(self.columns.between(MONDAY.replace(hour=11))), 2)
+        self.assertEqual(len(self.columns.between(end=MONDAY)), 0)
+        self.assertEqual(list(self.columns.at_location("north").duration), [45])
+        self.assertEqual(len(self.columns.at_location("unknown")), 0)
+
+    def test_concat_requires_shared_codes(self):
+        other = AppointmentColumns.build([make_appointment(trainer_id="t3")], AppointmentStatus,
+                                         self.columns.trainers, self.columns.locations)
+        self.assertEqual(list(self.columns.concat(other).trainer), [0, 1, 1, 2])
+        with self.assertRaises(ValueError):
+            self.columns.concat(AppointmentColumns.build([make_appointment()], AppointmentStatus))
+
+    def test_group_count_and_periods(self):
+        weeks, first_week, week_count = self.columns.periods(to_epoch(date(2030, 1, 7)), SECONDS_PER_WEEK)
+        self.assertEqual((list(weeks), week_count), ([0, 0, 1], 2))
+        self.assertEqual(group_count([self.columns.trainer, weeks], [2, week_count]),
+                         {(0, 0): 1, (1, 0): 1, (1, 1): 1})
+        self.assertEqual(Codes(["a", "b", "a"]).values, ["a", "b"])
+
+
+class TrainerUtilizationTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        bus = EventBus()
+        self.appointments = AppointmentRepository(self.path("appointments.json"), event_bus=bus)
+        self.series = RecurringAppointmentRepository(self.path("recurring_appointments.json"), event_bus=bus)
+        self.service = ReportService(self.appointments, self.series)
+        self.addCleanup(self.service.close)
+
+        for day, status, duration in ((0, AppointmentStatus.COMPLETED, 60), (1, AppointmentStatus.NO_SHOW, 60),
+                                      (2, AppointmentStatus.CANCELLED, 30)):
+            self.appointments.add(make_appointment(MONDAY.replace(day=7 + day), status=status, duration=duration))
+        self.appointments.add(make_appointment(NEXT_MONDAY, location_id="north", duration=45))
+        AppointmentService(self.appointments, self.series).create_recurring_appointment(
+            "m2", "t2", "central", AppointmentType.PERSONAL_TRAINING, MONDAY.replace(hour=8), 60, count=3
+        )
+
+    def report(self, location_id=None) -> list:
+        rows = self.service.trainer_utilization(datetime(2030, 1, 7), datetime(2030, 1, 21), location_id)
+        return [(row.trainer_id, row.week_start, row.appointments_booked, row.booked_minutes) for row in rows]
+
+    def test_weekly_hours_per_trainer(self):
+        self.assertEqual(self.report(), [
+            ("t1", date(2030, 1, 7), 2, 120),
+            ("t1", date(2030, 1, 14), 1, 45),
+            ("t2", date(2030, 1, 7), 1, 60),
+            ("t2", date(2030, 1, 14), 1, 60),
+        ])
+        self.assertEqual(self.report("north"), [("t1", date(2030, 1, 14), 1, 45)])
+        self.assertEqual(self.service.trainer_utilization(datetime(2031, 1, 1), datetime(2031, 2, 1)), [])
+
+    def test_completion_and_no_show_rates(self):
+        first_week, second_week = self.service.trainer_utilization(datetime(2030, 1, 7), datetime(2030, 1, 21))[:2]
+        self.assertEqual(first_week.booked_hours, 2)
+        self.assertEqual((first_week.appointments_completed, first_week.appointments_cancelled,
+                          first_week.appointments_no_show), (1, 1, 1))
+        self.assertAlmostEqual(first_week.completion_rate, 1 / 3)
+        self.assertAlmostEqual(first_week.no_show_rate, 1 / 3)
+        self.assertIsNone(second_week.completion_rate)
+
+    def test_report_follows_appointment_changes(self):
+        self.report()
+        self.appointments.add(make_appointment(NEXT_MONDAY.replace(hour=16), duration=30))
+        self.assertIn(("t1", date(2030, 1, 14), 2, 75), self.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Tests for answering retried requests once per request id.
+"""
+
+import threading
+import unittest
+from src.repositories.attendance_repository import AttendanceRepository
+from src.services.attendance_service import AttendanceService
+from src.utils.dedupe import RequestCache, RequestInProgressError
+from src.utils.events import EventBus
+from tests.helpers import DataDirTestCase
+
+
+class FakeClock:
+    """Monotonic time moved by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RequestCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = RequestCache("test", ttl=60, max_entries=3, wait=0.05, clock=self.clock)
+        self.calls = 0
+
+    def operation(self, value="done"):
+        def run():
+            self.calls += 1
+            return value
+        return run
+
+    def test_retry_gets_the_first_result(self):
+        self.assertEqual(self.cache.run("r1", self.operation("first")), "first")
+        self.assertEqual(self.cache.run("r1", self.operation("second")), "first")
+        self.assertEqual(self.calls, 1)
+
+    def test_without_request_id_the_operation_always_runs(self):
+        self.cache.run(None, self.operation())
+        self.cache.run(None, self.operation())
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_remembered_rejection_is_raised_anew_for_each_retry(self):
+        def reject():
+            self.calls += 1
+            raise ValueError("Member already has an active attendance record.")
+        raised = []
+        for _ in range(3):
+            with self.assertRaises(ValueError) as context:
+                self.cache.run("r1", reject)
+            raised.append(context.exception)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({error.args for error in raised}, {("Member already has an active attendance record.",)})
+        self.assertIsNot(raised[1], raised[2])
+        self.assertIsNone(raised[2].__context__)
+
+    def test_unexpected_errors_are_not_remembered(self):
+        def fail():
+            self.calls += 1
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            self.cache.run("r1", fail)
+        self.assertEqual(self.cache.run("r1", self.operation()), "done")
+        self.assertEqual(self.calls, 2)
+
+    def test_reused_request_id_with_other_arguments_is_rejected(self):
+        self.cache.run("r1", self.operation(), fingerprint=("m1", "central"))
+        with self.assertRaises(ValueError):
+            self.cache.run("r1", self.operation(), fingerprint=("m2", "central"))
+
+    def test_outcomes_expire_after_the_ttl(self):
+        self.cache.run("r1", self.operation())
+        self.clock.now = 61
+        self.cache.run("r1", self.operation())
+        self.assertEqual(self.calls, 2)
+
+    def test_oldest_outcomes_are_evicted_beyond_the_bound(self):
+        for request_id in ("r1", "r2", "r3", "r4"):
+            self.cache.run(request_id, self.operation())
+        self.assertEqual(len(self.cache), 3)
+        self.cache.run("r1", self.operation())
+        self.assertEqual(self.calls, 5)
+
+    def run_slow_attempt(self, release: threading.Event) -> threading.Thread:
+        """Start a first attempt of "r1" that runs until release is set."""
+        started = threading.Event()
+
+        def slow():
+            self.calls += 1
+            started.set()
+            release.wait()
+            return "first"
+        thread = threading.Thread(target=self.cache.run, args=("r1", slow))
+        thread.start()
+        started.wait()
+        return thread
+
+    def test_retry_waits_for_the_running_attempt(self):
+        self.cache.wait = 5
+        release = threading.Event()
+        thread = self.run_slow_attempt(release)
+        threading.Timer(0.01, release.set).start()
+        self.assertEqual(self.cache.run("r1", self.operation("second")), "first")
+        thread.join()
+        self.assertEqual(self.calls, 1)
+
+    def test_retry_of_a_stuck_attempt_is_turned_away(self):
+        release = threading.Event()
+        thread = self.run_slow_attempt(release)
+        try:
+            with self.assertRaises(RequestInProgressError):
+                self.cache.run("r1", self.operation("second"))
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.run("r1", self.operation("second")), "first")
+
+
+class AttendanceDedupeTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repository = AttendanceRepository(self.path("attendance.json"), event_bus=EventBus())
+        self.service = AttendanceService(self.repository)
+
+    def test_retried_check_in_and_check_out_happen_once(self):
+        record = self.service.check_in("m1", "central", request_id="in-1")
+        self.assertEqual(self.service.check_in("m1", "central", request_id="in-1").id, record.id)
+        self.assertEqual(len(self.repository.get_all()), 1)
+
+        self.assertTrue(self.service.check_out_member("m1", request_id="out-1"))
+        self.assertTrue(self.service.check_out_member("m1", request_id="out-1"))
+        self.assertFalse(self.service.check_out_member("m1", request_id="out-2"))
+
+    def test_new_request_is_still_rejected(self):
+        self.service.check_in("m1", "central", request_id="in-1")
+        with self.assertRaises(ValueError):
+            self.service.check_in("m1", "central", request_id="in-2")
+
+
+if __name__ == "__main__":
+    unittest.main()
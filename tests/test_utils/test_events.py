@@ -0,0 +1,80 @@
+"""
+Tests for the change event bus, the events repositories publish and the change log.
+"""
+
+import unittest
+from dataclasses import replace
+from src.repositories.member_repository import MemberRepository
+from src.utils.events import ChangeLog, ChangeType, EventBus
+from tests.helpers import DataDirTestCase, make_member
+
+
+class EventBusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = EventBus()
+
+    def test_events_reach_subscribers_of_their_entity_and_of_all_entities(self):
+        members, everything = [], []
+        self.bus.subscribe(members.append, "member")
+        self.bus.subscribe(everything.append)
+
+        self.bus.publish("member", ChangeType.CREATED, "m1")
+        self.bus.publish("attendance", ChangeType.CREATED, "a1")
+        self.assertEqual([event.entity_id for event in members], ["m1"])
+        self.assertEqual([event.entity_id for event in everything], ["m1", "a1"])
+        self.assertLess(everything[0].sequence, everything[1].sequence)
+
+    def test_unsubscribed_handler_receives_nothing(self):
+        events = []
+        unsubscribe = self.bus.subscribe(events.append, "member")
+        unsubscribe()
+        self.assertFalse(self.bus.has_subscribers("member"))
+        self.assertIsNone(self.bus.publish("member", ChangeType.CREATED, "m1"))
+        self.assertEqual(events, [])
+
+
+class RepositoryEventTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bus = EventBus()
+        self.events = []
+        self.bus.subscribe(self.events.append, "member")
+        self.repository = MemberRepository(self.path("members.json"), event_bus=self.bus)
+
+    def test_writes_publish_their_before_and_after_images(self):
+        member = self.repository.add(make_member(1))
+        renamed = replace(member, last_name="Renamed")
+        self.repository.update(renamed)
+        self.repository.delete(member.id)
+
+        created, updated, deleted = self.events
+        self.assertEqual((created.change_type, created.before, created.after), (ChangeType.CREATED, None, member))
+        self.assertEqual((updated.change_type, updated.before, updated.after), (ChangeType.UPDATED, member, renamed))
+        self.assertEqual((deleted.change_type, deleted.before, deleted.after), (ChangeType.DELETED, renamed, None))
+        self.assertEqual({event.entity_id for event in self.events}, {member.id})
+
+    def test_record_updated_in_place_has_no_before_image(self):
+        member = self.repository.add(make_member(1))
+        member.phone = "0113 999 9999"
+        self.repository.update(member)
+        self.assertEqual(self.events[-1].change_type, ChangeType.UPDATED)
+        self.assertIsNone(self.events[-1].before)
+
+    def test_change_log_records_the_stream(self):
+        log_path = self.path("changes.jsonl")
+        log = ChangeLog(log_path, self.bus, "member")
+        member = self.repository.add(make_member(1))
+        self.repository.delete(member.id)
+        log.close()
+        self.repository.add(make_member(2))
+
+        rows = list(ChangeLog.read(log_path))
+        self.assertEqual([row["change_type"] for row in rows], ["created", "deleted"])
+        self.assertEqual(rows[0]["after"]["email"], "member1@example.com")
+        self.assertEqual(rows[1]["before"]["id"], member.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the cross-process file lock, file stamps and writes from several repository instances.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from dataclasses import replace
+from src.repositories.member_repository import MemberRepository
+from src.utils.events import ChangeType, EventBus
+from src.utils.file_lock import FileLock, FileStamp, atomic_write_text
+from tests.helpers import DataDirTestCase, make_member
+
+# Exits with 0 if the lock on the data file given as argument was acquired, 1 if acquiring it timed out
+TRY_LOCK = """
+import sys
+from src.utils.file_lock import FileLock
+try:
+    with FileLock(sys.argv[1], timeout=0.1):
+        pass
+except TimeoutError:
+    sys.exit(1)
+"""
+
+
+class FileLockTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.path("members.json")
+
+    def lock_is_free_for_another_process(self) -> bool:
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        result = subprocess.run([sys.executable, "-c", TRY_LOCK, self.file_path], cwd=root)
+        return result.returncode == 0
+
+    def test_lock_excludes_other_processes_until_released(self):
+        lock = FileLock(self.file_path)
+        with lock:
+            self.assertTrue(lock.is_held)
+            self.assertFalse(self.lock_is_free_for_another_process())
+        self.assertFalse(lock.is_held)
+        self.assertTrue(self.lock_is_free_for_another_process())
+
+    def test_lock_is_reentrant(self):
+        lock = FileLock(self.file_path)
+        with lock:
+            with lock:
+                pass
+            self.assertTrue(lock.is_held)
+            with self.assertRaises(TimeoutError):
+                FileLock(self.file_path, timeout=0.05).acquire()
+        with FileLock(self.file_path, timeout=0.05):
+            pass
+
+    def test_stamp_changes_when_the_file_is_replaced(self):
+        self.assertIsNone(FileStamp.of(self.file_path))
+        atomic_write_text(self.file_path, "[]")
+        stamp = FileStamp.of(self.file_path)
+        self.assertEqual(FileStamp.of(self.file_path), stamp)
+
+        atomic_write_text(self.file_path, "[ ]")
+        self.assertNotEqual(FileStamp.of(self.file_path), stamp)
+        self.assertEqual(os.listdir(self.data_dir), ["members.json"])
+
+
+class SharedFileTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self.path("members.json")
+        self.bus = EventBus()
+        self.first = MemberRepository(self.file_path, event_bus=self.bus)
+        self.second = MemberRepository(self.file_path, event_bus=EventBus())
+
+    def test_interleaved_writes_are_all_kept(self):
+        first, second = make_member(1), make_member(2)
+        self.first.add(first)
+        self.second.add(second)
+        self.first.update(replace(first, phone="0113 999 9999"))
+
+        reopened = MemberRepository(self.file_path, event_bus=EventBus())
+        self.assertEqual(sorted(member.id for member in reopened.get_all()), sorted([first.id, second.id]))
+        self.assertEqual(reopened.get_by_id(first.id).phone, "0113 999 9999")
+
+    def test_stale_instance_reloads_a_rewritten_file(self):
+        member = self.first.add(make_member(1))
+        self.assertIsNotNone(self.second.get_by_id(member.id))
+        events = []
+        self.bus.subscribe(events.append, "member")
+
+        self.second.update(replace(member, last_name="Renamed"))
+        self.second.compact()
+        self.assertEqual(self.first.get_by_id(member.id).last_name, "Renamed")
+        self.assertEqual([event.change_type for event in events], [ChangeType.RELOADED])
+        self.assertFalse(self.first.refresh())
+
+
+if __name__ == "__main__":
+    unittest.main()
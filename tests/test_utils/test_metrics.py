@@ -0,0 +1,100 @@
+"""
+Tests for the metrics registry, its Prometheus rendering, service instrumentation and exporting.
+"""
+
+import os
+import socket
+import unittest
+from urllib.request import urlopen
+from src.utils.metrics import MetricsRegistry, exporting, instrument_service
+from tests.helpers import DataDirTestCase
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class MetricsRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(enabled=True, buckets=(0.1, 1.0))
+
+    def test_render(self):
+        self.registry.describe("calls_total", "Calls made.")
+        self.registry.inc("calls_total", method="add")
+        self.registry.inc("calls_total", 2, method="add")
+        self.registry.set("open_visits", 3)
+        for value in (0.05, 0.5, 5):
+            self.registry.observe("latency_seconds", value, path='say "hi"')
+
+        lines = self.registry.render().splitlines()
+        self.assertEqual(lines[:3], ["# HELP calls_total Calls made.", "# TYPE calls_total counter",
+                                     'calls_total{method="add"} 3'])
+        self.assertIn("open_visits 3", lines)
+        self.assertIn('latency_seconds_bucket{path="say \\"hi\\"",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{path="say \\"hi\\"",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{path="say \\"hi\\"",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{path="say \\"hi\\""} 3', lines)
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        registry.inc("calls_total")
+        with registry.time("latency_seconds"):
+            pass
+        self.assertEqual(registry.render(), "\n")
+
+    def test_instrumented_service_counts_calls_and_errors(self):
+        @instrument_service(registry=self.registry)
+        class Service:
+            def ok(self):
+                return 1
+
+            def fail(self):
+                raise ValueError("rejected")
+
+        service = Service()
+        service.ok()
+        with self.assertRaises(ValueError):
+            service.fail()
+
+        text = self.registry.render()
+        self.assertIn('service_calls_total{method="ok",service="Service"} 1', text)
+        self.assertIn('service_call_errors_total{method="fail",service="Service"} 1', text)
+        self.assertNotIn('service_call_errors_total{method="ok"', text)
+
+    def test_disabled_registry_leaves_services_undecorated(self):
+        class Service:
+            def ok(self):
+                return 1
+        ok = Service.ok
+        instrument_service(Service, registry=MetricsRegistry(enabled=False))
+        self.assertIs(Service.ok, ok)
+
+
+class ExportingTest(DataDirTestCase):
+
+    def test_metrics_are_served_while_running_and_written_at_exit(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.inc("calls_total")
+        path = self.path("metrics.prom")
+        port = free_port()
+
+        with exporting(registry, path, port, "127.0.0.1") as server:
+            self.assertIsNotNone(server)
+            with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                self.assertIn("calls_total 1", response.read().decode())
+            self.assertFalse(os.path.exists(path))
+        with open(path) as file:
+            self.assertIn("calls_total 1", file.read())
+
+    def test_nothing_is_exported_while_disabled(self):
+        path = self.path("metrics.prom")
+        with exporting(MetricsRegistry(enabled=False), path, free_port()) as server:
+            self.assertIsNone(server)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for copy-on-write record versions and the snapshots repositories hand out.
+"""
+
+import gc
+import unittest
+from dataclasses import replace
+from src.repositories.member_repository import MemberRepository
+from src.utils.events import EventBus
+from src.utils.mvcc import VersionedList
+from tests.helpers import DataDirTestCase, make_member
+
+
+class VersionedListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.versions = VersionedList([1, 2])
+
+    def test_write_copies_the_list_a_snapshot_reads(self):
+        snapshot = self.versions.snapshot()
+        with self.versions.writing() as items:
+            items.append(3)
+
+        self.assertEqual(list(snapshot), [1, 2])
+        self.assertEqual(self.versions.items, [1, 2, 3])
+        self.assertEqual((snapshot.version, self.versions.version), (0, 1))
+        self.assertEqual(self.versions.pinned_versions(), [0])
+
+    def test_write_without_snapshots_changes_the_list_in_place(self):
+        items_before = self.versions.items
+        self.versions.snapshot().release()
+        with self.versions.writing() as items:
+            items.append(3)
+        self.assertIs(self.versions.items, items_before)
+
+        snapshot = self.versions.snapshot()
+        del snapshot
+        gc.collect()
+        with self.versions.writing() as items:
+            items.append(4)
+        self.assertIs(self.versions.items, items_before)
+
+    def test_released_snapshot_cannot_be_read(self):
+        with self.versions.snapshot() as snapshot:
+            self.assertEqual(len(snapshot), 2)
+        self.assertTrue(snapshot.released)
+        self.assertEqual(self.versions.pinned_versions(), [])
+        with self.assertRaises(RuntimeError):
+            list(snapshot)
+
+
+class RepositorySnapshotTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repository = MemberRepository(self.path("members.json"), event_bus=EventBus())
+        self.first = self.repository.add(make_member(1))
+
+    def test_snapshot_keeps_its_version_while_writes_continue(self):
+        with self.repository.snapshot() as snapshot:
+            second = self.repository.add(make_member(2))
+            self.repository.update(replace(self.first, last_name="Renamed"))
+            self.repository.delete(second.id)
+
+            self.assertEqual([member.last_name for member in snapshot], ["Last1"])
+            self.assertIs(snapshot.get_by_id(self.first.id), self.first)
+            self.assertEqual(snapshot.find_all({"last_name": "Renamed"}), [])
+        self.assertEqual(self.repository.get_by_id(self.first.id).last_name, "Renamed")
+
+    def test_record_changed_in_place_is_seen_by_open_snapshots(self):
+        with self.repository.snapshot() as snapshot:
+            stored = self.repository.get_by_id(self.first.id)
+            stored.phone = "0113 999 9999"
+            stored.update()
+            self.repository.flush()
+            self.assertEqual(snapshot.get_by_id(self.first.id).phone, "0113 999 9999")
+
+        reopened = MemberRepository(self.path("members.json"), event_bus=EventBus())
+        self.assertEqual(reopened.get_by_id(self.first.id).phone, "0113 999 9999")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for replicating the data directory to a follower, directly or over a socket.
+"""
+
+import contextlib
+import io
+import os
+import unittest
+from dataclasses import replace
+from unittest import mock
+from src.repositories.member_repository import MemberRepository
+from src.utils.config import Config
+from src.utils.events import EventBus
+from src.utils.replication import Follower, RemoteSource, ReplicationServer, ReplicationSource
+from tests.helpers import DataDirTestCase, make_member
+
+
+class ReplicationTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.leader_dir = self.path("leader")
+        self.replica_dir = self.path("replica")
+        os.makedirs(self.leader_dir)
+        self.leader = MemberRepository(os.path.join(self.leader_dir, "members.json"), event_bus=EventBus())
+        self.source = ReplicationSource(self.leader_dir)
+
+    def replica(self) -> MemberRepository:
+        return MemberRepository(os.path.join(self.replica_dir, "members.json"), event_bus=EventBus())
+
+    def test_follower_copies_snapshots_then_journal_entries(self):
+        first = self.leader.add(make_member(1))
+        follower = Follower(self.source, self.replica_dir)
+        self.assertEqual(follower.lag, float("inf"))
+        follower.sync()
+        self.assertLess(follower.lag, 60)
+        replica = self.replica()
+        self.assertEqual([member.id for member in replica.get_all()], [first.id])
+
+        second = self.leader.add(make_member(2))
+        self.leader.update(replace(first, last_name="Renamed"))
+        _, updates = self.source.changes(follower.positions)
+        self.assertEqual([(update.name, update.snapshot) for update in updates], [("members.json", None)])
+        follower.sync()
+        self.assertEqual(sorted(member.id for member in replica.get_all()), sorted([first.id, second.id]))
+        self.assertEqual(replica.get_by_id(first.id).last_name, "Renamed")
+        self.assertEqual(self.source.changes(follower.positions)[1], [])
+
+    def test_compacted_file_is_sent_as_a_snapshot_again(self):
+        member = self.leader.add(make_member(1))
+        follower = Follower(self.source, self.replica_dir)
+        follower.sync()
+        self.leader.delete(member.id)
+        self.leader.compact()
+
+        _, updates = self.source.changes(follower.positions)
+        self.assertIsNotNone(updates[0].snapshot)
+        follower.sync()
+        self.assertEqual(self.replica().get_all(), [])
+
+    def test_partly_written_journal_line_waits_for_the_next_round(self):
+        self.leader.add(make_member(1))
+        follower = Follower(self.source, self.replica_dir)
+        follower.sync()
+        with open(os.path.join(self.leader_dir, "members.json.journal"), "ab") as journal:
+            journal.write(b'{"op": "upsert"')
+        self.assertEqual(self.source.changes(follower.positions)[1], [])
+
+    def test_ensure_current_syncs_only_when_lagging(self):
+        follower = Follower(self.source, self.replica_dir, max_lag=60)
+        with mock.patch.object(follower, "sync") as sync:
+            follower.ensure_current()
+            self.assertEqual(sync.call_count, 1)
+        follower.sync()
+        self.leader.add(make_member(1))
+        follower.ensure_current()
+        self.assertEqual(self.replica().get_all(), [])
+        follower.ensure_current(max_lag=0)
+        self.assertEqual(len(self.replica().get_all()), 1)
+
+    def test_follower_syncs_through_a_server(self):
+        member = self.leader.add(make_member(1))
+        server = ReplicationServer(self.source, ("127.0.0.1", 0), b"secret")
+        self.addCleanup(server.close)
+        server.start()
+        remote = RemoteSource(server.address, b"secret")
+        self.addCleanup(remote.close)
+
+        Follower(remote, self.replica_dir).sync()
+        self.assertEqual([replicated.id for replicated in self.replica().get_all()], [member.id])
+
+    def test_key_is_required_and_masked(self):
+        with self.assertRaises(ValueError):
+            ReplicationServer(self.source, ("127.0.0.1", 0), b"")
+        with self.assertRaises(ValueError):
+            RemoteSource(("127.0.0.1", 0), b"")
+
+        with mock.patch.object(Config, "REPLICATION_AUTHKEY", "secret"), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            Config.display()
+        self.assertIn("REPLICATION_AUTHKEY: ********", output.getvalue())
+        self.assertNotIn("secret", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
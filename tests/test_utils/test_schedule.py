@@ -0,0 +1,178 @@
+"""
+Tests for compiled zone schedules and opening hours, and the indexes built over them.
+"""
+
+import contextlib
+import io
+import unittest
+from datetime import datetime
+from src.utils.schedule import (
+    MINUTES_PER_DAY, MINUTES_PER_WEEK, AvailabilityIndex, OpeningHoursIndex, compile_opening_hours, compile_schedule,
+    minute_of_week, parse_time, slot_times, within_intervals
+)
+from src.utils.timestamps import to_epoch
+from tests.helpers import make_location, make_zone
+
+
+class CompileScheduleTest(unittest.TestCase):
+
+    def test_parse_time(self):
+        self.assertEqual(parse_time("00:00"), 0)
+        self.assertEqual(parse_time("18:30"), 18 * 60 + 30)
+        for value in ("24:00", "18:60", "1830", "18:3a", ""):
+            with self.assertRaises(ValueError):
+                parse_time(value)
+
+    def test_slots_compile_into_day_bitmaps(self):
+        bitmaps = compile_schedule({"Monday": ["18:00", "07:30", "bad"], "Tuesday": [], "Friday": ["bad"]})
+        self.assertEqual(list(bitmaps), ["Monday"])
+        self.assertEqual(bitmaps["Monday"], 1 << parse_time("07:30") | 1 << parse_time("18:00"))
+        self.assertEqual(slot_times(bitmaps["Monday"]), ["07:30", "18:00"])
+        self.assertEqual(compile_schedule(None), {})
+
+    def test_zone_availability_follows_schedule_updates(self):
+        zone = make_zone(schedule={"Monday": ["18:00"]})
+        self.assertTrue(zone.is_available("Monday", "18:00"))
+        self.assertFalse(zone.is_available("Monday", "19:00"))
+        self.assertFalse(zone.is_available("Monday", "not a time"))
+
+        zone.update_schedule("Monday", ["19:00"])
+        self.assertFalse(zone.is_available("Monday", "18:00"))
+        zone.schedule = {"Tuesday": ["18:00"]}
+        self.assertTrue(zone.is_available("Tuesday", "18:00"))
+        self.assertFalse(zone.is_available("Monday", "19:00"))
+
+
+class AvailabilityIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.studio = make_zone("Studio", schedule={"Tuesday": ["18:00", "19:00"]})
+        self.pool = make_zone("Pool", schedule={"Tuesday": ["18:00"], "Friday": ["07:00"]})
+        self.closed = make_zone("Closed", schedule={"Tuesday": ["18:00"]}, is_active=False)
+        self.gym = make_zone("Gym", schedule={"Tuesday": ["19:00"]})
+        self.central = make_location("Central", workout_zones=[self.studio, self.pool, self.closed])
+        self.north = make_location("North", workout_zones=[self.gym])
+        self.index = AvailabilityIndex([self.central, self.north])
+
+    def zone_names(self, refs) -> list:
+        return [ref.zone.name for ref in refs]
+
+    def test_available_zones(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.zone_names(self.index.available_zones("Tuesday", "18:00")), ["Studio", "Pool"])
+        self.assertEqual(self.zone_names(self.index.available_zones("Tuesday", "18:00", active_only=False)),
+                         ["Studio", "Pool", "Closed"])
+        refs = self.index.available_zones("Tuesday", "19:00", location_id=self.north.id)
+        self.assertEqual([(ref.location_id, ref.zone) for ref in refs], [(self.north.id, self.gym)])
+        self.assertEqual(self.index.available_zones("Sunday", "19:00"), [])
+        self.assertEqual(self.index.available_zones("Tuesday", "19:00", location_id="unknown"), [])
+
+    def test_inactive_location_hides_its_zones(self):
+        self.north.is_active = False
+        index = AvailabilityIndex([self.central, self.north])
+        self.assertEqual(self.zone_names(index.available_zones("Tuesday", "19:00")), ["Studio"])
+
+    def test_questions_over_several_slots_and_zones(self):
+        self.assertEqual(self.zone_names(self.index.available_throughout("Tuesday", ["18:00", "19:00"])), ["Studio"])
+        self.assertEqual(self.index.common_slots([self.studio.id, self.gym.id], "Tuesday"), ["19:00"])
+        self.assertEqual(self.index.common_slots([self.pool.id, self.gym.id], "Tuesday"), [])
+        self.assertEqual(self.zone_names(self.index.overlapping_zones(self.studio.id, "Tuesday")), ["Pool", "Gym"])
+        with self.assertRaises(KeyError):
+            self.index.common_slots(["unknown"], "Tuesday")
+
+
+# Monday
+WEEK_START = datetime(2030, 1, 7)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return WEEK_START.replace(day=WEEK_START.day + day, hour=hour, minute=minute)
+
+
+class CompileOpeningHoursTest(unittest.TestCase):
+
+    def test_ranges_compile_into_merged_week_intervals(self):
+        intervals = compile_opening_hours({
+            "Tuesday": "06:00-12:00, 11:00-14:00",
+            "Monday": "06:00-22:00",
+            "Wednesday": "closed",
+            "Thursday": "",
+            "Friday": "18:00-24:00",
+            "Saturday": "00:00-02:00",
+        })
+        self.assertEqual(intervals, [
+            (6 * 60, 22 * 60),
+            (MINUTES_PER_DAY + 6 * 60, MINUTES_PER_DAY + 14 * 60),
+            (4 * MINUTES_PER_DAY + 18 * 60, 5 * MINUTES_PER_DAY + 2 * 60),
+        ])
+
+    def test_overnight_hours_run_into_the_next_day(self):
+        self.assertEqual(compile_opening_hours({"Monday": "22:00-02:00"}), [(22 * 60, MINUTES_PER_DAY + 2 * 60)])
+        self.assertEqual(compile_opening_hours({"Sunday": "22:00-02:00"}),
+                         [(0, 2 * 60), (MINUTES_PER_WEEK - 2 * 60, MINUTES_PER_WEEK)])
+
+    def test_malformed_hours_are_rejected(self):
+        for opening_hours in ({"Funday": "06:00-22:00"}, {"Monday": "06:00"}, {"Monday": "06:00-25:00"},
+                              {"Monday": 6}, ["06:00-22:00"]):
+            with self.assertRaises(ValueError):
+                compile_opening_hours(opening_hours)
+        self.assertEqual(compile_opening_hours(None), [])
+
+    def test_minute_of_week_of_datetimes_and_epoch_seconds(self):
+        self.assertEqual(minute_of_week(at(0, 0)), 0)
+        self.assertEqual(minute_of_week(at(6, 23, 59)), MINUTES_PER_WEEK - 1)
+        for when in (at(0, 0), at(3, 18, 30), at(6, 23, 59)):
+            self.assertEqual(minute_of_week(to_epoch(when)), minute_of_week(when))
+
+    def test_spans_within_intervals(self):
+        intervals = compile_opening_hours({"Monday": "06:00-22:00", "Sunday": "20:00-24:00"})
+        self.assertTrue(within_intervals(intervals, at(0, 6)))
+        self.assertTrue(within_intervals(intervals, at(0, 21), 60))
+        self.assertFalse(within_intervals(intervals, at(0, 21), 61))
+        self.assertFalse(within_intervals(intervals, at(0, 22)))
+        self.assertFalse(within_intervals(intervals, at(0, 5, 59), 10))
+        # Sunday night into Monday morning wraps around the week
+        self.assertFalse(within_intervals(intervals, at(6, 23), 120))
+        self.assertTrue(within_intervals(compile_opening_hours({"Sunday": "20:00-02:00"}), at(6, 23), 120))
+        self.assertTrue(within_intervals([(0, MINUTES_PER_WEEK)], at(2, 12), MINUTES_PER_WEEK))
+
+
+class OpeningHoursIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.central = make_location("Central", opening_hours={"Monday": "06:00-22:00"})
+        self.north = make_location("North", opening_hours={"Monday": "12:00-02:00"})
+        self.closed = make_location("Closed", opening_hours={"Monday": "00:00-24:00"}, is_active=False)
+        self.broken = make_location("Broken", opening_hours={"Monday": "noon"})
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.index = OpeningHoursIndex([self.central, self.north, self.closed, self.broken])
+        self.assertIn(f"Skipping location {self.broken.id}", output.getvalue())
+
+    def test_open_locations(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.open_locations(at(0, 7)), [self.central])
+        self.assertEqual(self.index.open_locations(at(0, 13)), [self.central, self.north])
+        self.assertEqual(self.index.open_locations(to_epoch(at(1, 1))), [self.north])
+        self.assertEqual(self.index.open_locations(at(1, 2)), [])
+        self.assertTrue(self.index.is_open(self.north.id, at(0, 23)))
+        self.assertFalse(self.index.is_open(self.closed.id, at(0, 23)))
+        self.assertFalse(self.index.is_open(self.broken.id, at(0, 23)))
+
+    def test_bookings_within_opening_hours(self):
+        self.assertTrue(self.index.within_opening_hours(self.central.id, at(0, 21), 60))
+        self.assertFalse(self.index.within_opening_hours(self.central.id, at(0, 21), 90))
+        self.assertTrue(self.index.within_opening_hours(self.north.id, at(0, 21), 240))
+        self.assertFalse(self.index.within_opening_hours(self.closed.id, at(0, 12), 60))
+        self.assertFalse(self.index.within_opening_hours("unknown", at(0, 12), 60))
+
+    def test_location_hours_follow_updates(self):
+        self.assertTrue(self.central.is_within_opening_hours(at(0, 21), 60))
+        self.central.set_opening_hours("Monday", "06:00-21:00")
+        self.assertFalse(self.central.is_within_opening_hours(at(0, 21), 60))
+        self.central.opening_hours = {"Tuesday": "06:00-22:00"}
+        self.assertTrue(self.central.is_open_at(at(1, 21)))
+        self.assertFalse(self.central.is_open_at(at(0, 12)))
+
+
+if __name__ == "__main__":
+    unittest.main()
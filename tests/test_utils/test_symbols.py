@@ -0,0 +1,64 @@
+"""
+Tests for the shared symbol table and the interning of foreign keys when records are decoded.
+"""
+
+import unittest
+from dataclasses import fields
+from src.models.attendance import AttendanceRecord
+from src.repositories.attendance_repository import AttendanceRepository
+from src.utils.codec import codec_for
+from src.utils.events import EventBus
+from src.utils.symbols import SymbolTable, is_symbol, symbols
+from tests.helpers import DataDirTestCase, make_attendance
+
+
+def fresh(value: str) -> str:
+    """An equal string that is a different object"""
+    return "".join(list(value))
+
+
+class SymbolTableTest(unittest.TestCase):
+
+    def test_equal_strings_share_one_instance(self):
+        table = SymbolTable()
+        first = table.intern(fresh("member-1"), fresh("member-1"))
+        second = fresh("member-1")
+        self.assertIsNot(first, second)
+        self.assertIs(table.intern(second, second), first)
+        self.assertIn("member-1", table)
+        self.assertEqual(len(table), 1)
+
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(first, "member-1")
+
+    def test_only_declared_fields_are_symbols(self):
+        names = {field.name for field in fields(AttendanceRecord) if is_symbol(field)}
+        self.assertEqual(names, {"member_id", "location_id", "zone_id"})
+
+
+class DecodeInterningTest(DataDirTestCase):
+
+    def test_decoded_foreign_keys_are_interned(self):
+        codec = codec_for(AttendanceRecord)
+        rows = [codec.encode(make_attendance(member_id=fresh("member-1"))) for _ in range(2)]
+        first, second = [codec.decode(row) for row in rows]
+
+        self.assertIsNot(rows[0]["member_id"], rows[1]["member_id"])
+        self.assertIs(first.member_id, second.member_id)
+        self.assertIs(first.member_id, symbols.intern("member-1", "member-1"))
+        self.assertIsNot(first.id, second.id)
+        self.assertIsNone(first.zone_id)
+
+    def test_records_loaded_from_file_share_their_keys(self):
+        path = self.path("attendance.json")
+        repository = AttendanceRepository(path, event_bus=EventBus())
+        repository.add(make_attendance(location_id=fresh("north")))
+        repository.add(make_attendance(location_id=fresh("north")))
+
+        first, second = AttendanceRepository(path, event_bus=EventBus()).get_all()
+        self.assertIs(first.location_id, second.location_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for sampled tracing spans and the trace log they are written to.
+"""
+
+import json
+import unittest
+from unittest import mock
+from src.repositories.member_repository import MemberRepository
+from src.utils.events import EventBus
+from src.utils.tracing import Tracer
+from tests.helpers import DataDirTestCase, make_member
+
+
+class TracerTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.log_path = self.path("trace.json")
+        self.tracer = Tracer(self.log_path, sample_rate=1.0)
+
+    def events(self) -> list:
+        try:
+            with open(self.log_path) as file:
+                text = file.read()
+        except FileNotFoundError:
+            return []
+        return json.loads(text.rstrip().rstrip(",") + "]")
+
+    def test_nested_spans_are_written_with_their_root(self):
+        with self.tracer.span("service.book", member="m1") as root:
+            with self.tracer.span("repository.save") as child:
+                child.set(rows=2)
+            self.assertEqual(self.events(), [])
+            root.set(booked=True)
+
+        child_event, root_event = self.events()
+        self.assertEqual((child_event["name"], child_event["cat"]), ("repository.save", "repository"))
+        self.assertEqual(child_event["args"], {"rows": 2})
+        self.assertEqual(root_event["args"], {"member": "m1", "booked": True})
+        self.assertGreaterEqual(child_event["ts"], root_event["ts"])
+        self.assertLessEqual(child_event["dur"], root_event["dur"])
+
+        with self.tracer.span("service.cancel"):
+            pass
+        self.assertEqual(len(self.events()), 3)
+
+    def test_errors_are_recorded_on_the_span(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("service.book"):
+                raise ValueError("rejected")
+        self.assertEqual(self.events()[0]["args"], {"error": "ValueError"})
+
+    def test_unsampled_root_skips_its_children(self):
+        tracer = Tracer(self.log_path, sample_rate=0.5)
+        with mock.patch("src.utils.tracing.random.random", return_value=0.9):
+            with tracer.span("service.book"):
+                with tracer.span("repository.save"):
+                    pass
+        self.assertEqual(self.events(), [])
+
+    def test_fast_traces_are_dropped(self):
+        tracer = Tracer(self.log_path, sample_rate=1.0, slow_threshold_ms=60_000)
+        with tracer.span("service.book"):
+            pass
+        self.assertEqual(self.events(), [])
+
+    def test_repository_writes_are_traced_down_to_the_file(self):
+        with mock.patch("src.repositories.base_repository.tracer", self.tracer), \
+                mock.patch("src.utils.tracing.tracer", self.tracer):
+            repository = MemberRepository(self.path("members.json"), event_bus=EventBus())
+            with self.tracer.span("service.add_member"):
+                repository.add(make_member(1))
+
+        names = [event["name"] for event in self.events()]
+        self.assertEqual(names[-1], "service.add_member")
+        self.assertIn("repository.save", names)
+        self.assertLess(names.index("repository.write"), names.index("repository.save"))
+
+
+if __name__ == "__main__":
+    unittest.main()